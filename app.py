@@ -3,61 +3,192 @@
 # Sistema de Previsão de Atrasos de Voos
 # ========================================
 
-import json
+import asyncio
+import hmac
 import os
+import signal
+import time
 import traceback
-from datetime import datetime
+from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
+from typing import List, Optional
 
-import joblib
-import pandas as pd
-import uvicorn
-from fastapi import FastAPI, HTTPException
+import anyio.to_thread
+import numpy as np
+from fastapi import FastAPI, Header, HTTPException, Response
 from pydantic import BaseModel, field_validator
 
+from src.artifact_registry import ArtifactRegistry, carregar_versao
+from src.feature_encoder import EntradaInvalida
+from src.inference_executor import FilaCheia, InferenceExecutor, PrazoExcedido
+from src.metrics import CONTENT_TYPE, Contador, Gauge, MetricasAPI
+from src.micro_batcher import MicroBatcher
+from src.prediction_cache import PredictionCache
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Cada worker ajusta o threadpool onde rodam os endpoints síncronos
+    if THREADPOOL_SIZE > 0:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+    # Artefatos carregados em segundo plano: a porta abre na hora e /ready
+    # responde 503 até a primeira versão ser publicada (sob server.py o master
+    # já carregou antes do fork)
+    if registry.atual is None:
+        print("🔄 Inicializando API v2.1 (artefatos em segundo plano)...")
+        registry.recarregar()
+
+    # Recarga automática quando os arquivos de artefatos mudam (sob server.py
+    # quem vigia é o master, que troca os workers)
+    if ARTIFACT_WATCH_S > 0 and not MASTER_PID:
+        registry.vigiar(ARTIFACT_WATCH_S)
+    yield
+    registry.parar()
+    if executor is not None:
+        executor.close()
+    if batcher is not None:
+        batcher.close()
+
+
 app = FastAPI(
     title="FlightOnTime API",
     description="Sistema de Previsão de Atrasos de Voos com ML (Auto-Lookup)",
-    version="2.1"
+    version="2.1",
+    lifespan=lifespan
 )
 
 # --- CONFIGURAÇÃO DE PATHS ---
 BASE_DIR = Path(__file__).resolve().parent
-MODEL_PATH = BASE_DIR / 'models' / 'randomforest_v7_final.pkl'
-ENCODERS_PATH = BASE_DIR / 'models' / 'label_encoders_v7.pkl'
-THRESHOLD_PATH = BASE_DIR / 'models' / 'optimal_threshold_v2.txt'
-METADATA_PATH = BASE_DIR / 'models' / 'metadata_v7.json'
-LOOKUP_PATH = BASE_DIR / 'models' / 'lookup_tables.json'
+ARTIFACTS_DIR = Path(os.getenv("FLIGHTONTIME_ARTIFACTS_DIR", BASE_DIR / 'models'))
+# Pickle do sklearn ou diretório exportado por export_compiled_model.py
+MODEL_PATH = Path(os.getenv("FLIGHTONTIME_MODEL_PATH", ARTIFACTS_DIR / 'randomforest_v7_final.pkl'))
+ENCODERS_PATH = ARTIFACTS_DIR / 'label_encoders_v7.pkl'
+THRESHOLD_PATH = ARTIFACTS_DIR / 'optimal_threshold_v2.txt'
+METADATA_PATH = ARTIFACTS_DIR / 'metadata_v7.json'
+LOOKUP_PATH = ARTIFACTS_DIR / 'lookup_tables.json'
+FEATURE_NAMES_PATH = ARTIFACTS_DIR / 'feature_names_v7.json'
+# Grade de risco gerada por build_risk_grid.py (opcional)
+RISK_GRID_PATH = Path(os.getenv("FLIGHTONTIME_RISK_GRID_PATH", ARTIFACTS_DIR / 'risk_grid_v7'))
+
+# --- CONFIGURAÇÃO DO SERVIDOR ---
+# Threads do pool de endpoints síncronos por worker (0 = default do anyio, 40)
+THREADPOOL_SIZE = int(os.getenv("FLIGHTONTIME_THREADPOOL_SIZE", "0"))
+
+# --- CONFIGURAÇÃO DO EXECUTOR DE INFERÊNCIA ---
+# /predict e /predict/batch rodam em um pool dedicado de INFERENCE_WORKERS
+# threads com no máximo INFERENCE_QUEUE_SIZE requisições esperando: acima
+# disso a resposta é 429 na hora. Uma requisição de /predict que não termina
+# em INFERENCE_DEADLINE_MS recebe 503 (e não roda se ainda estiver na fila).
+# INFERENCE_WORKERS=0 volta a rodar no threadpool do anyio, sem limites.
+INFERENCE_WORKERS = int(os.getenv("FLIGHTONTIME_INFERENCE_WORKERS", "2"))
+INFERENCE_QUEUE_SIZE = int(os.getenv("FLIGHTONTIME_INFERENCE_QUEUE_SIZE", "16"))
+INFERENCE_DEADLINE_MS = float(os.getenv("FLIGHTONTIME_INFERENCE_DEADLINE_MS", "1000"))
+
+# --- CONFIGURAÇÃO DE LOTE ---
+# Limite de voos por chamada de /predict/batch e tamanho do bloco enviado
+# ao predict_proba (um bloco = uma chamada ao modelo).
+BATCH_MAX_FLIGHTS = int(os.getenv("FLIGHTONTIME_BATCH_MAX_FLIGHTS", "50000"))
+BATCH_CHUNK_SIZE = int(os.getenv("FLIGHTONTIME_BATCH_CHUNK_SIZE", "5000"))
+if BATCH_CHUNK_SIZE < 1:
+    raise ValueError(f"❌ FLIGHTONTIME_BATCH_CHUNK_SIZE deve ser >= 1 (recebido {BATCH_CHUNK_SIZE})")
+
+# --- CONFIGURAÇÃO DE INFERÊNCIA ---
+# "sklearn": predict_proba do RandomForestClassifier
+# "compiled": árvores exportadas para arrays NumPy (src/tree_engine.py)
+# Um MODEL_PATH já compilado (diretório mmap) usa sempre o motor compilado.
+INFERENCE_ENGINE = os.getenv("FLIGHTONTIME_INFERENCE_ENGINE", "sklearn")
+INFERENCE_ENGINES = ("sklearn", "compiled")
+
+# --- CONFIGURAÇÃO DE MICRO-BATCHING ---
+# Agrupa chamadas concorrentes de /predict em um único predict_proba:
+# até MICROBATCH_MAX_SIZE linhas ou MICROBATCH_WAIT_MS de espera (0 = desligado).
+# Só a codificação ocupa o executor de inferência: a espera pelo lote fica no
+# event loop, então um lote junta mais requisições que INFERENCE_WORKERS.
+MICROBATCH_MAX_SIZE = int(os.getenv("FLIGHTONTIME_MICROBATCH_MAX_SIZE", "0"))
+MICROBATCH_WAIT_MS = float(os.getenv("FLIGHTONTIME_MICROBATCH_WAIT_MS", "2"))
+
+# --- CONFIGURAÇÃO DE CACHE ---
+# Cache LRU/TTL de probabilidades de /predict indexado pela linha codificada
+# (0 = desligado). Invalidado a cada recarga de artefatos.
+PREDICTION_CACHE_SIZE = int(os.getenv("FLIGHTONTIME_PREDICTION_CACHE_SIZE", "65536"))
+PREDICTION_CACHE_TTL_S = float(os.getenv("FLIGHTONTIME_PREDICTION_CACHE_TTL_S", "300"))
+
+# --- CONFIGURAÇÃO DE MÉTRICAS ---
+# GET /metrics no formato Prometheus (0 = desligado). Contadores e latência
+# total valem para toda requisição; o tempo por etapa (parse, lookup, encode,
+# grade, cache, predict) é medido em uma fração FLIGHTONTIME_METRICS_STAGE_SAMPLE
+# das requisições (1 = todas, 0 = nenhuma).
+METRICS_ENABLED = os.getenv("FLIGHTONTIME_METRICS_ENABLED", "1") != "0"
+METRICS_STAGE_SAMPLE = float(os.getenv("FLIGHTONTIME_METRICS_STAGE_SAMPLE", "0.1"))
+
+# --- CONFIGURAÇÃO DE RECARGA ---
+# Intervalo (s) entre verificações dos arquivos de artefatos (modelo, encoders,
+# threshold, lookup tables, feature names, grade de risco). Uma versão nova é
+# carregada em segundo plano, validada e trocada sem reiniciar (0 = desligado).
+ARTIFACT_WATCH_S = float(os.getenv("FLIGHTONTIME_ARTIFACT_WATCH_S",
+                                   os.getenv("FLIGHTONTIME_LOOKUP_RELOAD_S", "30")))
+# Token exigido no header X-Admin-Token de /admin/* (vazio = endpoints desativados)
+ADMIN_TOKEN = os.getenv("FLIGHTONTIME_ADMIN_TOKEN", "")
+# Definido por server.py: /admin/reload pede ao master a troca de todos os workers
+MASTER_PID = int(os.getenv("FLIGHTONTIME_MASTER_PID", "0"))
+
+prediction_cache = (PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL_S)
+                    if PREDICTION_CACHE_SIZE > 0 else None)
+metricas = MetricasAPI(METRICS_ENABLED, METRICS_STAGE_SAMPLE)
+executor = InferenceExecutor(INFERENCE_WORKERS, INFERENCE_QUEUE_SIZE) if INFERENCE_WORKERS > 0 else None
+
 
 # --- CARREGAR ARTEFATOS ---
-try:
+CAMINHOS_ARTEFATOS = {
+    'model': MODEL_PATH,
+    'encoders': ENCODERS_PATH,
+    'threshold': THRESHOLD_PATH,
+    'metadata': METADATA_PATH,
+    'lookup': LOOKUP_PATH,
+    'feature_names': FEATURE_NAMES_PATH,
+    'risk_grid': RISK_GRID_PATH,
+}
+
+
+def carregar_versao_atual(anterior):
+    """Nova versão dos artefatos (modelo e encoders inalterados são reaproveitados)."""
+    if INFERENCE_ENGINE not in INFERENCE_ENGINES:
+        raise ValueError(f"FLIGHTONTIME_INFERENCE_ENGINE inválido: {INFERENCE_ENGINE!r}")
+    return carregar_versao(CAMINHOS_ARTEFATOS, INFERENCE_ENGINE, anterior)
+
+
+def invalidar_cache(artefatos):
+    if prediction_cache is not None:
+        prediction_cache.clear()
+
+
+# Versão em uso: cada requisição lê `registry.atual` uma vez
+registry = ArtifactRegistry(carregar_versao_atual, ao_publicar=invalidar_cache, caminhos=CAMINHOS_ARTEFATOS)
+
+
+def carregar_artefatos():
+    """
+    Carrega e publica uma nova versão, esperando a conclusão. Se a carga
+    falhar, a versão atual (se houver) continua em uso.
+
+    Importar `app` não carrega nada (nem importa pandas/sklearn): quem serve
+    chama esta função antes do fork (server.py) ou deixa o lifespan carregar
+    em segundo plano; export_openapi.py só precisa do schema.
+    """
     print("🔄 Inicializando API v2.1...")
-    model = joblib.load(MODEL_PATH)
-    encoders = joblib.load(ENCODERS_PATH)
-
-    # Carregar Lookup Tables
-    if os.path.exists(LOOKUP_PATH):
-        with open(LOOKUP_PATH, 'r') as f:
-            lookup_tables = json.load(f)
-        print(f"✅ Lookup Tables carregadas ({len(lookup_tables.get('origin_delay_rate', []))} aeroportos)")
-    else:
-        print("⚠️ Lookup Tables não encontradas! Usando defaults globais.")
-        lookup_tables = {"defaults": {"origin_delay_rate": 0.2, "carrier_delay_rate": 0.2, "origin_traffic": 500}}
+    if registry.recarregar(aguardar=True):
+        print("🚀 API PRONTA NA PORTA 8000")
+    elif registry.atual is None:
+        print(f"❌ ERRO CRÍTICO: {registry.ultimo_erro}")
 
-    # Carregar Threshold
-    if os.path.exists(THRESHOLD_PATH):
-        with open(THRESHOLD_PATH, 'r') as f:
-            OPTIMAL_THRESHOLD = float(f.read().strip())
-    else:
-        OPTIMAL_THRESHOLD = 0.409
 
-    print("🚀 API PRONTA NA PORTA 8000")
+def score_rows(X, model):
+    """Probabilidade de atraso para cada linha de X (modelo da versão que a codificou)."""
+    return model.predict_proba(X)[:, 1]
+
 
-except Exception as e:
-    print(f"❌ ERRO CRÍTICO: {e}")
-    model = None
-    lookup_tables = {}
-    OPTIMAL_THRESHOLD = 0.5
+batcher = MicroBatcher(score_rows, MICROBATCH_MAX_SIZE, MICROBATCH_WAIT_MS) if MICROBATCH_MAX_SIZE > 0 else None
 
 # --- SCHEMA SIMPLIFICADO (Back-End Friendly) ---
 
@@ -87,96 +218,398 @@ class FlightRequest(BaseModel):
         return v
 
 
-def get_time_of_day(h):
-    if 6 <= h < 12:
-        return 'Morning'
-    elif 12 <= h < 18:
-        return 'Afternoon'
-    elif 18 <= h < 22:
-        return 'Evening'
-    else:
-        return 'Night'
+class FlightBatchRequest(BaseModel):
+    flights: List[FlightRequest]
+
+    @field_validator('flights')
+    @classmethod
+    def validate_flights(cls, v):
+        if not v:
+            raise ValueError('Lote deve conter ao menos um voo')
+        if len(v) > BATCH_MAX_FLIGHTS:
+            raise ValueError(f'Lote excede o limite de {BATCH_MAX_FLIGHTS} voos')
+        return v
+
+
+def montar_resposta(proba, origin_rate, carrier_rate, threshold):
+    prediction = 1 if proba >= threshold else 0
+
+    return {
+        "prediction": "Atrasado" if prediction == 1 else "Pontual",
+        "probability_delay": round(float(proba), 4),
+        "recommendation": "Alerta: Alto risco operacional" if prediction == 1 else "Operação normal",
+        "internal_metrics": {
+            "historical_origin_risk": origin_rate,
+            "historical_carrier_risk": carrier_rate
+        }
+    }
+
+
+async def executar_inferencia(func, request, medicao, prazo_ms: float = 0):
+    """
+    Roda `func(request, medicao)` no executor de inferência sem bloquear o
+    event loop: 429 se a fila estiver cheia, 503 se o prazo (ms, 0 = sem
+    prazo) esgotar. Sem executor, usa o threadpool do anyio.
+    """
+    def tarefa():
+        medicao.etapa("queue")
+        return func(request, medicao)
+
+    if executor is None:
+        return await anyio.to_thread.run_sync(tarefa)
+    try:
+        return await executor.run(tarefa, timeout=prazo_ms / 1000 if prazo_ms > 0 else None)
+    except FilaCheia:
+        raise HTTPException(status_code=429, detail="Servidor sobrecarregado, tente novamente",
+                            headers={"Retry-After": "1"})
+    except PrazoExcedido:
+        raise HTTPException(status_code=503, detail="Prazo de inferência esgotado",
+                            headers={"Retry-After": "1"})
+
+
+@app.post("/predict", name="predict_flight_delay")
+async def predict_flight_delay_endpoint(request: FlightRequest):
+    with metricas.requisicao("/predict") as medicao:
+        if batcher is None:
+            return await executar_inferencia(_predict_flight_delay, request, medicao, INFERENCE_DEADLINE_MS)
+
+        # Micro-batching: o executor só codifica; o lote é esperado no event
+        # loop, sem ocupar uma vaga do executor, dentro do mesmo prazo
+        prazo = time.monotonic() + INFERENCE_DEADLINE_MS / 1000 if INFERENCE_DEADLINE_MS > 0 else None
+        pendente = await executar_inferencia(_codificar_para_lote, request, medicao, INFERENCE_DEADLINE_MS)
+        if not isinstance(pendente, _Predicao):
+            return pendente
+        restante = prazo - time.monotonic() if prazo is not None else None
+        if restante is not None and restante <= 0:
+            raise HTTPException(status_code=503, detail="Prazo de inferência esgotado",
+                                headers={"Retry-After": "1"})
+        with _erros_de_predicao("/predict"):
+            future = batcher.submit(pendente.X, pendente.art.model, copiar=False)
+            try:
+                # Prazo esgotado cancela o item (o batcher o descarta se ainda não pontuou)
+                proba = await asyncio.wait_for(asyncio.wrap_future(future), restante)
+            except asyncio.TimeoutError:
+                raise HTTPException(status_code=503, detail="Prazo de inferência esgotado",
+                                    headers={"Retry-After": "1"})
+            return _concluir_predicao(pendente, proba, medicao)
 
 
-@app.post("/predict")
 def predict_flight_delay(request: FlightRequest):
-    if model is None:
+    """Mesma resposta de POST /predict, calculada na thread de quem chama."""
+    with metricas.requisicao("/predict") as medicao:
+        return _predict_flight_delay(request, medicao)
+
+
+class _Predicao:
+    """Requisição de /predict codificada que ainda precisa do modelo."""
+    __slots__ = ("art", "X", "cache", "chave", "geracao", "origin_rate", "carrier_rate")
+
+    def __init__(self, art, X, cache, chave, geracao, origin_rate, carrier_rate):
+        self.art = art
+        self.X = X
+        self.cache = cache
+        self.chave = chave
+        self.geracao = geracao
+        self.origin_rate = origin_rate
+        self.carrier_rate = carrier_rate
+
+
+@contextmanager
+def _erros_de_predicao(endpoint):
+    """Erros inesperados viram 500 (contados por tipo); HTTPException passa."""
+    try:
+        yield
+    except HTTPException:
+        raise
+    except Exception as e:
+        metricas.erro(endpoint, e)
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _predict_flight_delay(request: FlightRequest, medicao):
+    with _erros_de_predicao("/predict"):
+        pendente = _codificar_predicao(request, medicao)
+        if not isinstance(pendente, _Predicao):
+            return pendente
+
+        # Predição (agrupada com requisições concorrentes se o batcher estiver ativo)
+        if batcher is not None:
+            proba = batcher.predict(pendente.X, pendente.art.model)
+        else:
+            proba = pendente.art.model.predict_proba(pendente.X)[0][1]
+        return _concluir_predicao(pendente, proba, medicao)
+
+
+def _codificar_para_lote(request: FlightRequest, medicao):
+    """
+    `_codificar_predicao` com a linha copiada: o buffer é da thread do
+    executor e é reescrito na próxima requisição dela. A cópia passa a ser
+    do batcher (submit com copiar=False), que não copia de novo.
+    """
+    with _erros_de_predicao("/predict"):
+        pendente = _codificar_predicao(request, medicao)
+        if isinstance(pendente, _Predicao):
+            pendente.X = pendente.X.copy()
+        return pendente
+
+
+def _codificar_predicao(request: FlightRequest, medicao):
+    """
+    Codifica o voo e consulta grade de risco e cache. Retorna a resposta
+    pronta ou um `_Predicao` para pontuar com o modelo.
+    """
+    # Geração do cache lida ANTES da versão: uma troca no meio da requisição
+    # descarta o valor calculado com a versão anterior
+    cache = prediction_cache
+    geracao = cache.geracao if cache is not None else None
+    art = registry.atual
+    if art is None or art.model is None:
         raise HTTPException(status_code=503, detail="Modelo indisponível")
+    medicao.versao = str(art.versao)
 
+    # 1-3. Parse de Data/Hora, Lookup Histórico e Codificação
+    encoder = art.feature_encoder
     try:
-        # 1. Parse de Data e Hora
-        try:
-            flight_date = datetime.strptime(request.flight_date, "%Y-%m-%d")
-            month = flight_date.month
-            quarter = (month - 1) // 3 + 1
-            hour = int(str(request.crs_dep_time).zfill(4)[:2])
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Data ou horário inválido")
-
-        # 2. Lookup de Dados Históricos (Lógica Interna)
-        defaults = lookup_tables.get("defaults", {})
-
-        origin_rate = lookup_tables.get("origin_delay_rate", {}).get(
-            request.origin, defaults.get("origin_delay_rate", 0.195)
-        )
-        carrier_rate = lookup_tables.get("carrier_delay_rate", {}).get(
-            request.airline, defaults.get("carrier_delay_rate", 0.205)
-        )
-        traffic = lookup_tables.get("origin_traffic", {}).get(
-            request.origin, defaults.get("origin_traffic", 450)
-        )
-
-        # 3. Montagem das Features
-        features = {
-            'Airline': request.airline,
-            'Origin': request.origin,
-            'Dest': request.dest,
-            'Distance': request.distance,
-            'Month': month,
-            'DayOfWeek': request.day_of_week,
-            'dephour': hour,
-            'quarter': quarter,
-            'is_weekend': 1 if request.day_of_week >= 6 else 0,
-            'time_of_day': get_time_of_day(hour),
-            'origin_delay_rate': origin_rate,
-            'carrier_delay_rate': carrier_rate,
-            'origin_traffic': traffic
-        }
+        X, origin_rate, carrier_rate = encoder.encode(request, medicao.etapa if medicao.amostrada else None)
+    except EntradaInvalida:
+        raise HTTPException(status_code=400, detail="Data ou horário inválido")
+    medicao.etapa("encode")
+    if metricas.habilitado:
+        metricas.qualidade_entrada(encoder.lookups_ausentes((request.origin,), (request.airline,)),
+                                   encoder.categorias_desconhecidas(X))
+
+    # Voo da malha pré-calculada: consulta O(1) na grade de risco
+    if art.risk_grid is not None:
+        proba = art.risk_grid.lookup(
+            request.airline, request.origin, request.dest, request.distance,
+            *encoder.calendario(X))
+        medicao.etapa("risk_grid")
+        if proba is not None:
+            metricas.voos("/predict", 1, "risk_grid")
+            return montar_resposta(proba, origin_rate, carrier_rate, art.threshold)
+
+    # Voo já consultado: mesma linha codificada, mesma probabilidade
+    chave = None
+    if cache is not None:
+        chave = PredictionCache.chave(X)
+        proba = cache.get(chave)
+        medicao.etapa("cache")
+        if proba is not None:
+            metricas.voos("/predict", 1, "cache")
+            return montar_resposta(proba, origin_rate, carrier_rate, art.threshold)
+
+    return _Predicao(art, X, cache, chave, geracao, origin_rate, carrier_rate)
+
 
-        X = pd.DataFrame([features])
+def _concluir_predicao(pendente: _Predicao, proba, medicao):
+    medicao.etapa("predict")
+    metricas.voos("/predict", 1, "model")
+    if pendente.cache is not None:
+        pendente.cache.put(pendente.chave, proba, pendente.geracao)
+    return montar_resposta(proba, pendente.origin_rate, pendente.carrier_rate, pendente.art.threshold)
 
-        # Codificação de Categóricas
-        for col in ['Airline', 'Origin', 'Dest', 'time_of_day']:
-            if col in encoders:
-                val = X.at[0, col]
-                X[col] = encoders[col].transform([val])[0] if val in encoders[col].classes_ else -1
 
-        # Reordenar colunas conforme treino
-        cols_order = [
-            'Month', 'DayOfWeek', 'dephour', 'is_weekend', 'quarter',
-            'Distance', 'origin_delay_rate', 'carrier_delay_rate', 'origin_traffic',
-            'Airline', 'Origin', 'Dest', 'time_of_day'
+@app.post("/predict/batch", name="predict_flight_delay_batch")
+async def predict_flight_delay_batch_endpoint(request: FlightBatchRequest):
+    """
+    Predição em lote: mesmas respostas de /predict, na ordem de entrada,
+    com uma chamada a predict_proba por bloco de BATCH_CHUNK_SIZE voos.
+    Ocupa uma vaga do executor de inferência, sem prazo.
+    """
+    with metricas.requisicao("/predict/batch") as medicao:
+        return await executar_inferencia(_predict_flight_delay_batch, request, medicao)
+
+
+def predict_flight_delay_batch(request: FlightBatchRequest):
+    """Mesma resposta de POST /predict/batch, calculada na thread de quem chama."""
+    with metricas.requisicao("/predict/batch") as medicao:
+        return _predict_flight_delay_batch(request, medicao)
+
+
+def _predict_flight_delay_batch(request: FlightBatchRequest, medicao):
+    art = registry.atual
+    if art is None or art.model is None:
+        raise HTTPException(status_code=503, detail="Modelo indisponível")
+    medicao.versao = str(art.versao)
+    metricas.lote("/predict/batch", len(request.flights))
+
+    try:
+        encoder = art.feature_encoder
+        try:
+            X, origin_rates, carrier_rates = encoder.encode_batch(
+                request.flights, medicao.etapa if medicao.amostrada else None)
+        except EntradaInvalida as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        medicao.etapa("encode")
+        if metricas.habilitado:
+            metricas.qualidade_entrada(
+                encoder.lookups_ausentes([f.origin for f in request.flights],
+                                         [f.airline for f in request.flights]),
+                encoder.categorias_desconhecidas(X))
+
+        probas = np.empty(len(X))
+        for inicio in range(0, len(X), BATCH_CHUNK_SIZE):
+            fim = inicio + BATCH_CHUNK_SIZE
+            probas[inicio:fim] = art.model.predict_proba(X[inicio:fim])[:, 1]
+        medicao.etapa("predict")
+        metricas.voos("/predict/batch", len(X), "model")
+
+        predictions = [
+            montar_resposta(proba, origin_rate, carrier_rate, art.threshold)
+            for proba, origin_rate, carrier_rate in zip(
+                probas, origin_rates.tolist(), carrier_rates.tolist())
         ]
-        X = X[cols_order]
-
-        # Predição
-        proba = model.predict_proba(X)[0][1]
-        prediction = 1 if proba >= OPTIMAL_THRESHOLD else 0
-
-        return {
-            "prediction": "Atrasado" if prediction == 1 else "Pontual",
-            "probability_delay": round(float(proba), 4),
-            "recommendation": "Alerta: Alto risco operacional" if prediction == 1 else "Operação normal",
-            "internal_metrics": {
-                "historical_origin_risk": origin_rate,
-                "historical_carrier_risk": carrier_rate
-            }
-        }
+        medicao.etapa("response")
+        return {"total": len(predictions), "predictions": predictions}
 
+    except HTTPException:
+        raise
     except Exception as e:
+        metricas.erro("/predict/batch", e)
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/health")
+def health():
+    """Liveness: o processo responde (não depende dos artefatos)."""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+def ready(response: Response):
+    """Readiness: 200 só com uma versão de artefatos publicada."""
+    art = registry.atual
+    if art is None:
+        response.status_code = 503
+        return {"ready": False, "reloading": registry.recarregando,
+                "last_error": registry.ultimo_erro}
+    return {"ready": True, "version": art.versao}
+
+
+@app.get("/metrics/batcher")
+def batcher_metrics():
+    """Tamanho dos lotes e espera na fila do micro-batcher."""
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
+
+
+@app.get("/metrics/executor")
+def executor_metrics():
+    """Ocupação, fila e rejeições do executor de inferência."""
+    if executor is None:
+        return {"enabled": False}
+    return {"enabled": True, **executor.stats()}
+
+
+@app.get("/metrics/cache")
+def cache_metrics():
+    """Hits, misses e evictions do cache de predições."""
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
+
+
+@metricas.registro.coletor
+def metricas_de_estado():
+    """Versão em uso, grade de risco, cache, executor e micro-batcher, lidos a cada GET /metrics."""
+    pronto = Gauge("flightontime_ready", "1 se há uma versão de artefatos publicada.")
+    art = registry.atual
+    pronto.definir(0 if art is None else 1)
+    yield pronto
+
+    if art is not None:
+        info = art.info()
+        modelo = Gauge("flightontime_model_info", "Versão dos artefatos em uso (valor sempre 1).",
+                       ("model_version", "model", "lookup_version"))
+        modelo.definir(1, str(info["version"]), str(info["model"]), str(info["lookup_version"]))
+        rotas = Gauge("flightontime_risk_grid_routes", "Rotas na grade de risco em uso (0 = sem grade).")
+        rotas.definir(info["risk_grid_routes"] or 0)
+        descartada = Gauge("flightontime_risk_grid_rejected",
+                           "1 se a grade de risco existe mas não corresponde aos artefatos carregados.")
+        descartada.definir(0 if info["risk_grid_error"] is None else 1)
+        yield from (modelo, rotas, descartada)
+
+    if prediction_cache is not None:
+        stats = prediction_cache.stats()
+        consultas = Contador("flightontime_prediction_cache_requests_total",
+                             "Consultas ao cache de predições por resultado.", ("result",))
+        for resultado in ("hits", "misses", "evictions", "expirations"):
+            consultas.inc(resultado, valor=stats[resultado])
+        tamanho = Gauge("flightontime_prediction_cache_size", "Entradas no cache de predições.")
+        tamanho.definir(stats["size"])
+        yield from (consultas, tamanho)
+
+    if executor is not None:
+        stats = executor.stats()
+        ocupacao = Gauge("flightontime_inference_tasks", "Tarefas no executor de inferência por estado.",
+                         ("state",))
+        ocupacao.definir(stats["running"], "running")
+        ocupacao.definir(stats["queue_depth"], "queued")
+        descartadas = Contador("flightontime_inference_shed_total",
+                               "Requisições recusadas pelo executor de inferência por motivo.", ("reason",))
+        descartadas.inc("queue_full", valor=stats["rejected"])
+        descartadas.inc("deadline", valor=stats["expired"])
+        yield from (ocupacao, descartadas)
+
+    if batcher is not None:
+        stats = batcher.stats()
+        lotes = Contador("flightontime_microbatch_batches_total", "Lotes enviados ao modelo pelo micro-batcher.")
+        lotes.inc(valor=stats["batches"])
+        fila = Gauge("flightontime_microbatch_queue_depth", "Requisições na fila do micro-batcher.")
+        fila.definir(stats["queue_depth"])
+        yield from (lotes, fila)
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Métricas de predição no formato de texto do Prometheus."""
+    if not metricas.habilitado:
+        raise HTTPException(status_code=404, detail="Métricas desativadas (FLIGHTONTIME_METRICS_ENABLED=0)")
+    return Response(content=metricas.expor(), media_type=CONTENT_TYPE)
+
+
+def verificar_admin(token):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403,
+                            detail="Endpoints administrativos desativados (defina FLIGHTONTIME_ADMIN_TOKEN)")
+    if not hmac.compare_digest((token or "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Token administrativo inválido")
+
+
+@app.post("/admin/reload")
+def admin_reload(response: Response, wait: bool = False,
+                 x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Recarrega modelo, encoders, threshold, lookup tables e grade de risco sem
+    reiniciar: a versão atual atende até a nova ser validada e trocada.
+    Com wait=true responde só depois da troca (ou da falha).
+    """
+    verificar_admin(x_admin_token)
+
+    if MASTER_PID:
+        # Sob server.py: o master recarrega e troca todos os workers
+        os.kill(MASTER_PID, signal.SIGHUP)
+        response.status_code = 202
+        return {"started": True, "mode": "prefork"}
+
+    iniciou = registry.recarregar(aguardar=wait)
+    if wait:
+        response.status_code = 200 if iniciou else 409 if registry.ultimo_erro is None else 500
+    else:
+        response.status_code = 202 if iniciou else 409
+    return {"started": iniciou, **registry.status()}
+
+
+@app.get("/admin/artifacts")
+def admin_artifacts(x_admin_token: Optional[str] = Header(default=None)):
+    """Versão em uso e estado das recargas."""
+    verificar_admin(x_admin_token)
+    return registry.status()
+
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,3 @@
+"""
+Benchmarks de desempenho da FlightOnTime (executar com `python -m benchmarks.<script>`)
+"""
@@ -0,0 +1,134 @@
+"""
+Benchmark do pré-processamento completo (Parquet → matriz float32 do modelo):
+backend pandas (src/preprocessing.py) contra backend Arrow (src/arrow_backend.py).
+
+Cada backend roda em um processo novo (spawn) para medir o pico de memória
+isoladamente (VmHWM do /proc; ru_maxrss no Linux herda o pico do processo pai).
+
+Uso:
+    python -m benchmarks.bench_arrow_backend                  # 14.6M linhas (tamanho do treino v7)
+    python -m benchmarks.bench_arrow_backend --rows 2000000
+"""
+import argparse
+import json
+import multiprocessing as mp
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+
+def _encoders():
+    from sklearn.preprocessing import LabelEncoder
+
+    from benchmarks.standin import carregar_vocabulario
+    from src.preprocessing import PERIODOS_DO_DIA
+
+    airports, carriers = carregar_vocabulario()
+    return {
+        'Airline': LabelEncoder().fit(carriers),
+        'Origin': LabelEncoder().fit(airports),
+        'Dest': LabelEncoder().fit(airports),
+        'time_of_day': LabelEncoder().fit(PERIODOS_DO_DIA),
+    }
+
+
+def _pipeline_pandas(path, features, encoders):
+    import numpy as np
+    import pandas as pd
+
+    from src.preprocessing import criar_features_historicas, criar_features_temporais, downcast_dataframe
+
+    df = downcast_dataframe(pd.read_parquet(path))
+    df = criar_features_historicas(criar_features_temporais(df))
+    X = np.empty((len(df), len(features)), dtype=np.float32)
+    for j, nome in enumerate(features):
+        if nome in encoders:
+            vocabulario = {c: i for i, c in enumerate(encoders[nome].classes_.tolist())}
+            X[:, j] = df[nome].astype(object).map(vocabulario).fillna(-1).to_numpy()
+        else:
+            X[:, j] = df[nome].to_numpy()
+    return X
+
+
+def _pipeline_arrow(path, features, encoders):
+    import pyarrow.parquet as pq
+
+    from src import arrow_backend
+
+    table = arrow_backend.codificar_dicionarios(arrow_backend.downcast_table(pq.read_table(path)))
+    table = arrow_backend.criar_features_historicas(arrow_backend.criar_features_temporais(table))
+    return arrow_backend.montar_matriz(table, features, encoders)
+
+
+def _pico_rss_mb():
+    """Pico de memória residente do processo atual (MB)."""
+    try:
+        with open("/proc/self/status") as f:
+            for linha in f:
+                if linha.startswith("VmHWM:"):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _executar(backend, path, features, fila):
+    import contextlib
+    import io
+
+    encoders = _encoders()
+    pipeline = _pipeline_pandas if backend == "pandas" else _pipeline_arrow
+    base = _pico_rss_mb()
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        X = pipeline(path, features, encoders)
+        segundos = time.perf_counter() - inicio
+    pico = _pico_rss_mb()
+    fila.put({"backend": backend, "seconds": segundos, "peak_rss_mb": pico,
+              "peak_over_baseline_mb": pico - base, "checksum": float(X.sum(dtype='float64'))})
+
+
+def medir(backend, path, features):
+    ctx = mp.get_context("spawn")
+    fila = ctx.Queue()
+    processo = ctx.Process(target=_executar, args=(backend, str(path), features, fila))
+    processo.start()
+    resultado = fila.get()
+    processo.join()
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=14_592_294)
+    parser.add_argument("--output", help="Arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    from benchmarks.standin import FEATURE_NAMES_PATH, gerar_dataset_voos
+
+    with open(FEATURE_NAMES_PATH, 'r') as f:
+        features = json.load(f)['todas']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "consolidado.parquet"
+        print(f"🧪 Gerando {args.rows:,} voos em {path}...")
+        gerar_dataset_voos(args.rows).sort_values(
+            'FlightDate', kind='stable').to_parquet(path, row_group_size=1_000_000)
+
+        resultados = [medir(backend, path, features) for backend in ("pandas", "arrow")]
+
+    if resultados[0]["checksum"] != resultados[1]["checksum"]:
+        raise AssertionError("❌ Backends produziram matrizes diferentes")
+
+    print(f"\n{'backend':>8} {'segundos':>9} {'pico RSS MB':>12}")
+    for r in resultados:
+        print(f"{r['backend']:>8} {r['seconds']:>9.2f} {r['peak_rss_mb']:>12.0f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"rows": args.rows, "results": resultados}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
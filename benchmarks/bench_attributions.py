@@ -0,0 +1,81 @@
+"""
+Custo das atribuições por voo (contribuições por caminho) contra a própria
+inferência, por batch_size e top-k, com a Random Forest substituta v7.
+
+Uso:
+    python -m benchmarks.bench_attributions                          # 200k voos
+    python -m benchmarks.bench_attributions --rows 1000000 --trees 100 --batch-sizes 512,2048,8192
+"""
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.standin import gerar_artefatos
+from src.attributions import AtribuidorFloresta
+from src.model_utils import load_model
+from src.tree_engine import CompiledForest
+
+
+def _voos(n, n_features, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.integers(1, 13, n), rng.integers(1, 8, n), rng.integers(0, 24, n), rng.integers(0, 2, n),
+        rng.integers(1, 5, n), rng.uniform(80, 3000, n), rng.uniform(0.1, 0.3, n),
+        rng.uniform(0.1, 0.3, n), rng.integers(50, 1100, n), rng.integers(0, 20, n),
+        rng.integers(0, 362, n), rng.integers(0, 362, n), rng.integers(0, 4, n),
+    ])[:, :n_features].astype(np.float32)
+
+
+def _cronometrar(func):
+    inicio = time.perf_counter()
+    func()
+    return time.perf_counter() - inicio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--trees", type=int, default=50)
+    parser.add_argument("--max-depth", type=int, default=20)
+    parser.add_argument("--batch-sizes", default="512,2048,8192")
+    parser.add_argument("--top-k", default="3,5")
+    parser.add_argument("--output", help="Arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"🧪 Treinando floresta substituta ({args.trees} árvores, max_depth={args.max_depth})...")
+        gerar_artefatos(tmp, n_estimators=args.trees, n_amostras=100_000, max_depth=args.max_depth)
+        model = load_model(f"{tmp}/randomforest_v7_final.pkl")
+
+    forest = CompiledForest.from_sklearn(model)
+    atribuidor = AtribuidorFloresta(forest)
+    X = _voos(args.rows, forest.n_features_in_)
+
+    t_sklearn = _cronometrar(lambda: model.predict_proba(X))
+    t_compilado = _cronometrar(lambda: forest.predict_proba(X))
+    linhas = []
+    for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+        for k in [int(k) for k in args.top_k.split(",")]:
+            t = _cronometrar(lambda: atribuidor.top_k(X, k=k, batch_size=batch_size))
+            linhas.append({"batch_size": batch_size, "top_k": k, "seconds": t,
+                           "flights_per_s": args.rows / t, "vs_sklearn_predict": t / t_sklearn})
+
+    print(f"\n{args.rows:,} voos, {forest.n_estimators} árvores, profundidade {forest.max_depth}")
+    print(f"predict_proba sklearn: {t_sklearn:.2f}s | compilado: {t_compilado:.2f}s")
+    print(f"{'batch':>7} {'top-k':>6} {'segundos':>9} {'voos/s':>10} {'x predict':>10}")
+    for r in linhas:
+        print(f"{r['batch_size']:>7} {r['top_k']:>6} {r['seconds']:>9.2f} "
+              f"{r['flights_per_s']:>10,.0f} {r['vs_sklearn_predict']:>9.1f}x")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"rows": args.rows, "trees": forest.n_estimators, "max_depth": forest.max_depth,
+                       "sklearn_predict_s": t_sklearn, "compiled_predict_s": t_compilado,
+                       "attributions": linhas}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Vazão e memória da pontuação em lote offline (src/bulk_scoring.py).
+
+Gera uma malha sintética em Parquet, pontua com 1..N workers e informa
+voos/s, pico de memória (PSS do processo principal + workers) e o custo
+de memória por linha de um bloco, usado para calibrar BYTES_POR_LINHA.
+
+Uso:
+    python -m benchmarks.bench_bulk_scoring
+    python -m benchmarks.bench_bulk_scoring --flights 2000000 --workers 1,4,8 --chunk-rows 200000
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.standin import gerar_artefatos, gerar_voos
+from src.artifact_registry import carregar_versao
+from src.bulk_scoring import (ContextoPontuacao, caminhos_artefatos, ler_blocos, memoria_mb, pontuar_arquivo,
+                              pontuar_tabela)
+
+
+def _bytes_por_linha(entrada, caminhos, destino, linhas):
+    """Pico de memória a mais (PSS amostrado) para pontuar um bloco de `linhas` no próprio processo."""
+    contexto = ContextoPontuacao(carregar_versao(caminhos, "compiled"), destino)
+    numero, inicio, tabela = next(ler_blocos(entrada, linhas))
+    base = pico = memoria_mb([os.getpid()])
+    fim = threading.Event()
+
+    def amostrar():
+        nonlocal pico
+        while not fim.wait(0.002):
+            pico = max(pico, memoria_mb([os.getpid()]))
+
+    amostrador = threading.Thread(target=amostrar)
+    amostrador.start()
+    try:
+        pontuar_tabela(tabela, contexto, inicio)
+    finally:
+        fim.set()
+        amostrador.join()
+    return (pico - base) * 1024**2 / tabela.num_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--flights", type=int, default=500_000)
+    parser.add_argument("--workers", default="1,2", help="Lista de workers separada por vírgula")
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--trees", type=int, default=50)
+    parser.add_argument("--output", help="Arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        gerar_artefatos(tmp, n_estimators=args.trees)
+        caminhos = caminhos_artefatos(tmp)
+        entrada = Path(tmp) / "malha.parquet"
+        pd.DataFrame(gerar_voos(args.flights)).to_parquet(entrada)
+
+        bytes_linha = _bytes_por_linha(entrada, caminhos, tmp, args.chunk_rows)
+        for workers in [int(w) for w in args.workers.split(",")]:
+            resumo = pontuar_arquivo(entrada, Path(tmp) / f"saida_{workers}", caminhos, workers=workers,
+                                     linhas_por_bloco=args.chunk_rows, recomecar=True)
+            resultados.append({"workers": workers, "flights_per_s": resumo["voos_por_s"],
+                               "seconds": resumo["segundos"], "peak_mb": resumo["memoria_pico_mb"]})
+
+    print(f"\n{args.flights:,} voos, blocos de {args.chunk_rows:,}, {args.trees} árvores (compilado)")
+    print(f"{'workers':>8} {'voos/s':>10} {'segundos':>9} {'pico MB':>8}")
+    for r in resultados:
+        print(f"{r['workers']:>8} {r['flights_per_s']:>10,.0f} {r['seconds']:>9.1f} {r['peak_mb']:>8.0f}")
+    print(f"Memória por linha de bloco: {bytes_linha:,.0f} bytes")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"flights": args.flights, "chunk_rows": args.chunk_rows, "trees": args.trees,
+                       "bytes_per_row": bytes_linha, "results": resultados}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
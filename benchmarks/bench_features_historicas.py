@@ -0,0 +1,89 @@
+"""
+Benchmark de criar_features_historicas: implementação vetorizada (somas e
+contagens acumuladas por grupo) contra a original (transform com lambda por
+grupo), em datasets sintéticos no formato dos dados de treino.
+
+Uso:
+    python -m benchmarks.bench_features_historicas                  # 1M, 5M, 15M
+    python -m benchmarks.bench_features_historicas --sizes 1000000 --no-legacy
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.standin import gerar_dataset_voos
+from src.preprocessing import criar_features_historicas
+
+
+def criar_features_historicas_legado(df, delay_col='ArrDelay15'):
+    """Implementação original, mantida apenas como referência de tempo e resultado."""
+    df_feat = df.copy()
+    df_feat = df_feat.sort_values('FlightDate').reset_index(drop=True)
+    df_feat['origin_delay_rate'] = df_feat.groupby(
+        'Origin')[delay_col].transform(lambda x: x.shift(1).expanding().mean())
+    df_feat['carrier_delay_rate'] = df_feat.groupby(
+        'Airline')[delay_col].transform(lambda x: x.shift(1).expanding().mean())
+    df_feat['origin_traffic'] = df_feat.groupby(
+        ['Origin', 'FlightDate']).cumcount().astype('int16')
+    global_mean = df_feat[delay_col].mean()
+    df_feat['origin_delay_rate'] = df_feat['origin_delay_rate'].fillna(global_mean)
+    df_feat['carrier_delay_rate'] = df_feat['carrier_delay_rate'].fillna(global_mean)
+    return df_feat
+
+
+def medir(func, df, memoria=False):
+    """(segundos, pico de memória alocada em MB ou None, resultado)."""
+    if memoria:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = func(df)
+    segundos = time.perf_counter() - inicio
+    pico = None
+    if memoria:
+        pico = tracemalloc.get_traced_memory()[1] / 1024**2
+        tracemalloc.stop()
+    return segundos, pico, resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", default="1000000,5000000,15000000")
+    parser.add_argument("--no-legacy", action="store_true",
+                        help="Mede apenas a versão vetorizada")
+    parser.add_argument("--memory", action="store_true",
+                        help="Mede pico de memória com tracemalloc (mais lento)")
+    parser.add_argument("--output", help="Arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for n in [int(s) for s in args.sizes.split(",")]:
+        print(f"\n🧪 {n:,} voos")
+        df = gerar_dataset_voos(n)
+
+        t_novo, mem_novo, novo = medir(criar_features_historicas, df, args.memory)
+        r = {"rows": n, "vectorized_s": t_novo, "vectorized_peak_mb": mem_novo}
+
+        if not args.no_legacy:
+            t_legado, mem_legado, legado = medir(criar_features_historicas_legado, df, args.memory)
+            pd.testing.assert_frame_equal(novo, legado, check_exact=True)
+            r.update(legacy_s=t_legado, legacy_peak_mb=mem_legado, speedup=t_legado / t_novo,
+                     identical=True)
+            del legado
+        del novo, df
+        resultados.append(r)
+
+    print(f"\n{'linhas':>12} {'vetorizada s':>13} {'original s':>11} {'speedup':>8}")
+    for r in resultados:
+        legado = f"{r['legacy_s']:>11.2f} {r['speedup']:>7.1f}x" if 'legacy_s' in r else f"{'-':>11} {'-':>8}"
+        print(f"{r['rows']:>12,} {r['vectorized_s']:>13.2f} {legado}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(resultados, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark de criar_features_temporais: período do dia por tabela de 24
+posições (Categorical direto) contra o apply por linha original, em um
+dataset sintético no formato dos dados de treino.
+
+Uso:
+    python -m benchmarks.bench_features_temporais                    # 15M linhas
+    python -m benchmarks.bench_features_temporais --rows 1000000
+"""
+import argparse
+import json
+import time
+
+import pandas as pd
+
+from benchmarks.standin import gerar_dataset_voos
+from src.preprocessing import classify_time_period, criar_features_temporais
+
+
+def criar_features_temporais_legado(df):
+    """Implementação original, mantida apenas como referência de tempo e resultado."""
+    df_feat = df.copy()
+    df_feat['dephour'] = (df_feat['CRSDepTime'] // 100).clip(0, 23).astype('int8')
+    df_feat['is_weekend'] = df_feat['DayOfWeek'].isin([6, 7]).astype('int8')
+    df_feat['quarter'] = ((df_feat['Month'] - 1) // 3 + 1).astype('int8')
+    df_feat['time_of_day'] = df_feat['dephour'].apply(classify_time_period).astype('category')
+    return df_feat
+
+
+def _cronometrar(func):
+    inicio = time.perf_counter()
+    resultado = func()
+    return time.perf_counter() - inicio, resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=15_000_000)
+    parser.add_argument("--output", help="Arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    print(f"🧪 Gerando {args.rows:,} voos...")
+    df = gerar_dataset_voos(args.rows)
+
+    t_legado, legado = _cronometrar(lambda: criar_features_temporais_legado(df))
+    t_copia, novo = _cronometrar(lambda: criar_features_temporais(df))
+    pd.testing.assert_frame_equal(novo, legado)
+    del legado, novo
+    t_inplace, _ = _cronometrar(lambda: criar_features_temporais(df, inplace=True))
+
+    resultado = {
+        "rows": args.rows,
+        "legacy_s": t_legado,
+        "vectorized_s": t_copia,
+        "vectorized_inplace_s": t_inplace,
+        "speedup": t_legado / t_copia,
+        "speedup_inplace": t_legado / t_inplace,
+    }
+    print(f"\n{'versão':>22} {'segundos':>9} {'speedup':>8}")
+    print(f"{'original (apply)':>22} {t_legado:>9.2f} {'1.0x':>8}")
+    print(f"{'vetorizada':>22} {t_copia:>9.2f} {resultado['speedup']:>7.1f}x")
+    print(f"{'vetorizada inplace':>22} {t_inplace:>9.2f} {resultado['speedup_inplace']:>7.1f}x")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(resultado, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
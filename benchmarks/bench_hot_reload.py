@@ -0,0 +1,126 @@
+"""
+Latência de /predict durante a recarga a quente de artefatos.
+
+Clientes em threads chamam o endpoint em loop fechado (no próprio processo,
+sem HTTP) enquanto uma nova versão do modelo é publicada no meio da medição.
+Reporta p50/p99 antes, durante e depois da troca e confere que nenhuma
+requisição falhou.
+
+Uso:
+    python -m benchmarks.bench_hot_reload                    # pickle do sklearn
+    python -m benchmarks.bench_hot_reload --compiled         # CompiledForest (mmap)
+    python -m benchmarks.bench_hot_reload --clients 16 --duration 10 --trees 200
+"""
+import argparse
+import importlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.standin import gerar_artefatos, gerar_voos
+
+
+def _percentis(latencias):
+    if not latencias:
+        return {"requests": 0}
+    ms = np.asarray(latencias) * 1000
+    return {"requests": len(ms), "p50_ms": float(np.percentile(ms, 50)),
+            "p99_ms": float(np.percentile(ms, 99)), "max_ms": float(ms.max())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=6.0)
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--compiled", action="store_true",
+                        help="Publica o modelo como CompiledForest mapeado em memória")
+    parser.add_argument("--output", help="Arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gerar_artefatos(tmp, n_estimators=args.trees)
+        os.environ["FLIGHTONTIME_ARTIFACTS_DIR"] = tmp
+        os.environ["FLIGHTONTIME_PREDICTION_CACHE_SIZE"] = "0"
+        os.environ["FLIGHTONTIME_ARTIFACT_WATCH_S"] = "0"
+        if args.compiled:
+            from src.model_utils import load_model
+            from src.tree_engine import CompiledForest
+            CompiledForest.from_sklearn(load_model(os.path.join(tmp, 'randomforest_v7_final.pkl'))).save(
+                os.path.join(tmp, 'compiled'))
+            os.environ["FLIGHTONTIME_MODEL_PATH"] = os.path.join(tmp, 'compiled')
+
+        import app as app_module
+        app_module = importlib.reload(app_module)
+        app_module.carregar_artefatos()
+        requests = [app_module.FlightRequest(**v) for v in gerar_voos(2000)]
+
+        amostras = []  # (instante de início, latência)
+        erros = []
+        fim = time.perf_counter() + args.duration
+
+        def cliente(semente):
+            i = semente
+            locais = []
+            while time.perf_counter() < fim:
+                inicio = time.perf_counter()
+                try:
+                    app_module.predict_flight_delay(requests[i % len(requests)])
+                except Exception as e:
+                    erros.append(repr(e))
+                locais.append((inicio, time.perf_counter() - inicio))
+                i += 1
+            amostras.extend(locais)
+
+        threads = [threading.Thread(target=cliente, args=(k * 97,)) for k in range(args.clients)]
+        for t in threads:
+            t.start()
+
+        # Nova versão do modelo no primeiro terço da medição
+        time.sleep(args.duration / 3)
+        modelo = os.environ.get("FLIGHTONTIME_MODEL_PATH", os.path.join(tmp, 'randomforest_v7_final.pkl'))
+        for raiz, _, arquivos in os.walk(modelo) if os.path.isdir(modelo) else [(None, None, [modelo])]:
+            for nome in arquivos:
+                os.utime(os.path.join(raiz, nome) if raiz else nome)
+        versao = app_module.registry.atual.versao
+        inicio_troca = time.perf_counter()
+        app_module.registry.recarregar()
+        app_module.registry.aguardar()
+        fim_troca = time.perf_counter()
+
+        for t in threads:
+            t.join()
+
+    assert app_module.registry.atual.versao == versao + 1, app_module.registry.status()
+    janelas = {
+        "before": [lat for t0, lat in amostras if t0 < inicio_troca],
+        "during": [lat for t0, lat in amostras if inicio_troca <= t0 < fim_troca],
+        "after": [lat for t0, lat in amostras if t0 >= fim_troca],
+    }
+    resultado = {
+        "model": "compiled" if args.compiled else "sklearn",
+        "trees": args.trees,
+        "clients": args.clients,
+        "reload_s": fim_troca - inicio_troca,
+        "errors": len(erros),
+        **{nome: _percentis(lat) for nome, lat in janelas.items()},
+    }
+
+    print(f"\n🔄 Recarga: {resultado['reload_s']:.2f}s, erros: {resultado['errors']}")
+    print(f"{'janela':>8} {'reqs':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for nome in janelas:
+        r = resultado[nome]
+        if r["requests"]:
+            print(f"{nome:>8} {r['requests']:>7} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['max_ms']:>8.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(resultado, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
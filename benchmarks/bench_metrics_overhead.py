@@ -0,0 +1,115 @@
+"""
+Custo das métricas Prometheus em /predict: sem métricas, só contadores e
+latência total, e com tempo por etapa em 10% e em 100% das requisições.
+
+Chama o endpoint em loop no próprio processo (sem HTTP), com o motor
+compilado e sem cache, para que o custo fixo das métricas fique o mais
+visível possível. As configurações são alternadas a cada rodada e o
+resultado é a mediana das rodadas. Como a diferença fica perto do ruído
+da própria predição, o custo das chamadas de métricas de uma requisição
+também é medido isoladamente.
+
+Uso:
+    python -m benchmarks.bench_metrics_overhead
+    python -m benchmarks.bench_metrics_overhead --requests 20000 --rounds 7 --trees 100
+"""
+import argparse
+import importlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.standin import gerar_artefatos, gerar_voos
+from src.metrics import MetricasAPI
+
+CONFIGURACOES = {
+    "desligado": dict(habilitado=False),
+    "sem etapas": dict(amostra_etapas=0.0),
+    "etapas 10%": dict(amostra_etapas=0.1),
+    "etapas 100%": dict(amostra_etapas=1.0),
+}
+
+
+def _rodada(app_module, requests, n):
+    latencias = np.empty(n)
+    for i in range(n):
+        inicio = time.perf_counter()
+        app_module.predict_flight_delay(requests[i % len(requests)])
+        latencias[i] = time.perf_counter() - inicio
+    return latencias
+
+
+def _custo_isolado(metricas, encoder, request, n):
+    """µs por requisição só das chamadas de métricas feitas por /predict."""
+    X, _, _ = encoder.encode(request)
+    inicio = time.perf_counter()
+    for _ in range(n):
+        with metricas.requisicao("/predict") as medicao:
+            medicao.versao = "0"
+            for etapa in ("parse", "lookup", "encode", "predict"):
+                medicao.etapa(etapa)
+            if metricas.habilitado:
+                metricas.qualidade_entrada(encoder.lookups_ausentes((request.origin,), (request.airline,)),
+                                           encoder.categorias_desconhecidas(X))
+            metricas.voos("/predict", 1, "model")
+    return (time.perf_counter() - inicio) / n * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=10000, help="Requisições por rodada")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--trees", type=int, default=50)
+    parser.add_argument("--output", help="Arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gerar_artefatos(tmp, n_estimators=args.trees)
+        os.environ["FLIGHTONTIME_ARTIFACTS_DIR"] = tmp
+        os.environ["FLIGHTONTIME_INFERENCE_ENGINE"] = "compiled"
+        os.environ["FLIGHTONTIME_PREDICTION_CACHE_SIZE"] = "0"
+        os.environ["FLIGHTONTIME_ARTIFACT_WATCH_S"] = "0"
+
+        import app as app_module
+        app_module = importlib.reload(app_module)
+        app_module.carregar_artefatos()
+        requests = [app_module.FlightRequest(**v) for v in gerar_voos(2000)]
+        _rodada(app_module, requests, min(args.requests, 2000))  # aquecimento
+
+        medias = {nome: [] for nome in CONFIGURACOES}
+        p99 = {nome: [] for nome in CONFIGURACOES}
+        for _ in range(args.rounds):
+            for nome, opcoes in CONFIGURACOES.items():
+                app_module.metricas = MetricasAPI(**opcoes)
+                latencias = _rodada(app_module, requests, args.requests)
+                medias[nome].append(latencias.mean() * 1e6)
+                p99[nome].append(np.percentile(latencias, 99) * 1e6)
+        encoder = app_module.registry.atual.feature_encoder
+        isolado = {nome: _custo_isolado(MetricasAPI(**opcoes), encoder, requests[0], 100_000)
+                   for nome, opcoes in CONFIGURACOES.items()}
+
+    base = float(np.median(medias["desligado"]))
+    resultados = []
+    for nome in CONFIGURACOES:
+        media = float(np.median(medias[nome]))
+        resultados.append({"config": nome, "mean_us": media, "p99_us": float(np.median(p99[nome])),
+                           "overhead_us": media - base, "overhead_pct": (media - base) / base * 100,
+                           "isolated_us": isolado[nome]})
+
+    print(f"\n{args.requests:,} requisições x {args.rounds} rodadas, {args.trees} árvores (compilado)")
+    print(f"{'métricas':>12} {'média µs':>9} {'p99 µs':>8} {'custo µs':>9} {'custo %':>8} {'isolado µs':>11}")
+    for r in resultados:
+        print(f"{r['config']:>12} {r['mean_us']:>9.1f} {r['p99_us']:>8.1f} "
+              f"{r['overhead_us']:>9.2f} {r['overhead_pct']:>7.1f}% {r['isolated_us']:>11.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"requests": args.requests, "rounds": args.rounds, "trees": args.trees,
+                       "results": resultados}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
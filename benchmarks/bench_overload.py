@@ -0,0 +1,161 @@
+"""
+Latência de /predict sob sobrecarga: threadpool do anyio x executor de inferência.
+
+Sobe `server.py` (1 worker, artefatos sintéticos, sem cache) em cada modo,
+mede a capacidade com clientes em loop fechado e então dispara carga em
+loop aberto (taxa fixa, independente das respostas) a frações e múltiplos
+dessa capacidade. A latência conta a partir do instante agendado de envio,
+então a espera do próprio cliente também aparece. Reporta vazão útil (200
+por segundo até a última resposta),
+p50/p99 das respostas 200 e a fração de 429, 503 e timeouts.
+
+Uso:
+    python -m benchmarks.bench_overload
+    python -m benchmarks.bench_overload --loads 0.8,1.5,3 --duration 10 --modes threadpool,executor
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from benchmarks.load_test import _aguardar
+from benchmarks.standin import BASE_DIR, gerar_artefatos, gerar_voos
+
+MODOS = {
+    "threadpool": {"FLIGHTONTIME_INFERENCE_WORKERS": "0"},
+    "executor": {},
+}
+
+
+async def _requisicao(host, port, corpo):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"POST /predict HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(corpo)}\r\nConnection: close\r\n\r\n".encode() + corpo)
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        await reader.read()
+        return status
+    finally:
+        writer.close()
+
+
+async def _medir_uma(host, port, corpo, agendado, timeout):
+    loop = asyncio.get_running_loop()
+    try:
+        status = await asyncio.wait_for(_requisicao(host, port, corpo), timeout)
+    except (asyncio.TimeoutError, OSError, IndexError, ValueError):
+        status = 0
+    return status, loop.time() - agendado
+
+
+async def _carga_fechada(host, port, payloads, clientes, duracao, timeout):
+    """`clientes` loops de uma requisição por vez: respostas 200 por segundo."""
+    loop = asyncio.get_running_loop()
+    fim = loop.time() + duracao
+
+    async def cliente(i):
+        ok = 0
+        while loop.time() < fim:
+            status, _ = await _medir_uma(host, port, payloads[i % len(payloads)], loop.time(), timeout)
+            ok += status == 200
+            i += clientes
+        return ok
+
+    return sum(await asyncio.gather(*(cliente(i) for i in range(clientes)))) / duracao
+
+
+async def _carga_aberta(host, port, payloads, taxa, duracao, timeout):
+    """Uma requisição a cada 1/taxa segundos, sem esperar as anteriores."""
+    loop = asyncio.get_running_loop()
+    inicio = loop.time()
+    tarefas = []
+    for i in range(int(taxa * duracao)):
+        agendado = inicio + i / taxa
+        atraso = agendado - loop.time()
+        if atraso > 0:
+            await asyncio.sleep(atraso)
+        corpo = payloads[i % len(payloads)]
+        tarefas.append(asyncio.create_task(_medir_uma(host, port, corpo, agendado, timeout)))
+    resultados = await asyncio.gather(*tarefas)
+    return resultados, loop.time() - inicio
+
+
+def _payloads(n=2000):
+    return [json.dumps(v).encode() for v in gerar_voos(n)]
+
+
+def capacidade(host, port, clientes=16, duracao=3.0, timeout=10.0):
+    return asyncio.run(_carga_fechada(host, port, _payloads(), clientes, duracao, timeout))
+
+
+def carga_aberta(host, port, taxa, duracao, timeout):
+    resultados, decorrido = asyncio.run(_carga_aberta(host, port, _payloads(), taxa, duracao, timeout))
+    status = np.array([r[0] for r in resultados])
+    latencias = np.array([r[1] for r in resultados]) * 1000
+    ok = latencias[status == 200]
+    return {
+        "offered_rps": taxa,
+        "goodput_rps": ok.size / decorrido,
+        "p50_ms": float(np.percentile(ok, 50)) if ok.size else None,
+        "p99_ms": float(np.percentile(ok, 99)) if ok.size else None,
+        "max_ms": float(ok.max()) if ok.size else None,
+        "rejected_429": float((status == 429).mean()),
+        "expired_503": float((status == 503).mean()),
+        "timeouts": float((status == 0).mean()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--modes", default="threadpool,executor")
+    parser.add_argument("--loads", default="0.8,1.5,3", help="Múltiplos da capacidade medida")
+    parser.add_argument("--duration", type=float, default=8.0)
+    parser.add_argument("--timeout", type=float, default=10.0, help="Timeout do cliente (s)")
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help="Arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="flightontime-standin-")
+    env = dict(os.environ)
+    env["FLIGHTONTIME_ARTIFACTS_DIR"] = str(gerar_artefatos(tmp, n_estimators=args.trees))
+    env["FLIGHTONTIME_PREDICTION_CACHE_SIZE"] = "0"
+    env["FLIGHTONTIME_ARTIFACT_WATCH_S"] = "0"
+
+    resultados = []
+    for modo in args.modes.split(","):
+        servidor = subprocess.Popen(
+            [sys.executable, "server.py", "--port", str(args.port), "--workers", "1", "--log-level", "warning"],
+            cwd=BASE_DIR, env={**env, **MODOS[modo]})
+        try:
+            _aguardar("127.0.0.1", args.port)
+            rps = capacidade("127.0.0.1", args.port, timeout=args.timeout)
+            print(f"📊 {modo}: capacidade {rps:.0f} req/s")
+            for fator in [float(f) for f in args.loads.split(",")]:
+                r = carga_aberta("127.0.0.1", args.port, fator * rps, args.duration, args.timeout)
+                resultados.append({"mode": modo, "load": fator, "capacity_rps": rps, **r})
+        finally:
+            servidor.send_signal(signal.SIGTERM)
+            servidor.wait(timeout=60)
+
+    print(f"\n{'modo':>10} {'carga':>6} {'oferta/s':>9} {'200/s':>7} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'429':>6} {'503':>6} {'timeout':>8}")
+    for r in resultados:
+        print(f"{r['mode']:>10} {r['load']:>5.1f}x {r['offered_rps']:>9.0f} {r['goodput_rps']:>7.0f} "
+              f"{r['p50_ms'] or 0:>8.1f} {r['p99_ms'] or 0:>8.1f} {r['rejected_429']:>6.1%} "
+              f"{r['expired_503']:>6.1%} {r['timeouts']:>8.1%}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"duration_s": args.duration, "trees": args.trees, "results": resultados}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark de escalabilidade de criar_features_historicas_paralelo: tempo com
+1, 4, 16 e 32 processos contra a versão serial, conferindo que o resultado é
+idêntico.
+
+Uso:
+    python -m benchmarks.bench_parallel_features                      # 5M voos
+    python -m benchmarks.bench_parallel_features --rows 15000000 --workers 1,8,32
+"""
+import argparse
+import json
+import os
+import time
+
+import pandas as pd
+
+from benchmarks.standin import gerar_dataset_voos
+from src.parallel_features import criar_features_historicas_paralelo
+from src.preprocessing import criar_features_historicas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--workers", default="1,4,16,32")
+    parser.add_argument("--repeat", type=int, default=1, help="Melhor de N execuções")
+    parser.add_argument("--output", help="Arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    print(f"🧪 {args.rows:,} voos, {os.cpu_count()} CPUs")
+    df = gerar_dataset_voos(args.rows)
+
+    def melhor(func):
+        tempos = []
+        for _ in range(args.repeat):
+            inicio = time.perf_counter()
+            resultado = func()
+            tempos.append(time.perf_counter() - inicio)
+        return min(tempos), resultado
+
+    t_serial, esperado = melhor(lambda: criar_features_historicas(df))
+    resultados = [{"workers": "serial", "seconds": t_serial, "speedup": 1.0}]
+
+    for workers in [int(w) for w in args.workers.split(",")]:
+        segundos, resultado = melhor(lambda: criar_features_historicas_paralelo(df, workers=workers))
+        pd.testing.assert_frame_equal(resultado, esperado, check_exact=True)
+        del resultado
+        resultados.append({"workers": workers, "seconds": segundos, "speedup": t_serial / segundos,
+                           "identical": True})
+
+    print(f"\n{'processos':>10} {'segundos':>9} {'speedup':>8}")
+    for r in resultados:
+        print(f"{r['workers']:>10} {r['seconds']:>9.2f} {r['speedup']:>7.2f}x")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"rows": args.rows, "cpus": os.cpu_count(), "results": resultados}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark do motor prescritivo: laço por voo original contra a versão
+vetorizada (lista de dicts e saída colunar), no tamanho do conjunto de teste.
+
+Uso:
+    python -m benchmarks.bench_prescriptive                  # 2.9M voos
+    python -m benchmarks.bench_prescriptive --rows 500000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.prescriptive_engine import gerar_output_prescritivo, gerar_saida_prescritiva
+
+FEATURE_IMPORTANCE = {
+    "dephour": 0.273, "carrier_delay_rate": 0.141, "time_of_day": 0.135,
+    "origin_delay_rate": 0.112, "Distance": 0.087, "origin_traffic": 0.071,
+}
+
+
+def gerar_output_prescritivo_legado(y_pred, y_proba, feature_importance_dict, top_n=3):
+    """Implementação original, mantida apenas como referência de tempo e resultado."""
+    outputs = []
+    top_features = sorted(feature_importance_dict.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    for i in range(len(y_pred)):
+        pred = y_pred[i]
+        prob = y_proba[i]
+        if pred == 1:
+            previsao = "Atrasado"
+            confianca_value = prob
+        else:
+            previsao = "Pontual"
+            confianca_value = 1 - prob
+        if confianca_value >= 0.75:
+            confianca = "Muito Alta"
+        elif confianca_value >= 0.60:
+            confianca = "Alta"
+        elif confianca_value >= 0.50:
+            confianca = "Moderada"
+        else:
+            confianca = "Baixa"
+        principais_fatores = [f"{feat}: {imp * 100:.1f}% de importância" for feat, imp in top_features]
+        if pred == 1:
+            recomendacoes = [
+                "⚠️ Reclassificar voo como potencialmente atrasado",
+                "📢 Notificar passageiros com conexões (>2h)",
+                "🎯 Antecipar boarding em 10-15 minutos",
+                "🚪 Reservar gate alternativo",
+                "🔧 Realizar pré-voo com margem de tempo"
+            ]
+        else:
+            recomendacoes = [
+                "✅ Manter agendamento normal",
+                "🟢 Prioridade operacional normal",
+                "⏰ Estimativa: Decolagem no horário"
+            ]
+        outputs.append({
+            "indice_voo": i,
+            "previsao": previsao,
+            "probabilidade_atraso": float(round(prob, 3)),
+            "confianca": confianca,
+            "principais_fatores": principais_fatores,
+            "recomendacoes": recomendacoes
+        })
+    return outputs
+
+
+def _medir(func):
+    """Segundos e pico de memória alocada (MB) de func(), em execuções separadas."""
+    tracemalloc.start()
+    func()
+    pico = tracemalloc.get_traced_memory()[1] / 1024**2
+    tracemalloc.stop()
+    inicio = time.perf_counter()
+    resultado = func()
+    return time.perf_counter() - inicio, pico, resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=2_900_000)
+    parser.add_argument("--threshold", type=float, default=0.409)
+    parser.add_argument("--output", help="Arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(42)
+    y_proba = rng.beta(2, 4, args.rows)
+    y_pred = (y_proba >= args.threshold).astype(np.int64)
+
+    t_legado, m_legado, legado = _medir(
+        lambda: gerar_output_prescritivo_legado(y_pred, y_proba, FEATURE_IMPORTANCE))
+    t_lista, m_lista, lista = _medir(lambda: gerar_output_prescritivo(y_pred, y_proba, FEATURE_IMPORTANCE))
+    assert lista == legado
+    del legado, lista
+    t_colunar, m_colunar, saida = _medir(lambda: gerar_saida_prescritiva(y_pred, y_proba, FEATURE_IMPORTANCE))
+    t_pandas, m_pandas, _ = _medir(saida.to_pandas)
+
+    resultado = {
+        "rows": args.rows,
+        "legacy_s": t_legado, "legacy_peak_mb": m_legado,
+        "list_s": t_lista, "list_peak_mb": m_lista,
+        "columnar_s": t_colunar, "columnar_peak_mb": m_colunar,
+        "to_pandas_s": t_pandas, "to_pandas_peak_mb": m_pandas,
+    }
+    print(f"\n{'versão':>22} {'segundos':>9} {'speedup':>8} {'pico MB':>9}")
+    linhas = [
+        ("original (laço)", t_legado, m_legado),
+        ("vetorizada (lista)", t_lista, m_lista),
+        ("colunar", t_colunar, m_colunar),
+        ("colunar + to_pandas", t_colunar + t_pandas, max(m_colunar, m_pandas)),
+    ]
+    for nome, t, m in linhas:
+        print(f"{nome:>22} {t:>9.2f} {t_legado / t:>7.1f}x {m:>9.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(resultado, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Saída prescritiva em disco: lista de dicts + json.dump (fluxo original do
+notebook) contra os sinks em fluxo (NDJSON e Parquet), em tempo e pico de
+memória residente. Cada modo roda em um processo filho (fork) separado.
+
+Uso:
+    python -m benchmarks.bench_prescriptive_io                    # 2.9M voos
+    python -m benchmarks.bench_prescriptive_io --rows 500000 --block 65536
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+
+from src.prescriptive_engine import dividir_em_lotes, gerar_output_prescritivo, iterar_saida_prescritiva
+from src.prescriptive_io import gravar_saida_prescritiva
+
+FEATURE_IMPORTANCE = {"dephour": 0.273, "carrier_delay_rate": 0.141, "time_of_day": 0.135}
+
+
+def _json_completo(y_pred, y_proba, path, bloco):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(gerar_output_prescritivo(y_pred, y_proba, FEATURE_IMPORTANCE), f, indent=2, ensure_ascii=False)
+
+
+def _fluxo(y_pred, y_proba, path, bloco):
+    blocos = iterar_saida_prescritiva(dividir_em_lotes(y_pred, y_proba, bloco), FEATURE_IMPORTANCE)
+    gravar_saida_prescritiva(blocos, path)
+
+
+MODOS = {
+    "json (lista completa)": (_json_completo, "saida.json"),
+    "ndjson (fluxo)": (_fluxo, "saida.ndjson"),
+    "parquet (fluxo)": (_fluxo, "saida.parquet"),
+}
+
+
+def _filho(modo, y_pred, y_proba, diretorio, bloco, fila):
+    func, nome = MODOS[modo]
+    path = os.path.join(diretorio, nome)
+    inicio = time.perf_counter()
+    func(y_pred, y_proba, path, bloco)
+    segundos = time.perf_counter() - inicio
+    fila.put((segundos, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, os.path.getsize(path)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=2_900_000)
+    parser.add_argument("--block", type=int, default=65536)
+    parser.add_argument("--output", help="Arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(42)
+    y_proba = rng.beta(2, 4, args.rows)
+    y_pred = (y_proba >= 0.409).astype(np.int64)
+    base_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    ctx = mp.get_context("fork")
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for modo in MODOS:
+            fila = ctx.Queue()
+            processo = ctx.Process(target=_filho, args=(modo, y_pred, y_proba, tmp, args.block, fila))
+            processo.start()
+            segundos, pico_mb, tamanho = fila.get()
+            processo.join()
+            resultados[modo] = {"seconds": segundos, "peak_rss_mb": pico_mb, "file_mb": tamanho / 1024**2}
+
+    print(f"\n{args.rows:,} voos, bloco {args.block:,} (RSS do processo pai: {base_mb:.0f} MB)")
+    print(f"{'modo':>22} {'segundos':>9} {'pico RSS MB':>12} {'arquivo MB':>11}")
+    for modo, r in resultados.items():
+        print(f"{modo:>22} {r['seconds']:>9.2f} {r['peak_rss_mb']:>12.0f} {r['file_mb']:>11.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"rows": args.rows, "block": args.block, "modes": resultados}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Tempo de inicialização da API: `import app`, export_openapi.py e tempo até a
+primeira resposta de /health e de /ready (uvicorn em subprocesso).
+
+Cada medição roda em um interpretador novo (mediana de --repeat execuções).
+Também confere que importar `app` não importa pandas, sklearn, scipy nem
+joblib. Com --max-import-s / --max-ttfb-s termina com código 1 se algum
+limite for excedido (uso em CI contra regressões).
+
+Uso:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --standin --max-import-s 1.0 --max-ttfb-s 1.5
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.standin import gerar_artefatos
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Módulos que não podem ser importados por `import app`
+MODULOS_PESADOS = ("pandas", "sklearn", "scipy", "joblib", "pyarrow")
+
+_SCRIPT_IMPORT = """
+import json, sys, time
+inicio = time.perf_counter()
+import app
+print(json.dumps({"s": time.perf_counter() - inicio,
+                  "pesados": [m for m in %r if m in sys.modules]}))
+""" % (MODULOS_PESADOS,)
+
+
+def medir_import(env):
+    saida = subprocess.run([sys.executable, "-c", _SCRIPT_IMPORT], cwd=BASE_DIR, env=env,
+                           capture_output=True, text=True, check=True).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def medir_openapi(env):
+    with tempfile.TemporaryDirectory() as tmp:
+        script = BASE_DIR / "export_openapi.py"
+        inicio = time.perf_counter()
+        # Roda em um diretório temporário para não sobrescrever openapi.yaml
+        subprocess.run([sys.executable, str(script)], cwd=tmp, capture_output=True, check=True,
+                       env={**env, "PYTHONPATH": str(BASE_DIR)})
+        return time.perf_counter() - inicio
+
+
+def _status(porta, rota):
+    conn = http.client.HTTPConnection("127.0.0.1", porta, timeout=1)
+    try:
+        conn.request("GET", rota)
+        return conn.getresponse().status
+    finally:
+        conn.close()
+
+
+def medir_ttfb(env, porta, timeout=120):
+    """Segundos até /health responder 200 e até /ready responder 200."""
+    inicio = time.perf_counter()
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(porta), "--log-level", "warning"],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL)
+    tempos = {}
+    try:
+        while len(tempos) < 2 and time.perf_counter() - inicio < timeout:
+            for rota in ("/health", "/ready"):
+                if rota in tempos:
+                    continue
+                try:
+                    if _status(porta, rota) == 200:
+                        tempos[rota] = time.perf_counter() - inicio
+                except OSError:
+                    break
+            time.sleep(0.005)
+    finally:
+        servidor.terminate()
+        servidor.wait(timeout=30)
+    return tempos.get("/health"), tempos.get("/ready")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--standin", action="store_true",
+                        help="Gera artefatos sintéticos (schema v7) em diretório temporário")
+    parser.add_argument("--max-import-s", type=float, help="Limite para `import app` (mediana)")
+    parser.add_argument("--max-ttfb-s", type=float, help="Limite para a primeira resposta de /health")
+    parser.add_argument("--output", help="Arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, FLIGHTONTIME_ARTIFACT_WATCH_S="0")
+    if args.standin:
+        tmp = tempfile.mkdtemp(prefix="flightontime-standin-")
+        print(f"🧪 Gerando artefatos substitutos em {tmp}...")
+        env["FLIGHTONTIME_ARTIFACTS_DIR"] = str(gerar_artefatos(tmp))
+
+    imports = [medir_import(env) for _ in range(args.repeat)]
+    openapi = [medir_openapi(env) for _ in range(args.repeat)]
+    ttfb = [medir_ttfb(env, args.port) for _ in range(args.repeat)]
+    health = [h for h, _ in ttfb if h is not None]
+    ready = [r for _, r in ttfb if r is not None]
+
+    resultado = {
+        "import_app_s": float(np.median([r["s"] for r in imports])),
+        "heavy_modules": imports[0]["pesados"],
+        "export_openapi_s": float(np.median(openapi)),
+        "ttfb_health_s": float(np.median(health)) if health else None,
+        "ttfb_ready_s": float(np.median(ready)) if ready else None,
+    }
+
+    print(f"\n{'etapa':>18} {'segundos':>9}")
+    print(f"{'import app':>18} {resultado['import_app_s']:>9.3f}")
+    print(f"{'export_openapi.py':>18} {resultado['export_openapi_s']:>9.3f}")
+    for chave, nome in (("ttfb_health_s", "/health"), ("ttfb_ready_s", "/ready")):
+        valor = resultado[chave]
+        print(f"{nome:>18} {valor:>9.3f}" if valor is not None else f"{nome:>18} {'-':>9}")
+
+    falhas = []
+    if resultado["heavy_modules"]:
+        falhas.append(f"`import app` importou {resultado['heavy_modules']}")
+    if args.max_import_s and resultado["import_app_s"] > args.max_import_s:
+        falhas.append(f"import app {resultado['import_app_s']:.3f}s > {args.max_import_s}s")
+    if args.max_ttfb_s and (resultado["ttfb_health_s"] or float("inf")) > args.max_ttfb_s:
+        falhas.append(f"/health {resultado['ttfb_health_s']}s > {args.max_ttfb_s}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(resultado, f, indent=2)
+
+    for falha in falhas:
+        print(f"❌ {falha}")
+    if falhas:
+        return 1
+    print("✅ Inicialização dentro dos limites")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Teste de carga: requisições/s de /predict em função do número de workers.
+
+Sobe `server.py` para cada quantidade de workers, dispara clientes HTTP
+concorrentes (processos, conexões keep-alive) por alguns segundos e reporta
+throughput e latências.
+
+Uso:
+    python -m benchmarks.load_test --workers-list 1,2,4 --clients 32 --duration 10
+    python -m benchmarks.load_test --standin      # artefatos sintéticos (sem LFS)
+    python -m benchmarks.load_test --url http://host:8000   # servidor já em execução
+"""
+import argparse
+import http.client
+import json
+import multiprocessing as mp
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+from benchmarks.standin import BASE_DIR, gerar_artefatos, gerar_voos
+
+
+def _cliente(args):
+    """Loop fechado: uma conexão keep-alive, uma requisição por vez."""
+    host, port, payloads, duracao = args
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {"Content-Type": "application/json"}
+    latencias, erros = [], 0
+    fim = time.perf_counter() + duracao
+    i = 0
+    while time.perf_counter() < fim:
+        corpo = payloads[i % len(payloads)]
+        i += 1
+        inicio = time.perf_counter()
+        try:
+            conn.request("POST", "/predict", corpo, headers)
+            resposta = conn.getresponse()
+            resposta.read()
+            if resposta.status != 200:
+                erros += 1
+                continue
+        except (OSError, http.client.HTTPException):
+            erros += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencias.append(time.perf_counter() - inicio)
+    conn.close()
+    return latencias, erros
+
+
+def medir(host, port, clientes, duracao, n_payloads=2000):
+    payloads = [json.dumps(v) for v in gerar_voos(n_payloads)]
+    fatias = [payloads[i::clientes] for i in range(clientes)]
+    with mp.get_context("fork").Pool(clientes) as pool:
+        resultados = pool.map(_cliente, [(host, port, f, duracao) for f in fatias])
+
+    latencias = np.concatenate([np.asarray(r[0]) for r in resultados]) * 1000
+    erros = sum(r[1] for r in resultados)
+    return {
+        "requests": int(latencias.size),
+        "errors": int(erros),
+        "rps": latencias.size / duracao,
+        "p50_ms": float(np.percentile(latencias, 50)) if latencias.size else None,
+        "p99_ms": float(np.percentile(latencias, 99)) if latencias.size else None,
+    }
+
+
+def _aguardar(host, port, timeout=60):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            conn.request("GET", "/ready")
+            resposta = conn.getresponse()
+            estado = json.loads(resposta.read())
+            conn.close()
+            if resposta.status == 200:
+                return
+            if not estado.get("reloading") and estado.get("last_error"):
+                raise RuntimeError("Servidor sem modelo (503); use --standin ou baixe os artefatos")
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError("Servidor não respondeu a tempo")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--workers-list", default="1,2,4")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", help="Mede um servidor já em execução")
+    parser.add_argument("--standin", action="store_true",
+                        help="Gera artefatos sintéticos (schema v7) em diretório temporário")
+    parser.add_argument("--output", help="Arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    if args.url:
+        alvo = urlparse(args.url)
+        r = medir(alvo.hostname, alvo.port or 80, args.clients, args.duration)
+        resultados.append({"workers": None, **r})
+    else:
+        env = dict(os.environ)
+        if args.standin:
+            tmp = tempfile.mkdtemp(prefix="flightontime-standin-")
+            print(f"🧪 Gerando artefatos substitutos em {tmp}...")
+            env["FLIGHTONTIME_ARTIFACTS_DIR"] = str(gerar_artefatos(tmp))
+
+        for workers in [int(w) for w in args.workers_list.split(",")]:
+            servidor = subprocess.Popen(
+                [sys.executable, "server.py", "--port", str(args.port),
+                 "--workers", str(workers), "--threads", str(args.threads),
+                 "--log-level", "warning"],
+                cwd=BASE_DIR, env=env)
+            try:
+                _aguardar("127.0.0.1", args.port)
+                r = medir("127.0.0.1", args.port, args.clients, args.duration)
+            finally:
+                servidor.send_signal(signal.SIGTERM)
+                servidor.wait(timeout=60)
+            resultados.append({"workers": workers, **r})
+
+    print(f"\n{'workers':>8} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'erros':>6}")
+    for r in resultados:
+        print(f"{str(r['workers'] or '-'):>8} {r['rps']:>10.1f} "
+              f"{r['p50_ms'] or 0:>8.2f} {r['p99_ms'] or 0:>8.2f} {r['errors']:>6}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"cpu_count": os.cpu_count(), "clients": args.clients,
+                       "duration_s": args.duration, "results": resultados}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
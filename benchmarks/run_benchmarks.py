@@ -0,0 +1,320 @@
+"""
+Suíte de benchmarks reproduzível da API e do pipeline, com comparação entre commits.
+
+Roda offline: voos sintéticos de docs/valid_airports.json e
+docs/valid_carriers.json e uma Random Forest substituta no schema v7
+(benchmarks/standin.py), com sementes fixas. Mede:
+
+- predict: latência de /predict (validação do payload + endpoint, no
+  próprio processo, sem cache), percentis p50/p95/p99
+- batch: voos/s de /predict/batch
+- features: linhas/s de criar_features_temporais e criar_features_historicas
+- prescriptive: linhas/s de gerar_saida_prescritiva e gerar_output_prescritivo
+
+Throughputs usam a melhor de `--repeat` execuções. O JSON gravado em
+`--output` tem ambiente (commit, versões, CPU), configuração e métricas;
+com `--baseline`, cada métrica é comparada ao arquivo anterior e o processo
+termina com código 1 se alguma piorar além do limite (limites por métrica
+em benchmarks/thresholds.json ou `--thresholds`; `--threshold` troca o
+default).
+
+Uso:
+    python -m benchmarks.run_benchmarks --output bench_main.json
+    python -m benchmarks.run_benchmarks --baseline bench_main.json --output bench_pr.json
+    python -m benchmarks.run_benchmarks --quick --only predict,batch --threshold 0.2
+    python -m benchmarks.run_benchmarks --baseline bench_main.json --thresholds limites_ci.json
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.standin import BASE_DIR, gerar_artefatos, gerar_dataset_voos, gerar_voos
+
+SCHEMA = 1
+SUITES = ("predict", "batch", "features", "prescriptive")
+THRESHOLD_DEFAULT = 0.15
+THRESHOLDS_PATH = Path(__file__).resolve().parent / 'thresholds.json'
+
+TAMANHOS = {
+    # requisições de /predict, voos por lote, lotes, linhas do pipeline, árvores
+    "full": dict(requests=3000, batch_size=5000, batches=5, rows=1_000_000, trees=100),
+    "quick": dict(requests=500, batch_size=1000, batches=3, rows=100_000, trees=30),
+}
+
+FEATURE_IMPORTANCE = {
+    "dephour": 0.273, "carrier_delay_rate": 0.141, "time_of_day": 0.135,
+    "origin_delay_rate": 0.112, "Distance": 0.087, "origin_traffic": 0.071,
+}
+
+
+def _metrica(valor, unidade, melhor):
+    return {"value": float(valor), "unit": unidade, "better": melhor}
+
+
+def _melhor_tempo(func, repeticoes):
+    """Menor tempo (s) de `repeticoes` execuções de func(), sem os prints do pipeline."""
+    tempos = []
+    for _ in range(repeticoes):
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            func()
+            tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+# --- Ambiente ---
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=BASE_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ambiente():
+    """Commit, versões das bibliotecas e máquina em que o resultado foi medido."""
+    import pandas as pd
+    import sklearn
+
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "git_commit": _git("rev-parse", "HEAD"),
+        "git_dirty": bool(status) if status is not None else None,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+# --- Benchmarks ---
+
+def _carregar_api(diretorio, engine):
+    os.environ["FLIGHTONTIME_ARTIFACTS_DIR"] = str(diretorio)
+    os.environ["FLIGHTONTIME_INFERENCE_ENGINE"] = engine
+    os.environ["FLIGHTONTIME_PREDICTION_CACHE_SIZE"] = "0"
+    os.environ["FLIGHTONTIME_ARTIFACT_WATCH_S"] = "0"
+    os.environ["FLIGHTONTIME_MICROBATCH_MAX_SIZE"] = "0"
+
+    import app as app_module
+    app_module = importlib.reload(app_module)
+    with contextlib.redirect_stdout(io.StringIO()):
+        app_module.carregar_artefatos()
+    if app_module.registry.atual is None:
+        raise RuntimeError(f"❌ Artefatos substitutos não carregaram: {app_module.registry.ultimo_erro}")
+    return app_module
+
+
+def bench_predict(api, config):
+    """Percentis de latência de /predict, uma requisição por vez."""
+    payloads = gerar_voos(config["requests"], seed=42)
+    for payload in payloads[:200]:  # aquecimento
+        api.predict_flight_delay(api.FlightRequest(**payload))
+
+    latencias = np.empty(len(payloads))
+    for i, payload in enumerate(payloads):
+        inicio = time.perf_counter()
+        api.predict_flight_delay(api.FlightRequest(**payload))
+        latencias[i] = time.perf_counter() - inicio
+
+    ms = latencias * 1000
+    return {
+        "predict_latency_p50_ms": _metrica(np.percentile(ms, 50), "ms", "lower"),
+        "predict_latency_p95_ms": _metrica(np.percentile(ms, 95), "ms", "lower"),
+        "predict_latency_p99_ms": _metrica(np.percentile(ms, 99), "ms", "lower"),
+        "predict_requests_per_s": _metrica(len(ms) / latencias.sum(), "req/s", "higher"),
+    }
+
+
+def bench_batch(api, config):
+    """Voos/s de /predict/batch (validação do lote + endpoint)."""
+    payloads = gerar_voos(config["batch_size"], seed=7)
+    t = _melhor_tempo(lambda: api.predict_flight_delay_batch(api.FlightBatchRequest(flights=payloads)),
+                      config["batches"])
+    return {"batch_flights_per_s": _metrica(len(payloads) / t, "voos/s", "higher")}
+
+
+def bench_features(config):
+    """Linhas/s da engenharia de features do pipeline de treino."""
+    from src.preprocessing import criar_features_historicas, criar_features_temporais
+
+    df = gerar_dataset_voos(config["rows"], seed=42)
+    t_temporais = _melhor_tempo(lambda: criar_features_temporais(df), config["repeat"])
+    t_historicas = _melhor_tempo(lambda: criar_features_historicas(df), config["repeat"])
+    return {
+        "features_temporais_rows_per_s": _metrica(len(df) / t_temporais, "linhas/s", "higher"),
+        "features_historicas_rows_per_s": _metrica(len(df) / t_historicas, "linhas/s", "higher"),
+    }
+
+
+def bench_prescriptive(config):
+    """Linhas/s da saída prescritiva, colunar e em lista de dicts."""
+    from src.prescriptive_engine import gerar_output_prescritivo, gerar_saida_prescritiva
+
+    rng = np.random.default_rng(42)
+    y_proba = rng.beta(2, 4, config["rows"])
+    y_pred = (y_proba >= 0.409).astype(np.int64)
+    t_colunar = _melhor_tempo(lambda: gerar_saida_prescritiva(y_pred, y_proba, FEATURE_IMPORTANCE),
+                              config["repeat"])
+    t_lista = _melhor_tempo(lambda: gerar_output_prescritivo(y_pred, y_proba, FEATURE_IMPORTANCE),
+                            config["repeat"])
+    return {
+        "prescriptive_columnar_rows_per_s": _metrica(len(y_pred) / t_colunar, "linhas/s", "higher"),
+        "prescriptive_list_rows_per_s": _metrica(len(y_pred) / t_lista, "linhas/s", "higher"),
+    }
+
+
+def executar(config, suites):
+    """{nome da métrica: {'value', 'unit', 'better'}} das suítes pedidas."""
+    metricas = {}
+    if "predict" in suites or "batch" in suites:
+        with tempfile.TemporaryDirectory() as tmp:
+            print(f"🧪 Treinando floresta substituta ({config['trees']} árvores)...")
+            gerar_artefatos(tmp, n_estimators=config["trees"])
+            api = _carregar_api(tmp, config["engine"])
+            if "predict" in suites:
+                print(f"🔄 predict: {config['requests']:,} requisições")
+                metricas.update(bench_predict(api, config))
+            if "batch" in suites:
+                print(f"🔄 batch: {config['batches']} x {config['batch_size']:,} voos")
+                metricas.update(bench_batch(api, config))
+    if "features" in suites:
+        print(f"🔄 features: {config['rows']:,} linhas")
+        metricas.update(bench_features(config))
+    if "prescriptive" in suites:
+        print(f"🔄 prescriptive: {config['rows']:,} linhas")
+        metricas.update(bench_prescriptive(config))
+    return metricas
+
+
+# --- Comparação ---
+
+def carregar_limites(path=THRESHOLDS_PATH, padrao=None):
+    """
+    Limites de regressão por métrica (fração: 0.10 = 10% pior). O arquivo é
+    {"default": 0.15, "<métrica>": 0.30, ...}; métricas ausentes usam o
+    default, que `padrao` substitui se informado.
+    """
+    limites = {"default": THRESHOLD_DEFAULT}
+    if path is not None:
+        with open(path, 'r') as f:
+            limites.update(json.load(f))
+    if padrao is not None:
+        limites["default"] = padrao
+    return limites
+
+
+def comparar(atual, base, limites):
+    """
+    Variação de cada métrica presente nos dois resultados.
+
+    `piora` é a variação relativa no sentido ruim (latência maior ou vazão
+    menor; negativa = melhorou) e `regressao` indica piora acima do limite.
+    """
+    linhas = []
+    for nome, metrica in atual["metrics"].items():
+        anterior = base.get("metrics", {}).get(nome)
+        if anterior is None or not anterior["value"]:
+            continue
+        variacao = (metrica["value"] - anterior["value"]) / anterior["value"]
+        piora = variacao if metrica["better"] == "lower" else -variacao
+        limite = limites.get(nome, limites["default"])
+        linhas.append({"metric": nome, "baseline": anterior["value"], "current": metrica["value"],
+                       "unit": metrica["unit"], "change": variacao, "threshold": limite,
+                       "regression": piora > limite})
+    return linhas
+
+
+def _imprimir_metricas(metricas):
+    print(f"\n{'métrica':<36} {'valor':>14}")
+    for nome, m in metricas.items():
+        print(f"{nome:<36} {m['value']:>14,.3f} {m['unit']}")
+
+
+def _imprimir_comparacao(linhas, base):
+    print(f"\nComparação com {base.get('environment', {}).get('git_commit') or 'baseline'}")
+    print(f"{'métrica':<36} {'baseline':>14} {'atual':>14} {'variação':>9} {'limite':>7}")
+    for r in linhas:
+        marca = "❌" if r["regression"] else "✅"
+        print(f"{r['metric']:<36} {r['baseline']:>14,.3f} {r['current']:>14,.3f} "
+              f"{r['change']:>+8.1%} {r['threshold']:>6.0%} {marca}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--only", default=",".join(SUITES), help=f"Suítes separadas por vírgula ({', '.join(SUITES)})")
+    parser.add_argument("--quick", action="store_true", help="Tamanhos reduzidos (fumaça / CI)")
+    parser.add_argument("--requests", type=int, help="Requisições de /predict")
+    parser.add_argument("--batch-size", type=int, help="Voos por chamada de /predict/batch")
+    parser.add_argument("--rows", type=int, help="Linhas de features e saída prescritiva")
+    parser.add_argument("--trees", type=int, help="Árvores da floresta substituta")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por throughput (vale a melhor)")
+    parser.add_argument("--engine", choices=("sklearn", "compiled"), default="sklearn")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--threshold", type=float,
+                        help="Piora relativa tolerada nas métricas sem limite próprio (ex.: 0.2)")
+    parser.add_argument("--thresholds", default=str(THRESHOLDS_PATH),
+                        help="JSON com limites por métrica (default: benchmarks/thresholds.json)")
+    parser.add_argument("--output", help="Arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    suites = [s.strip() for s in args.only.split(",") if s.strip()]
+    desconhecidas = sorted(set(suites) - set(SUITES))
+    if desconhecidas:
+        parser.error(f"suítes desconhecidas: {desconhecidas}")
+
+    config = dict(TAMANHOS["quick" if args.quick else "full"], repeat=args.repeat, engine=args.engine)
+    for chave in ("requests", "batch_size", "rows", "trees"):
+        if getattr(args, chave) is not None:
+            config[chave] = getattr(args, chave)
+
+    resultado = {
+        "schema": SCHEMA,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": ambiente(),
+        "config": config,
+        "suites": suites,
+        "metrics": executar(config, suites),
+    }
+    _imprimir_metricas(resultado["metrics"])
+
+    regressoes = []
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            base = json.load(f)
+        if base.get("config") != config:
+            print(f"⚠️ Configuração diferente da baseline: {base.get('config')} (atual: {config})")
+        limites = carregar_limites(args.thresholds, args.threshold)
+        comparacao = comparar(resultado, base, limites)
+        _imprimir_comparacao(comparacao, base)
+        resultado["comparison"] = {"baseline": args.baseline, "thresholds": limites, "metrics": comparacao}
+        regressoes = [r["metric"] for r in comparacao if r["regression"]]
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(resultado, f, indent=2)
+        print(f"\n✅ Resultados gravados em {args.output}")
+
+    if regressoes:
+        print(f"❌ Regressão acima do limite: {', '.join(regressoes)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
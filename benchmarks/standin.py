@@ -0,0 +1,155 @@
+"""
+Artefatos e voos sintéticos para benchmarks offline.
+
+Os artefatos reais (models/*.pkl) são distribuídos via Git LFS / Google Drive;
+para medir desempenho sem eles, geramos uma Random Forest substituta com o
+schema v7 (mesmos nomes de arquivo, mesmas 13 features).
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+FEATURE_NAMES_PATH = BASE_DIR / 'models' / 'feature_names_v7.json'
+AIRPORTS_PATH = BASE_DIR / 'docs' / 'valid_airports.json'
+CARRIERS_PATH = BASE_DIR / 'docs' / 'valid_carriers.json'
+
+TIME_OF_DAY = ['Morning', 'Afternoon', 'Evening', 'Night']
+
+
+def carregar_vocabulario():
+    """(aeroportos, companhias) válidos segundo docs/."""
+    with open(AIRPORTS_PATH, 'r') as f:
+        airports = json.load(f)['valid_airports']
+    with open(CARRIERS_PATH, 'r') as f:
+        carriers = [c['code'] for c in json.load(f)['valid_carriers']]
+    return airports, carriers
+
+
+def gerar_voos(n, seed=42):
+    """
+    Voos sintéticos no formato do payload de /predict.
+
+    Returns:
+        List[Dict]: n payloads com aeroportos e companhias válidos
+    """
+    rng = np.random.default_rng(seed)
+    airports, carriers = carregar_vocabulario()
+
+    origem = rng.choice(airports, n)
+    destino = rng.choice(airports, n)
+    companhia = rng.choice(carriers, n)
+    dia = rng.integers(1, 29, n)
+    mes = rng.integers(1, 13, n)
+    hora = rng.integers(0, 24, n)
+    minuto = rng.choice([0, 15, 30, 45], n)
+
+    return [
+        {
+            "airline": str(companhia[i]),
+            "origin": str(origem[i]),
+            "dest": str(destino[i]),
+            "distance": float(rng.uniform(80, 3000)),
+            "day_of_week": int(rng.integers(1, 8)),
+            "flight_date": f"2024-{mes[i]:02d}-{dia[i]:02d}",
+            "crs_dep_time": int(hora[i] * 100 + minuto[i]),
+        }
+        for i in range(n)
+    ]
+
+
+def gerar_dataset_voos(n, seed=42, dias=730):
+    """
+    Dataset bruto sintético no formato de data/flight_data_consolidated.parquet
+    (colunas usadas pelo pré-processamento), fora de ordem de FlightDate.
+
+    Returns:
+        pd.DataFrame: n voos com aeroportos e companhias válidos
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    airports, carriers = carregar_vocabulario()
+
+    data = pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, dias, n), unit='D')
+    hora = rng.integers(0, 24, n)
+    return pd.DataFrame({
+        'FlightDate': data,
+        'Airline': np.asarray(carriers, dtype=object)[rng.integers(0, len(carriers), n)],
+        'Origin': np.asarray(airports, dtype=object)[rng.integers(0, len(airports), n)],
+        'Dest': np.asarray(airports, dtype=object)[rng.integers(0, len(airports), n)],
+        'CRSDepTime': hora * 100 + rng.choice([0, 15, 30, 45], n),
+        'DayOfWeek': data.dayofweek.to_numpy() + 1,
+        'Month': data.month.to_numpy(),
+        'Distance': rng.uniform(80, 3000, n),
+        'ArrDelay15': (rng.random(n) < 0.12 + 0.01 * hora).astype(np.int64),
+    })
+
+
+def gerar_artefatos(diretorio, n_estimators=50, n_amostras=20000, max_depth=None, seed=42):
+    """
+    Treina uma Random Forest substituta no schema v7 e grava em `diretorio`
+    todos os artefatos que app.py espera (use FLIGHTONTIME_ARTIFACTS_DIR).
+
+    Returns:
+        Path: diretório com os artefatos
+    """
+    import joblib
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import LabelEncoder
+
+    diretorio = Path(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    with open(FEATURE_NAMES_PATH, 'r') as f:
+        feature_names = json.load(f)
+    airports, carriers = carregar_vocabulario()
+
+    encoders = {
+        'Airline': LabelEncoder().fit(carriers),
+        'Origin': LabelEncoder().fit(airports),
+        'Dest': LabelEncoder().fit(airports),
+        'time_of_day': LabelEncoder().fit(TIME_OF_DAY),
+    }
+
+    n = n_amostras
+    month = rng.integers(1, 13, n)
+    day_of_week = rng.integers(1, 8, n)
+    dephour = rng.integers(0, 24, n)
+    X = pd.DataFrame({
+        'Month': month,
+        'DayOfWeek': day_of_week,
+        'dephour': dephour,
+        'is_weekend': (day_of_week >= 6).astype(int),
+        'quarter': (month - 1) // 3 + 1,
+        'Distance': rng.uniform(80, 3000, n),
+        'origin_delay_rate': rng.uniform(0.1, 0.3, n),
+        'carrier_delay_rate': rng.uniform(0.1, 0.3, n),
+        'origin_traffic': rng.integers(50, 1100, n),
+        'Airline': rng.integers(0, len(carriers), n),
+        'Origin': rng.integers(0, len(airports), n),
+        'Dest': rng.integers(0, len(airports), n),
+        'time_of_day': rng.integers(0, len(TIME_OF_DAY), n),
+    }, columns=feature_names['todas'])
+    risco = 0.12 + 0.01 * dephour + 0.5 * (X['carrier_delay_rate'] - 0.2)
+    y = (rng.random(n) < risco).astype(int)
+
+    model = RandomForestClassifier(
+        n_estimators=n_estimators, max_depth=max_depth, min_samples_leaf=5,
+        random_state=seed).fit(X, y)
+
+    joblib.dump(model, diretorio / 'randomforest_v7_final.pkl')
+    joblib.dump(encoders, diretorio / 'label_encoders_v7.pkl')
+    with open(diretorio / 'feature_names_v7.json', 'w') as f:
+        json.dump(feature_names, f, indent=2)
+    with open(BASE_DIR / 'models' / 'lookup_tables.json', 'r') as f:
+        lookup_tables = json.load(f)
+    with open(diretorio / 'lookup_tables.json', 'w') as f:
+        json.dump(lookup_tables, f, indent=2)
+    with open(diretorio / 'optimal_threshold_v2.txt', 'w') as f:
+        f.write("0.24436875228000565")
+
+    return diretorio
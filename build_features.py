@@ -0,0 +1,22 @@
+"""
+Gera flight_data_with_features.parquet a partir do Parquet consolidado em
+streaming (blocos de linhas), sem carregar o dataset inteiro em memória.
+
+Uso:
+    python build_features.py [entrada.parquet] [saida.parquet] [linhas_por_bloco]
+
+A entrada precisa estar ordenada por FlightDate. O resultado é idêntico a
+criar_features_historicas(criar_features_temporais(pd.read_parquet(entrada))).
+"""
+import sys
+
+from src.model_utils import BASE_DIR
+from src.streaming_pipeline import processar_parquet
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    input_path = args[0] if len(args) > 0 else BASE_DIR / "data" / "flight_data_consolidated.parquet"
+    output_path = args[1] if len(args) > 1 else BASE_DIR / "data" / "flight_data_with_features.parquet"
+    chunk_rows = int(args[2]) if len(args) > 2 else 1_000_000
+
+    processar_parquet(input_path, output_path, chunk_rows=chunk_rows)
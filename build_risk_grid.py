@@ -0,0 +1,52 @@
+"""
+Gera a grade de risco pré-calculada para uma malha de rotas fixa.
+
+Pontua todas as combinações (rota, mês, dia da semana, hora) com o modelo e
+as lookup tables atuais e salva em um diretório mapeável em memória.
+
+Uso:
+    python build_risk_grid.py rotas.csv [diretorio_saida]
+
+O CSV deve ter as colunas airline, origin, dest, distance. A API usa a grade
+automaticamente se `models/risk_grid_v7` existir (ou FLIGHTONTIME_RISK_GRID_PATH).
+A grade vale para as lookup tables usadas aqui: depois de publicar tabelas
+novas, regere-a (ou use update_lookup_tables.py --risk-grid-routes).
+"""
+import json
+import sys
+import time
+
+from src.feature_encoder import FeatureEncoder
+from src.model_utils import BASE_DIR, load_encoders, load_feature_names, load_model
+from src.risk_grid import CELULAS_POR_ROTA, RiskGrid, carregar_rotas
+
+
+def build_risk_grid(routes_path: str, output_dir: str = "models/risk_grid_v7",
+                    model_path: str = "models/randomforest_v7_final.pkl",
+                    lookup_path: str = "models/lookup_tables.json",
+                    encoders_path: str = "models/label_encoders_v7.pkl",
+                    feature_names_path: str = "models/feature_names_v7.json"):
+    rotas = carregar_rotas(routes_path)
+    model = load_model(model_path)
+    encoders = load_encoders(encoders_path)
+    with open(BASE_DIR / lookup_path, 'r') as f:
+        lookup_tables = json.load(f)
+    feature_encoder = FeatureEncoder(load_feature_names(feature_names_path), encoders, lookup_tables)
+    model = feature_encoder.preparar_modelo(model)
+
+    print(f"🔄 Pontuando {len(rotas)} rotas × {CELULAS_POR_ROTA} células...")
+    inicio = time.perf_counter()
+    grade = RiskGrid.build(rotas, feature_encoder, model)
+    output_path = grade.save(BASE_DIR / output_dir)
+
+    print(f"✅ Grade de risco salva em {output_path} "
+          f"({grade.nbytes / 1024**2:.1f} MB, {time.perf_counter() - inicio:.1f}s)")
+    return output_path
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+    build_risk_grid(args[0], args[1] if len(args) > 1 else "models/risk_grid_v7")
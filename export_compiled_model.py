@@ -0,0 +1,19 @@
+"""
+Exporta a Random Forest (pickle) para o formato compilado mapeável em memória.
+
+Uso:
+    python export_compiled_model.py [modelo.pkl] [diretorio_saida]
+
+Depois, aponte a API para o diretório gerado:
+    FLIGHTONTIME_MODEL_PATH=models/randomforest_v7_compiled uvicorn app:app
+"""
+import sys
+
+from src.model_utils import export_compiled_model
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    model_path = args[0] if len(args) > 0 else "models/randomforest_v7_final.pkl"
+    output_dir = args[1] if len(args) > 1 else "models/randomforest_v7_compiled"
+
+    export_compiled_model(model_path, output_dir)
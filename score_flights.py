@@ -0,0 +1,65 @@
+"""
+Pontuação em lote offline de uma malha de voos (Parquet ou CSV)
+
+Lê a entrada em blocos, codifica com a mesma lógica de /predict, pontua em
+um pool de processos e grava previsões + saída prescritiva em
+`saida/part-NNNNN.parquet`. Interrompida, a execução é retomada do último
+bloco concluído ao rodar o mesmo comando (`--restart` recomeça do zero).
+
+Uso:
+    python score_flights.py malha.parquet reports/malha_pontuada
+    python score_flights.py malha.csv reports/malha_pontuada --workers 8 --max-memory-mb 4096
+
+A entrada precisa das colunas de FlightRequest (airline, origin, dest,
+distance, day_of_week, flight_date, crs_dep_time) ou dos nomes BTS
+equivalentes (Airline, Origin, Dest, Distance, DayOfWeek, FlightDate, CRSDepTime).
+Artefatos: FLIGHTONTIME_ARTIFACTS_DIR e FLIGHTONTIME_MODEL_PATH, como na API.
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from src.bulk_scoring import LINHAS_POR_BLOCO, TOP_K, caminhos_artefatos, pontuar_arquivo
+from src.model_utils import BASE_DIR
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pontuação em lote offline de uma malha de voos")
+    parser.add_argument("entrada", help="Arquivo .parquet ou .csv")
+    parser.add_argument("saida", help="Diretório de saída (part-NNNNN.parquet + _checkpoint.json)")
+    parser.add_argument("--artifacts-dir",
+                        default=os.getenv("FLIGHTONTIME_ARTIFACTS_DIR", str(BASE_DIR / 'models')))
+    parser.add_argument("--model-path", default=os.getenv("FLIGHTONTIME_MODEL_PATH"))
+    parser.add_argument("--engine", choices=("compiled", "sklearn"), default="compiled")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-rows", type=int, default=LINHAS_POR_BLOCO,
+                        help="Linhas por bloco (reduzido se não couber em --max-memory-mb)")
+    parser.add_argument("--max-memory-mb", type=float, default=2048,
+                        help="Teto de memória do processo principal + workers (0 = sem teto)")
+    parser.add_argument("--factors", choices=("voo", "global"), default="voo",
+                        help="Fatores por voo (atribuições) ou importância global do modelo sklearn")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--keep-columns", default="",
+                        help="Colunas da entrada copiadas para a saída, separadas por vírgula")
+    parser.add_argument("--restart", action="store_true", help="Descarta checkpoint e partes existentes")
+    parser.add_argument("--summary", help="Arquivo JSON com o resumo da execução")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    manter = [c for c in args.keep_columns.split(",") if c]
+    resumo = pontuar_arquivo(
+        args.entrada, args.saida, caminhos_artefatos(args.artifacts_dir, args.model_path),
+        inference_engine=args.engine, workers=args.workers, linhas_por_bloco=args.chunk_rows,
+        limite_memoria_mb=args.max_memory_mb or None, fatores=args.factors, top_k=args.top_k,
+        manter_colunas=manter, recomecar=args.restart)
+    if args.summary:
+        Path(args.summary).write_text(json.dumps(resumo, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
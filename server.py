@@ -0,0 +1,213 @@
+"""
+Servidor de produção FlightOnTime (pre-fork)
+
+O processo master importa `app`, carrega modelo, encoders, lookup tables e
+threshold UMA vez, abre o socket e só então faz fork dos workers.
+As páginas dos artefatos ficam compartilhadas via copy-on-write; `gc.freeze()`
+evita que o coletor de lixo dos workers toque (e copie) essas páginas.
+
+Uso:
+    python server.py --workers 4 --threads 64 --port 8000
+
+Sinais (enviados ao master):
+    SIGHUP           recarrega artefatos no master e troca os workers sem
+                     derrubar requisições (novos sobem antes dos antigos saírem);
+                     o mesmo acontece quando os arquivos de artefatos mudam e
+                     em POST /admin/reload
+    SIGTERM/SIGINT   encerramento gracioso de todos os workers
+
+Configuração por ambiente: FLIGHTONTIME_WORKERS, FLIGHTONTIME_THREADPOOL_SIZE,
+FLIGHTONTIME_HOST, FLIGHTONTIME_PORT, FLIGHTONTIME_GRACEFUL_TIMEOUT.
+"""
+import argparse
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor pre-fork da FlightOnTime API")
+    parser.add_argument("--host", default=os.getenv("FLIGHTONTIME_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("FLIGHTONTIME_PORT", "8000")))
+    parser.add_argument("--workers", type=int,
+                        default=int(os.getenv("FLIGHTONTIME_WORKERS", str(os.cpu_count() or 1))))
+    parser.add_argument("--threads", type=int,
+                        default=int(os.getenv("FLIGHTONTIME_THREADPOOL_SIZE", "0")),
+                        help="Threads do pool síncrono por worker (0 = default do anyio)")
+    parser.add_argument("--graceful-timeout", type=int,
+                        default=int(os.getenv("FLIGHTONTIME_GRACEFUL_TIMEOUT", "30")),
+                        help="Segundos para um worker concluir requisições ao sair")
+    parser.add_argument("--log-level", default="info")
+    return parser.parse_args(argv)
+
+
+def _abrir_socket(host, port):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Master:
+    """Supervisiona os workers: fork, respawn, reload gracioso e shutdown."""
+
+    def __init__(self, args):
+        self.args = args
+        self.workers = set()
+        self.sock = None
+        self.app_module = None
+        self._reload = False
+        self._stop = False
+
+    # --- Artefatos ---
+
+    def _carregar_app(self):
+        if self.args.threads > 0:
+            os.environ["FLIGHTONTIME_THREADPOOL_SIZE"] = str(self.args.threads)
+
+        if self.app_module is None:
+            # Workers pedem recargas ao master (SIGHUP) em vez de recarregar sozinhos
+            os.environ["FLIGHTONTIME_MASTER_PID"] = str(os.getpid())
+            self.app_module = importlib.import_module("app")
+            self.app_module.carregar_artefatos()
+            ok = self.app_module.registry.atual is not None
+        else:
+            # Nova versão pelo registro: se a carga falhar, a atual continua
+            gc.unfreeze()
+            ok = self.app_module.registry.recarregar(aguardar=True)
+
+        # Congela os objetos já alocados (artefatos) fora do alcance do GC
+        gc.collect()
+        gc.freeze()
+        return ok
+
+    # --- Workers ---
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid:
+            self.workers.add(pid)
+            return pid
+
+        # Processo filho: volta aos handlers padrão e serve até receber SIGTERM
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(sig, signal.SIG_DFL)
+        config = uvicorn.Config(
+            self.app_module.app,
+            log_level=self.args.log_level,
+            timeout_graceful_shutdown=self.args.graceful_timeout,
+        )
+        try:
+            uvicorn.Server(config).run(sockets=[self.sock])
+        finally:
+            os._exit(0)
+
+    def _encerrar(self, pids, timeout):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        limite = time.monotonic() + timeout
+        pendentes = set(pids)
+        while pendentes and time.monotonic() < limite:
+            for pid in list(pendentes):
+                try:
+                    if os.waitpid(pid, os.WNOHANG)[0]:
+                        pendentes.discard(pid)
+                except ChildProcessError:
+                    pendentes.discard(pid)
+            time.sleep(0.1)
+        for pid in pendentes:
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.workers -= set(pids)
+
+    def _recarregar(self):
+        print("🔄 SIGHUP: recarregando artefatos no master...")
+        antigos = set(self.workers)
+        if not self._carregar_app():
+            print("❌ Recarga falhou; mantendo workers atuais")
+            return
+        for _ in range(self.args.workers):
+            self._spawn()
+        # Novos workers já aceitam no mesmo socket; os antigos terminam o que têm
+        self._encerrar(antigos, self.args.graceful_timeout)
+        print(f"✅ Reload concluído: {len(self.workers)} workers")
+
+    def _colher_mortos(self):
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid in self.workers:
+                self.workers.discard(pid)
+                if not self._stop:
+                    print(f"⚠️ Worker {pid} saiu (status {status}); iniciando substituto")
+                    self._spawn()
+
+    # --- Loop principal ---
+
+    def run(self):
+        print(f"🔄 Master {os.getpid()}: carregando artefatos uma única vez...")
+        self._carregar_app()
+        self.sock = _abrir_socket(self.args.host, self.args.port)
+
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "_reload", True))
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, "_stop", True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, "_stop", True))
+
+        for _ in range(self.args.workers):
+            self._spawn()
+        print(f"🚀 {self.args.workers} workers em {self.args.host}:{self.args.port} "
+              f"(threads/worker: {self.args.threads or 'default'})")
+
+        # Vigia dos arquivos de artefatos (FLIGHTONTIME_ARTIFACT_WATCH_S)
+        intervalo = self.app_module.ARTIFACT_WATCH_S
+        proxima_vigia = time.monotonic() + intervalo
+        pendente = None
+
+        while not self._stop:
+            if intervalo > 0 and time.monotonic() >= proxima_vigia:
+                proxima_vigia = time.monotonic() + intervalo
+                pendente = self.app_module.registry.verificar_arquivos(
+                    pendente, ao_mudar=lambda: setattr(self, "_reload", True))
+            if self._reload:
+                self._reload = False
+                self._recarregar()
+            self._colher_mortos()
+            time.sleep(0.2)
+
+        print("🛑 Encerrando workers...")
+        self._encerrar(set(self.workers), self.args.graceful_timeout)
+        self.sock.close()
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+
+    if not hasattr(os, "fork"):
+        # Sem fork (Windows): um único processo
+        from app import app
+        uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level)
+        return
+
+    Master(args).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
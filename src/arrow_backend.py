@@ -0,0 +1,234 @@
+"""
+Backend Arrow para o Pré-processamento
+Mesmas etapas de src/preprocessing.py (downcast, features temporais e
+históricas) operando direto sobre `pyarrow.Table`: kernels de pyarrow.compute,
+colunas categóricas como dictionary e somas acumuladas por segmento em NumPy,
+sem colunas object intermediárias e sem cópias do DataFrame inteiro.
+
+Uso típico:
+    table = pq.read_table("data/flight_data_consolidated.parquet")
+    table = criar_features_historicas(criar_features_temporais(table))
+    X = montar_matriz(table, feature_names['todas'], encoders)
+"""
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.preprocessing import _CATEGORIAS_PERIODO, _CODIGO_PERIODO_POR_HORA, _menor_inteiro
+
+COLUNAS_DICIONARIO = ('Airline', 'Origin', 'Dest')
+
+
+def _substituir(table: pa.Table, nome: str, coluna) -> pa.Table:
+    """Adiciona ou substitui uma coluna (só metadados; os buffers não são copiados)."""
+    if nome in table.column_names:
+        return table.set_column(table.column_names.index(nome), nome, coluna)
+    return table.append_column(nome, coluna)
+
+
+def _numpy(coluna) -> np.ndarray:
+    """ChunkedArray numérico → ndarray (sem cópia quando há um único bloco sem nulos)."""
+    if isinstance(coluna, pa.ChunkedArray):
+        coluna = coluna.combine_chunks() if coluna.num_chunks != 1 else coluna.chunk(0)
+    return coluna.to_numpy(zero_copy_only=False)
+
+
+def _codigos(coluna) -> Tuple[np.ndarray, pa.Array]:
+    """
+    Código inteiro por linha (-1 para nulos) e dicionário de valores,
+    via dictionary_encode do Arrow (sem objetos Python por linha).
+    """
+    if isinstance(coluna, pa.ChunkedArray):
+        if not pa.types.is_dictionary(coluna.type):
+            coluna = pc.dictionary_encode(coluna)
+        coluna = coluna.unify_dictionaries().combine_chunks()
+    elif not pa.types.is_dictionary(coluna.type):
+        coluna = pc.dictionary_encode(coluna)
+    codigos = pc.fill_null(coluna.indices, -1).to_numpy(zero_copy_only=False).astype(np.int64)
+    return codigos, coluna.dictionary
+
+
+def _anteriores_por_grupo(codigos: np.ndarray, valores: np.ndarray) -> np.ndarray:
+    """
+    Soma de `valores` nas linhas ANTERIORES do mesmo grupo (segmentos de um
+    argsort estável pelo código; a ordem dentro do grupo é preservada).
+    """
+    ordem = np.argsort(codigos, kind='stable')
+    v = valores[ordem]
+    antes = np.cumsum(v) - v
+    c = codigos[ordem]
+    inicio = np.empty(len(c), dtype=bool)
+    inicio[:1] = True
+    inicio[1:] = c[1:] != c[:-1]
+    antes -= antes[inicio][np.cumsum(inicio) - 1]
+
+    resultado = np.empty_like(antes)
+    resultado[ordem] = antes
+    return resultado
+
+
+def planejar_dtypes_table(table: pa.Table, max_categorias: int = 1000,
+                          max_fracao_categorias: float = 0.5, unsigned: bool = True) -> Dict[str, str]:
+    """Mesmas regras de preprocessing.planejar_dtypes com kernels do Arrow."""
+    plano = {}
+    for nome in table.column_names:
+        coluna = table[nome]
+        tipo = coluna.type
+
+        if pa.types.is_integer(tipo):
+            if coluna.null_count == len(coluna):
+                continue
+            extremos = pc.min_max(coluna)
+            alvo = _menor_inteiro(extremos['min'].as_py(), extremos['max'].as_py(), unsigned)
+            if alvo != np.dtype(tipo.to_pandas_dtype()):
+                plano[nome] = alvo.name
+
+        elif tipo == pa.float64():
+            extremos = pc.min_max(coluna)
+            c_min, c_max = extremos['min'].as_py(), extremos['max'].as_py()
+            if c_min is None or (np.finfo(np.float32).min < c_min and c_max < np.finfo(np.float32).max):
+                plano[nome] = 'float32'
+
+        elif pa.types.is_string(tipo) or pa.types.is_large_string(tipo):
+            distintos = pc.count_distinct(coluna).as_py()
+            if distintos <= max_categorias and distintos <= max_fracao_categorias * len(coluna):
+                plano[nome] = 'category'
+
+    return plano
+
+
+def downcast_table(table: pa.Table, plano: Optional[Dict[str, str]] = None, **opcoes_plano) -> pa.Table:
+    """
+    Aplica o plano de dtypes (default: planejar_dtypes_table) com casts do
+    Arrow; colunas 'category' viram dictionary.
+    """
+    start_memory = table.nbytes / 1024**2
+
+    if plano is None:
+        plano = planejar_dtypes_table(table, **opcoes_plano)
+    for nome, dtype in plano.items():
+        if dtype == 'category':
+            coluna = pc.dictionary_encode(table[nome]).unify_dictionaries()
+        else:
+            coluna = table[nome].cast(pa.from_numpy_dtype(np.dtype(dtype)))
+        table = _substituir(table, nome, coluna)
+
+    end_memory = table.nbytes / 1024**2
+    print("📊 Otimização de Memória (Arrow):")
+    print(f"  - Antes: {start_memory:.2f} MB")
+    print(f"  - Depois: {end_memory:.2f} MB")
+    if start_memory:
+        print(f"  - Redução: {(1 - end_memory / start_memory) * 100:.1f}%")
+    return table
+
+
+def codificar_dicionarios(table: pa.Table, colunas: Sequence[str] = COLUNAS_DICIONARIO) -> pa.Table:
+    """Converte Airline, Origin e Dest para dictionary (um código int32 por linha)."""
+    for nome in colunas:
+        if nome in table.column_names and not pa.types.is_dictionary(table[nome].type):
+            table = _substituir(table, nome, pc.dictionary_encode(table[nome]).unify_dictionaries())
+    return table
+
+
+def criar_features_temporais(table: pa.Table) -> pa.Table:
+    """
+    dephour, is_weekend, quarter e time_of_day com kernels do Arrow.
+
+    time_of_day vira um dictionary com os períodos presentes em ordem
+    alfabética: `to_pandas()` produz o mesmo Categorical de
+    preprocessing.criar_features_temporais.
+    """
+    # Feature 1: Hora da partida (divisão inteira + clip 0-23)
+    dephour = pc.cast(pc.max_element_wise(pc.min_element_wise(
+        pc.divide(table['CRSDepTime'], 100), 23), 0), pa.int8())
+
+    # Feature 2: Fim de semana (6=Saturday, 7=Sunday)
+    is_weekend = pc.cast(pc.is_in(table['DayOfWeek'], value_set=pa.array([6, 7])), pa.int8())
+
+    # Feature 3: Trimestre
+    quarter = pc.cast(pc.add(pc.divide(pc.subtract(table['Month'], 1), 3), 1), pa.int8())
+
+    # Feature 4: Período do dia (tabela de 24 posições → dictionary)
+    codigos = _CODIGO_PERIODO_POR_HORA[_numpy(dephour)]
+    usados = np.flatnonzero(np.bincount(codigos, minlength=len(_CATEGORIAS_PERIODO)))
+    remapeado = np.full(len(_CATEGORIAS_PERIODO), -1, dtype=np.int8)
+    remapeado[usados] = np.arange(len(usados))
+    time_of_day = pa.DictionaryArray.from_arrays(
+        pa.array(remapeado[codigos]), pa.array([_CATEGORIAS_PERIODO[i] for i in usados]))
+
+    for nome, coluna in [('dephour', dephour), ('is_weekend', is_weekend),
+                         ('quarter', quarter), ('time_of_day', time_of_day)]:
+        table = _substituir(table, nome, coluna)
+
+    print("✅ Features temporais criadas (Arrow): ['dephour', 'is_weekend', 'quarter', 'time_of_day']")
+    return table
+
+
+def criar_features_historicas(table: pa.Table, delay_col: str = 'ArrDelay15') -> pa.Table:
+    """
+    origin_delay_rate, carrier_delay_rate e origin_traffic sem data leakage
+    (cada voo vê apenas os voos anteriores do grupo).
+
+    Tabelas já ordenadas por FlightDate mantêm a ordem (mesmo resultado do
+    backend pandas); as demais são ordenadas de forma estável.
+    """
+    if 'FlightDate' not in table.column_names:
+        raise ValueError(
+            "❌ Coluna 'FlightDate' não encontrada! Obrigatória para features históricas.")
+
+    datas = _numpy(table['FlightDate'])
+    if len(datas) > 1 and not (datas[1:] >= datas[:-1]).all():
+        table = table.take(pc.sort_indices(table, sort_keys=[('FlightDate', 'ascending')]))
+        datas = _numpy(table['FlightDate'])
+        print("📅 Tabela ordenada por FlightDate (obrigatório para evitar data leakage)")
+
+    valores = _numpy(pc.cast(table[delay_col], pa.float64()))
+    presente = ~np.isnan(valores)
+    valores = np.where(presente, valores, 0.0)
+    global_mean = valores.sum() / presente.sum() if presente.any() else np.nan
+
+    # 1-2. Taxas de atraso por aeroporto e por companhia
+    for nome, grupo in [('origin_delay_rate', 'Origin'), ('carrier_delay_rate', 'Airline')]:
+        codigos, _ = _codigos(table[grupo])
+        soma = _anteriores_por_grupo(codigos, valores)
+        n = _anteriores_por_grupo(codigos, presente.astype(np.float64))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            taxa = np.where((n > 0) & (codigos >= 0), soma / n, global_mean)
+        table = _substituir(table, nome, pa.array(taxa))
+
+    # 3. Congestionamento acumulado: posição do voo no (aeroporto, dia)
+    #    (tabela já ordenada: o código do dia é a contagem de trocas de data)
+    origem, _ = _codigos(table['Origin'])
+    dia = np.zeros(len(datas), dtype=np.int64)
+    np.cumsum(datas[1:] != datas[:-1], out=dia[1:])
+    chave = (origem + 1) * (int(dia[-1]) + 1 if len(dia) else 1) + dia
+    trafego = _anteriores_por_grupo(chave, np.ones(len(chave)))
+    table = _substituir(table, 'origin_traffic', pa.array(trafego.astype(np.int16)))
+
+    print("✅ Features históricas criadas (Arrow): "
+          "['origin_delay_rate', 'carrier_delay_rate', 'origin_traffic']")
+    print(f"📊 NaN preenchidos com média global: {global_mean:.4f}")
+    return table
+
+
+def montar_matriz(table: pa.Table, feature_names: Sequence[str],
+                  encoders: Dict[str, Any]) -> np.ndarray:
+    """
+    Matriz (n, n_features) float32 C-contígua na ordem de treino.
+
+    Colunas categóricas são codificadas pelo dicionário do Arrow: o
+    LabelEncoder é consultado uma vez por valor distinto (desconhecidos = -1).
+    """
+    X = np.empty((table.num_rows, len(feature_names)), dtype=np.float32)
+    for j, nome in enumerate(feature_names):
+        if nome in encoders:
+            codigos, dicionario = _codigos(table[nome])
+            vocabulario = {c: i for i, c in enumerate(encoders[nome].classes_.tolist())}
+            por_valor = np.array([vocabulario.get(v, -1) for v in dicionario.to_pylist()] + [-1],
+                                 dtype=np.float32)
+            X[:, j] = por_valor[codigos]
+        else:
+            X[:, j] = _numpy(table[nome])
+    return X
@@ -0,0 +1,382 @@
+"""
+Registro de Artefatos com Recarga a Quente
+Mantém a versão em uso (modelo, encoders, lookup tables, threshold e grade
+de risco) como um único objeto imutável. Uma nova versão é carregada em
+segundo plano, validada (ordem de features + lote de verificação) e só então
+trocada por uma atribuição de referência: cada requisição usa a versão que
+leu no início, inteira, e nenhuma espera pela carga.
+"""
+import json
+import os
+import threading
+import time
+import traceback
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+from src.feature_encoder import FeatureEncoder
+from src.model_utils import load_encoders, load_feature_names, load_metadata, load_model
+from src.risk_grid import RiskGrid
+from src.tree_engine import CompiledForest
+
+LOOKUP_DEFAULTS = {"defaults": {"origin_delay_rate": 0.2, "carrier_delay_rate": 0.2, "origin_traffic": 500}}
+THRESHOLD_DEFAULT = 0.409
+
+# Arquivos de uma versão: {nome lógico: caminho}
+Caminhos = Dict[str, Path]
+CAMINHOS_OBRIGATORIOS = ('model', 'encoders', 'feature_names')
+
+
+class Artefatos:
+    """
+    Uma versão completa dos artefatos servidos pela API (não é modificada
+    depois de publicada; use `substituir` para derivar outra).
+    """
+
+    CAMPOS = ('model', 'encoders', 'lookup_tables', 'threshold', 'feature_names',
+              'feature_encoder', 'risk_grid', 'metadata', 'assinaturas', 'versao', 'risk_grid_erro')
+
+    def __init__(self, model, encoders: Dict[str, Any], lookup_tables: Dict[str, Any],
+                 threshold: float, feature_names: Dict[str, list], feature_encoder: FeatureEncoder,
+                 risk_grid: Optional[RiskGrid] = None, metadata: Optional[Dict[str, Any]] = None,
+                 assinaturas: Optional[Dict[str, tuple]] = None, versao: int = 0,
+                 risk_grid_erro: Optional[str] = None):
+        self.model = model
+        self.encoders = encoders
+        self.lookup_tables = lookup_tables
+        self.threshold = threshold
+        self.feature_names = feature_names
+        self.feature_encoder = feature_encoder
+        self.risk_grid = risk_grid
+        self.metadata = metadata or {}
+        self.assinaturas = assinaturas or {}
+        self.versao = versao
+        # Motivo do descarte de uma grade de risco existente (None = aceita ou ausente)
+        self.risk_grid_erro = risk_grid_erro
+        self.carregado_em = time.time()
+
+    def substituir(self, **campos) -> "Artefatos":
+        """Cópia com os campos informados trocados."""
+        atuais = {campo: getattr(self, campo) for campo in self.CAMPOS}
+        atuais.update(campos)
+        return Artefatos(**atuais)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.versao,
+            "loaded_at": self.carregado_em,
+            "model": type(self.model).__name__,
+            "model_version": self.metadata.get("version"),
+            "threshold": self.threshold,
+            "lookup_version": self.lookup_tables.get("version"),
+            "lookup_airports": len(self.lookup_tables.get("origin_delay_rate", {})),
+            "risk_grid_routes": len(self.risk_grid) if self.risk_grid is not None else None,
+            "risk_grid_error": self.risk_grid_erro,
+        }
+
+
+def assinaturas_arquivos(caminhos: Caminhos) -> Dict[str, tuple]:
+    """(mtime_ns, tamanho) de cada arquivo; diretórios usam o arquivo mais recente."""
+    resultado = {}
+    for nome, path in caminhos.items():
+        path = Path(path)
+        try:
+            if path.is_dir():
+                stats = [p.stat() for p in path.iterdir() if p.is_file()]
+                resultado[nome] = (max((s.st_mtime_ns for s in stats), default=0), sum(s.st_size for s in stats))
+            else:
+                stat = path.stat()
+                resultado[nome] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            resultado[nome] = None
+    return resultado
+
+
+def ler_lookup_tables(path: Union[str, Path]) -> Dict[str, Any]:
+    """Conteúdo de lookup_tables.json ou os defaults globais se não existir."""
+    if not os.path.exists(path):
+        print("⚠️ Lookup Tables não encontradas! Usando defaults globais.")
+        return LOOKUP_DEFAULTS
+
+    with open(path, 'r') as f:
+        tabelas = json.load(f)
+    versao = f" v{tabelas['version']}" if 'version' in tabelas else ""
+    print(f"✅ Lookup Tables{versao} carregadas ({len(tabelas.get('origin_delay_rate', []))} aeroportos)")
+    return tabelas
+
+
+def ler_threshold(path: Union[str, Path]) -> float:
+    if not os.path.exists(path):
+        return THRESHOLD_DEFAULT
+    with open(path, 'r') as f:
+        return float(f.read().strip())
+
+
+def carregar_versao(caminhos: Caminhos, inference_engine: str = "sklearn",
+                    anterior: Optional[Artefatos] = None) -> Artefatos:
+    """
+    Carrega uma versão a partir de `caminhos` (model, encoders, lookup,
+    threshold, feature_names e, opcionais, metadata e risk_grid).
+
+    Modelo e encoders cujos arquivos não mudaram desde `anterior` são
+    reaproveitados: atualizar só as lookup tables ou o threshold não recarrega
+    o modelo.
+    """
+    assinaturas = assinaturas_arquivos(caminhos)
+    faltando = [nome for nome in CAMINHOS_OBRIGATORIOS if assinaturas.get(nome) is None]
+    if faltando:
+        raise FileNotFoundError(f"❌ Artefatos ausentes: {faltando}")
+
+    def inalterado(*nomes):
+        return anterior is not None and all(
+            assinaturas.get(n) == anterior.assinaturas.get(n) for n in nomes)
+
+    if inalterado('model', 'feature_names'):
+        model = anterior.model
+    else:
+        model = load_model(caminhos['model'])
+    if inference_engine == "compiled" and not isinstance(model, CompiledForest):
+        model = CompiledForest.from_sklearn(model)
+        print(f"⚙️ Motor compilado: {model.n_estimators} árvores, {model.nbytes / 1024**2:.1f} MB")
+
+    encoders = anterior.encoders if inalterado('encoders') else load_encoders(caminhos['encoders'])
+    feature_names = load_feature_names(caminhos['feature_names'])
+    lookup_tables = ler_lookup_tables(caminhos['lookup']) if 'lookup' in caminhos else LOOKUP_DEFAULTS
+    threshold = ler_threshold(caminhos['threshold']) if 'threshold' in caminhos else THRESHOLD_DEFAULT
+    metadata = (load_metadata(caminhos['metadata'])
+                if assinaturas.get('metadata') is not None else {})
+
+    # Compilar o codificador de features (valida a ordem de features do modelo)
+    feature_encoder = FeatureEncoder(feature_names, encoders, lookup_tables)
+    model = feature_encoder.preparar_modelo(model)
+
+    # Grade de risco pré-calculada (O(1) para rotas da malha)
+    # (lookup tables novas invalidam a grade: regerar com build_risk_grid.py
+    # ou update_lookup_tables.py --risk-grid-routes)
+    risk_grid, risk_grid_erro = None, None
+    if 'risk_grid' in caminhos and RiskGrid.is_artifact(caminhos['risk_grid']):
+        try:
+            risk_grid = RiskGrid.load(caminhos['risk_grid'])
+            risk_grid.verificar(feature_encoder, model)
+            print(f"✅ Grade de risco carregada ({len(risk_grid)} rotas)")
+        except Exception as e:
+            print(f"⚠️ Grade de risco ignorada (regere com build_risk_grid.py): {e}")
+            risk_grid, risk_grid_erro = None, str(e)
+
+    return Artefatos(model, encoders, lookup_tables, threshold, feature_names, feature_encoder,
+                     risk_grid, metadata, assinaturas, risk_grid_erro=risk_grid_erro)
+
+
+def lote_de_verificacao(feature_encoder: FeatureEncoder, n: int = 64, seed: int = 0) -> List[SimpleNamespace]:
+    """
+    Voos sintéticos com categorias conhecidas e desconhecidas, todas as horas
+    e meses, no formato do payload de /predict.
+    """
+    rng = np.random.default_rng(seed)
+    vocab = feature_encoder.vocabularios
+
+    def categorias(col):
+        return list(vocab.get(col, {})) + ['???']
+
+    airlines, origins, dests = categorias('Airline'), categorias('Origin'), categorias('Dest')
+    return [
+        SimpleNamespace(
+            airline=airlines[rng.integers(len(airlines))],
+            origin=origins[rng.integers(len(origins))],
+            dest=dests[rng.integers(len(dests))],
+            distance=float(rng.uniform(80, 3000)),
+            day_of_week=int(rng.integers(1, 8)),
+            flight_date=f"2024-{i % 12 + 1:02d}-{int(rng.integers(1, 29)):02d}",
+            crs_dep_time=int((i % 24) * 100 + rng.choice([0, 15, 30, 45])),
+        )
+        for i in range(n)
+    ]
+
+
+def validar_artefatos(artefatos: Artefatos, n: int = 64) -> None:
+    """
+    Confere uma versão antes de publicá-la:
+    - feature_names: 'todas' = numéricas + categóricas, encoder para cada categórica
+    - threshold em (0, 1)
+    - lote de verificação pontuado de ponta a ponta (encode_batch + predict_proba)
+      com probabilidades finitas em [0, 1]; também aquece o modelo
+
+    Raises:
+        ValueError: Versão inconsistente
+    """
+    nomes = artefatos.feature_names
+    todas = list(nomes.get('todas', []))
+    if not todas or sorted(todas) != sorted(list(nomes.get('numericas', [])) + list(nomes.get('categoricas', []))):
+        raise ValueError("❌ feature_names inconsistente: 'todas' != numéricas + categóricas")
+    n_modelo = getattr(artefatos.model, 'n_features_in_', len(todas))
+    if n_modelo != len(todas):
+        raise ValueError(f"❌ Modelo espera {n_modelo} features, feature_names tem {len(todas)}")
+    if not 0.0 < artefatos.threshold < 1.0:
+        raise ValueError(f"❌ Threshold fora de (0, 1): {artefatos.threshold}")
+
+    X, _, _ = artefatos.feature_encoder.encode_batch(lote_de_verificacao(artefatos.feature_encoder, n))
+    probas = np.asarray(artefatos.model.predict_proba(X))
+    if probas.shape != (len(X), 2):
+        raise ValueError(f"❌ predict_proba retornou formato {probas.shape}, esperado {(len(X), 2)}")
+    if not np.isfinite(probas).all() or probas.min() < 0.0 or probas.max() > 1.0:
+        raise ValueError("❌ predict_proba retornou probabilidades inválidas no lote de verificação")
+
+
+class ArtifactRegistry:
+    """
+    Versão em uso + recarga em segundo plano.
+
+    - `atual`: versão publicada (leitura sem lock; uma requisição deve lê-la
+      uma vez e usar sempre o mesmo objeto)
+    - `recarregar()`: carrega, valida e publica em uma thread; a versão atual
+      continua atendendo até a troca e permanece se a nova falhar
+    - `vigiar()`: dispara a recarga quando algum arquivo muda (mtime/tamanho
+      estáveis por duas verificações seguidas, para não ler arquivos pela metade)
+
+    Args:
+        carregar: Função (versão anterior ou None) → nova versão
+        validar: Função que levanta exceção para versões inválidas
+        ao_publicar: Chamada após cada troca (ex.: invalidar o cache de predições)
+        caminhos: Arquivos vigiados
+    """
+
+    def __init__(self, carregar: Callable[[Optional[Artefatos]], Artefatos],
+                 validar: Callable[[Artefatos], None] = validar_artefatos,
+                 ao_publicar: Optional[Callable[[Artefatos], None]] = None,
+                 caminhos: Optional[Caminhos] = None):
+        self._carregar = carregar
+        self._validar = validar
+        self._ao_publicar = ao_publicar
+        self.caminhos = dict(caminhos or {})
+
+        self._atual: Optional[Artefatos] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._parar = threading.Event()
+        self._vigia: Optional[threading.Thread] = None
+        self._tentadas: Optional[Dict] = None
+
+        self.recargas = 0
+        self.falhas = 0
+        self.ultimo_erro: Optional[str] = None
+        self.ultima_duracao_s: Optional[float] = None
+
+    @property
+    def atual(self) -> Optional[Artefatos]:
+        return self._atual
+
+    def publicar(self, artefatos: Optional[Artefatos]) -> None:
+        """Troca a versão em uso (uma atribuição: leitores veem a antiga ou a nova)."""
+        if artefatos is not None:
+            anterior = self._atual
+            artefatos.versao = (anterior.versao if anterior is not None else 0) + 1
+        self._atual = artefatos
+        if self._ao_publicar is not None:
+            self._ao_publicar(artefatos)
+
+    def _executar(self) -> bool:
+        inicio = time.perf_counter()
+        try:
+            novo = self._carregar(self._atual)
+            self._validar(novo)
+        except Exception as e:
+            self.falhas += 1
+            self.ultimo_erro = f"{type(e).__name__}: {e}"
+            print(f"❌ Recarga de artefatos falhou (versão atual mantida): {e}")
+            traceback.print_exc()
+            return False
+        finally:
+            self.ultima_duracao_s = time.perf_counter() - inicio
+
+        self.publicar(novo)
+        self.recargas += 1
+        self.ultimo_erro = None
+        print(f"🚀 Artefatos v{novo.versao} publicados ({self.ultima_duracao_s:.2f}s)")
+        return True
+
+    def recarregar(self, aguardar: bool = False) -> bool:
+        """
+        Inicia uma recarga em segundo plano (uma por vez).
+
+        Returns:
+            bool: False se já havia uma recarga em andamento; com
+            aguardar=True, se esta chamada publicou uma nova versão
+        """
+        with self._lock:
+            iniciou = not self.recarregando
+            if iniciou:
+                self._thread = threading.Thread(target=self._executar, name="artifact-reload", daemon=True)
+                self._thread.start()
+            thread = self._thread
+        if aguardar:
+            thread.join()
+            return iniciou and self.ultimo_erro is None
+        return iniciou
+
+    @property
+    def recarregando(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def aguardar(self, timeout: Optional[float] = None) -> None:
+        """Espera a recarga em andamento (se houver) terminar."""
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def vigiar(self, intervalo_s: float) -> None:
+        """Inicia a thread que recarrega quando os arquivos vigiados mudam."""
+        if self._vigia is not None and self._vigia.is_alive():
+            return
+        self._parar.clear()
+        self._vigia = threading.Thread(target=self._loop_vigia, args=(intervalo_s,),
+                                       name="artifact-watch", daemon=True)
+        self._vigia.start()
+
+    def verificar_arquivos(self, pendente: Optional[Dict] = None,
+                           ao_mudar: Optional[Callable[[], Any]] = None) -> Optional[Dict]:
+        """
+        Uma rodada da vigia. Retorna as assinaturas vistas se houve mudança
+        ainda não estável (passe-as na próxima rodada) ou None. Mudança
+        estável chama `ao_mudar` (default: recarregar e esperar).
+        """
+        atual = self._atual
+        vistas = assinaturas_arquivos(self.caminhos)
+        conhecidas = {nome: atual.assinaturas.get(nome) for nome in vistas} if atual else None
+        if vistas == conhecidas or vistas == self._tentadas:
+            return None
+        if vistas != pendente:
+            return vistas
+        # Arquivos que falharam na carga só são tentados de novo se mudarem
+        self._tentadas = vistas
+        if ao_mudar is not None:
+            ao_mudar()
+        else:
+            self.recarregar(aguardar=True)
+        return None
+
+    def _loop_vigia(self, intervalo_s: float) -> None:
+        pendente = None
+        while not self._parar.wait(intervalo_s):
+            try:
+                pendente = self.verificar_arquivos(pendente)
+            except Exception:
+                traceback.print_exc()
+
+    def parar(self) -> None:
+        self._parar.set()
+
+    def status(self) -> Dict[str, Any]:
+        atual = self._atual
+        return {
+            "ready": atual is not None,
+            "current": atual.info() if atual is not None else None,
+            "reloading": self.recarregando,
+            "reloads": self.recargas,
+            "failures": self.falhas,
+            "last_error": self.ultimo_erro,
+            "last_reload_s": self.ultima_duracao_s,
+        }
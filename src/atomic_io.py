@@ -0,0 +1,51 @@
+"""
+Gravação Atômica de Arquivos
+Grava em um temporário no mesmo diretório, faz fsync e troca pelo destino
+com os.replace: quem lê o arquivo vê a versão anterior inteira ou a nova
+inteira. Em caso de erro o temporário é removido e o destino fica intocado.
+"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional, Union
+
+import numpy as np
+
+
+@contextmanager
+def escrita_atomica(path: Union[str, Path], modo: str = 'w',
+                    encoding: Optional[str] = None) -> Iterator[IO]:
+    """
+    Arquivo temporário aberto em `modo` ('w' ou 'wb') que substitui `path`
+    na saída do bloco sem exceção.
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, modo, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def gravar_json_atomico(path: Union[str, Path], dados: Any, indent: int = 2) -> None:
+    """Grava `dados` em JSON com `escrita_atomica`."""
+    with escrita_atomica(path) as f:
+        json.dump(dados, f, indent=indent)
+
+
+def gravar_npy_atomico(path: Union[str, Path], array: np.ndarray) -> None:
+    """
+    Grava `array` em `.npy` com `escrita_atomica`. O arquivo anterior não é
+    truncado: processos que o mapearam (np.load com mmap_mode) continuam
+    lendo o inode antigo.
+    """
+    with escrita_atomica(path, 'wb') as f:
+        np.save(f, array)
@@ -0,0 +1,149 @@
+"""
+Atribuições por Voo para a Random Forest
+Contribuições por caminho (Saabas): ao descer de um nó para o filho, a
+variação da probabilidade de atraso é creditada à feature do split. Para
+cada voo, viés + soma das contribuições = probabilidade prevista.
+
+Calculadas em lotes sobre os arrays do CompiledForest: as folhas vêm de
+`apply` e o caminho é percorrido de volta até a raiz por ponteiros de pai,
+nível a nível, para todas as árvores × linhas do lote de uma vez.
+"""
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from src.tree_engine import CompiledForest
+
+TOP_K = 3
+BATCH_SIZE = 2048
+
+
+class Atribuicoes:
+    """
+    Top-k contribuições de cada voo, ordenadas por |contribuição|.
+
+    - indices: (n, k) int16, índice da feature em `nomes`
+    - valores: (n, k) float32, contribuição na probabilidade de atraso
+    """
+
+    def __init__(self, indices: np.ndarray, valores: np.ndarray, nomes: Sequence[str]):
+        self.indices = indices
+        self.valores = valores
+        self.nomes = list(nomes)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def fatia(self, inicio: int, fim: int) -> "Atribuicoes":
+        return Atribuicoes(self.indices[inicio:fim], self.valores[inicio:fim], self.nomes)
+
+    def fator_principal(self) -> np.ndarray:
+        """Feature que mais aumenta o risco de cada voo (-1 se nenhuma aumenta)."""
+        positivo = self.valores > 0
+        primeiro = positivo.argmax(axis=1)
+        principal = self.indices[np.arange(len(self)), primeiro]
+        return np.where(positivo.any(axis=1), principal, -1).astype(np.int16)
+
+    def formatar(self) -> List[List[str]]:
+        """principais_fatores de cada voo: 'feature: +x.x p.p. no risco de atraso'."""
+        prefixos = [f"{nome}: " for nome in self.nomes]
+        pontos = np.round(self.valores.astype(np.float64) * 100, 1).tolist()
+        return [[f"{prefixos[i]}{p:+.1f} p.p. no risco de atraso" for i, p in zip(linha, valores)]
+                for linha, valores in zip(self.indices.tolist(), pontos)]
+
+
+class AtribuidorFloresta:
+    """
+    Contribuições por caminho de uma floresta (CompiledForest ou sklearn,
+    compilada na criação).
+
+    Args:
+        model: CompiledForest ou RandomForestClassifier treinado
+        feature_names: Nomes na ordem das colunas (default: os do modelo)
+        classe: Classe explicada (default: 1 = atrasado)
+    """
+
+    def __init__(self, model, feature_names: Optional[Sequence[str]] = None, classe=1):
+        forest = model if isinstance(model, CompiledForest) else CompiledForest.from_sklearn(model)
+        if feature_names is None:
+            feature_names = getattr(forest, 'feature_names_in_', None)
+        if feature_names is None:
+            feature_names = [f"x{i}" for i in range(forest.n_features_in_)]
+        if len(feature_names) != forest.n_features_in_:
+            raise ValueError(f"❌ {len(feature_names)} nomes para {forest.n_features_in_} features")
+
+        coluna = np.flatnonzero(forest.classes_ == classe)
+        if len(coluna) != 1:
+            raise ValueError(f"❌ Classe {classe!r} não encontrada em {forest.classes_.tolist()}")
+
+        self.forest = forest
+        self.feature_names = [str(nome) for nome in feature_names]
+        valor = np.asarray(forest.value[:, coluna[0]], dtype=np.float64)
+
+        # Pai de cada nó; a raiz aponta para si mesma (variação 0), então
+        # subir além dela não altera a soma
+        n_nodes = len(valor)
+        filhos = np.asarray(forest.children)
+        internos = np.flatnonzero(filhos[:, 0] != np.arange(n_nodes))
+        pai = np.arange(n_nodes)
+        pai[filhos[internos, 0]] = internos
+        pai[filhos[internos, 1]] = internos
+
+        self._pai = pai.astype(np.int32)
+        self._variacao = valor - valor[pai]
+        self._feature_pai = np.asarray(forest.feature, dtype=np.int64)[pai]
+        self.vies = float(valor[forest.roots].mean())
+
+    def contribuicoes(self, X, batch_size: int = BATCH_SIZE) -> np.ndarray:
+        """
+        Contribuição de cada feature na probabilidade de cada linha.
+
+        Returns:
+            np.ndarray: (n_amostras, n_features) float64, com
+            vies + soma da linha = predict_proba(X)[:, classe]
+        """
+        X = np.asarray(X)
+        n_features = self.forest.n_features_in_
+        contrib = np.empty((len(X), n_features), dtype=np.float64)
+        for inicio in range(0, len(X), batch_size):
+            lote = X[inicio:inicio + batch_size]
+            contrib[inicio:inicio + len(lote)] = self._contribuicoes_lote(lote)
+        return contrib
+
+    def _contribuicoes_lote(self, X) -> np.ndarray:
+        n_rows, n_features = len(X), self.forest.n_features_in_
+        node = self.forest.apply(X)
+        # Posição (linha, feature) no resultado achatado, por árvore × linha
+        base = (np.arange(n_rows, dtype=np.int64) * n_features)[np.newaxis, :]
+        soma = np.zeros(n_rows * n_features, dtype=np.float64)
+        for _ in range(self.forest.max_depth):
+            soma += np.bincount((base + self._feature_pai.take(node)).ravel(),
+                                weights=self._variacao.take(node).ravel(), minlength=soma.size)
+            node = self._pai.take(node)
+        return (soma / self.forest.n_estimators).reshape(n_rows, n_features)
+
+    def top_k(self, X, k: int = TOP_K, batch_size: int = BATCH_SIZE) -> Atribuicoes:
+        """
+        As k maiores contribuições (em módulo) de cada linha. O custo é o de
+        `contribuicoes`; só o top-k fica em memória, lote a lote.
+        """
+        X = np.asarray(X)
+        k = min(k, self.forest.n_features_in_)
+        indices = np.empty((len(X), k), dtype=np.int16)
+        valores = np.empty((len(X), k), dtype=np.float32)
+        for inicio in range(0, len(X), batch_size):
+            contrib = self._contribuicoes_lote(X[inicio:inicio + batch_size])
+            idx = _maiores(np.abs(contrib), k)
+            indices[inicio:inicio + len(contrib)] = idx
+            valores[inicio:inicio + len(contrib)] = np.take_along_axis(contrib, idx, axis=1)
+        return Atribuicoes(indices, valores, self.feature_names)
+
+
+def _maiores(a: np.ndarray, k: int) -> np.ndarray:
+    """Índices das k maiores colunas de cada linha, em ordem decrescente."""
+    if k < a.shape[1]:
+        idx = np.argpartition(-a, k - 1, axis=1)[:, :k]
+    else:
+        idx = np.broadcast_to(np.arange(a.shape[1]), a.shape).copy()
+    ordem = np.argsort(-np.take_along_axis(a, idx, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(idx, ordem, axis=1)
@@ -0,0 +1,536 @@
+"""
+Pontuação em Lote Offline (malha de voos programados)
+Lê um arquivo Parquet ou CSV em blocos de tamanho fixo, codifica cada bloco
+com o mesmo FeatureEncoder de /predict (lookups, período do dia, encoders),
+pontua com o modelo em um pool de processos e grava previsões + saída
+prescritiva em um diretório Parquet (um arquivo por bloco).
+
+- Consistência: cada linha tem a mesma probabilidade, previsão e métricas
+  internas que /predict daria ao mesmo voo; linhas que /predict rejeitaria
+  (campo ausente, distância <= 0, dia da semana fora de 1-7, data ou horário
+  inválido) são contadas e ficam fora da saída.
+- Retomada: `_checkpoint.json` registra os blocos concluídos; uma nova
+  execução com os mesmos parâmetros pula esses blocos.
+- Memória: o tamanho do bloco é limitado pelo teto informado (PSS do
+  processo principal + workers, que compartilham o modelo por fork) e novos
+  blocos esperam enquanto o teto estiver excedido.
+"""
+import json
+import multiprocessing as mp
+import os
+import resource
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.artifact_registry import Artefatos, Caminhos, carregar_versao
+from src.atomic_io import gravar_json_atomico
+from src.attributions import AtribuidorFloresta
+from src.feature_encoder import FeatureEncoder
+from src.prescriptive_engine import gerar_saida_prescritiva
+from src.prescriptive_io import gravar_tabela_parquet
+
+LINHAS_POR_BLOCO = 200_000
+LINHAS_POR_BLOCO_MIN = 1_000
+# Pico de memória por linha de um bloco em processamento (entrada Arrow,
+# colunas NumPy, X float32, atribuições e tabela de saída): ~1 KB medido
+# com benchmarks/bench_bulk_scoring.py, com folga para o Parquet gravado
+BYTES_POR_LINHA = 2048
+TOP_K = 3
+ARQUIVO_CHECKPOINT = "_checkpoint.json"
+
+# Campo de FlightRequest → nomes aceitos no arquivo (payload da API ou BTS)
+COLUNAS_ENTRADA = {
+    'airline': ('airline', 'Airline'),
+    'origin': ('origin', 'Origin'),
+    'dest': ('dest', 'Dest'),
+    'distance': ('distance', 'Distance'),
+    'day_of_week': ('day_of_week', 'DayOfWeek'),
+    'flight_date': ('flight_date', 'FlightDate'),
+    'crs_dep_time': ('crs_dep_time', 'CRSDepTime'),
+}
+COLUNAS_TEXTO = ('airline', 'origin', 'dest')
+
+MOTIVOS_INVALIDOS = ('campo_ausente', 'distance', 'day_of_week', 'crs_dep_time', 'flight_date')
+
+# Mesmos textos de montar_resposta em app.py
+RECOMENDACAO_API = ("Operação normal", "Alerta: Alto risco operacional")
+
+
+def caminhos_artefatos(diretorio: Union[str, Path], model_path: Optional[Union[str, Path]] = None) -> Caminhos:
+    """Arquivos de uma versão com os nomes usados por app.py (sem a grade de risco)."""
+    diretorio = Path(diretorio)
+    return {
+        'model': Path(model_path) if model_path else diretorio / 'randomforest_v7_final.pkl',
+        'encoders': diretorio / 'label_encoders_v7.pkl',
+        'threshold': diretorio / 'optimal_threshold_v2.txt',
+        'metadata': diretorio / 'metadata_v7.json',
+        'lookup': diretorio / 'lookup_tables.json',
+        'feature_names': diretorio / 'feature_names_v7.json',
+    }
+
+
+# --- Leitura em blocos ---
+
+def _resolver_colunas(nomes: Sequence[str], extras: Sequence[str]) -> Dict[str, str]:
+    """{campo: coluna do arquivo} para os campos de FlightRequest + colunas mantidas."""
+    disponiveis = set(nomes)
+    mapa = {}
+    for campo, candidatos in COLUNAS_ENTRADA.items():
+        coluna = next((c for c in candidatos if c in disponiveis), None)
+        if coluna is None:
+            raise ValueError(f"❌ Coluna ausente na entrada: {campo} (aceitas: {list(candidatos)})")
+        mapa[campo] = coluna
+    ausentes = [c for c in extras if c not in disponiveis]
+    if ausentes:
+        raise ValueError(f"❌ Colunas a manter não existem na entrada: {ausentes}")
+    return mapa
+
+
+def _formato(path: Union[str, Path]) -> str:
+    return 'csv' if str(path).lower().endswith(('.csv', '.csv.gz')) else 'parquet'
+
+
+def contar_linhas(path: Union[str, Path]) -> Optional[int]:
+    """Linhas do arquivo (metadados do Parquet; None para CSV)."""
+    if _formato(path) != 'parquet':
+        return None
+    import pyarrow.parquet as pq
+    return pq.ParquetFile(path).metadata.num_rows
+
+
+def ler_blocos(path: Union[str, Path], linhas_por_bloco: int = LINHAS_POR_BLOCO,
+               manter_colunas: Sequence[str] = ()) -> Iterator[Tuple[int, int, Any]]:
+    """
+    (número do bloco, linha inicial, pa.Table) com exatamente `linhas_por_bloco`
+    linhas (o último pode ser menor). Os blocos são os mesmos a cada leitura
+    do mesmo arquivo, o que permite retomar pelo número do bloco.
+
+    Colunas renomeadas para os campos de FlightRequest; `manter_colunas`
+    seguem com o nome original.
+    """
+    import pyarrow as pa
+
+    if linhas_por_bloco <= 0:
+        raise ValueError("❌ linhas_por_bloco deve ser positivo")
+
+    if _formato(path) == 'csv':
+        import pyarrow.csv as pacsv
+
+        with open(path, 'rb') as f:
+            cabecalho = pacsv.open_csv(f).schema.names
+        mapa = _resolver_colunas(cabecalho, manter_colunas)
+        # Códigos de companhia/aeroporto sempre como texto ("NA" não é nulo)
+        tipos = {mapa[c]: pa.string() for c in COLUNAS_TEXTO + ('flight_date',)}
+        lotes = pacsv.open_csv(path, convert_options=pacsv.ConvertOptions(
+            column_types=tipos, include_columns=list(mapa.values()) + list(manter_colunas),
+            strings_can_be_null=False))
+    else:
+        import pyarrow.parquet as pq
+
+        arquivo = pq.ParquetFile(path)
+        mapa = _resolver_colunas(arquivo.schema_arrow.names, manter_colunas)
+        lotes = arquivo.iter_batches(batch_size=linhas_por_bloco,
+                                     columns=list(mapa.values()) + list(manter_colunas))
+
+    renomear = {coluna: campo for campo, coluna in mapa.items()}
+    pendentes, n_pendentes, numero, inicio = [], 0, 0, 0
+
+    def emitir(n):
+        nonlocal pendentes, n_pendentes, numero, inicio
+        tabela = pa.Table.from_batches(pendentes)
+        bloco, resto = tabela.slice(0, n), tabela.slice(n)
+        pendentes = resto.to_batches() if resto.num_rows else []
+        n_pendentes -= n
+        bloco = bloco.rename_columns([renomear.get(c, c) for c in bloco.column_names]).combine_chunks()
+        item = (numero, inicio, bloco)
+        numero += 1
+        inicio += n
+        return item
+
+    for lote in lotes:
+        if lote.num_rows:
+            pendentes.append(lote)
+            n_pendentes += lote.num_rows
+        while n_pendentes >= linhas_por_bloco:
+            yield emitir(linhas_por_bloco)
+    if n_pendentes:
+        yield emitir(n_pendentes)
+
+
+# --- Pontuação de um bloco ---
+
+class ContextoPontuacao:
+    """
+    O que cada worker precisa para pontuar (herdado por fork, sem pickle do
+    modelo): artefatos, atribuidor e destino.
+    """
+
+    def __init__(self, artefatos: Artefatos, destino: Union[str, Path], fatores: str = 'voo',
+                 top_k: int = TOP_K, manter_colunas: Sequence[str] = ()):
+        if fatores not in ('voo', 'global'):
+            raise ValueError(f"❌ fatores deve ser 'voo' ou 'global', não {fatores!r}")
+        self.artefatos = artefatos
+        self.destino = Path(destino)
+        self.fatores = fatores
+        self.top_k = top_k
+        self.manter_colunas = list(manter_colunas)
+        self.atribuidor = None
+        self.importancias: Dict[str, float] = {}
+        nomes = artefatos.feature_encoder.feature_names
+        if fatores == 'voo':
+            self.atribuidor = AtribuidorFloresta(artefatos.model, nomes)
+        else:
+            importancias = getattr(artefatos.model, 'feature_importances_', None)
+            if importancias is None:
+                raise ValueError("❌ O modelo não tem feature_importances_ (motor compilado): use fatores='voo'")
+            self.importancias = dict(zip(nomes, np.asarray(importancias).tolist()))
+
+
+_CONTEXTO: Optional[ContextoPontuacao] = None
+
+
+def validar_bloco(tabela, encoder: FeatureEncoder) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Máscara das linhas que /predict aceitaria e contagem das rejeitadas por
+    motivo (o primeiro que falha, na ordem de MOTIVOS_INVALIDOS).
+    """
+    import pyarrow.compute as pc
+
+    n = tabela.num_rows
+    invalida = np.zeros(n, dtype=bool)
+    motivos = {}
+
+    def marcar(motivo, mascara):
+        novas = mascara & ~invalida
+        if novas.any():
+            motivos[motivo] = int(novas.sum())
+            invalida[novas] = True
+
+    nulos = np.zeros(n, dtype=bool)
+    for campo in COLUNAS_ENTRADA:
+        nulos |= pc.is_null(tabela[campo], nan_is_null=True).to_numpy(zero_copy_only=False)
+    marcar('campo_ausente', nulos)
+
+    with np.errstate(invalid='ignore'):
+        distance = tabela['distance'].to_numpy(zero_copy_only=False).astype(float)
+        marcar('distance', ~(distance > 0))
+        dia = tabela['day_of_week'].to_numpy(zero_copy_only=False).astype(float)
+        marcar('day_of_week', ~((dia >= 1) & (dia <= 7) & (dia == np.floor(dia))))
+        horario = tabela['crs_dep_time'].to_numpy(zero_copy_only=False).astype(float)
+        marcar('crs_dep_time', ~(horario == np.floor(horario)))
+
+    datas = _datas_texto(tabela['flight_date'])
+    validas = np.flatnonzero(~invalida)
+    meses = np.full(n, -1)
+    if validas.size:
+        unicos, inverso = np.unique(datas[validas].astype(str), return_inverse=True)
+        meses[validas] = np.asarray([encoder._month_or_invalid(d) for d in unicos.tolist()])[inverso]
+    marcar('flight_date', meses < 0)
+    return ~invalida, motivos
+
+
+def _datas_texto(coluna) -> np.ndarray:
+    """flight_date como 'YYYY-MM-DD' (colunas date/timestamp são formatadas)."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if pa.types.is_temporal(coluna.type):
+        coluna = pc.strftime(coluna, format="%Y-%m-%d")
+    elif not pa.types.is_string(coluna.type):
+        coluna = coluna.cast(pa.string())
+    return coluna.to_numpy(zero_copy_only=False)
+
+
+def pontuar_tabela(tabela, contexto: ContextoPontuacao, inicio: int = 0):
+    """
+    Pontua um bloco e monta a tabela de saída.
+
+    Returns:
+        tuple: (pa.Table com uma linha por voo válido, {motivo: linhas rejeitadas})
+    """
+    import pyarrow as pa
+
+    art = contexto.artefatos
+    encoder = art.feature_encoder
+    validas, motivos = validar_bloco(tabela, encoder)
+    indices = np.flatnonzero(validas) + inicio
+    if not validas.all():
+        tabela = tabela.filter(pa.array(validas))
+
+    colunas = {campo: tabela[campo].to_numpy(zero_copy_only=False) for campo in COLUNAS_ENTRADA}
+    colunas['flight_date'] = _datas_texto(tabela['flight_date'])
+    colunas['day_of_week'] = colunas['day_of_week'].astype(np.int64)
+    colunas['crs_dep_time'] = colunas['crs_dep_time'].astype(np.int64)
+    X, origin_rates, carrier_rates = encoder.encode_colunas(**colunas)
+
+    if len(X):
+        proba = art.model.predict_proba(X)[:, 1]
+    else:
+        proba = np.empty(0)
+    y_pred = (proba >= art.threshold).astype(np.int8)
+    atribuicoes = contexto.atribuidor.top_k(X, contexto.top_k) if contexto.atribuidor is not None else None
+    saida = gerar_saida_prescritiva(y_pred, proba, contexto.importancias, contexto.top_k,
+                                    atribuicoes=atribuicoes).to_arrow()
+
+    # Campos de /predict (montar_resposta) ao lado da saída prescritiva
+    saida = saida.set_column(0, 'indice_voo', pa.array(indices, type=pa.int64()))
+    saida = saida.append_column('probability_delay', pa.array(np.round(proba.astype(float), 4)))
+    saida = saida.append_column('recommendation', pa.DictionaryArray.from_arrays(
+        pa.array(y_pred, type=pa.int8()), list(RECOMENDACAO_API)))
+    saida = saida.append_column('historical_origin_risk', pa.array(origin_rates, type=pa.float64()))
+    saida = saida.append_column('historical_carrier_risk', pa.array(carrier_rates, type=pa.float64()))
+    for coluna in contexto.manter_colunas:
+        saida = saida.append_column(coluna, tabela[coluna])
+    return saida, motivos
+
+
+def caminho_parte(destino: Union[str, Path], numero: int) -> Path:
+    return Path(destino) / f"part-{numero:05d}.parquet"
+
+
+def pontuar_bloco(numero: int, inicio: int, tabela) -> Dict[str, Any]:
+    """Pontua e grava um bloco (executado nos workers com o _CONTEXTO herdado)."""
+    t0 = time.perf_counter()
+    saida, motivos = pontuar_tabela(tabela, _CONTEXTO, inicio)
+    gravar_tabela_parquet(saida, caminho_parte(_CONTEXTO.destino, numero))
+    return {"bloco": numero, "inicio": inicio, "linhas": tabela.num_rows, "pontuadas": saida.num_rows,
+            "invalidas": motivos, "segundos": time.perf_counter() - t0}
+
+
+# --- Memória ---
+
+def memoria_mb(pids: Optional[Sequence[int]] = None) -> float:
+    """
+    Memória do processo atual e dos filhos (workers), em MB. Usa PSS: as
+    páginas do modelo compartilhadas por fork contam uma vez só no total.
+    Sem /proc, cai para o pico de RSS do processo atual.
+    """
+    if pids is None:
+        pids = [os.getpid()] + [p.pid for p in mp.active_children()]
+    total = 0.0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup", 'r') as f:
+                for linha in f:
+                    if linha.startswith("Pss:"):
+                        total += int(linha.split()[1]) / 1024
+                        break
+        except FileNotFoundError:
+            continue
+        except OSError:
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return total
+
+
+def linhas_por_bloco_para_memoria(limite_mb: float, base_mb: float, em_voo: int,
+                                  pedido: int = LINHAS_POR_BLOCO) -> int:
+    """
+    Maior bloco (até `pedido`) em que `em_voo` blocos simultâneos cabem no
+    que sobra do teto depois da memória base (modelo + processos).
+    """
+    disponivel = (limite_mb - base_mb) * 1024**2
+    linhas = min(pedido, int(disponivel / (BYTES_POR_LINHA * em_voo)))
+    if linhas < LINHAS_POR_BLOCO_MIN:
+        raise ValueError(
+            f"❌ Teto de memória de {limite_mb:.0f} MB insuficiente: modelo e workers já usam "
+            f"{base_mb:.0f} MB (aumente o teto ou reduza os workers)")
+    return linhas
+
+
+# --- Checkpoint ---
+
+class Checkpoint:
+    """
+    Blocos concluídos de uma execução, gravados em `_checkpoint.json` no
+    diretório de saída (temporário + os.replace a cada bloco).
+
+    `parametros` identifica a execução (arquivo de entrada, tamanho do bloco,
+    artefatos, fatores): retomar com parâmetros diferentes é um erro.
+    """
+
+    def __init__(self, diretorio: Union[str, Path], parametros: Dict[str, Any]):
+        self.diretorio = Path(diretorio)
+        self.path = self.diretorio / ARQUIVO_CHECKPOINT
+        self.parametros = parametros
+        self.blocos: Dict[int, Dict[str, Any]] = {}
+        self.concluido = False
+
+    @classmethod
+    def abrir(cls, diretorio: Union[str, Path], parametros: Dict[str, Any],
+              recomecar: bool = False) -> "Checkpoint":
+        checkpoint = cls(diretorio, parametros)
+        checkpoint.diretorio.mkdir(parents=True, exist_ok=True)
+        if recomecar:
+            for parte in checkpoint.diretorio.glob("part-*.parquet"):
+                parte.unlink()
+            if checkpoint.path.exists():
+                checkpoint.path.unlink()
+        elif checkpoint.path.exists():
+            with open(checkpoint.path, 'r') as f:
+                anterior = json.load(f)
+            diferentes = sorted(k for k in set(parametros) | set(anterior["parametros"])
+                                if parametros.get(k) != anterior["parametros"].get(k))
+            if diferentes:
+                raise ValueError(
+                    f"❌ {checkpoint.path} é de outra execução (diferem: {diferentes}); "
+                    "use recomecar=True (--restart) para descartá-la")
+            checkpoint.blocos = {int(b): stats for b, stats in anterior["blocos"].items()}
+            checkpoint.concluido = anterior.get("concluido", False)
+        return checkpoint
+
+    def registrar(self, stats: Dict[str, Any]) -> None:
+        self.blocos[stats["bloco"]] = stats
+        self._gravar()
+
+    def finalizar(self) -> None:
+        self.concluido = True
+        self._gravar()
+
+    def _gravar(self) -> None:
+        conteudo = {"parametros": self.parametros, "concluido": self.concluido,
+                    "blocos": {str(b): s for b, s in sorted(self.blocos.items())}}
+        gravar_json_atomico(self.path, conteudo, indent=1)
+
+
+def _assinatura(path: Union[str, Path]) -> List[int]:
+    stat = Path(path).stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _formatar_duracao(segundos: float) -> str:
+    minutos, segundos = divmod(int(segundos), 60)
+    horas, minutos = divmod(minutos, 60)
+    return f"{horas}h{minutos:02d}m{segundos:02d}s" if horas else f"{minutos}m{segundos:02d}s"
+
+
+# --- Execução ---
+
+def pontuar_arquivo(entrada: Union[str, Path], destino: Union[str, Path], caminhos: Caminhos,
+                    inference_engine: str = "compiled", workers: Optional[int] = None,
+                    linhas_por_bloco: int = LINHAS_POR_BLOCO, limite_memoria_mb: Optional[float] = None,
+                    fatores: str = 'voo', top_k: int = TOP_K, manter_colunas: Sequence[str] = (),
+                    recomecar: bool = False) -> Dict[str, Any]:
+    """
+    Pontua todos os voos de `entrada` (Parquet ou CSV) e grava
+    `destino/part-NNNNN.parquet` + `_checkpoint.json`.
+
+    Args:
+        caminhos: Artefatos (ver `caminhos_artefatos`)
+        inference_engine: 'compiled' (default, mesmas probabilidades do sklearn) ou 'sklearn'
+        workers: Processos de pontuação (default: núcleos da máquina; 1 = no próprio processo)
+        linhas_por_bloco: Tamanho máximo do bloco (reduzido para caber no teto de memória)
+        limite_memoria_mb: Teto de memória do processo principal + workers (None = sem teto)
+        fatores: 'voo' (atribuições por voo) ou 'global' (importância do modelo sklearn)
+        manter_colunas: Colunas da entrada copiadas para a saída (ex.: identificador do voo)
+        recomecar: Descarta checkpoint e partes de uma execução anterior
+
+    Returns:
+        dict: Resumo (linhas, pontuadas, inválidas por motivo, voos/s, pico de memória)
+    """
+    global _CONTEXTO
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    artefatos = carregar_versao(caminhos, inference_engine)
+    if workers > 1 and hasattr(artefatos.model, 'n_jobs'):
+        # Um processo por núcleo: sem threads do joblib dentro de cada worker
+        artefatos.model.set_params(n_jobs=1)
+    _CONTEXTO = ContextoPontuacao(artefatos, destino, fatores, top_k, manter_colunas)
+
+    pool = mp.get_context("fork").Pool(workers) if workers > 1 else None
+    try:
+        em_voo = workers + 1
+        pico_mb = base_mb = memoria_mb()
+        checkpoint_parametros = {
+            "entrada": str(Path(entrada).resolve()),
+            "assinatura_entrada": _assinatura(entrada),
+            "artefatos": {nome: list(a) if a else None for nome, a in sorted(artefatos.assinaturas.items())},
+            "inference_engine": inference_engine,
+            "threshold": artefatos.threshold,
+            "fatores": fatores,
+            "top_k": top_k,
+            "manter_colunas": list(manter_colunas),
+        }
+        checkpoint_existente = Path(destino) / ARQUIVO_CHECKPOINT
+        if not recomecar and checkpoint_existente.exists():
+            # Retomada: os blocos precisam ser os mesmos da execução original
+            with open(checkpoint_existente, 'r') as f:
+                linhas_por_bloco = json.load(f)["parametros"].get("linhas_por_bloco", linhas_por_bloco)
+        elif limite_memoria_mb:
+            linhas_por_bloco = linhas_por_bloco_para_memoria(limite_memoria_mb, base_mb, em_voo, linhas_por_bloco)
+        checkpoint_parametros["linhas_por_bloco"] = linhas_por_bloco
+        checkpoint = Checkpoint.abrir(destino, checkpoint_parametros, recomecar)
+
+        total = contar_linhas(entrada)
+        print(f"🚀 Pontuando {entrada} ({f'{total:,} voos' if total is not None else 'CSV'}) "
+              f"em blocos de {linhas_por_bloco:,}, {workers} worker(s), base {base_mb:.0f} MB")
+        if checkpoint.blocos:
+            print(f"🔄 Retomando: {len(checkpoint.blocos)} bloco(s) já concluído(s)")
+
+        inicio = time.perf_counter()
+        feitas = sum(s["linhas"] for s in checkpoint.blocos.values())
+        feitas_nesta = 0
+        pendentes: deque = deque()
+
+        def concluir(resultado):
+            nonlocal feitas, feitas_nesta, pico_mb
+            stats = resultado.get() if pool is not None else resultado
+            checkpoint.registrar(stats)
+            feitas += stats["linhas"]
+            feitas_nesta += stats["linhas"]
+            memoria = memoria_mb()
+            pico_mb = max(pico_mb, memoria)
+            decorrido = time.perf_counter() - inicio
+            taxa = feitas_nesta / decorrido if decorrido else 0.0
+            progresso = f"{feitas:,}/{total:,} ({feitas / total:.0%})" if total else f"{feitas:,}"
+            eta = f" | ETA {_formatar_duracao((total - feitas) / taxa)}" if total and taxa else ""
+            print(f"   bloco {stats['bloco']}: {progresso} voos | {taxa:,.0f} voos/s | "
+                  f"memória {memoria:,.0f} MB{eta}")
+            return memoria
+
+        for numero, linha_inicial, tabela in ler_blocos(entrada, linhas_por_bloco, manter_colunas):
+            if numero in checkpoint.blocos:
+                continue
+            # Contrapressão: limite de blocos em voo e, acima do teto, esvaziar a fila
+            while pendentes and (len(pendentes) >= em_voo or
+                                 (limite_memoria_mb and memoria_mb() > limite_memoria_mb)):
+                concluir(pendentes.popleft())
+            if pool is None:
+                pendentes.append(pontuar_bloco(numero, linha_inicial, tabela))
+            else:
+                pendentes.append(pool.apply_async(pontuar_bloco, (numero, linha_inicial, tabela)))
+            del tabela
+        while pendentes:
+            concluir(pendentes.popleft())
+        checkpoint.finalizar()
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        _CONTEXTO = None
+
+    segundos = time.perf_counter() - inicio
+    invalidas: Dict[str, int] = {}
+    for stats in checkpoint.blocos.values():
+        for motivo, n in stats["invalidas"].items():
+            invalidas[motivo] = invalidas.get(motivo, 0) + n
+    resumo = {
+        "saida": str(destino),
+        "blocos": len(checkpoint.blocos),
+        "linhas": sum(s["linhas"] for s in checkpoint.blocos.values()),
+        "pontuadas": sum(s["pontuadas"] for s in checkpoint.blocos.values()),
+        "invalidas": invalidas,
+        "linhas_nesta_execucao": feitas_nesta,
+        "segundos": segundos,
+        "voos_por_s": feitas_nesta / segundos if segundos else 0.0,
+        "linhas_por_bloco": linhas_por_bloco,
+        "memoria_pico_mb": pico_mb,
+    }
+    print(f"✅ {resumo['pontuadas']:,} voos pontuados em {destino} ({_formatar_duracao(segundos)}, "
+          f"{resumo['voos_por_s']:,.0f} voos/s, pico {pico_mb:,.0f} MB)")
+    if invalidas:
+        print(f"⚠️ Linhas rejeitadas (mesmas regras de /predict): {invalidas}")
+    return resumo
@@ -0,0 +1,304 @@
+"""
+Codificador de Features Pré-compilado
+Transforma requisições de voo diretamente em linhas float32 no formato de treino,
+sem pandas e sem LabelEncoder.transform no caminho de predição.
+"""
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.vocabulary import Vocabulario
+
+DEFAULT_ORIGIN_DELAY_RATE = 0.195
+DEFAULT_CARRIER_DELAY_RATE = 0.205
+DEFAULT_ORIGIN_TRAFFIC = 450
+
+
+class EntradaInvalida(ValueError):
+    """Data ou horário de partida não interpretável."""
+
+
+def get_time_of_day(h):
+    if 6 <= h < 12:
+        return 'Morning'
+    elif 12 <= h < 18:
+        return 'Afternoon'
+    elif 18 <= h < 22:
+        return 'Evening'
+    else:
+        return 'Night'
+
+
+def parse_dep_hour(crs_dep_time):
+    """Extrai a hora (HH) de um horário HHMM."""
+    return int(str(crs_dep_time).zfill(4)[:2])
+
+
+@lru_cache(maxsize=4096)
+def parse_month(flight_date: str) -> int:
+    """Mês de uma data 'YYYY-MM-DD' (cacheado: poucas datas distintas por dia)."""
+    return datetime.strptime(flight_date, "%Y-%m-%d").month
+
+
+def _mapear_unicos(valores, func, dtype=None):
+    """
+    Aplica `func` uma única vez por valor distinto e expande o resultado
+    para o tamanho original (np.unique + inverse).
+    """
+    unicos, inverso = np.unique(np.asarray(valores), return_inverse=True)
+    return np.asarray([func(v) for v in unicos.tolist()], dtype=dtype)[inverso]
+
+
+class FeatureEncoder:
+    """
+    Codificador compilado uma única vez a partir de feature_names_v7.json,
+    dos LabelEncoders e das Lookup Tables.
+
+    - Categorias viram dicts {classe: código} (sem varrer `classes_`)
+    - Aeroportos e companhias viram ids inteiros de um `Vocabulario`:
+      códigos dos encoders e lookups históricos (com defaults no id 0) em
+      arrays indexados por id, a única cópia das lookup tables
+    - Cada thread reutiliza a mesma linha float32 pré-alocada
+
+    Args:
+        feature_names: Dict com 'todas' (ordem de treino) e 'categoricas'
+        encoders: {coluna: LabelEncoder} para as colunas categóricas
+        lookup_tables: Conteúdo de lookup_tables.json
+    """
+
+    def __init__(self, feature_names: Dict[str, list], encoders: Dict[str, Any],
+                 lookup_tables: Dict[str, Any]):
+        self.feature_names: List[str] = list(feature_names['todas'])
+        self.n_features = len(self.feature_names)
+        self._idx = {nome: i for i, nome in enumerate(self.feature_names)}
+
+        # Categorias → código (mesmo resultado de LabelEncoder.transform)
+        self.vocabularios: Dict[str, Dict[str, int]] = {}
+        for col in feature_names.get('categoricas', []):
+            if col not in encoders:
+                raise ValueError(f"❌ Encoder ausente para a coluna categórica '{col}'")
+            self.vocabularios[col] = {
+                classe: codigo for codigo, classe in enumerate(encoders[col].classes_.tolist())
+            }
+
+        self._idx_categoricas = np.asarray([self._idx[col] for col in self.vocabularios], dtype=np.intp)
+
+        # Um id por aeroporto/companhia: códigos dos encoders e lookups
+        # (defaults resolvidos) por id
+        defaults = lookup_tables.get("defaults", {})
+        self.vocabulario = Vocabulario.compilar(
+            self.vocabularios,
+            lookup_tables.get("origin_delay_rate", {}),
+            lookup_tables.get("origin_traffic", {}),
+            lookup_tables.get("carrier_delay_rate", {}),
+            defaults.get("origin_delay_rate", DEFAULT_ORIGIN_DELAY_RATE),
+            defaults.get("origin_traffic", DEFAULT_ORIGIN_TRAFFIC),
+            defaults.get("carrier_delay_rate", DEFAULT_CARRIER_DELAY_RATE))
+
+        # Período do dia já codificado para toda hora HH que parse_dep_hour devolve (0-99)
+        self._time_of_day_codes = np.asarray(
+            [self._codificar('time_of_day', get_time_of_day(h)) for h in range(100)], dtype=np.float64)
+
+        self._local = threading.local()
+
+    def _codificar(self, col: str, valor: str) -> int:
+        return self.vocabularios[col].get(valor, -1)
+
+    def lookup(self, origin: str, airline: str) -> Tuple[float, float, float]:
+        """Retorna (origin_rate, carrier_rate, traffic) com fallback para defaults."""
+        voc = self.vocabulario
+        origin_rate, traffic, _, _ = voc.aeroportos[voc.id_aeroporto(origin)].tolist()
+        return origin_rate, voc.companhias.item(voc.id_companhia(airline), 0), traffic
+
+    def lookups_ausentes(self, origins: Sequence[str], airlines: Sequence[str]) -> Dict[str, int]:
+        """Voos cujo lookup histórico caiu no default, por tabela (só as não nulas)."""
+        voc = self.vocabulario
+        if len(origins) == 1:
+            origin_rate, traffic = voc.ausentes_aeroportos[voc.id_aeroporto(origins[0])].tolist()
+            ausentes = {
+                'origin_delay_rate': origin_rate,
+                'carrier_delay_rate': voc.ausentes_companhias.item(voc.id_companhia(airlines[0])),
+                'origin_traffic': traffic,
+            }
+        else:
+            por_origem = np.count_nonzero(
+                voc.ausentes_aeroportos[_mapear_unicos(origins, voc.id_aeroporto, np.intp)], axis=0).tolist()
+            ausentes = {
+                'origin_delay_rate': por_origem[0],
+                'carrier_delay_rate': np.count_nonzero(
+                    voc.ausentes_companhias[_mapear_unicos(airlines, voc.id_companhia, np.intp)]),
+                'origin_traffic': por_origem[1],
+            }
+        return {tabela: int(n) for tabela, n in ausentes.items() if n}
+
+    def categorias_desconhecidas(self, X: np.ndarray) -> Dict[str, int]:
+        """Linhas de X com código -1 (categoria fora do encoder), por coluna."""
+        if len(X) == 1:
+            codigos = X[0].take(self._idx_categoricas).tolist()
+            return {col: 1 for col, codigo in zip(self.vocabularios, codigos) if codigo == -1}
+        contagens = np.count_nonzero(X[:, self._idx_categoricas] == -1, axis=0).tolist()
+        return {col: n for col, n in zip(self.vocabularios, contagens) if n}
+
+    def _buffer(self) -> np.ndarray:
+        row = getattr(self._local, 'row', None)
+        if row is None:
+            row = np.empty((1, self.n_features), dtype=np.float32)
+            self._local.row = row
+        return row
+
+    def encode(self, flight, etapa: Optional[Callable[[str], None]] = None) -> Tuple[np.ndarray, float, float]:
+        """
+        Codifica um voo em uma linha (1, n_features) float32.
+
+        A linha retornada é o buffer da thread atual: use-a (ou copie) antes
+        da próxima chamada a `encode` na mesma thread.
+
+        Args:
+            flight: Requisição com os campos de FlightRequest
+            etapa: Chamada ao fim do parse ('parse') e do lookup ('lookup'),
+                para medir o tempo de cada etapa (ex.: `Requisicao.etapa`)
+
+        Returns:
+            tuple: (linha, origin_rate, carrier_rate)
+
+        Raises:
+            EntradaInvalida: Data ou horário inválido
+        """
+        try:
+            month = parse_month(flight.flight_date)
+            hour = parse_dep_hour(flight.crs_dep_time)
+        except ValueError:
+            raise EntradaInvalida("Data ou horário inválido")
+        if etapa is not None:
+            etapa('parse')
+
+        voc = self.vocabulario
+        origin_rate, traffic, origin_code, _ = voc.aeroportos[voc.id_aeroporto(flight.origin)].tolist()
+        carrier_rate, airline_code = voc.companhias[voc.id_companhia(flight.airline)].tolist()
+        if etapa is not None:
+            etapa('lookup')
+
+        idx = self._idx
+        row = self._buffer()
+        x = row[0]
+        x[idx['Month']] = month
+        x[idx['DayOfWeek']] = flight.day_of_week
+        x[idx['dephour']] = hour
+        x[idx['is_weekend']] = 1 if flight.day_of_week >= 6 else 0
+        x[idx['quarter']] = (month - 1) // 3 + 1
+        x[idx['Distance']] = flight.distance
+        x[idx['origin_delay_rate']] = origin_rate
+        x[idx['carrier_delay_rate']] = carrier_rate
+        x[idx['origin_traffic']] = traffic
+        x[idx['Airline']] = airline_code
+        x[idx['Origin']] = origin_code
+        x[idx['Dest']] = voc.aeroportos.item(voc.id_aeroporto(flight.dest), 3)
+        x[idx['time_of_day']] = self._time_of_day_codes.item(hour)
+        return row, origin_rate, carrier_rate
+
+    def calendario(self, row: np.ndarray) -> Tuple[int, int, int]:
+        """(month, day_of_week, hour) de uma linha (1, n_features) já codificada."""
+        x, idx = row[0], self._idx
+        return int(x.item(idx['Month'])), int(x.item(idx['DayOfWeek'])), int(x.item(idx['dephour']))
+
+    def encode_batch(self, flights: Sequence,
+                     etapa: Optional[Callable[[str], None]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Codifica um lote de voos em uma matriz (n, n_features) float32.
+
+        Parse de data/hora, lookups e codificação são resolvidos uma vez por
+        valor distinto e expandidos com operações de array. `etapa` é chamada
+        como em `encode`.
+
+        Returns:
+            tuple: (X, origin_rates, carrier_rates)
+
+        Raises:
+            EntradaInvalida: Data ou horário inválido (com índices dos voos)
+        """
+        return self.encode_colunas(
+            airline=[f.airline for f in flights],
+            origin=[f.origin for f in flights],
+            dest=[f.dest for f in flights],
+            distance=[f.distance for f in flights],
+            day_of_week=[f.day_of_week for f in flights],
+            flight_date=[f.flight_date for f in flights],
+            crs_dep_time=[f.crs_dep_time for f in flights],
+            etapa=etapa)
+
+    def encode_colunas(self, airline: Sequence[str], origin: Sequence[str], dest: Sequence[str],
+                       distance: Sequence[float], day_of_week: Sequence[int], flight_date: Sequence[str],
+                       crs_dep_time: Sequence[int], etapa: Optional[Callable[[str], None]] = None
+                       ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Mesmo resultado de `encode_batch`, com uma coluna (lista ou array)
+        por campo de FlightRequest em vez de um objeto por voo, como vêm de
+        um DataFrame ou de um arquivo Parquet/CSV.
+        """
+        day_of_week = np.asarray(day_of_week)
+
+        # 1. Parse de Data e Hora
+        month = _mapear_unicos(flight_date, self._month_or_invalid)
+        invalidos = np.flatnonzero(month < 0)
+        if invalidos.size:
+            raise EntradaInvalida(
+                f"Data ou horário inválido (voos: {invalidos[:10].tolist()})")
+        hour = _mapear_unicos(crs_dep_time, parse_dep_hour, np.intp)
+        if etapa is not None:
+            etapa('parse')
+
+        # 2. Ids de aeroportos/companhias e lookup de dados históricos por id
+        voc = self.vocabulario
+        por_origem = voc.aeroportos[_mapear_unicos(origin, voc.id_aeroporto, np.intp)]
+        por_companhia = voc.companhias[_mapear_unicos(airline, voc.id_companhia, np.intp)]
+        origin_rates, carrier_rates = por_origem[:, 0], por_companhia[:, 0]
+        if etapa is not None:
+            etapa('lookup')
+
+        # 3. Matriz no formato de treino
+        idx = self._idx
+        X = np.empty((len(day_of_week), self.n_features), dtype=np.float32)
+        X[:, idx['Month']] = month
+        X[:, idx['DayOfWeek']] = day_of_week
+        X[:, idx['dephour']] = hour
+        X[:, idx['is_weekend']] = day_of_week >= 6
+        X[:, idx['quarter']] = (month - 1) // 3 + 1
+        X[:, idx['Distance']] = np.asarray(distance, dtype=float)
+        X[:, idx['origin_delay_rate']] = origin_rates
+        X[:, idx['carrier_delay_rate']] = carrier_rates
+        X[:, idx['origin_traffic']] = por_origem[:, 1]
+        X[:, idx['Airline']] = por_companhia[:, 1]
+        X[:, idx['Origin']] = por_origem[:, 2]
+        X[:, idx['Dest']] = voc.aeroportos[_mapear_unicos(dest, voc.id_aeroporto, np.intp), 3]
+        X[:, idx['time_of_day']] = self._time_of_day_codes[hour]
+        return X, origin_rates, carrier_rates
+
+    @staticmethod
+    def _month_or_invalid(flight_date: str) -> int:
+        try:
+            return parse_month(flight_date)
+        except ValueError:
+            return -1
+
+    def verificar_modelo(self, model) -> None:
+        """Garante que o modelo foi treinado com a mesma ordem de features."""
+        treino = getattr(model, 'feature_names_in_', None)
+        if treino is not None and list(treino) != self.feature_names:
+            raise ValueError(
+                f"❌ Ordem de features do modelo difere de feature_names: {list(treino)}")
+
+    def preparar_modelo(self, model):
+        """
+        Valida a ordem de features e remove `feature_names_in_` do estimador.
+
+        O modelo passa a receber as linhas float32 do encoder sem emitir o
+        aviso de nomes de features do sklearn a cada predição (filtros de
+        warnings não são confiáveis sob o threadpool do FastAPI).
+        """
+        self.verificar_modelo(model)
+        if 'feature_names_in_' in getattr(model, '__dict__', {}):
+            del model.feature_names_in_
+        return model
@@ -0,0 +1,165 @@
+"""
+Executor de Inferência com Contrapressão
+Pool de threads dedicado (e de tamanho fixo) para o trabalho de CPU de
+/predict, fora do threadpool compartilhado do anyio e do event loop.
+
+- Fila limitada: com `max_workers` tarefas em execução e `max_queue`
+  esperando, novas submissões falham na hora (`FilaCheia` → 429).
+- Prazo por tarefa: uma tarefa que chega ao topo da fila depois do prazo é
+  descartada sem rodar (`PrazoExcedido` → 503); quem espera pelo resultado
+  desiste no prazo mesmo se a tarefa já estiver rodando.
+
+Sob sobrecarga a latência das requisições aceitas fica limitada por
+(max_queue / max_workers + 1) × tempo de serviço, em vez de crescer com a
+fila sem limite do threadpool.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class FilaCheia(RuntimeError):
+    """Executor com todas as vagas (execução + fila) ocupadas."""
+
+
+class PrazoExcedido(RuntimeError):
+    """Prazo da tarefa esgotado antes de ela começar ou terminar."""
+
+
+class InferenceExecutor:
+    """
+    Submete funções síncronas a um pool de `max_workers` threads com no
+    máximo `max_queue` tarefas esperando. As threads são criadas na primeira
+    submissão, então o objeto pode ser criado antes do fork dos workers
+    (server.py).
+
+    Args:
+        max_workers: Threads de inferência (tarefas simultâneas)
+        max_queue: Tarefas aceitas além das que estão em execução
+        nome: Prefixo do nome das threads
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 64, nome: str = "flightontime-inference"):
+        if max_workers < 1:
+            raise ValueError("max_workers deve ser >= 1")
+        if max_queue < 0:
+            raise ValueError("max_queue deve ser >= 0")
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.nome = nome
+
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pendentes = 0
+        self._em_execucao = 0
+        self._aceitas = 0
+        self._concluidas = 0
+        self._rejeitadas = 0
+        self._expiradas = 0
+        self._espera_max = 0.0
+
+    # --- Métricas ---
+
+    def stats(self) -> Dict[str, Any]:
+        """Ocupação atual e contagem de tarefas aceitas, rejeitadas e expiradas."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._em_execucao,
+                "queue_depth": self._pendentes - self._em_execucao,
+                "accepted": self._aceitas,
+                "completed": self._concluidas,
+                "rejected": self._rejeitadas,
+                "expired": self._expiradas,
+                "max_queue_wait_ms": self._espera_max * 1000,
+            }
+
+    # --- Submissão ---
+
+    def _garantir_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix=self.nome)
+        return self._pool
+
+    def submit(self, func: Callable[..., Any], *args, prazo: Optional[float] = None) -> Future:
+        """
+        Enfileira `func(*args)`.
+
+        Args:
+            prazo: Instante (time.monotonic) depois do qual a tarefa não deve
+                mais começar (None = sem prazo)
+
+        Returns:
+            Future: resolvido com o retorno de `func`
+
+        Raises:
+            FilaCheia: Todas as vagas ocupadas (a tarefa não é enfileirada)
+        """
+        pool = self._garantir_pool()
+        with self._lock:
+            if self._pendentes >= self.max_workers + self.max_queue:
+                self._rejeitadas += 1
+                raise FilaCheia(f"Executor de inferência cheio ({self._pendentes} tarefas)")
+            self._pendentes += 1
+            self._aceitas += 1
+        try:
+            future = pool.submit(self._executar, func, args, prazo, time.monotonic())
+        except BaseException:
+            self._liberar(None)
+            raise
+        future.add_done_callback(self._liberar)
+        return future
+
+    def _executar(self, func, args, prazo, enfileirada):
+        inicio = time.monotonic()
+        with self._lock:
+            self._espera_max = max(self._espera_max, inicio - enfileirada)
+            if prazo is not None and inicio > prazo:
+                self._expiradas += 1
+                raise PrazoExcedido("Prazo esgotado na fila do executor de inferência")
+            self._em_execucao += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._em_execucao -= 1
+
+    def _liberar(self, future: Optional[Future]) -> None:
+        with self._lock:
+            self._pendentes -= 1
+            if future is not None and not future.cancelled() and future.exception() is None:
+                self._concluidas += 1
+
+    async def run(self, func: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """
+        Versão para o event loop: submete e aguarda sem bloquear o loop.
+
+        Args:
+            timeout: Prazo em segundos a partir de agora (None = sem prazo).
+                Esgotado, a tarefa é cancelada se ainda estiver na fila; se
+                já estiver rodando, o resultado é descartado.
+
+        Raises:
+            FilaCheia: Executor cheio
+            PrazoExcedido: Prazo esgotado na fila ou durante a execução
+        """
+        prazo = time.monotonic() + timeout if timeout is not None else None
+        future = self.submit(func, *args, prazo=prazo)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            if future.cancel():
+                with self._lock:
+                    self._expiradas += 1
+            raise PrazoExcedido("Prazo esgotado aguardando o executor de inferência") from None
+
+    def close(self, wait: bool = False) -> None:
+        """Cancela o que está na fila e encerra as threads."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
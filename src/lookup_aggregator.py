@@ -0,0 +1,192 @@
+"""
+Atualização Incremental das Lookup Tables
+Mantém somas e contagens por aeroporto de origem e por companhia, ingere
+lotes diários de voos (Parquet ou CSV) em O(lote) e publica uma nova versão
+de lookup_tables.json de forma atômica (a API recarrega o arquivo sozinha).
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.atomic_io import gravar_json_atomico
+from src.feature_encoder import DEFAULT_CARRIER_DELAY_RATE, DEFAULT_ORIGIN_DELAY_RATE, DEFAULT_ORIGIN_TRAFFIC
+
+FORMAT_NAME = "flightontime-lookup-state"
+FORMAT_VERSION = 1
+
+COLUNAS = ['FlightDate', 'Origin', 'Airline']
+
+
+def carregar_aeroportos_validos(path: Union[str, Path]) -> List[str]:
+    """Códigos IATA de docs/valid_airports.json (todos entram na tabela publicada)."""
+    with open(path, 'r') as f:
+        return list(json.load(f)["valid_airports"])
+
+
+def _digest(path: Union[str, Path]) -> str:
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+class LookupAggregator:
+    """
+    Estado acumulado das lookup tables.
+
+    - origin_delay_rate / carrier_delay_rate: soma do target / voos com target
+    - origin_traffic: voos do aeroporto / dias observados (média diária de partidas)
+    - defaults: taxa global, mediana do tráfego dos aeroportos observados
+
+    Args:
+        aeroportos: Códigos sempre presentes na tabela (sem voos = defaults)
+        delay_col: Coluna target (default: 'ArrDelay15')
+    """
+
+    def __init__(self, aeroportos: Iterable[str] = (), delay_col: str = 'ArrDelay15'):
+        self.aeroportos = sorted(set(aeroportos))
+        self.delay_col = delay_col
+        self.versao = 0
+        # {codigo: [soma do target, voos com target, voos]}
+        self.origem: Dict[str, List[float]] = {}
+        self.companhia: Dict[str, List[float]] = {}
+        self.dias: set = set()
+        self.lotes: List[str] = []
+
+    @property
+    def voos(self) -> int:
+        return int(sum(v[2] for v in self.origem.values()))
+
+    def ingerir(self, df: pd.DataFrame) -> int:
+        """
+        Soma um lote de voos ao estado (custo proporcional ao lote).
+
+        Returns:
+            int: Linhas ingeridas
+        """
+        faltando = set(COLUNAS + [self.delay_col]) - set(df.columns)
+        if faltando:
+            raise ValueError(f"❌ Colunas ausentes no lote: {sorted(faltando)}")
+
+        target = df[self.delay_col].to_numpy(dtype='float64', na_value=np.nan)
+        presente = ~np.isnan(target)
+        lote = pd.DataFrame({
+            'soma': np.where(presente, target, 0.0),
+            'n': presente.astype('float64'),
+            'voos': 1.0,
+        })
+
+        for coluna, estado in (('Origin', self.origem), ('Airline', self.companhia)):
+            chave = df[coluna].astype(object).to_numpy()
+            por_grupo = lote.groupby(chave, sort=False).sum()
+            for codigo, soma, n, voos in por_grupo.itertuples():
+                atual = estado.setdefault(str(codigo), [0.0, 0.0, 0.0])
+                atual[0] += soma
+                atual[1] += n
+                atual[2] += voos
+
+        datas = pd.to_datetime(df['FlightDate'].drop_duplicates())
+        self.dias.update(datas.dt.strftime('%Y-%m-%d').tolist())
+        return len(df)
+
+    def ingerir_arquivo(self, path: Union[str, Path]) -> bool:
+        """
+        Ingere um Parquet ou CSV. Arquivos já ingeridos (mesmo SHA-256) são
+        ignorados, então reprocessar um lote não conta os voos duas vezes.
+
+        Returns:
+            bool: False se o arquivo já havia sido ingerido
+        """
+        digest = _digest(path)
+        if digest in self.lotes:
+            print(f"⚠️ Lote já ingerido, ignorado: {path}")
+            return False
+
+        colunas = COLUNAS + [self.delay_col]
+        if str(path).endswith('.csv'):
+            df = pd.read_csv(path, usecols=colunas)
+        else:
+            df = pd.read_parquet(path, columns=colunas)
+        linhas = self.ingerir(df)
+        self.lotes.append(digest)
+        print(f"✅ Lote ingerido: {path} ({linhas:,} voos)")
+        return True
+
+    def tabelas(self) -> Dict[str, Any]:
+        """Conteúdo de lookup_tables.json calculado a partir do estado."""
+        n_dias = max(len(self.dias), 1)
+
+        def taxa(soma_n):
+            return round(soma_n[0] / soma_n[1], 6)
+
+        origem = {c: v for c, v in self.origem.items() if v[1] > 0}
+        companhia = {c: v for c, v in self.companhia.items() if v[1] > 0}
+        trafego = {c: int(round(v[2] / n_dias)) for c, v in self.origem.items()}
+
+        soma = sum(v[0] for v in origem.values())
+        n = sum(v[1] for v in origem.values())
+        defaults = {
+            "origin_delay_rate": round(soma / n, 6) if n else DEFAULT_ORIGIN_DELAY_RATE,
+            "carrier_delay_rate": round(soma / n, 6) if n else DEFAULT_CARRIER_DELAY_RATE,
+            "origin_traffic": int(np.median(list(trafego.values()))) if trafego else DEFAULT_ORIGIN_TRAFFIC,
+        }
+
+        aeroportos = sorted(set(self.aeroportos) | set(self.origem))
+        return {
+            "origin_delay_rate": {
+                a: taxa(origem[a]) if a in origem else defaults["origin_delay_rate"] for a in aeroportos},
+            "carrier_delay_rate": {c: taxa(v) for c, v in sorted(companhia.items())},
+            "origin_traffic": {a: trafego.get(a, defaults["origin_traffic"]) for a in aeroportos},
+            "defaults": defaults,
+            "version": self.versao,
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "flights": self.voos,
+            "days": len(self.dias),
+        }
+
+    def publicar(self, lookup_path: Union[str, Path]) -> Dict[str, Any]:
+        """Incrementa a versão e troca lookup_tables.json atomicamente."""
+        self.versao += 1
+        tabelas = self.tabelas()
+        gravar_json_atomico(lookup_path, tabelas)
+        print(f"🚀 Lookup tables v{self.versao} publicadas: {lookup_path} "
+              f"({len(tabelas['origin_delay_rate'])} aeroportos, "
+              f"{len(tabelas['carrier_delay_rate'])} companhias)")
+        return tabelas
+
+    def salvar(self, path: Union[str, Path]) -> None:
+        """Grava o estado (somas, contagens, dias e lotes ingeridos) em JSON."""
+        gravar_json_atomico(path, {
+            "format": FORMAT_NAME,
+            "format_version": FORMAT_VERSION,
+            "version": self.versao,
+            "delay_col": self.delay_col,
+            "airports": self.aeroportos,
+            "origin": self.origem,
+            "carrier": self.companhia,
+            "days": sorted(self.dias),
+            "batches": self.lotes,
+        })
+
+    @classmethod
+    def carregar(cls, path: Union[str, Path],
+                 aeroportos: Optional[Iterable[str]] = None) -> "LookupAggregator":
+        """Reabre um estado salvo com `salvar` (aeroportos extras são adicionados)."""
+        with open(path, 'r') as f:
+            estado = json.load(f)
+        if estado.get("format") != FORMAT_NAME or estado.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"❌ Estado de lookup tables não suportado: {path}")
+
+        agregador = cls(list(estado["airports"]) + list(aeroportos or []), estado["delay_col"])
+        agregador.versao = estado["version"]
+        agregador.origem = {c: list(v) for c, v in estado["origin"].items()}
+        agregador.companhia = {c: list(v) for c, v in estado["carrier"].items()}
+        agregador.dias = set(estado["days"])
+        agregador.lotes = list(estado["batches"])
+        return agregador
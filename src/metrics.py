@@ -0,0 +1,328 @@
+"""
+Métricas da API no Formato Prometheus
+Contadores, gauges e histogramas (buckets fixos, rótulos posicionais)
+mantidos em memória e expostos em texto no formato de exposição 0.0.4 do
+Prometheus, sem depender de prometheus_client.
+
+Cada série é atualizada sob um lock curto da própria métrica; o custo por
+observação é de um dict lookup e um bisect. As métricas são por processo:
+sob server.py cada worker expõe os seus próprios contadores.
+"""
+import random
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Segundos: da consulta à grade de risco (µs) a um lote grande (s)
+LATENCIA_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ETAPA_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001,
+                 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+LOTE_BUCKETS = (1, 10, 100, 500, 1000, 5000, 10000, 50000)
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _numero(valor: float) -> str:
+    if valor == float('inf'):
+        return "+Inf"
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+class _Metrica:
+    tipo = "untyped"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._lock = threading.Lock()
+        self._series: Dict[tuple, object] = {}
+
+    def _rotulos(self, valores: tuple, extra: str = "") -> str:
+        pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(self.rotulos, valores)]
+        if extra:
+            pares.append(extra)
+        return "{" + ",".join(pares) + "}" if pares else ""
+
+    def _verificar(self, valores: tuple) -> None:
+        if len(valores) != len(self.rotulos):
+            raise ValueError(f"❌ {self.nome} espera os rótulos {self.rotulos}, recebeu {valores}")
+
+    def valor(self, *rotulos):
+        """Valor atual da série (None se nunca foi observada)."""
+        with self._lock:
+            return self._series.get(rotulos)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def linhas(self) -> List[str]:
+        with self._lock:
+            series = sorted(self._series.items())
+        saida = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        saida.extend(self._amostras(series))
+        return saida
+
+    def _amostras(self, series) -> Iterable[str]:
+        for valores, valor in series:
+            yield f"{self.nome}{self._rotulos(valores)} {_numero(valor)}"
+
+
+class Contador(_Metrica):
+    """Total monotônico por combinação de rótulos."""
+
+    tipo = "counter"
+
+    def inc(self, *rotulos, valor: float = 1) -> None:
+        with self._lock:
+            atual = self._series.get(rotulos)
+            if atual is None:
+                self._verificar(rotulos)
+                atual = 0
+            self._series[rotulos] = atual + valor
+
+
+class Gauge(_Metrica):
+    """Valor instantâneo por combinação de rótulos."""
+
+    tipo = "gauge"
+
+    def definir(self, valor: float, *rotulos) -> None:
+        self._verificar(rotulos)
+        with self._lock:
+            self._series[rotulos] = valor
+
+
+class Histograma(_Metrica):
+    """
+    Contagem por faixa (`le`, cumulativa na exposição), soma e total por
+    combinação de rótulos.
+    """
+
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, buckets: Sequence[float], rotulos: Sequence[str] = ()):
+        super().__init__(nome, ajuda, rotulos)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def observar(self, valor: float, *rotulos) -> None:
+        faixa = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(rotulos)
+            if serie is None:
+                self._verificar(rotulos)
+                serie = self._series[rotulos] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][faixa] += 1
+            serie[1] += valor
+
+    def valor(self, *rotulos) -> Optional[Dict]:
+        """{'buckets': contagens não cumulativas, 'sum', 'count'} da série."""
+        with self._lock:
+            serie = self._series.get(rotulos)
+            if serie is None:
+                return None
+            return {"buckets": list(serie[0]), "sum": serie[1], "count": sum(serie[0])}
+
+    def linhas(self) -> List[str]:
+        # Cópia das contagens sob o lock: a exposição é formatada fora dele
+        with self._lock:
+            series = sorted((valores, (list(s[0]), s[1])) for valores, s in self._series.items())
+        saida = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        saida.extend(self._amostras(series))
+        return saida
+
+    def _amostras(self, series) -> Iterable[str]:
+        for valores, (contagens, soma) in series:
+            acumulado = 0
+            for limite, contagem in zip(self.buckets + (float('inf'),), contagens):
+                acumulado += contagem
+                le = 'le="' + _numero(limite) + '"'
+                yield f"{self.nome}_bucket{self._rotulos(valores, le)} {acumulado}"
+            yield f"{self.nome}_sum{self._rotulos(valores)} {_numero(soma)}"
+            yield f"{self.nome}_count{self._rotulos(valores)} {acumulado}"
+
+
+class RegistroMetricas:
+    """
+    Conjunto de métricas expostas juntas. Coletores são chamados a cada
+    exposição e devolvem métricas montadas na hora (ex.: stats do cache).
+    """
+
+    def __init__(self):
+        self._metricas: List[_Metrica] = []
+        self._coletores: List[Callable[[], Iterable[_Metrica]]] = []
+
+    def _adicionar(self, metrica):
+        if any(m.nome == metrica.nome for m in self._metricas):
+            raise ValueError(f"❌ Métrica já registrada: {metrica.nome}")
+        self._metricas.append(metrica)
+        return metrica
+
+    def contador(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()) -> Contador:
+        return self._adicionar(Contador(nome, ajuda, rotulos))
+
+    def gauge(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()) -> Gauge:
+        return self._adicionar(Gauge(nome, ajuda, rotulos))
+
+    def histograma(self, nome: str, ajuda: str, buckets: Sequence[float],
+                   rotulos: Sequence[str] = ()) -> Histograma:
+        return self._adicionar(Histograma(nome, ajuda, buckets, rotulos))
+
+    def coletor(self, func: Callable[[], Iterable[_Metrica]]) -> Callable:
+        self._coletores.append(func)
+        return func
+
+    def expor(self) -> str:
+        """Todas as métricas no formato de texto do Prometheus."""
+        linhas = []
+        for metrica in self._metricas:
+            linhas.extend(metrica.linhas())
+        for coletor in self._coletores:
+            for metrica in coletor():
+                linhas.extend(metrica.linhas())
+        return "\n".join(linhas) + "\n"
+
+
+class Requisicao:
+    """
+    Medição de uma requisição (context manager de `MetricasAPI.requisicao`).
+
+    Ao sair, conta a requisição por status e registra a latência total.
+    Se foi sorteada para o detalhamento, `etapa(nome)` registra o tempo
+    desde a etapa anterior (ou desde o início); senão não faz nada.
+    """
+
+    __slots__ = ("_metricas", "endpoint", "versao", "amostrada", "_inicio", "_marca")
+
+    def __init__(self, metricas: "MetricasAPI", endpoint: str, amostrada: bool):
+        self._metricas = metricas
+        self.endpoint = endpoint
+        self.versao = "none"
+        self.amostrada = amostrada
+
+    def __enter__(self):
+        self._inicio = self._marca = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        duracao = time.perf_counter() - self._inicio
+        status = "200" if tipo is None else str(getattr(valor, "status_code", 500))
+        metricas = self._metricas
+        metricas.requisicoes.inc(self.endpoint, status, self.versao)
+        metricas.latencia.observar(duracao, self.endpoint, self.versao)
+        return False
+
+    def etapa(self, nome: str) -> None:
+        if self.amostrada:
+            agora = time.perf_counter()
+            self._metricas.etapas.observar(agora - self._marca, self.endpoint, nome)
+            self._marca = agora
+
+
+class _RequisicaoNula:
+    """Requisição sem métricas (FLIGHTONTIME_METRICS_ENABLED=0)."""
+
+    __slots__ = ("versao",)
+    amostrada = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        return False
+
+    def etapa(self, nome: str) -> None:
+        pass
+
+
+class MetricasAPI:
+    """
+    Métricas de predição da FlightOnTime API.
+
+    - flightontime_requests_total{endpoint, status, model_version}
+    - flightontime_request_duration_seconds{endpoint, model_version}
+    - flightontime_stage_duration_seconds{endpoint, stage} (amostrado)
+    - flightontime_batch_flights{endpoint}: voos por requisição de lote
+    - flightontime_predictions_total{endpoint, source}: grade, cache ou modelo
+    - flightontime_lookup_fallbacks_total{table}: lookups que caíram no default
+    - flightontime_unknown_categories_total{feature}: categorias fora do encoder
+    - flightontime_errors_total{endpoint, exception}: erros internos (500)
+
+    Métricas que só existem no momento da exposição (versão em uso, cache,
+    micro-batcher) entram por `registro.coletor`.
+
+    Args:
+        habilitado: False desliga tudo (requisicao() vira um no-op)
+        amostra_etapas: Fração das requisições com tempo por etapa (0 a 1)
+    """
+
+    def __init__(self, habilitado: bool = True, amostra_etapas: float = 0.1):
+        if not 0 <= amostra_etapas <= 1:
+            raise ValueError("❌ amostra_etapas deve estar entre 0 e 1")
+        self.habilitado = habilitado
+        self.amostra_etapas = amostra_etapas
+        self._nula = _RequisicaoNula()
+
+        self.registro = registro = RegistroMetricas()
+        self.requisicoes = registro.contador(
+            "flightontime_requests_total", "Requisições de predição por endpoint e status.",
+            ("endpoint", "status", "model_version"))
+        self.latencia = registro.histograma(
+            "flightontime_request_duration_seconds", "Latência total das requisições de predição.",
+            LATENCIA_BUCKETS, ("endpoint", "model_version"))
+        self.etapas = registro.histograma(
+            "flightontime_stage_duration_seconds",
+            "Tempo por etapa do caminho de predição (requisições amostradas).",
+            ETAPA_BUCKETS, ("endpoint", "stage"))
+        self.lotes = registro.histograma(
+            "flightontime_batch_flights", "Voos por requisição de lote.", LOTE_BUCKETS, ("endpoint",))
+        self.predicoes = registro.contador(
+            "flightontime_predictions_total", "Voos previstos por origem da probabilidade.",
+            ("endpoint", "source"))
+        self.fallbacks = registro.contador(
+            "flightontime_lookup_fallbacks_total", "Voos cujo lookup histórico usou o default.", ("table",))
+        self.desconhecidas = registro.contador(
+            "flightontime_unknown_categories_total", "Voos com categoria desconhecida pelo encoder.",
+            ("feature",))
+        self.erros = registro.contador(
+            "flightontime_errors_total", "Erros internos por endpoint e tipo de exceção.",
+            ("endpoint", "exception"))
+
+    def requisicao(self, endpoint: str):
+        """Context manager que mede uma requisição (ver `Requisicao`)."""
+        if not self.habilitado:
+            return self._nula
+        amostrada = self.amostra_etapas > 0 and random.random() < self.amostra_etapas
+        return Requisicao(self, endpoint, amostrada)
+
+    def voos(self, endpoint: str, n: int, origem: str) -> None:
+        if self.habilitado:
+            self.predicoes.inc(endpoint, origem, valor=n)
+
+    def lote(self, endpoint: str, n: int) -> None:
+        if self.habilitado:
+            self.lotes.observar(n, endpoint)
+
+    def qualidade_entrada(self, fallbacks: Dict[str, int], desconhecidas: Dict[str, int]) -> None:
+        """Soma os contadores de `FeatureEncoder.lookups_ausentes`/`categorias_desconhecidas`."""
+        if not self.habilitado:
+            return
+        for tabela, n in fallbacks.items():
+            self.fallbacks.inc(tabela, valor=n)
+        for feature, n in desconhecidas.items():
+            self.desconhecidas.inc(feature, valor=n)
+
+    def erro(self, endpoint: str, excecao: BaseException) -> None:
+        if self.habilitado:
+            self.erros.inc(endpoint, type(excecao).__name__)
+
+    def expor(self) -> str:
+        return self.registro.expor()
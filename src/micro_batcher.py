@@ -0,0 +1,218 @@
+"""
+Micro-batching de Predições
+Agrupa linhas de requisições concorrentes de /predict em uma única chamada
+vetorizada ao modelo e devolve a cada chamador o seu resultado.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+
+class _Item:
+    __slots__ = ("row", "modelo", "future", "enqueued")
+
+    def __init__(self, row: np.ndarray, modelo: Any = None):
+        self.row = row
+        self.modelo = modelo
+        self.future: Future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Coalesce requisições concorrentes em lotes de até `max_batch_size` linhas
+    ou `max_wait_ms` milissegundos (o que ocorrer primeiro).
+
+    Cada chamador recebe um `concurrent.futures.Future` com a probabilidade
+    da sua linha. Uma thread dedicada monta o lote e chama `score_fn` uma
+    única vez por lote. A thread é iniciada na primeira submissão, então o
+    objeto pode ser criado antes do fork dos workers (server.py).
+
+    Itens cancelados (`future.cancel()`) antes de o lote ser montado são
+    descartados sem pontuar.
+
+    Linhas submetidas com `modelo` são pontuadas por `score_fn(X, modelo)`,
+    um lote por modelo: durante uma troca de versão, cada linha é pontuada
+    pelo modelo da versão que a codificou.
+
+    Args:
+        score_fn: Recebe X (n, n_features) float32 (e o modelo, se
+            informado na submissão) e retorna n probabilidades
+        max_batch_size: Tamanho máximo do lote
+        max_wait_ms: Espera máxima do primeiro item da fila antes do disparo
+    """
+
+    BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+    WAIT_MS_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100)
+
+    def __init__(self, score_fn: Callable[[np.ndarray], np.ndarray],
+                 max_batch_size: int = 64, max_wait_ms: float = 2.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size deve ser >= 1")
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue: "queue.Queue[Optional[_Item]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
+
+    # --- Métricas ---
+
+    def _reset_stats(self):
+        self._batches = 0
+        self._requests = 0
+        self._errors = 0
+        self._cancelled = 0
+        self._max_batch_seen = 0
+        self._wait_sum = 0.0
+        self._wait_max = 0.0
+        self._size_hist = [0] * (len(self.BATCH_SIZE_BUCKETS) + 1)
+        self._wait_hist = [0] * (len(self.WAIT_MS_BUCKETS) + 1)
+
+    @staticmethod
+    def _bucket(buckets, valor) -> int:
+        for i, limite in enumerate(buckets):
+            if valor <= limite:
+                return i
+        return len(buckets)
+
+    def _registrar(self, tamanho: int, esperas_ms, erro: bool):
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += tamanho
+            self._errors += tamanho if erro else 0
+            self._max_batch_seen = max(self._max_batch_seen, tamanho)
+            self._size_hist[self._bucket(self.BATCH_SIZE_BUCKETS, tamanho)] += 1
+            for espera in esperas_ms:
+                self._wait_sum += espera
+                self._wait_max = max(self._wait_max, espera)
+                self._wait_hist[self._bucket(self.WAIT_MS_BUCKETS, espera)] += 1
+
+    def stats(self) -> Dict:
+        """Tamanho dos lotes e tempo de espera na fila (histogramas por faixa)."""
+        with self._stats_lock:
+            def _hist(buckets, contagens):
+                rotulos = [f"<={b}" for b in buckets] + [f">{buckets[-1]}"]
+                return dict(zip(rotulos, contagens))
+
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self._batches,
+                "requests": self._requests,
+                "errors": self._errors,
+                "cancelled": self._cancelled,
+                "queue_depth": self._queue.qsize(),
+                "avg_batch_size": self._requests / self._batches if self._batches else 0.0,
+                "max_batch_size_seen": self._max_batch_seen,
+                "avg_queue_wait_ms": self._wait_sum / self._requests if self._requests else 0.0,
+                "max_queue_wait_ms": self._wait_max,
+                "batch_size_histogram": _hist(self.BATCH_SIZE_BUCKETS, self._size_hist),
+                "queue_wait_ms_histogram": _hist(self.WAIT_MS_BUCKETS, self._wait_hist),
+            }
+
+    # --- Submissão ---
+
+    def _garantir_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._loop, name="flightontime-microbatcher", daemon=True)
+                self._thread.start()
+
+    def submit(self, row: np.ndarray, modelo: Any = None, copiar: bool = True) -> Future:
+        """
+        Enfileira uma linha (1, n_features) ou (n_features,).
+
+        Args:
+            modelo: Repassado a `score_fn`; linhas de modelos diferentes
+                nunca dividem uma chamada
+            copiar: False quando a linha já é do batcher (o chamador não a
+                reutiliza nem altera até o future resolver): evita a cópia
+
+        Returns:
+            Future: resolvido com a probabilidade (float) da linha
+        """
+        self._garantir_thread()
+        linha = np.array(row, dtype=np.float32, copy=True) if copiar else np.asarray(row, dtype=np.float32)
+        item = _Item(linha.reshape(-1), modelo)
+        self._queue.put(item)
+        return item.future
+
+    def predict(self, row: np.ndarray, modelo: Any = None, timeout: Optional[float] = None) -> float:
+        """Versão bloqueante de `submit` (para endpoints síncronos)."""
+        return self.submit(row, modelo).result(timeout=timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Processa o que já está na fila e encerra a thread."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self._thread = None
+
+    # --- Thread de lotes ---
+
+    def _coletar(self, primeiro: _Item):
+        lote = [primeiro]
+        prazo = primeiro.enqueued + self.max_wait
+        parar = False
+        while len(lote) < self.max_batch_size:
+            restante = prazo - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=restante) if restante > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                parar = True
+                break
+            lote.append(item)
+        return lote, parar
+
+    def _loop(self):
+        while True:
+            primeiro = self._queue.get()
+            if primeiro is None:
+                return
+            lote, parar = self._coletar(primeiro)
+
+            # Futures cancelados (quem esperava desistiu) não são pontuados
+            ativos = [item for item in lote if item.future.set_running_or_notify_cancel()]
+            if len(ativos) < len(lote):
+                with self._stats_lock:
+                    self._cancelled += len(lote) - len(ativos)
+            lote = ativos
+
+            # Um lote por modelo (em geral, um só), na ordem de chegada
+            grupos: Dict[int, list] = {}
+            for item in lote:
+                grupos.setdefault(id(item.modelo), []).append(item)
+            for grupo in grupos.values():
+                self._pontuar(grupo)
+
+            if parar:
+                return
+
+    def _pontuar(self, lote):
+        inicio = time.perf_counter()
+        esperas_ms = [(inicio - item.enqueued) * 1000 for item in lote]
+        X = np.stack([item.row for item in lote])
+        modelo = lote[0].modelo
+        try:
+            probas = self.score_fn(X) if modelo is None else self.score_fn(X, modelo)
+        except Exception as e:
+            for item in lote:
+                item.future.set_exception(e)
+            self._registrar(len(lote), esperas_ms, erro=True)
+        else:
+            for item, proba in zip(lote, probas):
+                item.future.set_result(proba)
+            self._registrar(len(lote), esperas_ms, erro=False)
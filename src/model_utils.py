@@ -6,7 +6,7 @@ import json
 from pathlib import Path
 from typing import Any, Dict
 
-import joblib
+from src.tree_engine import CompiledForest
 
 # Define o diretório base como sendo DOIS NÍVEIS acima de 'src/model_utils.py'
 # (ou seja, a raiz do projeto)
@@ -15,20 +15,46 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # --- Funções de Carregamento Modificadas ---
 
 
-def load_model(model_path: str = "models/randomforest_v7_final.pkl"):
+def load_model(model_path: str = "models/randomforest_v7_final.pkl", mmap: bool = True):
     """
     Carrega modelo treinado usando caminho absoluto.
+
+    Aceita o pickle do sklearn ou um diretório exportado por
+    `export_compiled_model` (CompiledForest). No segundo caso os arrays são
+    mapeados em memória (mmap=True): a carga não depende do tamanho do modelo
+    e vários workers compartilham as mesmas páginas.
     """
     absolute_path = BASE_DIR / model_path
 
     if not absolute_path.exists():
         raise FileNotFoundError(f"❌ Modelo não encontrado: {absolute_path}")
 
+    if CompiledForest.is_artifact(absolute_path):
+        model = CompiledForest.load(absolute_path, mmap=mmap)
+        print(f"✅ Modelo compilado carregado (mmap={mmap}): {absolute_path.name}")
+        return model
+
+    # joblib (e o sklearn, ao desserializar) só são importados aqui
+    import joblib
     model = joblib.load(absolute_path)
     print(f"✅ Modelo carregado: {absolute_path.name}")
     return model
 
 
+def export_compiled_model(
+        model_path: str = "models/randomforest_v7_final.pkl",
+        output_dir: str = "models/randomforest_v7_compiled") -> Path:
+    """
+    Exporta o pickle do sklearn para o formato mapeável em memória.
+    """
+    forest = CompiledForest.from_sklearn(load_model(model_path))
+    output_path = forest.save(BASE_DIR / output_dir)
+
+    print(f"✅ Modelo compilado exportado: {output_path} "
+          f"({forest.n_estimators} árvores, {forest.nbytes / 1024**2:.1f} MB)")
+    return output_path
+
+
 def load_encoders(encoder_path: str = "models/label_encoders_v7.pkl"):
     """
     Carrega encoders categóricos usando caminho absoluto.
@@ -38,6 +64,7 @@ def load_encoders(encoder_path: str = "models/label_encoders_v7.pkl"):
     if not absolute_path.exists():
         raise FileNotFoundError(f"❌ Encoders não encontrados: {absolute_path}")
 
+    import joblib
     encoders = joblib.load(absolute_path)
     print(f"✅ Encoders carregados: {absolute_path.name}")
     return encoders
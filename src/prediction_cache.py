@@ -0,0 +1,99 @@
+"""
+Cache de Predições
+LRU com expiração (TTL) para probabilidades de /predict, indexado pela linha
+de features já codificada (o mesmo voo consultado várias vezes ao dia gera
+exatamente a mesma linha float32).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+import numpy as np
+
+
+class PredictionCache:
+    """
+    Cache LRU + TTL thread-safe.
+
+    Cada `clear()` (recarga de modelo, threshold ou lookups) incrementa a
+    `geracao`; `put` ignora valores calculados com uma geração anterior, então
+    uma predição em andamento durante a recarga nunca volta ao cache.
+
+    Args:
+        max_size: Número máximo de entradas (a menos usada recentemente sai primeiro)
+        ttl_seconds: Validade de cada entrada (<= 0 = sem expiração)
+    """
+
+    def __init__(self, max_size: int = 65536, ttl_seconds: float = 300.0):
+        if max_size < 1:
+            raise ValueError("max_size deve ser >= 1")
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.geracao = 0
+
+        self._dados: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @staticmethod
+    def chave(row: np.ndarray) -> bytes:
+        """Chave de uma linha codificada (bytes do vetor float32)."""
+        return row.tobytes()
+
+    def get(self, key: Hashable) -> Optional[float]:
+        """Valor em cache ou None (conta hit/miss)."""
+        with self._lock:
+            entrada = self._dados.get(key)
+            if entrada is None:
+                self._misses += 1
+                return None
+            valor, expira_em = entrada
+            if expira_em is not None and time.monotonic() >= expira_em:
+                del self._dados[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._dados.move_to_end(key)
+            self._hits += 1
+            return valor
+
+    def put(self, key: Hashable, valor: float, geracao: Optional[int] = None) -> None:
+        """Armazena `valor`; descartado se `geracao` não for a atual."""
+        expira_em = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            if geracao is not None and geracao != self.geracao:
+                return
+            self._dados[key] = (valor, expira_em)
+            self._dados.move_to_end(key)
+            while len(self._dados) > self.max_size:
+                self._dados.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Invalida todas as entradas (artefatos recarregados)."""
+        with self._lock:
+            self._dados.clear()
+            self.geracao += 1
+
+    def __len__(self) -> int:
+        return len(self._dados)
+
+    def stats(self) -> Dict:
+        """Contadores de hit/miss/eviction e ocupação."""
+        with self._lock:
+            consultas = self._hits + self._misses
+            return {
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "size": len(self._dados),
+                "generation": self.geracao,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / consultas if consultas else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
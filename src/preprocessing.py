@@ -2,53 +2,206 @@
 Módulo de Pré-processamento e Engenharia de Features
 Versão refatorada do notebook FlightOnTime_v8
 """
+import json
+
 import numpy as np
+import pandas as pd
+
+
+DTYPE_SCHEMA_FORMAT = "flightontime-dtype-schema"
+DTYPE_SCHEMA_VERSION = 1
+
+_INTEIROS_SEM_SINAL = (np.uint8, np.uint16, np.uint32, np.uint64)
+_INTEIROS_COM_SINAL = (np.int8, np.int16, np.int32, np.int64)
+
+
+def _menor_inteiro(c_min, c_max, unsigned=True):
+    """Menor tipo inteiro que comporta [c_min, c_max]."""
+    candidatos = _INTEIROS_SEM_SINAL if unsigned and c_min >= 0 else _INTEIROS_COM_SINAL
+    for tipo in candidatos:
+        info = np.iinfo(tipo)
+        if info.min <= c_min and c_max <= info.max:
+            return np.dtype(tipo)
+    return np.dtype(np.int64)
+
 
+def planejar_dtypes(df, max_categorias=1000, max_fracao_categorias=0.5, unsigned=True):
+    """
+    Planeja o menor dtype de cada coluna com uma única leitura por coluna.
+
+    Regras:
+    - Inteiros → menor uint8/16/32 (sem negativos) ou int8/16/32
+    - float64 → float32 quando o intervalo cabe
+    - Strings (object) com até `max_categorias` valores distintos e no
+      máximo `max_fracao_categorias` × linhas → category
 
-def downcast_dataframe(df):
+    Returns:
+        Dict[str, str]: {coluna: dtype} apenas para colunas que mudam
+    """
+    plano = {}
+    for col in df.columns:
+        dtype = df[col].dtype
+
+        if pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+            valores = df[col].to_numpy()
+            if not len(valores):
+                continue
+            alvo = _menor_inteiro(int(valores.min()), int(valores.max()), unsigned)
+            if alvo != dtype:
+                plano[col] = alvo.name
+
+        elif dtype == np.float64:
+            valores = df[col].to_numpy()
+            finitos = valores[~np.isnan(valores)]
+            if not len(finitos) or (np.finfo(np.float32).min < finitos.min()
+                                    and finitos.max() < np.finfo(np.float32).max):
+                plano[col] = 'float32'
+
+        elif dtype == object or pd.api.types.is_string_dtype(dtype):
+            distintos = df[col].nunique(dropna=True)
+            if distintos <= max_categorias and distintos <= max_fracao_categorias * len(df):
+                plano[col] = 'category'
+
+    return plano
+
+
+def downcast_dataframe(df, plano=None, schema_path=None, **opcoes_plano):
     """
     Reduz uso de memória através de downcast de tipos de dados.
 
-    Conversões:
-    - int64 → int32/int16 quando possível
+    Conversões (ver planejar_dtypes):
+    - int64 → menor uint/int que comporta os valores (inclusive 8 bits)
     - float64 → float32 quando possível
+    - strings de baixa cardinalidade → category
+
+    O plano é aplicado com um único `astype`; colunas sem mudança não são
+    copiadas.
+
+    Args:
+        df: DataFrame de entrada (não é modificado)
+        plano: {coluna: dtype} pronto (default: planejar_dtypes(df))
+        schema_path: Grava o schema resultante em JSON (ver ler_parquet_compacto)
+        **opcoes_plano: Repassadas a planejar_dtypes
 
     Returns:
         pd.DataFrame: DataFrame otimizado
     """
-    start_memory = df.memory_usage(deep=True).sum() / 1024**2
+    # Memória rasa (sem percorrer o conteúdo das strings)
+    start_memory = df.memory_usage(deep=False).sum() / 1024**2
 
-    for col in df.columns:
-        col_type = df[col].dtype
-
-        if col_type == 'int64':
-            c_min, c_max = df[col].min(), df[col].max()
-            if c_min > np.iinfo(
-                    np.int32).min and c_max < np.iinfo(
-                    np.int32).max:
-                df[col] = df[col].astype(np.int32)
-            elif c_min > np.iinfo(np.int16).min and c_max < np.iinfo(np.int16).max:
-                df[col] = df[col].astype(np.int16)
-
-        elif col_type == 'float64':
-            c_min, c_max = df[col].min(), df[col].max()
-            if c_min > np.finfo(
-                    np.float32).min and c_max < np.finfo(
-                    np.float32).max:
-                df[col] = df[col].astype(np.float32)
-
-    end_memory = df.memory_usage(deep=True).sum() / 1024**2
-    reduction_pct = (1 - end_memory / start_memory) * 100
-
-    print("📊 Otimização de Memória:")
+    if plano is None:
+        plano = planejar_dtypes(df, **opcoes_plano)
+    df_opt = df.astype(plano, copy=False) if plano else df
+
+    end_memory = df_opt.memory_usage(deep=False).sum() / 1024**2
+    reduction_pct = (1 - end_memory / start_memory) * 100 if start_memory else 0.0
+
+    print("📊 Otimização de Memória (sem conteúdo de strings):")
     print(f"  - Antes: {start_memory:.2f} MB")
     print(f"  - Depois: {end_memory:.2f} MB")
     print(f"  - Redução: {reduction_pct:.1f}%")
 
+    if schema_path is not None:
+        salvar_schema_dtypes(df_opt, schema_path)
+
+    return df_opt
+
+
+def salvar_schema_dtypes(df, path):
+    """Grava {coluna: dtype} do DataFrame em JSON para cargas futuras."""
+    schema = {
+        "format": DTYPE_SCHEMA_FORMAT,
+        "format_version": DTYPE_SCHEMA_VERSION,
+        "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
+    }
+    with open(path, 'w') as f:
+        json.dump(schema, f, indent=2)
+    print(f"✅ Schema de dtypes salvo: {path}")
+
+
+def carregar_schema_dtypes(path):
+    """
+    Lê um schema salvo por salvar_schema_dtypes.
+
+    Returns:
+        Dict[str, str]: {coluna: dtype}, aceito por pd.read_csv(dtype=...)
+    """
+    with open(path, 'r') as f:
+        schema = json.load(f)
+    if schema.get("format") != DTYPE_SCHEMA_FORMAT or \
+            schema.get("format_version") != DTYPE_SCHEMA_VERSION:
+        raise ValueError(f"❌ Schema de dtypes não suportado: {path}")
+    return schema["dtypes"]
+
+
+def ler_parquet_compacto(path, schema, columns=None):
+    """
+    Lê um Parquet já nos dtypes do schema: as colunas são convertidas no
+    Arrow (cast seguro; valores fora do intervalo planejado geram erro) e só
+    então viram pandas, sem passar por int64/float64/object.
+
+    Args:
+        path: Arquivo Parquet
+        schema: {coluna: dtype} (carregar_schema_dtypes) ou caminho do JSON
+        columns: Subconjunto de colunas a ler
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    if not isinstance(schema, dict):
+        schema = carregar_schema_dtypes(schema)
+
+    table = pq.read_table(path, columns=columns)
+    categoricas = []
+    for i, nome in enumerate(table.column_names):
+        dtype = schema.get(nome)
+        if dtype is None or dtype == str(table.schema.field(nome).type):
+            continue
+        if dtype == 'category':
+            coluna = table[nome]
+            if not pa.types.is_dictionary(coluna.type):
+                coluna = pc.dictionary_encode(coluna)
+            table = table.set_column(i, nome, coluna)
+            categoricas.append(nome)
+        elif np.dtype(dtype).kind in 'iuf':
+            table = table.set_column(i, nome, table[nome].cast(pa.from_numpy_dtype(np.dtype(dtype))))
+
+    df = table.to_pandas()
+    # Mesma ordem de categorias de astype('category')
+    for nome in categoricas:
+        df[nome] = df[nome].cat.reorder_categories(sorted(df[nome].cat.categories))
     return df
 
 
-def criar_features_temporais(df):
+# Período do dia por hora de partida (0-23): uma posição por hora
+PERIODOS_DO_DIA = [
+    'Morning (6am-12pm)',
+    'Afternoon (12pm-6pm)',
+    'Evening (6pm-10pm)',
+    'Night (10pm-6am)',
+]
+
+
+def classify_time_period(hour):
+    if 6 <= hour < 12:
+        return PERIODOS_DO_DIA[0]
+    elif 12 <= hour < 18:
+        return PERIODOS_DO_DIA[1]
+    elif 18 <= hour < 22:
+        return PERIODOS_DO_DIA[2]
+    else:
+        return PERIODOS_DO_DIA[3]
+
+
+# Categorias em ordem alfabética (a mesma que astype('category') produz) e
+# código de cada uma das 24 horas
+_CATEGORIAS_PERIODO = sorted(PERIODOS_DO_DIA)
+_CODIGO_PERIODO_POR_HORA = np.array(
+    [_CATEGORIAS_PERIODO.index(classify_time_period(h)) for h in range(24)], dtype=np.int8)
+
+
+def criar_features_temporais(df, inplace=False):
     """
     Extrai features temporais sem data leakage.
 
@@ -60,11 +213,12 @@ def criar_features_temporais(df):
 
     Args:
         df: DataFrame com coluna 'CRSDepTime' e 'DayOfWeek'
+        inplace: Adiciona as colunas em `df` sem copiar o DataFrame
 
     Returns:
         pd.DataFrame: DataFrame com novas features
     """
-    df_feat = df.copy()
+    df_feat = df if inplace else df.copy()
 
     # Feature 1: Hora da partida
     df_feat['dephour'] = (
@@ -79,19 +233,10 @@ def criar_features_temporais(df):
     # Feature 3: Trimestre
     df_feat['quarter'] = ((df_feat['Month'] - 1) // 3 + 1).astype('int8')
 
-    # Feature 4: Período do dia
-    def classify_time_period(hour):
-        if 6 <= hour < 12:
-            return 'Morning (6am-12pm)'
-        elif 12 <= hour < 18:
-            return 'Afternoon (12pm-6pm)'
-        elif 18 <= hour < 22:
-            return 'Evening (6pm-10pm)'
-        else:
-            return 'Night (10pm-6am)'
-
-    df_feat['time_of_day'] = df_feat['dephour'].apply(
-        classify_time_period).astype('category')
+    # Feature 4: Período do dia (tabela de 24 posições indexada pela hora)
+    codigos = _CODIGO_PERIODO_POR_HORA[df_feat['dephour'].to_numpy()]
+    df_feat['time_of_day'] = pd.Categorical.from_codes(
+        codigos, categories=_CATEGORIAS_PERIODO).remove_unused_categories()
 
     print(
         "✅ Features temporais criadas: ['dephour', 'is_weekend', 'quarter', 'time_of_day']")
@@ -108,7 +253,9 @@ def criar_features_historicas(df, delay_col='ArrDelay15'):
     2. carrier_delay_rate: Taxa histórica de atrasos da companhia
     3. origin_traffic: Número acumulado de voos no aeroporto
 
-    CRÍTICO: Usa shift(1) + expanding().mean() para evitar lookahead bias.
+    CRÍTICO: Cada voo vê apenas os voos ANTERIORES do grupo (equivalente a
+    shift(1) + expanding().mean()), calculado com somas e contagens
+    acumuladas por grupo, sem lambda por grupo.
 
     Args:
         df: DataFrame OBRIGATORIAMENTE ordenado por 'FlightDate'
@@ -117,37 +264,60 @@ def criar_features_historicas(df, delay_col='ArrDelay15'):
     Returns:
         pd.DataFrame: DataFrame com features históricas
     """
-    df_feat = df.copy()
-
     # VALIDAÇÃO CRÍTICA
-    if 'FlightDate' not in df_feat.columns:
+    if 'FlightDate' not in df.columns:
         raise ValueError(
             "❌ Coluna 'FlightDate' não encontrada! Obrigatória para features históricas.")
 
-    # Ordenar por data ANTES de tudo
-    df_feat = df_feat.sort_values('FlightDate').reset_index(drop=True)
+    # Ordenar por data ANTES de tudo (única cópia do DataFrame). Dados já
+    # ordenados mantêm a ordem de entrada (o sort padrão não é estável e
+    # embaralharia voos da mesma data) e não são copiados: só ganham colunas.
+    if df['FlightDate'].is_monotonic_increasing:
+        df_feat = df.copy(deep=False)
+        df_feat.index = pd.RangeIndex(len(df_feat))
+    else:
+        df_feat = df.sort_values('FlightDate', ignore_index=True)
     print("📅 Dataset ordenado por FlightDate (obrigatório para evitar data leakage)")
 
-    # 1. Taxa de atraso por aeroporto (rolling com shift)
-    df_feat['origin_delay_rate'] = df_feat.groupby(
-        'Origin')[delay_col].transform(lambda x: x.shift(1).expanding().mean())
-
-    # 2. Taxa de atraso por companhia (rolling com shift)
-    df_feat['carrier_delay_rate'] = df_feat.groupby(
-        'Airline')[delay_col].transform(lambda x: x.shift(1).expanding().mean())
+    # 1-2. Taxa de atraso por aeroporto e por companhia:
+    #      (soma acumulada - valor atual) / (contagem acumulada - atual)
+    df_feat['origin_delay_rate'] = _taxa_anterior_por_grupo(df_feat, 'Origin', delay_col)
+    df_feat['carrier_delay_rate'] = _taxa_anterior_por_grupo(df_feat, 'Airline', delay_col)
 
     # 3. Congestionamento acumulado (até o dia anterior)
     df_feat['origin_traffic'] = df_feat.groupby(
-        ['Origin', 'FlightDate']).cumcount().astype('int16')
+        ['Origin', 'FlightDate'], observed=True).cumcount().astype('int16')
 
     # Preencher NaNs iniciais com média global
     global_mean = df_feat[delay_col].mean()
-    df_feat['origin_delay_rate'].fillna(global_mean, inplace=True)
-    df_feat['carrier_delay_rate'].fillna(global_mean, inplace=True)
+    df_feat['origin_delay_rate'] = df_feat['origin_delay_rate'].fillna(global_mean)
+    df_feat['carrier_delay_rate'] = df_feat['carrier_delay_rate'].fillna(global_mean)
 
     print("✅ Features históricas criadas: "
           "['origin_delay_rate', 'carrier_delay_rate', 'origin_traffic']")
-    print("🛡️ Data leakage evitado através de shift(1) temporal!")
+    print("🛡️ Data leakage evitado: cada voo usa apenas o histórico anterior!")
     print(f"📊 NaN preenchidos com média global: {global_mean:.4f}")
 
     return df_feat
+
+
+def _taxa_anterior_por_grupo(df, group_col, delay_col):
+    """
+    Média de `delay_col` nos voos anteriores do mesmo grupo (NaN no primeiro
+    voo do grupo e em grupos nulos), igual a
+    groupby(group_col)[delay_col].transform(lambda x: x.shift(1).expanding().mean()).
+
+    Valores nulos do target não entram nem na soma nem na contagem.
+    """
+    valores = df[delay_col].to_numpy(dtype='float64', na_value=np.nan)
+    presente = ~np.isnan(valores)
+    valores = np.where(presente, valores, 0.0)
+
+    acumulado = pd.DataFrame({'soma': valores, 'n': presente.astype('float64')},
+                             index=df.index).groupby(
+        df[group_col], sort=False, observed=True).cumsum()
+
+    soma = acumulado['soma'].to_numpy() - valores
+    n = acumulado['n'].to_numpy() - presente
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(n > 0, soma / n, np.nan)
@@ -1,16 +1,385 @@
 """
 Motor Prescritivo - Gera recomendações acionáveis para companhias aéreas
 Baseado em Mosqueira et al. (2024)
+
+Rótulos e confiança são calculados de forma vetorizada (np.where/np.select)
+e guardados como códigos inteiros; fatores e recomendações são listas
+compartilhadas pelos voos de uma saída, em vez de uma cópia por voo. A
+tabela global de recomendações é de tuplas e cada saída recebe as suas
+próprias listas.
+
+Com atribuições por voo (src/attributions.py), principais_fatores passa a
+explicar cada voo e a feature que mais aumenta o risco acrescenta uma ação
+específica às recomendações dos voos atrasados.
 """
 import numpy as np
-from typing import List, Dict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
+PREVISOES = ("Pontual", "Atrasado")
+# Ordem crescente: o código é comparável (0 = Baixa ... 3 = Muito Alta)
+CONFIANCAS = ("Baixa", "Moderada", "Alta", "Muito Alta")
+LIMITES_CONFIANCA = (0.75, 0.60, 0.50)
 
-def gerar_output_prescritivo(
+RECOMENDACOES = {
+    "Atrasado": [
+        "⚠️ Reclassificar voo como potencialmente atrasado",
+        "📢 Notificar passageiros com conexões (>2h)",
+        "🎯 Antecipar boarding em 10-15 minutos",
+        "🚪 Reservar gate alternativo",
+        "🔧 Realizar pré-voo com margem de tempo"
+    ],
+    "Pontual": [
+        "✅ Manter agendamento normal",
+        "🟢 Prioridade operacional normal",
+        "⏰ Estimativa: Decolagem no horário"
+    ],
+}
+
+# Ação específica (voos atrasados) para a feature que mais aumenta o risco
+RECOMENDACOES_POR_FATOR = {
+    "dephour": "🕐 Horário de partida de alto risco: avaliar troca de slot e reforçar equipe de solo",
+    "time_of_day": "🕐 Horário de partida de alto risco: avaliar troca de slot e reforçar equipe de solo",
+    "carrier_delay_rate": "✈️ Histórico de atrasos da companhia: revisar turnaround e tripulação de reserva",
+    "Airline": "✈️ Histórico de atrasos da companhia: revisar turnaround e tripulação de reserva",
+    "origin_delay_rate": "🛫 Origem com atrasos recorrentes: alinhar com o centro de operações do aeroporto",
+    "Origin": "🛫 Origem com atrasos recorrentes: alinhar com o centro de operações do aeroporto",
+    "origin_traffic": "🚦 Tráfego elevado na origem: solicitar pushback e taxiamento com antecedência",
+    "Dest": "🛬 Destino de alto risco: confirmar gate de chegada e proteger conexões",
+    "Distance": "📏 Trecho sensível à distância: revisar combustível e margem de bloco",
+    "Month": "📅 Período sazonal de risco: reforçar escala e manutenção preventiva",
+    "quarter": "📅 Período sazonal de risco: reforçar escala e manutenção preventiva",
+    "DayOfWeek": "📅 Dia da semana de alto movimento: reforçar escala de solo",
+    "is_weekend": "📅 Dia da semana de alto movimento: reforçar escala de solo",
+}
+
+# Sem atribuições: código da recomendação = código da previsão. Tuplas: a
+# tabela é global e não pode ser alterada pelos registros que a usam
+TABELA_RECOMENDACOES = tuple(tuple(RECOMENDACOES[p]) for p in PREVISOES)
+
+
+def principais_fatores_globais(feature_importance_dict: Dict[str, float], top_n: int = 3) -> List[str]:
+    """Top-N features por importância global, já formatadas."""
+    top_features = sorted(feature_importance_dict.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    return [f"{feat}: {imp * 100:.1f}% de importância" for feat, imp in top_features]
+
+
+def classificar_confianca(y_pred: np.ndarray, y_proba: np.ndarray) -> np.ndarray:
+    """
+    Código de confiança (índice em CONFIANCAS) de cada predição: a
+    probabilidade da classe prevista contra LIMITES_CONFIANCA.
+    """
+    valor = np.where(y_pred == 1, y_proba, 1 - y_proba)
+    return np.select([valor >= limite for limite in LIMITES_CONFIANCA], [3, 2, 1], 0).astype(np.int8)
+
+
+@lru_cache(maxsize=None)
+def tabela_recomendacoes(nomes: Tuple[str, ...]) -> Tuple[Tuple[Tuple[str, ...], ...], np.ndarray]:
+    """
+    Recomendações possíveis (tuplas) para as features `nomes` e o código
+    (índice na tabela) de cada feature como fator principal de um atraso.
+    Cacheada: todos os blocos compartilham a mesma tabela.
+    """
+    tabela = list(TABELA_RECOMENDACOES)
+    por_acao: Dict[str, int] = {}
+    codigo = np.ones(len(nomes), dtype=np.int16)
+    for i, nome in enumerate(nomes):
+        acao = RECOMENDACOES_POR_FATOR.get(nome)
+        if acao is None:
+            continue
+        if acao not in por_acao:
+            por_acao[acao] = len(tabela)
+            tabela.append((acao,) + TABELA_RECOMENDACOES[1])
+        codigo[i] = por_acao[acao]
+    return tuple(tabela), codigo
+
+
+def codigos_recomendacao(previsao: np.ndarray, atribuicoes) -> Tuple[np.ndarray, Tuple[Tuple[str, ...], ...]]:
+    """Código da recomendação de cada voo e a tabela de listas correspondente."""
+    if atribuicoes is None:
+        return previsao.astype(np.int16), TABELA_RECOMENDACOES
+    tabela, por_feature = tabela_recomendacoes(tuple(atribuicoes.nomes))
+    principal = atribuicoes.fator_principal()
+    atrasado = np.where(principal >= 0, por_feature[np.maximum(principal, 0)], 1)
+    return np.where(previsao == 1, atrasado, 0).astype(np.int16), tabela
+
+
+class SaidaPrescritiva(Sequence):
+    """
+    Saída prescritiva em colunas.
+
+    - previsao: código em PREVISOES (int8)
+    - probabilidade_atraso: probabilidade arredondada em 3 casas (float64)
+    - confianca: código em CONFIANCAS (int8)
+    - principais_fatores: lista global compartilhada entre os voos, usada
+      quando não há `atribuicoes` (top-k por voo, src/attributions.py)
+    - recomendacoes: código em `tabela_recomendacoes` (int16), uma tupla
+      de tuplas compartilhada entre blocos; os dicts recebem listas novas a
+      cada iteração, então alterá-los não afeta outras saídas
+    - inicio: indice_voo da primeira linha (blocos de um fluxo maior)
+
+    Também é uma sequência de dicts no formato de `gerar_output_prescritivo`,
+    montados sob demanda (`saida[i]`, iteração, `to_list()`).
+    """
+
+    def __init__(self, previsao: np.ndarray, probabilidade_atraso: np.ndarray,
+                 confianca: np.ndarray, principais_fatores: Optional[List[str]], inicio: int = 0,
+                 atribuicoes=None, recomendacoes: Optional[np.ndarray] = None,
+                 tabela_recomendacoes: Optional[Tuple[Tuple[str, ...], ...]] = None):
+        self.previsao = previsao
+        self.probabilidade_atraso = probabilidade_atraso
+        self.confianca = confianca
+        self.principais_fatores = principais_fatores
+        self.inicio = inicio
+        self.atribuicoes = atribuicoes
+        if recomendacoes is None:
+            recomendacoes, tabela_recomendacoes = codigos_recomendacao(previsao, atribuicoes)
+        self.recomendacoes = recomendacoes
+        self.tabela_recomendacoes = tabela_recomendacoes
+
+    def __len__(self) -> int:
+        return len(self.previsao)
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(i, slice):
+            inicio, fim, passo = i.indices(len(self))
+            if passo != 1:
+                return [self[j] for j in range(inicio, fim, passo)]
+            return list(self.fatia(inicio, fim))
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("índice fora da saída prescritiva")
+        return next(iter(self.fatia(i, i + 1)))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        # Uma lista por entrada da tabela, compartilhada só entre os voos desta iteração
+        tabela = self.listas_recomendacoes()
+        for i, pred, prob, conf, fatores, rec in zip(
+                self.indices().tolist(), self.previsao.tolist(), self.probabilidade_atraso.tolist(),
+                self.confianca.tolist(), self.fatores_por_voo(), self.recomendacoes.tolist()):
+            yield {
+                "indice_voo": i,
+                "previsao": PREVISOES[pred],
+                "probabilidade_atraso": prob,
+                "confianca": CONFIANCAS[conf],
+                "principais_fatores": fatores,
+                "recomendacoes": tabela[rec]
+            }
+
+    def fatia(self, inicio: int, fim: int) -> "SaidaPrescritiva":
+        """Linhas [inicio, fim) como um novo bloco (views dos arrays)."""
+        return SaidaPrescritiva(
+            self.previsao[inicio:fim], self.probabilidade_atraso[inicio:fim], self.confianca[inicio:fim],
+            self.principais_fatores, self.inicio + inicio,
+            None if self.atribuicoes is None else self.atribuicoes.fatia(inicio, fim),
+            self.recomendacoes[inicio:fim], self.tabela_recomendacoes)
+
+    def listas_recomendacoes(self) -> List[List[str]]:
+        """Cópia da tabela de recomendações como listas (formato JSON)."""
+        return [list(r) for r in self.tabela_recomendacoes]
+
+    def indices(self) -> np.ndarray:
+        """indice_voo de cada linha."""
+        return np.arange(self.inicio, self.inicio + len(self), dtype=np.int64)
+
+    def fatores_por_voo(self) -> List[List[str]]:
+        """principais_fatores de cada linha (a lista global repetida, sem cópias)."""
+        if self.atribuicoes is None:
+            return [self.principais_fatores] * len(self)
+        return self.atribuicoes.formatar()
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Lista de dicts (formato JSON original)."""
+        return list(self)
+
+    def to_pandas(self):
+        """
+        DataFrame com previsao/confianca categóricas e recomendacoes como
+        referências a uma lista por entrada da tabela. Sem atribuições, os fatores
+        (iguais para todos os voos) ficam em `df.attrs`.
+        """
+        import pandas as pd
+
+        tabela = np.empty(len(self.tabela_recomendacoes), dtype=object)
+        tabela[:] = self.listas_recomendacoes()
+        colunas = {
+            "indice_voo": self.indices(),
+            "previsao": pd.Categorical.from_codes(self.previsao, PREVISOES),
+            "probabilidade_atraso": self.probabilidade_atraso,
+            "confianca": pd.Categorical.from_codes(self.confianca, CONFIANCAS, ordered=True),
+        }
+        if self.atribuicoes is not None:
+            colunas["principais_fatores"] = self.fatores_por_voo()
+        colunas["recomendacoes"] = tabela[self.recomendacoes]
+        df = pd.DataFrame(colunas)
+        if self.atribuicoes is None:
+            df.attrs["principais_fatores"] = self.principais_fatores
+        return df
+
+    def to_arrow(self):
+        """
+        Tabela Arrow no schema da saída (SCHEMA_ARROW): previsao/confianca
+        como dictionary, fatores e recomendações como list<string> montadas
+        a partir de offsets (sem uma lista Python por linha).
+        """
+        import pyarrow as pa
+
+        if self.atribuicoes is None:
+            fatores = _listas_por_codigo([self.principais_fatores], np.zeros(len(self), dtype=np.int8))
+        else:
+            fatores = pa.array(self.fatores_por_voo(), type=pa.list_(pa.string()))
+        return pa.table([
+            pa.array(self.indices()),
+            pa.DictionaryArray.from_arrays(self.previsao, list(PREVISOES)),
+            pa.array(self.probabilidade_atraso),
+            pa.DictionaryArray.from_arrays(self.confianca, list(CONFIANCAS)),
+            fatores,
+            _listas_por_codigo(self.tabela_recomendacoes, self.recomendacoes),
+        ], schema=schema_arrow())
+
+
+def schema_arrow():
+    """Schema Arrow/Parquet da saída prescritiva (mesmos campos do JSON)."""
+    import pyarrow as pa
+
+    return pa.schema([
+        ("indice_voo", pa.int64()),
+        ("previsao", pa.dictionary(pa.int8(), pa.string())),
+        ("probabilidade_atraso", pa.float64()),
+        ("confianca", pa.dictionary(pa.int8(), pa.string())),
+        ("principais_fatores", pa.list_(pa.string())),
+        ("recomendacoes", pa.list_(pa.string())),
+    ])
+
+
+def _listas_por_codigo(listas: Sequence[Sequence[str]], codigos: np.ndarray):
+    """list<string> em que a linha i é listas[codigos[i]], sem montar listas Python."""
+    import pyarrow as pa
+
+    tamanhos = np.array([len(v) for v in listas], dtype=np.int32)
+    primeiros = np.concatenate([[0], np.cumsum(tamanhos)[:-1]]).astype(np.int32)
+    comprimentos = tamanhos[codigos]
+    offsets = np.zeros(len(codigos) + 1, dtype=np.int32)
+    np.cumsum(comprimentos, out=offsets[1:])
+    # Posição de cada valor em `todos`: início da lista da linha + posição na lista
+    posicao = np.arange(offsets[-1], dtype=np.int32) - np.repeat(offsets[:-1], comprimentos)
+    indices = np.repeat(primeiros[codigos], comprimentos) + posicao
+    todos = pa.array([v for lista in listas for v in lista], type=pa.string())
+    return pa.ListArray.from_arrays(pa.array(offsets), todos.take(pa.array(indices)))
+
+
+def gerar_saida_prescritiva(
     y_pred: np.ndarray,
     y_proba: np.ndarray,
     feature_importance_dict: Dict[str, float],
+    top_n: int = 3,
+    inicio: int = 0,
+    atribuicoes=None
+) -> SaidaPrescritiva:
+    """
+    Versão colunar de `gerar_output_prescritivo`, sem laço por voo.
+
+    Args:
+        atribuicoes: `Atribuicoes` por voo (AtribuidorFloresta.top_k); sem
+            elas, principais_fatores é o top-N global de feature_importance_dict
+
+    Raises:
+        IndexError: y_pred, y_proba (e atribuicoes) com tamanhos diferentes
+    """
+    fatores = principais_fatores_globais(feature_importance_dict, top_n) if atribuicoes is None else None
+    return _saida(y_pred, y_proba, fatores, inicio, atribuicoes)
+
+
+def _saida(y_pred, y_proba, principais_fatores: Optional[List[str]], inicio: int,
+           atribuicoes=None) -> SaidaPrescritiva:
+    y_pred = np.asarray(y_pred)
+    y_proba = np.asarray(y_proba, dtype=np.float64)
+    if len(y_pred) != len(y_proba):
+        raise IndexError(f"y_pred ({len(y_pred)}) e y_proba ({len(y_proba)}) com tamanhos diferentes")
+    if atribuicoes is not None and len(atribuicoes) != len(y_pred):
+        raise IndexError(f"atribuicoes ({len(atribuicoes)}) e y_pred ({len(y_pred)}) com tamanhos diferentes")
+
+    return SaidaPrescritiva(
+        previsao=(y_pred == 1).astype(np.int8),
+        probabilidade_atraso=np.round(y_proba, 3),
+        confianca=classificar_confianca(y_pred, y_proba),
+        principais_fatores=principais_fatores,
+        inicio=inicio,
+        atribuicoes=atribuicoes,
+    )
+
+
+def iterar_saida_prescritiva(
+    lotes: Iterable[Tuple],
+    feature_importance_dict: Dict[str, float],
     top_n: int = 3
+) -> Iterator[SaidaPrescritiva]:
+    """
+    Saída colunar bloco a bloco para lotes (y_pred, y_proba) vindos, por
+    exemplo, de uma inferência em chunks, ou (y_pred, y_proba, atribuicoes)
+    de `lotes_explicados`. indice_voo continua de um bloco para o outro; só
+    um bloco fica em memória por vez.
+    """
+    fatores = principais_fatores_globais(feature_importance_dict, top_n)
+    inicio = 0
+    for lote in lotes:
+        y_pred, y_proba, atribuicoes = (tuple(lote) + (None,))[:3]
+        bloco = _saida(y_pred, y_proba, fatores if atribuicoes is None else None, inicio, atribuicoes)
+        inicio += len(bloco)
+        yield bloco
+
+
+def dividir_em_lotes(y_pred: np.ndarray, y_proba: np.ndarray,
+                     tamanho_bloco: int = 65536) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Fatias (views, sem cópia) de tamanho_bloco predições."""
+    if len(y_pred) != len(y_proba):
+        raise IndexError(f"y_pred ({len(y_pred)}) e y_proba ({len(y_proba)}) com tamanhos diferentes")
+    for inicio in range(0, len(y_pred), tamanho_bloco):
+        yield y_pred[inicio:inicio + tamanho_bloco], y_proba[inicio:inicio + tamanho_bloco]
+
+
+def lotes_explicados(atribuidor, X: np.ndarray, y_pred: np.ndarray, y_proba: np.ndarray,
+                     top_k: int = 3, tamanho_bloco: int = 65536,
+                     batch_size: int = 2048) -> Iterator[Tuple[np.ndarray, np.ndarray, Any]]:
+    """
+    Lotes (y_pred, y_proba, atribuicoes) para `iterar_saida_prescritiva`:
+    as atribuições de cada bloco são calculadas só quando ele é consumido.
+
+    Args:
+        atribuidor: AtribuidorFloresta do modelo que gerou y_proba
+        X: Features na ordem de treino
+        top_k: Fatores por voo (limita memória e formatação)
+        batch_size: Linhas por travessia das árvores (limita memória temporária)
+    """
+    for inicio, (pred, proba) in zip(range(0, len(y_pred), tamanho_bloco),
+                                     dividir_em_lotes(y_pred, y_proba, tamanho_bloco)):
+        yield pred, proba, atribuidor.top_k(X[inicio:inicio + len(pred)], top_k, batch_size)
+
+
+def gerar_output_prescritivo_stream(
+    y_pred: np.ndarray,
+    y_proba: np.ndarray,
+    feature_importance_dict: Dict[str, float],
+    top_n: int = 3,
+    tamanho_bloco: int = 65536
+) -> Iterator[Dict]:
+    """
+    Gerador com os mesmos dicts de `gerar_output_prescritivo`, montados um
+    a um: a memória não cresce com o número de voos.
+    """
+    blocos = iterar_saida_prescritiva(dividir_em_lotes(y_pred, y_proba, tamanho_bloco),
+                                      feature_importance_dict, top_n)
+    for bloco in blocos:
+        yield from bloco
+
+
+def gerar_output_prescritivo(
+    y_pred: np.ndarray,
+    y_proba: np.ndarray,
+    feature_importance_dict: Dict[str, float],
+    top_n: int = 3,
+    atribuicoes=None
 ) -> List[Dict]:
     """
     Gera output JSON no formato prescritivo.
@@ -25,78 +394,20 @@ def gerar_output_prescritivo(
         "recomendacoes": ["ação1", "ação2", ...]
     }
 
+    As listas de fatores e recomendações são compartilhadas entre os voos.
+    Para milhões de voos prefira `gerar_saida_prescritiva` (colunar).
+
     Args:
         y_pred: Array com predições (0=Pontual, 1=Atrasado)
         y_proba: Array com probabilidades [0.0 - 1.0]
         feature_importance_dict: {feature_name: importance}
         top_n: Número de features mais importantes para mostrar
+        atribuicoes: Top-k por voo (AtribuidorFloresta.top_k); os fatores
+            viram "feature: +x.x p.p. no risco de atraso" e o fator principal
+            de cada atraso acrescenta uma ação às recomendações
 
     Returns:
         List[Dict]: Lista de predições prescritivas
     """
-    outputs = []
-
-    # Top features globais (ordenadas por importância)
-    top_features = sorted(
-        feature_importance_dict.items(),
-        key=lambda x: x[1],
-        # Corrigido para x[1] para obter o valor da importância
-        reverse=True
-    )[:top_n]
-
-    for i in range(len(y_pred)):
-        pred = y_pred[i]
-        prob = y_proba[i]
-
-        # Determinar rótulo e confiança
-        if pred == 1:
-            previsao = "Atrasado"
-            confianca_value = prob
-        else:
-            previsao = "Pontual"
-            confianca_value = 1 - prob
-
-        # Classificar confiança
-        if confianca_value >= 0.75:
-            confianca = "Muito Alta"
-        elif confianca_value >= 0.60:
-            confianca = "Alta"
-        elif confianca_value >= 0.50:
-            confianca = "Moderada"
-        else:
-            confianca = "Baixa"
-
-        # Principais fatores
-        principais_fatores = [
-            f"{feat}: {imp * 100:.1f}% de importância"
-            for feat, imp in top_features
-        ]
-
-        # Recomendações baseadas em predição
-        if pred == 1:  # Atrasado
-            recomendacoes = [
-                "⚠️ Reclassificar voo como potencialmente atrasado",
-                "📢 Notificar passageiros com conexões (>2h)",
-                "🎯 Antecipar boarding em 10-15 minutos",
-                "🚪 Reservar gate alternativo",
-                "🔧 Realizar pré-voo com margem de tempo"
-            ]
-        else:  # Pontual
-            recomendacoes = [
-                "✅ Manter agendamento normal",
-                "🟢 Prioridade operacional normal",
-                "⏰ Estimativa: Decolagem no horário"
-            ]
-
-        output_json = {
-            "indice_voo": i,
-            "previsao": previsao,
-            "probabilidade_atraso": float(round(prob, 3)),
-            "confianca": confianca,
-            "principais_fatores": principais_fatores,
-            "recomendacoes": recomendacoes
-        }
-
-        outputs.append(output_json)
-
-    return outputs
+    return gerar_saida_prescritiva(y_pred, y_proba, feature_importance_dict, top_n,
+                                   atribuicoes=atribuicoes).to_list()
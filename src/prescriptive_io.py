@@ -0,0 +1,232 @@
+"""
+Gravação em Fluxo da Saída Prescritiva
+Grava blocos de `SaidaPrescritiva` em NDJSON (um voo por linha) ou Parquet
+(row groups de tamanho fixo) à medida que chegam: a memória depende do
+tamanho do bloco, não do número de voos. Cada registro tem os mesmos campos
+de `gerar_output_prescritivo`.
+
+O arquivo é gravado com `escrita_atomica` (temporário no mesmo diretório)
+e só aparece no destino quando o sink é fechado sem erro.
+"""
+import abc
+import itertools
+import json
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Union
+
+from src.atomic_io import escrita_atomica
+from src.prescriptive_engine import CONFIANCAS, PREVISOES, SaidaPrescritiva, schema_arrow
+
+LINHAS_POR_GRUPO = 131072
+
+
+class _SinkAtomico(abc.ABC):
+    """
+    Mantém um bloco `escrita_atomica` aberto durante a vida do sink:
+    `fechar()` sai dele sem erro (o temporário vira o destino) e
+    `descartar()` sai com erro (o temporário é apagado). Subclasses gravam
+    em `self._arquivo` e implementam `escrever`, `_concluir` (grava o que
+    estiver pendente) e `_abortar`.
+    """
+
+    def __init__(self, path: Union[str, Path], modo: str = 'w', encoding: Optional[str] = None):
+        self.path = Path(path)
+        self.linhas = 0
+        self._escrita = ExitStack()
+        self._arquivo = self._escrita.enter_context(escrita_atomica(self.path, modo, encoding))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        if tipo is None:
+            self.fechar()
+        else:
+            self.descartar(valor)
+
+    def escrever_todos(self, blocos: Iterable[SaidaPrescritiva]) -> int:
+        for bloco in blocos:
+            self.escrever(bloco)
+        return self.linhas
+
+    @abc.abstractmethod
+    def escrever(self, bloco: SaidaPrescritiva) -> None:
+        """Acrescenta um bloco ao arquivo temporário."""
+
+    @abc.abstractmethod
+    def _concluir(self) -> None:
+        """Grava o que estiver pendente no temporário."""
+
+    @abc.abstractmethod
+    def _abortar(self) -> None:
+        """Libera o que a subclasse abriu sobre o temporário."""
+
+    def _sair(self, erro: Optional[BaseException]) -> None:
+        """Encerra o bloco `escrita_atomica`, propagando `erro` (se houver) para ele."""
+        if erro is None:
+            self._escrita.close()
+        else:
+            self._escrita.__exit__(type(erro), erro, erro.__traceback__)
+
+    def fechar(self) -> None:
+        try:
+            self._concluir()
+        except BaseException as erro:
+            self._sair(erro)
+            raise
+        self._sair(None)
+        print(f"✅ Saída prescritiva gravada: {self.path} ({self.linhas:,} voos)")
+
+    def descartar(self, erro: Optional[BaseException] = None) -> None:
+        try:
+            self._abortar()
+        finally:
+            self._sair(erro or RuntimeError("saída descartada"))
+
+
+class NDJSONSink(_SinkAtomico):
+    """
+    Um objeto JSON por linha (UTF-8), igual a
+    `json.dumps(registro, ensure_ascii=False)`.
+
+    Recomendações (e fatores globais) vêm de poucas listas compartilhadas:
+    cada uma é serializada uma vez por bloco; por linha só são formatados
+    indice_voo, probabilidade e, com atribuições, os fatores do voo.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        super().__init__(path, 'w', encoding='utf-8')
+
+    def escrever(self, bloco: SaidaPrescritiva) -> None:
+        self._arquivo.writelines(self._linhas(bloco))
+        self.linhas += len(bloco)
+
+    def _linhas(self, bloco: SaidaPrescritiva) -> Iterator[str]:
+        recomendacoes = [json.dumps(r, ensure_ascii=False) for r in bloco.tabela_recomendacoes]
+        previsoes = [f', "previsao": "{p}", "probabilidade_atraso": ' for p in PREVISOES]
+        confiancas = [f', "confianca": "{c}", "principais_fatores": ' for c in CONFIANCAS]
+        if bloco.atribuicoes is None:
+            fatores = itertools.repeat(json.dumps(bloco.principais_fatores, ensure_ascii=False))
+        else:
+            fatores = (json.dumps(f, ensure_ascii=False) for f in bloco.fatores_por_voo())
+
+        for i, pred, prob, conf, fat, rec in zip(
+                bloco.indices().tolist(), bloco.previsao.tolist(), bloco.probabilidade_atraso.tolist(),
+                bloco.confianca.tolist(), fatores, bloco.recomendacoes.tolist()):
+            # repr(float) é o que o json usa; NaN/Infinity só pelo encoder
+            prob = repr(prob) if prob - prob == 0 else json.dumps(prob)
+            yield (f'{{"indice_voo": {i}{previsoes[pred]}{prob}{confiancas[conf]}{fat}, '
+                   f'"recomendacoes": {recomendacoes[rec]}}}\n')
+
+    def _concluir(self) -> None:
+        # Linhas vão direto para o arquivo; flush/fsync ficam com escrita_atomica
+        pass
+
+    def _abortar(self) -> None:
+        pass
+
+
+class ParquetSink(_SinkAtomico):
+    """
+    Parquet com row groups de exatamente `linhas_por_grupo` voos (o último
+    pode ser menor). Blocos menores são acumulados até completar um grupo.
+
+    Schema de `schema_arrow()`: indice_voo (int64), previsao e confianca
+    (dictionary), probabilidade_atraso (float64), principais_fatores e
+    recomendacoes (list<string>, dictionary-encoded no arquivo).
+    """
+
+    def __init__(self, path: Union[str, Path], linhas_por_grupo: int = LINHAS_POR_GRUPO,
+                 compression: str = 'zstd'):
+        import pyarrow.parquet as pq
+
+        if linhas_por_grupo <= 0:
+            raise ValueError("❌ linhas_por_grupo deve ser positivo")
+        super().__init__(path, 'wb')
+        self.linhas_por_grupo = linhas_por_grupo
+        self.schema = schema_arrow()
+        try:
+            self._writer = pq.ParquetWriter(self._arquivo, self.schema, compression=compression)
+        except BaseException as erro:
+            self._sair(erro)
+            raise
+        self._pendentes: List[SaidaPrescritiva] = []
+        self._n_pendentes = 0
+
+    def escrever(self, bloco: SaidaPrescritiva) -> None:
+        self._pendentes.append(bloco)
+        self._n_pendentes += len(bloco)
+        while self._n_pendentes >= self.linhas_por_grupo:
+            self._gravar_grupo(self.linhas_por_grupo)
+
+    def _gravar_grupo(self, n: int) -> None:
+        """Grava as n primeiras linhas pendentes como um row group."""
+        import pyarrow as pa
+
+        partes, restante = [], n
+        while restante:
+            bloco = self._pendentes[0]
+            if len(bloco) <= restante:
+                partes.append(self._pendentes.pop(0))
+                restante -= len(bloco)
+            else:
+                partes.append(bloco.fatia(0, restante))
+                self._pendentes[0] = bloco.fatia(restante, len(bloco))
+                restante = 0
+        self._n_pendentes -= n
+        tabela = pa.concat_tables([p.to_arrow() for p in partes]).unify_dictionaries()
+        self._writer.write_table(tabela.combine_chunks(), row_group_size=n)
+        self.linhas += n
+
+    def _concluir(self) -> None:
+        if self._n_pendentes:
+            self._gravar_grupo(self._n_pendentes)
+        self._writer.close()
+
+    def _abortar(self) -> None:
+        self._writer.close()
+
+
+def abrir_sink(path: Union[str, Path], formato: Optional[str] = None, **opcoes) -> _SinkAtomico:
+    """
+    Sink pelo formato ('ndjson' ou 'parquet'); sem formato, pela extensão
+    (.parquet → Parquet, qualquer outra → NDJSON).
+    """
+    formato = formato or ('parquet' if str(path).endswith('.parquet') else 'ndjson')
+    if formato == 'parquet':
+        return ParquetSink(path, **opcoes)
+    if formato == 'ndjson':
+        return NDJSONSink(path, **opcoes)
+    raise ValueError(f"❌ Formato de saída desconhecido: {formato!r} (use 'ndjson' ou 'parquet')")
+
+
+def gravar_saida_prescritiva(blocos: Iterable[SaidaPrescritiva], path: Union[str, Path],
+                             formato: Optional[str] = None, **opcoes) -> int:
+    """
+    Grava blocos (ex.: de `iterar_saida_prescritiva`) em NDJSON ou Parquet.
+
+    Returns:
+        int: Voos gravados
+    """
+    with abrir_sink(path, formato, **opcoes) as sink:
+        sink.escrever_todos(blocos)
+    return sink.linhas
+
+
+def gravar_tabela_parquet(tabela, path: Union[str, Path], compression: str = 'zstd') -> None:
+    """
+    Grava uma tabela Arrow inteira em Parquet de forma atômica (temporário no
+    mesmo diretório + os.replace): o destino só existe se estiver completo.
+    """
+    import pyarrow.parquet as pq
+
+    with escrita_atomica(path, 'wb') as f:
+        pq.write_table(tabela, f, compression=compression)
+
+
+def ler_ndjson(path: Union[str, Path]) -> Iterator[dict]:
+    """Registros de um NDJSON gravado por `NDJSONSink`, um por vez."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for linha in f:
+            yield json.loads(linha)
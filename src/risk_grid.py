@@ -0,0 +1,243 @@
+"""
+Grade de Risco Pré-calculada
+Probabilidade de atraso para todas as combinações (rota, mês, dia da semana,
+hora) de uma malha de rotas fixa, calculada offline em lote e consultada em
+O(1) pela API.
+"""
+import csv
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.atomic_io import gravar_json_atomico, gravar_npy_atomico
+from src.feature_encoder import get_time_of_day
+
+FORMAT_NAME = "flightontime-risk-grid"
+FORMAT_VERSION = 1
+HEADER_FILE = "header.json"
+PROBAS_FILE = "probas.npy"
+
+MESES = 12
+DIAS_SEMANA = 7
+HORAS = 24
+CELULAS_POR_ROTA = MESES * DIAS_SEMANA * HORAS
+
+Rota = Tuple[str, str, str, float]
+
+
+def carregar_rotas(path: Union[str, Path]) -> List[Rota]:
+    """
+    Lê a malha de rotas de um CSV com colunas airline, origin, dest, distance
+    (uma linha por rota; a mesma distância enviada pelos clientes em /predict).
+    """
+    with open(path, newline='') as f:
+        leitor = csv.DictReader(f)
+        faltando = {'airline', 'origin', 'dest', 'distance'} - set(leitor.fieldnames or [])
+        if faltando:
+            raise ValueError(f"❌ Colunas ausentes no arquivo de rotas: {sorted(faltando)}")
+        return [(r['airline'].strip(), r['origin'].strip(), r['dest'].strip(), float(r['distance']))
+                for r in leitor]
+
+
+def assinatura_encoder(feature_encoder) -> str:
+    """
+    SHA-256 do estado que entra nas linhas da grade: ordem das features,
+    vocabulários categóricos e tabelas do `Vocabulario` (lookup tables com
+    defaults, por id).
+    """
+    voc = feature_encoder.vocabulario
+    estado = {
+        "features": feature_encoder.feature_names,
+        "vocabularios": feature_encoder.vocabularios,
+        "aeroportos": [voc.codigos_aeroportos, voc.aeroportos.tolist()],
+        "companhias": [voc.codigos_companhias, voc.companhias.tolist()],
+    }
+    return hashlib.sha256(json.dumps(estado, sort_keys=True).encode()).hexdigest()
+
+
+def _indices(feature_encoder) -> Dict[str, int]:
+    return {nome: i for i, nome in enumerate(feature_encoder.feature_names)}
+
+
+def _linhas_calendario(feature_encoder) -> np.ndarray:
+    """
+    Bloco (CELULAS_POR_ROTA, n_features) com as colunas de calendário
+    preenchidas na ordem (mês, dia da semana, hora).
+    """
+    idx = _indices(feature_encoder)
+    month, day_of_week, hour = (a.ravel() for a in np.meshgrid(
+        np.arange(1, MESES + 1), np.arange(1, DIAS_SEMANA + 1), np.arange(HORAS), indexing='ij'))
+    periodo = feature_encoder.vocabularios['time_of_day']
+
+    bloco = np.zeros((CELULAS_POR_ROTA, feature_encoder.n_features), dtype=np.float32)
+    bloco[:, idx['Month']] = month
+    bloco[:, idx['DayOfWeek']] = day_of_week
+    bloco[:, idx['dephour']] = hour
+    bloco[:, idx['is_weekend']] = day_of_week >= 6
+    bloco[:, idx['quarter']] = (month - 1) // 3 + 1
+    bloco[:, idx['time_of_day']] = [periodo.get(get_time_of_day(h), -1) for h in hour.tolist()]
+    return bloco
+
+
+def montar_linhas(rotas: Sequence[Rota], feature_encoder,
+                  calendario: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Linhas de features de todas as células das rotas, idênticas às que
+    `FeatureEncoder.encode` gera para cada voo da grade.
+
+    Returns:
+        np.ndarray: (len(rotas) * len(calendario), n_features) float32
+    """
+    if calendario is None:
+        calendario = _linhas_calendario(feature_encoder)
+    idx = _indices(feature_encoder)
+    vocab = feature_encoder.vocabularios
+
+    por_rota = np.empty((len(rotas), 7), dtype=np.float64)
+    for i, (airline, origin, dest, distance) in enumerate(rotas):
+        origin_rate, carrier_rate, traffic = feature_encoder.lookup(origin, airline)
+        por_rota[i] = (distance, origin_rate, carrier_rate, traffic,
+                       vocab['Airline'].get(airline, -1), vocab['Origin'].get(origin, -1),
+                       vocab['Dest'].get(dest, -1))
+
+    X = np.tile(calendario, (len(rotas), 1))
+    colunas = ['Distance', 'origin_delay_rate', 'carrier_delay_rate', 'origin_traffic',
+               'Airline', 'Origin', 'Dest']
+    for j, col in enumerate(colunas):
+        X[:, idx[col]] = np.repeat(por_rota[:, j], len(calendario))
+    return X
+
+
+class RiskGrid:
+    """
+    Probabilidades de atraso indexadas por rota × mês × dia da semana × hora.
+
+    - rotas: lista de (airline, origin, dest, distance); a distância faz parte
+      da chave porque é a única feature contínua do modelo
+    - probas: (n_rotas, 12, 7, 24) float64, na mesma precisão da inferência ao
+      vivo (a resposta e o threshold veem exatamente o mesmo valor)
+
+    Args:
+        rotas: Rotas da malha, na ordem do primeiro eixo de `probas`
+        probas: Array de probabilidades (pode ser um memmap)
+        assinatura: `assinatura_encoder` do codificador usado na geração
+    """
+
+    def __init__(self, rotas: Sequence[Rota], probas: np.ndarray, assinatura: str):
+        if probas.shape != (len(rotas), MESES, DIAS_SEMANA, HORAS):
+            raise ValueError(f"❌ Grade com formato inválido: {probas.shape}")
+        self.rotas: List[Rota] = [(a, o, d, float(dist)) for a, o, d, dist in rotas]
+        self.probas = probas
+        self.assinatura = assinatura
+
+        self._indice: Dict[Tuple[str, str, str], Tuple[int, np.float32]] = {}
+        for i, (airline, origin, dest, distance) in enumerate(self.rotas):
+            chave = (airline, origin, dest)
+            if chave in self._indice:
+                raise ValueError(f"❌ Rota duplicada na grade: {chave}")
+            self._indice[chave] = (i, np.float32(distance))
+
+    def __len__(self) -> int:
+        return len(self.rotas)
+
+    @property
+    def nbytes(self) -> int:
+        return self.probas.nbytes
+
+    @classmethod
+    def build(cls, rotas: Sequence[Rota], feature_encoder, model,
+              rotas_por_bloco: int = 256) -> "RiskGrid":
+        """
+        Pontua todas as células das rotas em blocos de `rotas_por_bloco`
+        rotas (uma chamada a predict_proba por bloco).
+        """
+        calendario = _linhas_calendario(feature_encoder)
+        probas = np.empty((len(rotas), MESES, DIAS_SEMANA, HORAS), dtype=np.float64)
+        for inicio in range(0, len(rotas), rotas_por_bloco):
+            bloco = rotas[inicio:inicio + rotas_por_bloco]
+            X = montar_linhas(bloco, feature_encoder, calendario)
+            probas[inicio:inicio + len(bloco)] = \
+                model.predict_proba(X)[:, 1].reshape(len(bloco), MESES, DIAS_SEMANA, HORAS)
+        return cls(rotas, probas, assinatura_encoder(feature_encoder))
+
+    def lookup(self, airline: str, origin: str, dest: str, distance: float,
+               month: int, day_of_week: int, hour: int) -> Optional[float]:
+        """Probabilidade da célula ou None se o voo está fora da grade."""
+        rota = self._indice.get((airline, origin, dest))
+        if rota is None:
+            return None
+        i, dist = rota
+        if np.float32(distance) != dist:
+            return None
+        if not (1 <= month <= MESES and 1 <= day_of_week <= DIAS_SEMANA and 0 <= hour < HORAS):
+            return None
+        return float(self.probas[i, month - 1, day_of_week - 1, hour])
+
+    def verificar(self, feature_encoder, model, amostras: int = 64, seed: int = 0,
+                  atol: float = 1e-9) -> None:
+        """
+        Garante que a grade foi gerada com os mesmos artefatos carregados:
+        compara a assinatura do codificador e repontua `amostras` células
+        sorteadas com o modelo atual.
+
+        Raises:
+            ValueError: Grade gerada com outro modelo, lookup ou vocabulário
+        """
+        if self.assinatura != assinatura_encoder(feature_encoder):
+            raise ValueError("❌ Grade de risco gerada com outros encoders/lookup tables")
+        if not self.rotas:
+            return
+
+        rng = np.random.default_rng(seed)
+        celulas = rng.integers(0, len(self.rotas) * CELULAS_POR_ROTA, amostras)
+        rota, celula = np.divmod(celulas, CELULAS_POR_ROTA)
+        calendario = _linhas_calendario(feature_encoder)
+        X = np.vstack([montar_linhas([self.rotas[r]], feature_encoder, calendario[c:c + 1])
+                       for r, c in zip(rota.tolist(), celula.tolist())])
+
+        esperado = self.probas.reshape(len(self.rotas), -1)[rota, celula]
+        if not np.allclose(model.predict_proba(X)[:, 1], esperado, rtol=0, atol=atol):
+            raise ValueError("❌ Grade de risco não corresponde ao modelo carregado")
+
+    def save(self, directory: Union[str, Path]) -> Path:
+        """
+        Salva `probas.npy` (mapeável em memória) e `header.json` (por último).
+        Cada arquivo é trocado por inteiro (temporário + os.replace): regerar
+        a grade no diretório que a API mapeou não trunca o arquivo em uso.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        gravar_npy_atomico(directory / PROBAS_FILE, np.ascontiguousarray(self.probas))
+
+        header = {
+            "format": FORMAT_NAME,
+            "format_version": FORMAT_VERSION,
+            "shape": list(self.probas.shape),
+            "encoder_fingerprint": self.assinatura,
+            "routes": [list(r) for r in self.rotas],
+        }
+        gravar_json_atomico(directory / HEADER_FILE, header, indent=None)
+        return directory
+
+    @classmethod
+    def load(cls, directory: Union[str, Path], mmap: bool = True) -> "RiskGrid":
+        """Abre uma grade salva com `save` (memmap somente leitura por default)."""
+        directory = Path(directory)
+        with open(directory / HEADER_FILE, 'r') as f:
+            header = json.load(f)
+
+        if header.get("format") != FORMAT_NAME or header.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"❌ Formato de grade de risco não suportado: {directory}")
+
+        probas = np.load(directory / PROBAS_FILE, mmap_mode='r' if mmap else None)
+        if list(probas.shape) != header["shape"] or probas.dtype != np.float64:
+            raise ValueError(f"❌ probas.npy não confere com o header em {directory}")
+        return cls([tuple(r) for r in header["routes"]], probas, header["encoder_fingerprint"])
+
+    @staticmethod
+    def is_artifact(path: Union[str, Path]) -> bool:
+        """True se `path` é um diretório salvo por `RiskGrid.save`."""
+        return (Path(path) / HEADER_FILE).is_file() and (Path(path) / PROBAS_FILE).is_file()
@@ -0,0 +1,176 @@
+"""
+Pipeline de Features em Streaming
+Lê o Parquet consolidado em blocos (pyarrow), aplica as features temporais e
+históricas carregando o estado por aeroporto/companhia entre blocos e grava o
+Parquet de saída incrementalmente. O pico de memória depende do tamanho do
+bloco, não do dataset.
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.preprocessing import _CATEGORIAS_PERIODO, _CODIGO_PERIODO_POR_HORA, criar_features_temporais
+
+
+class _TaxaAcumulada:
+    """
+    Soma e contagem do target por grupo vistas nos blocos anteriores:
+    continua o shift(1) + expanding().mean() de criar_features_historicas.
+    """
+
+    def __init__(self):
+        self.soma = pd.Series(dtype='float64')
+        self.n = pd.Series(dtype='float64')
+
+    def aplicar(self, chave: pd.Series, valores: np.ndarray, presente: np.ndarray) -> np.ndarray:
+        codigos, unicos = pd.factorize(chave)
+        valido = codigos >= 0
+
+        # Estado anterior de cada grupo do bloco (0 para grupos novos)
+        soma_base = self.soma.reindex(unicos, fill_value=0.0).to_numpy()
+        n_base = self.n.reindex(unicos, fill_value=0.0).to_numpy()
+
+        # Grupo -1 (chave nula) é calculado mas descartado abaixo
+        acumulado = pd.DataFrame({'soma': valores, 'n': presente.astype('float64')}).groupby(
+            codigos, sort=False).cumsum()
+
+        soma = np.full(len(chave), np.nan)
+        n = np.full(len(chave), np.nan)
+        soma[valido] = soma_base[codigos[valido]] + acumulado['soma'].to_numpy()[valido] - valores[valido]
+        n[valido] = n_base[codigos[valido]] + acumulado['n'].to_numpy()[valido] - presente[valido]
+
+        # Totais do bloco entram no estado
+        total_soma = np.bincount(codigos[valido], weights=valores[valido], minlength=len(unicos))
+        total_n = np.bincount(codigos[valido], weights=presente[valido], minlength=len(unicos))
+        self.soma = self.soma.add(pd.Series(total_soma, index=unicos), fill_value=0.0)
+        self.n = self.n.add(pd.Series(total_n, index=unicos), fill_value=0.0)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(n > 0, soma / n, np.nan)
+
+
+class _TrafegoAcumulado:
+    """Voos anteriores do aeroporto na última data vista (data cruzando blocos)."""
+
+    def __init__(self):
+        self.data = None
+        self.contagem: Dict = {}
+
+    def aplicar(self, df: pd.DataFrame) -> np.ndarray:
+        trafego = df.groupby(['Origin', 'FlightDate'], observed=True).cumcount().to_numpy()
+
+        continua = (df['FlightDate'] == self.data).to_numpy() if self.data is not None else None
+        if continua is not None and continua.any():
+            trafego[continua] += [self.contagem.get(o, 0) for o in df['Origin'][continua].tolist()]
+
+        ultima = df['FlightDate'].iloc[-1]
+        do_dia = df.loc[(df['FlightDate'] == ultima).to_numpy(), 'Origin'].value_counts(sort=False)
+        if ultima != self.data:
+            self.data, self.contagem = ultima, {}
+        for origem, n in do_dia.items():
+            self.contagem[origem] = self.contagem.get(origem, 0) + int(n)
+        return trafego
+
+
+def _primeira_passada(arquivo: pq.ParquetFile, delay_col: str, chunk_rows: int):
+    """
+    Lê apenas FlightDate, CRSDepTime e o target: valida a ordenação e calcula
+    a média global do target e os períodos do dia presentes no dataset.
+    """
+    soma, n, ultima = 0.0, 0, None
+    horas = np.zeros(24, dtype=bool)
+    dicionarios: Dict[str, List] = {
+        campo.name: [] for campo in arquivo.schema_arrow if pa.types.is_dictionary(campo.type)}
+
+    colunas = ['FlightDate', 'CRSDepTime', delay_col] + list(dicionarios)
+    for batch in arquivo.iter_batches(batch_size=chunk_rows, columns=list(dict.fromkeys(colunas))):
+        datas = batch.column('FlightDate').to_pandas()
+        if not datas.is_monotonic_increasing or (ultima is not None and datas.iloc[0] < ultima):
+            raise ValueError(
+                "❌ Parquet de entrada precisa estar ordenado por FlightDate para o streaming "
+                "(ordene uma vez ou use o caminho em memória)")
+        ultima = datas.iloc[-1]
+
+        target = batch.column(delay_col).to_pandas().to_numpy(dtype='float64', na_value=np.nan)
+        presente = ~np.isnan(target)
+        soma += target[presente].sum()
+        n += int(presente.sum())
+
+        dephour = (batch.column('CRSDepTime').to_pandas() // 100).clip(0, 23).astype('int8')
+        horas[dephour.to_numpy()] = True
+
+        for col, valores in dicionarios.items():
+            vistos = set(valores)
+            valores.extend(v for v in batch.column(col).dictionary.to_pylist() if v not in vistos)
+
+    usados = set(_CODIGO_PERIODO_POR_HORA[horas].tolist())
+    periodos = [c for i, c in enumerate(_CATEGORIAS_PERIODO) if i in usados]
+    return (soma / n if n else np.nan), periodos, dicionarios
+
+
+def processar_parquet(input_path: Union[str, Path], output_path: Union[str, Path],
+                      delay_col: str = 'ArrDelay15', chunk_rows: int = 1_000_000,
+                      row_group_size: Optional[int] = None) -> Dict:
+    """
+    Equivalente em streaming de
+    criar_features_historicas(criar_features_temporais(pd.read_parquet(input_path)))
+    gravado em `output_path`.
+
+    O arquivo de entrada precisa estar ordenado por FlightDate (o caminho em
+    memória preserva essa ordem). Duas passadas: a primeira lê três colunas
+    para validar a ordenação e calcular a média global usada no fillna; a
+    segunda processa bloco a bloco com o estado por grupo.
+
+    A média global é somada bloco a bloco: exata para targets inteiros (0/1).
+
+    Returns:
+        dict: linhas, blocos e média global
+    """
+    arquivo = pq.ParquetFile(input_path)
+    global_mean, periodos, dicionarios = _primeira_passada(arquivo, delay_col, chunk_rows)
+    print(f"📊 Média global de {delay_col}: {global_mean:.4f}")
+
+    origem = _TaxaAcumulada()
+    companhia = _TaxaAcumulada()
+    trafego = _TrafegoAcumulado()
+    writer = None
+    linhas = blocos = 0
+    try:
+        for batch in arquivo.iter_batches(batch_size=chunk_rows):
+            df = batch.to_pandas()
+            # Categorias iguais às da leitura do arquivo inteiro
+            for col, categorias in dicionarios.items():
+                df[col] = df[col].cat.set_categories(categorias)
+
+            criar_features_temporais(df, inplace=True)
+            df['time_of_day'] = df['time_of_day'].cat.set_categories(periodos)
+
+            valores = df[delay_col].to_numpy(dtype='float64', na_value=np.nan)
+            presente = ~np.isnan(valores)
+            valores = np.where(presente, valores, 0.0)
+            df['origin_delay_rate'] = origem.aplicar(df['Origin'], valores, presente)
+            df['carrier_delay_rate'] = companhia.aplicar(df['Airline'], valores, presente)
+            df['origin_traffic'] = trafego.aplicar(df).astype('int16')
+
+            df['origin_delay_rate'] = df['origin_delay_rate'].fillna(global_mean)
+            df['carrier_delay_rate'] = df['carrier_delay_rate'].fillna(global_mean)
+
+            tabela = pa.Table.from_pandas(
+                df, schema=writer.schema if writer else None, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, tabela.schema)
+            writer.write_table(tabela, row_group_size=row_group_size)
+
+            linhas += len(df)
+            blocos += 1
+            print(f"🔄 Bloco {blocos}: {linhas:,} linhas processadas")
+    finally:
+        if writer is not None:
+            writer.close()
+
+    print(f"✅ Features gravadas em {output_path} ({linhas:,} linhas, {blocos} blocos)")
+    return {"rows": linhas, "chunks": blocos, "global_mean": global_mean}
@@ -0,0 +1,275 @@
+"""
+Motor de Inferência Compilado para a Random Forest
+Exporta as árvores do sklearn para arrays NumPy planos e avalia lotes com
+travessia vetorizada (todas as árvores × todas as linhas por nível).
+"""
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from src.atomic_io import gravar_json_atomico, gravar_npy_atomico
+
+FORMAT_NAME = "flightontime-compiled-forest"
+FORMAT_VERSION = 1
+HEADER_FILE = "header.json"
+ARRAY_NAMES = ("feature", "threshold", "children", "missing_left", "value", "roots")
+
+
+@lru_cache(maxsize=None)
+def _sklearn_guarda_fracoes() -> bool:
+    """
+    sklearn >= 1.4 guarda em `tree_.value` as frações por classe. Consultado
+    só ao compilar: carregar um CompiledForest não importa o sklearn.
+    """
+    try:
+        import sklearn
+    except ImportError:
+        return True
+    major, minor = (int(p) for p in sklearn.__version__.split('.')[:2])
+    return (major, minor) >= (1, 4)
+
+
+class CompiledForest:
+    """
+    Floresta "achatada": os nós de todas as árvores ficam em arrays contíguos
+    indexados por um id global de nó.
+
+    Arrays (n_nodes = soma dos nós de todas as árvores):
+    - feature: índice da feature do split (0 nas folhas)
+    - threshold: limiar do split em float64 (como no sklearn)
+    - children: (n_nodes, 2) → [filho se x > thr, filho se x <= thr];
+      folhas apontam para si mesmas, então a travessia é estável
+    - missing_left: 1 se NaN segue para a esquerda no nó
+    - value: (n_nodes, n_classes) fração de cada classe, exatamente como
+      DecisionTreeClassifier.predict_proba a retorna
+    - roots: id global da raiz de cada árvore
+
+    `predict_proba` reproduz bit a bit o RandomForestClassifier do sklearn
+    (mesma soma sequencial por árvore, na ordem de `estimators_`, seguida da
+    divisão pelo número de árvores).
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 missing_left: np.ndarray, value: np.ndarray, roots: np.ndarray,
+                 max_depth: int, classes: np.ndarray,
+                 feature_names: Optional[np.ndarray] = None,
+                 n_features: Optional[int] = None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        if n_features is None:
+            n_features = len(feature_names) if feature_names is not None else int(feature.max()) + 1
+        self.n_features_in_ = int(n_features)
+        if feature_names is not None:
+            self.feature_names_in_ = feature_names
+
+        self._children_flat = children.reshape(-1)
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        """Memória ocupada pelos arrays da floresta (bytes)."""
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.children,
+                                      self.missing_left, self.value, self.roots))
+
+    @classmethod
+    def from_sklearn(cls, forest) -> "CompiledForest":
+        """
+        Compila um RandomForestClassifier (ou ExtraTreesClassifier) treinado.
+
+        Args:
+            forest: Estimador sklearn com `estimators_` de DecisionTreeClassifier
+        """
+        if getattr(forest, 'n_outputs_', 1) != 1:
+            raise ValueError("❌ CompiledForest suporta apenas modelos de saída única")
+
+        features, thresholds, children, missing, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        n_classes = len(forest.classes_)
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            ids = np.arange(n)
+            is_leaf = tree.children_left == -1
+
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.int32)
+            left = np.where(is_leaf, ids, tree.children_left) + offset
+            right = np.where(is_leaf, ids, tree.children_right) + offset
+
+            proba = tree.value[:, 0, :n_classes].astype(np.float64, copy=True)
+            if not _sklearn_guarda_fracoes():
+                # sklearn < 1.4 guarda contagens e normaliza no predict_proba
+                normalizer = proba.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                proba /= normalizer
+
+            miss = getattr(tree, 'missing_go_to_left', None)
+            if miss is None:
+                miss = np.zeros(n, dtype=np.uint8)
+
+            features.append(feature)
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            children.append(np.column_stack([right, left]).astype(np.int32))
+            missing.append(np.asarray(miss, dtype=np.uint8))
+            values.append(proba)
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children=np.concatenate(children),
+            missing_left=np.concatenate(missing),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            classes=np.asarray(forest.classes_),
+            feature_names=getattr(forest, 'feature_names_in_', None),
+            n_features=forest.n_features_in_,
+        )
+
+    def save(self, directory: Union[str, Path]) -> Path:
+        """
+        Salva a floresta como um diretório de arrays `.npy` + `header.json`.
+
+        Os `.npy` não são comprimidos para que `load` possa mapeá-los em
+        memória. Cada arquivo é trocado por inteiro (temporário + os.replace),
+        então regravar um diretório em uso não trunca os arrays que os workers
+        já mapearam; o header é trocado por último.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        arrays = {}
+        for name in ARRAY_NAMES:
+            array = np.ascontiguousarray(getattr(self, name))
+            gravar_npy_atomico(directory / f"{name}.npy", array)
+            arrays[name] = {"dtype": array.dtype.str, "shape": list(array.shape)}
+
+        feature_names = getattr(self, 'feature_names_in_', None)
+        header = {
+            "format": FORMAT_NAME,
+            "format_version": FORMAT_VERSION,
+            "n_estimators": self.n_estimators,
+            "max_depth": self.max_depth,
+            "n_features": self.n_features_in_,
+            "classes": self.classes_.tolist(),
+            "feature_names": None if feature_names is None else list(feature_names),
+            "arrays": arrays,
+        }
+        gravar_json_atomico(directory / HEADER_FILE, header)
+        return directory
+
+    @classmethod
+    def load(cls, directory: Union[str, Path], mmap: bool = True) -> "CompiledForest":
+        """
+        Abre uma floresta salva com `save`.
+
+        Com `mmap=True` (default) os arrays são mapeados em memória somente
+        leitura: a abertura só lê os headers e os workers compartilham as
+        páginas do arquivo pelo page cache do sistema operacional.
+        """
+        directory = Path(directory)
+        with open(directory / HEADER_FILE, 'r') as f:
+            header = json.load(f)
+
+        if header.get("format") != FORMAT_NAME or header.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"❌ Formato de floresta não suportado: {directory}")
+
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            array = np.load(directory / f"{name}.npy", mmap_mode='r' if mmap else None)
+            if array.dtype.str != spec["dtype"] or list(array.shape) != spec["shape"]:
+                raise ValueError(f"❌ Array '{name}' não confere com o header em {directory}")
+            arrays[name] = array
+
+        feature_names = header.get("feature_names")
+        return cls(
+            **arrays,
+            max_depth=header["max_depth"],
+            classes=np.asarray(header["classes"]),
+            feature_names=None if feature_names is None else np.asarray(feature_names, dtype=object),
+            n_features=header["n_features"],
+        )
+
+    @staticmethod
+    def is_artifact(path: Union[str, Path]) -> bool:
+        """True se `path` é um diretório salvo por `CompiledForest.save`."""
+        return (Path(path) / HEADER_FILE).is_file()
+
+    def _validar(self, X) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"❌ X deve ter formato (n, {self.n_features_in_}); recebido {X.shape}")
+        return X
+
+    def apply(self, X) -> np.ndarray:
+        """
+        Id global da folha alcançada por cada linha em cada árvore.
+
+        Returns:
+            np.ndarray: (n_estimators, n_amostras) int32
+        """
+        X = self._validar(X)
+        n_rows, n_features = X.shape
+        X_flat = X.reshape(-1)
+        has_nan = bool(np.isnan(X_flat).any())
+
+        # Offset da linha no array achatado, replicado para cada árvore
+        row_offset = (np.arange(n_rows, dtype=np.int64) * n_features)[np.newaxis, :]
+        node = np.repeat(self.roots[:, np.newaxis], n_rows, axis=1)
+
+        for _ in range(self.max_depth):
+            x = X_flat.take(row_offset + self.feature.take(node))
+            go_left = x <= self.threshold.take(node)
+            if has_nan:
+                go_left |= np.isnan(x) & self.missing_left.take(node).astype(bool)
+            node = self._children_flat.take(2 * node + go_left)
+
+        return node
+
+    def predict_proba(self, X, batch_size: int = 4096) -> np.ndarray:
+        """
+        Probabilidades por classe, bit a bit iguais ao sklearn com n_jobs=1
+        (com vários jobs o sklearn acumula as árvores em ordem não determinística).
+
+        Otimizado para as chamadas de /predict (uma linha ou lotes pequenos);
+        em lotes de milhares de linhas o Cython do sklearn segue competitivo.
+
+        Args:
+            X: Matriz (n_amostras, n_features)
+            batch_size: Linhas por bloco de travessia (limita memória temporária)
+
+        Returns:
+            np.ndarray: (n_amostras, n_classes) float64
+        """
+        X = self._validar(X)
+        proba = np.zeros((X.shape[0], self.value.shape[1]), dtype=np.float64)
+
+        for inicio in range(0, X.shape[0], batch_size):
+            leaves = self.apply(X[inicio:inicio + batch_size])
+            out = proba[inicio:inicio + batch_size]
+            # Soma sequencial na ordem das árvores, como o sklearn
+            for tree_leaves in leaves:
+                out += self.value.take(tree_leaves, axis=0)
+
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
@@ -0,0 +1,111 @@
+"""
+Vocabulário Compilado de Aeroportos e Companhias
+Cada código IATA de aeroporto e de companhia recebe um id inteiro na carga
+dos artefatos. Códigos dos LabelEncoders e taxas das Lookup Tables ficam em
+arrays contíguos indexados por esse id: codificar um voo custa uma consulta
+de id por código e indexação de array, em linha única e em lote.
+
+O id 0 é reservado para códigos desconhecidos (defaults das lookup tables e
+código -1 dos encoders). Os arrays são somente leitura e montados no master
+antes do fork (server.py): as páginas ficam compartilhadas entre os workers
+sem cópia, o que não acontece com dicts de floats (o refcount de cada item
+lido escreve na página).
+"""
+from typing import Dict, Sequence
+
+import numpy as np
+
+ID_DESCONHECIDO = 0
+
+# Colunas das tabelas por id (float64: mesmas taxas que o JSON devolve)
+COLUNAS_AEROPORTOS = ('origin_delay_rate', 'origin_traffic', 'Origin', 'Dest')
+COLUNAS_COMPANHIAS = ('carrier_delay_rate', 'Airline')
+# Lookups que caíram no default, por id (para as métricas de qualidade de entrada)
+AUSENTES_AEROPORTOS = ('origin_delay_rate', 'origin_traffic')
+AUSENTES_COMPANHIAS = ('carrier_delay_rate',)
+
+ARRAY_NAMES = ('aeroportos', 'companhias', 'ausentes_aeroportos', 'ausentes_companhias')
+
+
+class Vocabulario:
+    """
+    Ids de aeroportos/companhias e tabelas por id.
+
+    - ids_aeroportos / ids_companhias: {código: id}, ids a partir de 1
+    - aeroportos: (n + 1, 4) float64 com COLUNAS_AEROPORTOS
+    - companhias: (n + 1, 2) float64 com COLUNAS_COMPANHIAS
+    - ausentes_aeroportos / ausentes_companhias: bool, True onde a lookup
+      table não tem o código (a linha usa o default)
+
+    Use `compilar` para montar a partir dos encoders e das lookup tables.
+    """
+
+    def __init__(self, codigos_aeroportos: Sequence[str], codigos_companhias: Sequence[str],
+                 aeroportos: np.ndarray, companhias: np.ndarray,
+                 ausentes_aeroportos: np.ndarray, ausentes_companhias: np.ndarray):
+        self.codigos_aeroportos = list(codigos_aeroportos)
+        self.codigos_companhias = list(codigos_companhias)
+        if aeroportos.shape != (len(self.codigos_aeroportos) + 1, len(COLUNAS_AEROPORTOS)) or \
+                companhias.shape != (len(self.codigos_companhias) + 1, len(COLUNAS_COMPANHIAS)):
+            raise ValueError("❌ Tabelas do vocabulário não conferem com os códigos")
+        self.ids_aeroportos: Dict[str, int] = {c: i for i, c in enumerate(self.codigos_aeroportos, 1)}
+        self.ids_companhias: Dict[str, int] = {c: i for i, c in enumerate(self.codigos_companhias, 1)}
+        self.aeroportos = _somente_leitura(aeroportos)
+        self.companhias = _somente_leitura(companhias)
+        self.ausentes_aeroportos = _somente_leitura(ausentes_aeroportos)
+        self.ausentes_companhias = _somente_leitura(ausentes_companhias)
+
+    @classmethod
+    def compilar(cls, vocabularios: Dict[str, Dict[str, int]], origin_rates: Dict[str, float],
+                 origin_traffic: Dict[str, float], carrier_rates: Dict[str, float],
+                 default_origin_rate: float, default_traffic: float,
+                 default_carrier_rate: float) -> "Vocabulario":
+        """
+        Um id para cada código presente em qualquer fonte (encoders de
+        Origin/Dest/Airline ou lookup tables), em ordem alfabética.
+
+        Args:
+            vocabularios: {coluna: {classe: código}} dos LabelEncoders
+            origin_rates, origin_traffic, carrier_rates: Lookup tables planas
+            default_*: Valores para códigos ausentes das lookup tables
+        """
+        origem, destino = vocabularios.get('Origin', {}), vocabularios.get('Dest', {})
+        airline = vocabularios.get('Airline', {})
+        codigos_aeroportos = sorted(set(origem) | set(destino) | set(origin_rates) | set(origin_traffic))
+        codigos_companhias = sorted(set(airline) | set(carrier_rates))
+
+        aeroportos = np.empty((len(codigos_aeroportos) + 1, len(COLUNAS_AEROPORTOS)), dtype=np.float64)
+        aeroportos[ID_DESCONHECIDO] = (default_origin_rate, default_traffic, -1, -1)
+        aeroportos[1:] = [(origin_rates.get(c, default_origin_rate), origin_traffic.get(c, default_traffic),
+                           origem.get(c, -1), destino.get(c, -1)) for c in codigos_aeroportos]
+        ausentes_aeroportos = np.ones((len(codigos_aeroportos) + 1, len(AUSENTES_AEROPORTOS)), dtype=bool)
+        ausentes_aeroportos[1:] = [(c not in origin_rates, c not in origin_traffic) for c in codigos_aeroportos]
+
+        companhias = np.empty((len(codigos_companhias) + 1, len(COLUNAS_COMPANHIAS)), dtype=np.float64)
+        companhias[ID_DESCONHECIDO] = (default_carrier_rate, -1)
+        companhias[1:] = [(carrier_rates.get(c, default_carrier_rate), airline.get(c, -1))
+                          for c in codigos_companhias]
+        ausentes_companhias = np.ones(len(codigos_companhias) + 1, dtype=bool)
+        ausentes_companhias[1:] = [c not in carrier_rates for c in codigos_companhias]
+
+        return cls(codigos_aeroportos, codigos_companhias, aeroportos, companhias,
+                   ausentes_aeroportos, ausentes_companhias)
+
+    def __len__(self) -> int:
+        return len(self.codigos_aeroportos) + len(self.codigos_companhias)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, nome).nbytes for nome in ARRAY_NAMES)
+
+    def id_aeroporto(self, codigo: str) -> int:
+        return self.ids_aeroportos.get(codigo, ID_DESCONHECIDO)
+
+    def id_companhia(self, codigo: str) -> int:
+        return self.ids_companhias.get(codigo, ID_DESCONHECIDO)
+
+
+def _somente_leitura(array: np.ndarray) -> np.ndarray:
+    array = np.ascontiguousarray(array)
+    array.flags.writeable = False
+    return array
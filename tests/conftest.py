@@ -0,0 +1,115 @@
+"""
+Fixtures compartilhadas: modelo substituto no schema v7.
+
+Os artefatos reais em models/*.pkl são ponteiros Git LFS, então os testes
+da API treinam uma RandomForest pequena com as mesmas 13 features.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder
+
+from src.artifact_registry import Artefatos
+from src.feature_encoder import FeatureEncoder
+from src.prediction_cache import PredictionCache
+
+AIRLINES = ['AA', 'DL', 'UA', 'WN', 'B6']
+AIRPORTS = ['ATL', 'JFK', 'LAX', 'ORD', 'DFW', 'SEA', 'BOS', 'MIA']
+TIME_OF_DAY = ['Morning', 'Afternoon', 'Evening', 'Night']
+
+FEATURE_ORDER = [
+    'Month', 'DayOfWeek', 'dephour', 'is_weekend', 'quarter',
+    'Distance', 'origin_delay_rate', 'carrier_delay_rate', 'origin_traffic',
+    'Airline', 'Origin', 'Dest', 'time_of_day'
+]
+
+FEATURE_NAMES = {
+    "numericas": FEATURE_ORDER[:9],
+    "categoricas": FEATURE_ORDER[9:],
+    "todas": FEATURE_ORDER,
+}
+
+LOOKUP_TABLES = {
+    "origin_delay_rate": {"ATL": 0.16, "JFK": 0.24, "LAX": 0.17, "ORD": 0.22},
+    "carrier_delay_rate": {"AA": 0.20, "DL": 0.14, "B6": 0.28},
+    "origin_traffic": {"ATL": 1050, "JFK": 460, "LAX": 850, "ORD": 920},
+    "defaults": {
+        "origin_delay_rate": 0.195,
+        "carrier_delay_rate": 0.205,
+        "origin_traffic": 450
+    }
+}
+
+
+@pytest.fixture(scope="session")
+def artefatos_substitutos():
+    """(model, encoders) treinados em dados sintéticos no schema v7."""
+    rng = np.random.default_rng(42)
+    n = 2000
+
+    encoders = {
+        'Airline': LabelEncoder().fit(AIRLINES),
+        'Origin': LabelEncoder().fit(AIRPORTS),
+        'Dest': LabelEncoder().fit(AIRPORTS),
+        'time_of_day': LabelEncoder().fit(TIME_OF_DAY),
+    }
+
+    month = rng.integers(1, 13, n)
+    day_of_week = rng.integers(1, 8, n)
+    X = pd.DataFrame({
+        'Month': month,
+        'DayOfWeek': day_of_week,
+        'dephour': rng.integers(0, 24, n),
+        'is_weekend': (day_of_week >= 6).astype(int),
+        'quarter': (month - 1) // 3 + 1,
+        'Distance': rng.uniform(100, 3000, n),
+        'origin_delay_rate': rng.uniform(0.1, 0.3, n),
+        'carrier_delay_rate': rng.uniform(0.1, 0.3, n),
+        'origin_traffic': rng.integers(300, 1100, n),
+        'Airline': rng.integers(-1, len(AIRLINES), n),
+        'Origin': rng.integers(-1, len(AIRPORTS), n),
+        'Dest': rng.integers(-1, len(AIRPORTS), n),
+        'time_of_day': rng.integers(-1, len(TIME_OF_DAY), n),
+    }, columns=FEATURE_ORDER)
+    y = (rng.random(n) < 0.2 + 0.02 * (X['dephour'] > 17)).astype(int)
+
+    model = RandomForestClassifier(
+        n_estimators=10, max_depth=8, random_state=42).fit(X, y)
+    return model, encoders
+
+
+@pytest.fixture
+def api(monkeypatch, artefatos_substitutos):
+    """Módulo `app` com os artefatos substitutos carregados."""
+    import app as app_module
+
+    model, encoders = artefatos_substitutos
+    artefatos = Artefatos(model, encoders, LOOKUP_TABLES, 0.2, FEATURE_NAMES,
+                          FeatureEncoder(FEATURE_NAMES, encoders, LOOKUP_TABLES))
+    monkeypatch.setattr(app_module.registry, "_atual", artefatos)
+    monkeypatch.setattr(app_module, "prediction_cache", PredictionCache(max_size=1024))
+    return app_module
+
+
+@pytest.fixture
+def diretorio_artefatos(tmp_path, artefatos_substitutos):
+    """Arquivos de artefatos (nomes do app) gravados a partir dos substitutos."""
+    import json
+
+    import joblib
+
+    model, encoders = artefatos_substitutos
+    joblib.dump(model, tmp_path / 'randomforest_v7_final.pkl')
+    joblib.dump(encoders, tmp_path / 'label_encoders_v7.pkl')
+    (tmp_path / 'feature_names_v7.json').write_text(json.dumps(FEATURE_NAMES))
+    (tmp_path / 'lookup_tables.json').write_text(json.dumps(LOOKUP_TABLES))
+    (tmp_path / 'optimal_threshold_v2.txt').write_text("0.2")
+    return {
+        'model': tmp_path / 'randomforest_v7_final.pkl',
+        'encoders': tmp_path / 'label_encoders_v7.pkl',
+        'feature_names': tmp_path / 'feature_names_v7.json',
+        'lookup': tmp_path / 'lookup_tables.json',
+        'threshold': tmp_path / 'optimal_threshold_v2.txt',
+        'risk_grid': tmp_path / 'risk_grid_v7',
+    }
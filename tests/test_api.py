@@ -0,0 +1,498 @@
+"""
+Testes da API (app.py) com modelo substituto
+"""
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app import FlightBatchRequest, FlightRequest
+
+
+def _voos():
+    """Voos variados: aeroportos/companhias conhecidos e desconhecidos."""
+    return [
+        FlightRequest(airline='AA', origin='JFK', dest='LAX', distance=2475,
+                      day_of_week=2, flight_date='2023-12-12', crs_dep_time=1830),
+        FlightRequest(airline='DL', origin='ATL', dest='ORD', distance=606,
+                      day_of_week=6, flight_date='2024-03-02', crs_dep_time=545),
+        FlightRequest(airline='ZZ', origin='XXX', dest='BOS', distance=187,
+                      day_of_week=7, flight_date='2024-07-14', crs_dep_time=2359),
+        FlightRequest(airline='WN', origin='MIA', dest='YYY', distance=1100,
+                      day_of_week=1, flight_date='2024-10-07', crs_dep_time=0),
+        FlightRequest(airline='AA', origin='JFK', dest='LAX', distance=2475,
+                      day_of_week=2, flight_date='2023-12-12', crs_dep_time=1830),
+    ]
+
+
+class TestPredictBatch:
+    """Testes para /predict/batch"""
+
+    def test_batch_igual_ao_endpoint_individual(self, api):
+        """Cada item do lote deve ser idêntico à resposta de /predict"""
+        voos = _voos()
+
+        resultado = api.predict_flight_delay_batch(FlightBatchRequest(flights=voos))
+
+        assert resultado["total"] == len(voos)
+        assert resultado["predictions"] == [
+            api.predict_flight_delay(v) for v in voos]
+
+    def test_batch_em_blocos_preserva_ordem(self, api, monkeypatch):
+        """Blocos menores que o lote não alteram resultado nem ordem"""
+        voos = _voos() * 3
+        esperado = api.predict_flight_delay_batch(
+            FlightBatchRequest(flights=voos))
+
+        monkeypatch.setattr(api, "BATCH_CHUNK_SIZE", 2)
+        resultado = api.predict_flight_delay_batch(
+            FlightBatchRequest(flights=voos))
+
+        assert resultado == esperado
+
+    def test_batch_data_invalida(self, api):
+        """Data inválida retorna 400 indicando os voos"""
+        voos = _voos()
+        voos[3] = voos[3].model_copy(update={"flight_date": "2024-13-01"})
+
+        with pytest.raises(HTTPException) as exc:
+            api.predict_flight_delay_batch(FlightBatchRequest(flights=voos))
+
+        assert exc.value.status_code == 400
+        assert "[3]" in exc.value.detail
+
+    def test_batch_vazio(self):
+        """Lote vazio é rejeitado na validação"""
+        with pytest.raises(ValueError):
+            FlightBatchRequest(flights=[])
+
+    def test_modelo_indisponivel(self, api, monkeypatch):
+        """Sem modelo, o lote retorna 503"""
+        monkeypatch.setattr(api.registry, "_atual", None)
+
+        with pytest.raises(HTTPException) as exc:
+            api.predict_flight_delay_batch(FlightBatchRequest(flights=_voos()))
+
+        assert exc.value.status_code == 503
+
+    def test_motor_compilado_mesmas_respostas(self, api, monkeypatch):
+        """Trocar o modelo pelo CompiledForest não altera as respostas"""
+        from src.tree_engine import CompiledForest
+
+        voos = _voos()
+        esperado = [api.predict_flight_delay(v) for v in voos]
+
+        art = api.registry.atual
+        monkeypatch.setattr(api.registry, "_atual",
+                            art.substituir(model=CompiledForest.from_sklearn(art.model)))
+
+        assert [api.predict_flight_delay(v) for v in voos] == esperado
+        assert api.predict_flight_delay_batch(
+            FlightBatchRequest(flights=voos))["predictions"] == esperado
+
+    def test_micro_batcher_mesmas_respostas(self, api, monkeypatch):
+        """Com micro-batching ativo, /predict responde exatamente igual"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        from src.micro_batcher import MicroBatcher
+
+        monkeypatch.setattr(api, "prediction_cache", None)
+        voos = _voos() * 4
+        esperado = [api.predict_flight_delay(v) for v in voos]
+
+        batcher = MicroBatcher(api.score_rows, max_batch_size=8, max_wait_ms=5)
+        monkeypatch.setattr(api, "batcher", batcher)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            resultado = list(pool.map(api.predict_flight_delay, voos))
+        batcher.close()
+
+        assert resultado == esperado
+        assert api.batcher_metrics()["requests"] == len(voos)
+
+
+class TestPredictCache:
+    """Testes do cache de predições em /predict"""
+
+    def test_repeticao_nao_chama_modelo(self, api, monkeypatch):
+        """Consulta repetida responde igual sem inferência"""
+        chamadas = []
+        predict_proba = api.registry.atual.model.predict_proba
+
+        def contar(X):
+            chamadas.append(len(X))
+            return predict_proba(X)
+
+        monkeypatch.setattr(api.registry.atual.model, "predict_proba", contar)
+        voo = _voos()[0]
+
+        primeira = api.predict_flight_delay(voo)
+        segunda = api.predict_flight_delay(voo)
+
+        assert primeira == segunda
+        assert len(chamadas) == 1
+        metricas = api.cache_metrics()
+        assert (metricas["hits"], metricas["misses"]) == (1, 1)
+
+    def test_respostas_iguais_sem_cache(self, api, monkeypatch):
+        """Cache não altera as respostas"""
+        voos = _voos() * 2
+        com_cache = [api.predict_flight_delay(v) for v in voos]
+
+        monkeypatch.setattr(api, "prediction_cache", None)
+        assert [api.predict_flight_delay(v) for v in voos] == com_cache
+        assert api.cache_metrics() == {"enabled": False}
+
+    def test_recarga_invalida_cache(self, api):
+        """Publicar uma nova versão de artefatos esvazia o cache"""
+        api.predict_flight_delay(_voos()[0])
+        geracao = api.prediction_cache.geracao
+        assert len(api.prediction_cache) == 1
+
+        api.registry.publicar(api.registry.atual.substituir())
+
+        assert len(api.prediction_cache) == 0
+        assert api.prediction_cache.geracao == geracao + 1
+
+
+class TestPredictRiskGrid:
+    """Testes de /predict com a grade de risco"""
+
+    def test_grade_mesmas_respostas(self, api, monkeypatch):
+        """Voos dentro e fora da grade respondem igual à inferência ao vivo"""
+        from src.risk_grid import RiskGrid
+
+        voos = _voos()
+        esperado = [api.predict_flight_delay(v) for v in voos]
+
+        rotas = [('AA', 'JFK', 'LAX', 2475.0), ('DL', 'ATL', 'ORD', 606.0)]
+        art = api.registry.atual
+        grade = RiskGrid.build(rotas, art.feature_encoder, art.model)
+        monkeypatch.setattr(api.registry, "_atual", art.substituir(risk_grid=grade))
+        monkeypatch.setattr(api, "prediction_cache", None)
+
+        chamadas = []
+        predict_proba = art.model.predict_proba
+        monkeypatch.setattr(art.model, "predict_proba",
+                            lambda X: chamadas.append(len(X)) or predict_proba(X))
+
+        assert [api.predict_flight_delay(v) for v in voos] == esperado
+        # Só os dois voos fora da malha chamam o modelo
+        assert len(chamadas) == 2
+
+
+class TestRecargaArtefatos:
+    """Recarga a quente pelo registro de artefatos"""
+
+    @pytest.fixture
+    def api_arquivos(self, api, monkeypatch, diretorio_artefatos):
+        from src.artifact_registry import ArtifactRegistry, carregar_versao
+
+        registry = ArtifactRegistry(lambda anterior: carregar_versao(diretorio_artefatos, 'sklearn', anterior),
+                                    ao_publicar=api.invalidar_cache, caminhos=diretorio_artefatos)
+        assert registry.recarregar(aguardar=True)
+        monkeypatch.setattr(api, "registry", registry)
+        monkeypatch.setattr(api, "ADMIN_TOKEN", "segredo")
+        return api, diretorio_artefatos
+
+    def _publicar(self, path, conteudo):
+        import os
+
+        path.write_text(conteudo)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+
+    def test_lookup_tables_republicadas(self, api_arquivos):
+        """Nova versão das lookup tables é carregada sem recarregar o modelo"""
+        import json
+
+        api, caminhos = api_arquivos
+        voo = _voos()[0]
+        modelo = api.registry.atual.model
+        assert api.registry.verificar_arquivos() is None
+        api.predict_flight_delay(voo)
+        assert len(api.prediction_cache) == 1
+
+        self._publicar(caminhos['lookup'], json.dumps({
+            "origin_delay_rate": {"JFK": 0.5}, "carrier_delay_rate": {"AA": 0.45},
+            "origin_traffic": {"JFK": 900}, "defaults": {}, "version": 2}))
+        # Mudança só é aplicada quando estável por duas verificações
+        pendente = api.registry.verificar_arquivos()
+        assert pendente is not None and api.registry.atual.versao == 1
+        assert api.registry.verificar_arquivos(pendente) is None
+
+        art = api.registry.atual
+        assert art.versao == 2 and art.lookup_tables["version"] == 2
+        assert art.model is modelo
+        assert len(api.prediction_cache) == 0
+        assert api.predict_flight_delay(voo)["internal_metrics"] == {
+            "historical_origin_risk": 0.5, "historical_carrier_risk": 0.45}
+
+    def test_admin_reload_threshold(self, api_arquivos):
+        """POST /admin/reload troca o threshold; falha mantém a versão atual"""
+        from fastapi import Response
+
+        api, caminhos = api_arquivos
+        voo = _voos()[0]
+        antes = api.predict_flight_delay(voo)
+
+        self._publicar(caminhos['threshold'], "0.99")
+        resposta = Response()
+        status = api.admin_reload(resposta, wait=True, x_admin_token="segredo")
+        assert resposta.status_code == 200 and status["current"]["threshold"] == 0.99
+        assert api.predict_flight_delay(voo)["prediction"] == "Pontual"
+        assert api.predict_flight_delay(voo)["probability_delay"] == antes["probability_delay"]
+
+        # Threshold inválido: recarga rejeitada, versão 2 continua
+        self._publicar(caminhos['threshold'], "7")
+        resposta = Response()
+        status = api.admin_reload(resposta, wait=True, x_admin_token="segredo")
+        assert resposta.status_code == 500 and "Threshold" in status["last_error"]
+        assert api.registry.atual.versao == 2 and api.registry.atual.threshold == 0.99
+
+    def test_admin_exige_token(self, api_arquivos, monkeypatch):
+        """Sem token configurado ou com token errado, /admin/* é recusado"""
+        from fastapi import Response
+
+        api, _ = api_arquivos
+        with pytest.raises(HTTPException) as exc:
+            api.admin_artifacts(x_admin_token="errado")
+        assert exc.value.status_code == 401
+
+        monkeypatch.setattr(api, "ADMIN_TOKEN", "")
+        with pytest.raises(HTTPException) as exc:
+            api.admin_reload(Response(), x_admin_token="")
+        assert exc.value.status_code == 403
+        assert api.registry.recargas == 1
+
+
+class TestInicializacao:
+    """Inicialização rápida: import leve, health e readiness"""
+
+    def test_import_nao_carrega_dependencias_pesadas(self):
+        """`import app` não importa pandas/sklearn nem carrega artefatos"""
+        import os
+        import subprocess
+        import sys
+
+        script = ("import sys, app; "
+                  "print([m for m in ('pandas', 'sklearn', 'scipy', 'joblib') if m in sys.modules], "
+                  "app.registry.atual)")
+        saida = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                               env={**os.environ, "FLIGHTONTIME_ARTIFACT_WATCH_S": "0"})
+        assert saida.stdout.strip().splitlines()[-1] == "[] None"
+
+    @pytest.mark.parametrize("tamanho", ["0", "-5"])
+    def test_bloco_de_lote_invalido(self, tamanho):
+        """FLIGHTONTIME_BATCH_CHUNK_SIZE < 1 impede a inicialização"""
+        import os
+        import subprocess
+        import sys
+
+        saida = subprocess.run([sys.executable, "-c", "import app"], capture_output=True, text=True,
+                               env={**os.environ, "FLIGHTONTIME_BATCH_CHUNK_SIZE": tamanho})
+        assert saida.returncode != 0
+        assert "FLIGHTONTIME_BATCH_CHUNK_SIZE" in saida.stderr
+
+    def test_health_e_ready(self, api, monkeypatch):
+        """/health responde sempre; /ready só com uma versão publicada"""
+        from fastapi import Response
+
+        assert api.health() == {"status": "ok"}
+
+        response = Response()
+        assert api.ready(response) == {"ready": True, "version": 0}
+        assert response.status_code == 200
+
+        monkeypatch.setattr(api.registry, "_atual", None)
+        response = Response()
+        assert api.ready(response)["ready"] is False
+        assert response.status_code == 503
+
+
+class TestExecutorInferencia:
+    """POST /predict e /predict/batch pelo executor de inferência (fila limitada e prazo)"""
+
+    @pytest.fixture
+    def cliente(self, api, monkeypatch):
+        from fastapi.testclient import TestClient
+
+        from src.inference_executor import InferenceExecutor
+
+        executor = InferenceExecutor(max_workers=1, max_queue=0)
+        monkeypatch.setattr(api, "executor", executor)
+        monkeypatch.setattr(api, "prediction_cache", None)
+        yield TestClient(api.app)
+        executor.close()
+
+    def test_mesmas_respostas(self, api, cliente):
+        voos = _voos()
+        for voo in voos:
+            resposta = cliente.post("/predict", json=voo.model_dump())
+            assert resposta.status_code == 200
+            assert resposta.json() == api.predict_flight_delay(voo)
+        resposta = cliente.post("/predict/batch", json={"flights": [v.model_dump() for v in voos]})
+        assert resposta.json() == api.predict_flight_delay_batch(FlightBatchRequest(flights=voos))
+
+    def test_sobrecarga_429(self, api, cliente, monkeypatch):
+        """Executor ocupado e sem fila: a próxima requisição recebe 429 na hora"""
+        import threading
+
+        liberar = threading.Event()
+        predict_proba = api.registry.atual.model.predict_proba
+
+        def bloquear(X):
+            liberar.wait(5)
+            return predict_proba(X)
+
+        monkeypatch.setattr(api.registry.atual.model, "predict_proba", bloquear)
+        payload = _voos()[0].model_dump()
+        respostas = []
+        ocupada = threading.Thread(target=lambda: respostas.append(cliente.post("/predict", json=payload)))
+        ocupada.start()
+        while api.executor.stats()["running"] == 0:
+            time.sleep(0.001)
+
+        rejeitada = cliente.post("/predict", json=payload)
+        liberar.set()
+        ocupada.join()
+
+        assert rejeitada.status_code == 429
+        assert rejeitada.headers["retry-after"] == "1"
+        assert respostas[0].status_code == 200
+        assert api.executor_metrics()["rejected"] == 1
+
+    def test_prazo_esgotado_503(self, api, cliente, monkeypatch):
+        predict_proba = api.registry.atual.model.predict_proba
+
+        def lento(X):
+            time.sleep(0.3)
+            return predict_proba(X)
+
+        monkeypatch.setattr(api.registry.atual.model, "predict_proba", lento)
+        monkeypatch.setattr(api, "INFERENCE_DEADLINE_MS", 50)
+
+        inicio = time.perf_counter()
+        resposta = cliente.post("/predict", json=_voos()[0].model_dump())
+
+        assert resposta.status_code == 503
+        assert time.perf_counter() - inicio < 0.25
+
+    @pytest.fixture
+    def com_batcher(self, api, monkeypatch):
+        """Executor de 1 thread (fila de 16) + micro-batcher de até 8 linhas"""
+        from src.inference_executor import InferenceExecutor
+        from src.micro_batcher import MicroBatcher
+
+        executor = InferenceExecutor(max_workers=1, max_queue=16)
+        batcher = MicroBatcher(api.score_rows, max_batch_size=8, max_wait_ms=100)
+        monkeypatch.setattr(api, "executor", executor)
+        monkeypatch.setattr(api, "batcher", batcher)
+        monkeypatch.setattr(api, "prediction_cache", None)
+        yield executor, batcher
+        batcher.close()
+        executor.close()
+
+    def test_lote_maior_que_workers(self, api, com_batcher):
+        """A espera pelo lote não ocupa o executor: 8 chamadas concorrentes, 1 worker, 1 lote"""
+        import asyncio
+
+        executor, batcher = com_batcher
+        voos = _voos() + _voos()[:3]
+
+        async def concorrentes():
+            return await asyncio.gather(*(api.predict_flight_delay_endpoint(v) for v in voos))
+
+        resultado = asyncio.run(concorrentes())
+
+        assert resultado == [api.predict_flight_delay(v) for v in voos]
+        assert batcher.stats()["max_batch_size_seen"] > executor.max_workers
+        assert batcher.stats()["max_batch_size_seen"] == len(voos)
+
+    def test_prazo_esgotado_esperando_lote(self, api, com_batcher, monkeypatch):
+        """Prazo esgotado na fila do batcher: 503 e a linha não é pontuada"""
+        import asyncio
+
+        _, batcher = com_batcher
+        monkeypatch.setattr(api, "INFERENCE_DEADLINE_MS", 20)
+
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(api.predict_flight_delay_endpoint(_voos()[0]))
+        batcher.close()
+
+        assert exc.value.status_code == 503
+        assert batcher.stats()["cancelled"] == 1 and batcher.stats()["requests"] == 0
+
+
+class TestMetricas:
+    """Métricas de /predict e /predict/batch em GET /metrics"""
+
+    @pytest.fixture
+    def metricas(self, api, monkeypatch):
+        from src.metrics import MetricasAPI
+
+        metricas = MetricasAPI(amostra_etapas=1.0)
+        metricas.registro.coletor(api.metricas_de_estado)
+        monkeypatch.setattr(api, "metricas", metricas)
+        return metricas
+
+    def test_contadores_e_etapas(self, api, metricas):
+        """Requisições, origem da probabilidade, fallbacks e tempo por etapa"""
+        voos = _voos()
+        for voo in voos:
+            api.predict_flight_delay(voo)
+        api.predict_flight_delay_batch(FlightBatchRequest(flights=voos))
+
+        assert metricas.requisicoes.valor("/predict", "200", "0") == 5
+        assert metricas.requisicoes.valor("/predict/batch", "200", "0") == 1
+        # O último voo repete o primeiro: resposta do cache
+        assert metricas.predicoes.valor("/predict", "model") == 4
+        assert metricas.predicoes.valor("/predict", "cache") == 1
+        assert metricas.predicoes.valor("/predict/batch", "model") == 5
+        assert metricas.lotes.valor("/predict/batch")["count"] == 1
+        # Voos com 'ZZ'/'XXX' e 'WN'/'MIA'/'YYY', uma vez em cada endpoint
+        assert metricas.fallbacks.valor("origin_delay_rate") == 4
+        assert metricas.fallbacks.valor("carrier_delay_rate") == 4
+        assert metricas.desconhecidas.valor("Dest") == 2
+        for etapa in ("parse", "lookup", "encode", "cache", "predict"):
+            assert metricas.etapas.valor("/predict", etapa)["count"] >= 4
+        for etapa in ("parse", "lookup", "encode", "predict", "response"):
+            assert metricas.etapas.valor("/predict/batch", etapa)["count"] == 1
+
+    def test_erros_contados(self, api, metricas, monkeypatch):
+        """400 e 503 por status; exceções internas também por tipo"""
+        voo = _voos()[0]
+        with pytest.raises(HTTPException):
+            api.predict_flight_delay(voo.model_copy(update={"flight_date": "2024-13-01"}))
+
+        def falhar(X):
+            raise RuntimeError("modelo quebrado")
+        monkeypatch.setattr(api, "prediction_cache", None)
+        monkeypatch.setattr(api.registry.atual.model, "predict_proba", falhar)
+        with pytest.raises(HTTPException):
+            api.predict_flight_delay(voo)
+        monkeypatch.setattr(api.registry, "_atual", None)
+        with pytest.raises(HTTPException):
+            api.predict_flight_delay(voo)
+
+        assert metricas.requisicoes.valor("/predict", "400", "0") == 1
+        assert metricas.requisicoes.valor("/predict", "500", "0") == 1
+        assert metricas.requisicoes.valor("/predict", "503", "none") == 1
+        assert metricas.erros.valor("/predict", "RuntimeError") == 1
+
+    def test_endpoint_prometheus(self, api, metricas):
+        """GET /metrics em texto, com versão em uso e estado do cache"""
+        from fastapi.testclient import TestClient
+
+        api.predict_flight_delay(_voos()[0])
+        # Sem o lifespan: os artefatos substitutos já estão publicados
+        resposta = TestClient(api.app).get("/metrics")
+
+        assert resposta.status_code == 200
+        assert resposta.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'flightontime_requests_total{endpoint="/predict",status="200",model_version="0"} 1' \
+            in resposta.text
+        assert 'flightontime_model_info{model_version="0",model="RandomForestClassifier",' \
+               'lookup_version="None"} 1' in resposta.text
+        assert 'flightontime_prediction_cache_requests_total{result="misses"} 1' in resposta.text
+        assert "flightontime_ready 1" in resposta.text
+        assert "flightontime_risk_grid_routes 0" in resposta.text
+        assert "flightontime_risk_grid_rejected 0" in resposta.text
@@ -0,0 +1,112 @@
+"""
+Testes para o backend Arrow do pré-processamento
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from src import arrow_backend
+from src.preprocessing import (criar_features_historicas, criar_features_temporais, downcast_dataframe,
+                               planejar_dtypes)
+
+FEATURES = ['origin_delay_rate', 'carrier_delay_rate', 'origin_traffic',
+            'dephour', 'is_weekend', 'quarter', 'time_of_day']
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(5)
+    n = 4000
+    data = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 50, n), unit='D')
+    return pd.DataFrame({
+        'FlightDate': data,
+        'Airline': rng.choice(['AA', 'DL', 'UA', 'WN'], n),
+        'Origin': rng.choice(['JFK', 'LAX', 'ATL', 'ORD', 'MIA'], n),
+        'Dest': rng.choice(['JFK', 'LAX', 'ATL', 'BOS'], n),
+        'CRSDepTime': rng.integers(0, 2500, n),
+        'DayOfWeek': data.dayofweek + 1,
+        'Month': data.month,
+        'Distance': rng.uniform(100, 3000, n),
+        'ArrDelay15': rng.integers(0, 2, n),
+    })
+
+
+def _pandas(df):
+    return criar_features_historicas(criar_features_temporais(df))
+
+
+def _arrow(df):
+    table = arrow_backend.codificar_dicionarios(pa.Table.from_pandas(df, preserve_index=False))
+    return arrow_backend.criar_features_historicas(arrow_backend.criar_features_temporais(table))
+
+
+class TestArrowBackend:
+    """Backend Arrow == backend pandas"""
+
+    def test_features_identicas_ao_pandas(self, dataset):
+        """Dados ordenados: mesmas linhas, valores e dtypes"""
+        dataset = dataset.sort_values('FlightDate', kind='stable', ignore_index=True)
+
+        esperado = _pandas(dataset)
+        resultado = _arrow(dataset).to_pandas()
+
+        pd.testing.assert_frame_equal(resultado[FEATURES], esperado[FEATURES], check_exact=True)
+        for col in arrow_backend.COLUNAS_DICIONARIO:
+            assert resultado[col].astype(object).tolist() == esperado[col].tolist()
+
+    def test_nulos_no_target_e_no_grupo(self, dataset):
+        """Target nulo e companhia nula seguem o backend pandas"""
+        dataset['ArrDelay15'] = dataset['ArrDelay15'].astype('float64')
+        dataset.loc[::11, 'ArrDelay15'] = np.nan
+        dataset.loc[::19, 'Airline'] = None
+        dataset = dataset.sort_values('FlightDate', kind='stable', ignore_index=True)
+
+        pd.testing.assert_frame_equal(
+            _arrow(dataset).to_pandas()[FEATURES], _pandas(dataset)[FEATURES], check_exact=True)
+
+    def test_ordena_entrada_fora_de_ordem(self, dataset):
+        """Entrada embaralhada é ordenada (de forma estável) por FlightDate"""
+        resultado = _arrow(dataset).to_pandas()
+        esperado = _pandas(dataset.sort_values('FlightDate', kind='stable', ignore_index=True))
+
+        assert resultado['FlightDate'].is_monotonic_increasing
+        pd.testing.assert_frame_equal(resultado[FEATURES], esperado[FEATURES], check_exact=True)
+
+    def test_requires_flight_date(self):
+        """Exige coluna FlightDate"""
+        with pytest.raises(ValueError, match="FlightDate"):
+            arrow_backend.criar_features_historicas(pa.table({'Origin': ['JFK']}))
+
+    def test_downcast_igual_ao_pandas(self, dataset):
+        """Mesmo plano e tipos após downcast que downcast_dataframe"""
+        dataset['Origin'] = dataset['Origin'].astype(object)
+        tabela = pa.Table.from_pandas(dataset, preserve_index=False)
+        esperado = downcast_dataframe(dataset)
+
+        assert arrow_backend.planejar_dtypes_table(tabela) == planejar_dtypes(dataset)
+        resultado = arrow_backend.downcast_table(tabela).to_pandas()
+        assert resultado.dtypes.astype(str).equals(esperado.dtypes.astype(str))
+
+    def test_matriz_float32(self, dataset):
+        """Matriz C-contígua igual ao DataFrame codificado com LabelEncoder"""
+        dataset = dataset.sort_values('FlightDate', kind='stable', ignore_index=True)
+        encoders = {
+            'Airline': LabelEncoder().fit(['AA', 'DL', 'UA']),
+            'Origin': LabelEncoder().fit(['ATL', 'JFK', 'LAX', 'MIA', 'ORD']),
+            'Dest': LabelEncoder().fit(['ATL', 'JFK', 'LAX']),
+        }
+        features = ['Month', 'DayOfWeek', 'dephour', 'Distance', 'origin_delay_rate', 'Airline',
+                    'Origin', 'Dest']
+
+        X = arrow_backend.montar_matriz(_arrow(dataset), features, encoders)
+
+        esperado = _pandas(dataset)[features].copy()
+        for col, encoder in encoders.items():
+            conhecido = esperado[col].isin(encoder.classes_)
+            codigos = np.full(len(esperado), -1)
+            codigos[conhecido] = encoder.transform(esperado.loc[conhecido, col])
+            esperado[col] = codigos
+        assert X.dtype == np.float32 and X.flags['C_CONTIGUOUS']
+        np.testing.assert_array_equal(X, esperado.to_numpy(dtype=np.float32))
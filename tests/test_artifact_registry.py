@@ -0,0 +1,111 @@
+"""
+Testes para o registro de artefatos (recarga a quente)
+"""
+import json
+import os
+import threading
+
+import joblib
+import numpy as np
+import pytest
+
+from src.artifact_registry import ArtifactRegistry, carregar_versao, lote_de_verificacao, validar_artefatos
+
+
+def _tocar(path, conteudo=None):
+    if conteudo is not None:
+        path.write_text(conteudo)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+
+
+class TestCarregarVersao:
+    """Testes para carregar_versao e validar_artefatos"""
+
+    def test_reaproveita_modelo_inalterado(self, diretorio_artefatos):
+        """Só lookup/threshold mudaram: modelo e encoders são os mesmos objetos"""
+        v1 = carregar_versao(diretorio_artefatos)
+        _tocar(diretorio_artefatos['threshold'], "0.3")
+        v2 = carregar_versao(diretorio_artefatos, anterior=v1)
+        assert v2.model is v1.model and v2.encoders is v1.encoders
+        assert v2.threshold == 0.3
+
+        _tocar(diretorio_artefatos['model'])
+        v3 = carregar_versao(diretorio_artefatos, anterior=v2)
+        assert v3.model is not v2.model
+
+    def test_artefato_obrigatorio_ausente(self, diretorio_artefatos):
+        """Sem o arquivo de encoders a versão não é carregada"""
+        os.unlink(diretorio_artefatos['encoders'])
+        with pytest.raises(FileNotFoundError, match="encoders"):
+            carregar_versao(diretorio_artefatos)
+
+    def test_lote_de_verificacao(self, diretorio_artefatos):
+        """Versão válida passa; modelo com outro número de features é rejeitado"""
+        artefatos = carregar_versao(diretorio_artefatos)
+        validar_artefatos(artefatos)
+        assert len(lote_de_verificacao(artefatos.feature_encoder, n=10)) == 10
+
+        nomes = json.loads(diretorio_artefatos['feature_names'].read_text())
+        nomes['todas'] = nomes['todas'][:-1]
+        with pytest.raises(ValueError, match="feature_names"):
+            validar_artefatos(artefatos.substituir(feature_names=nomes))
+
+        class ModeloQuebrado:
+            n_features_in_ = len(artefatos.feature_encoder.feature_names)
+
+            def predict_proba(self, X):
+                return np.full((len(X), 2), np.nan)
+
+        with pytest.raises(ValueError, match="probabilidades inválidas"):
+            validar_artefatos(artefatos.substituir(model=ModeloQuebrado()))
+
+
+class TestArtifactRegistry:
+    """Testes para ArtifactRegistry"""
+
+    def test_recarga_em_segundo_plano(self, diretorio_artefatos):
+        """Versão atual atende durante a carga; troca só depois da validação"""
+        liberar = threading.Event()
+
+        def carregar(anterior):
+            if anterior is not None:
+                liberar.wait(5)
+            return carregar_versao(diretorio_artefatos, anterior=anterior)
+
+        publicadas = []
+        registry = ArtifactRegistry(carregar, ao_publicar=publicadas.append)
+        assert registry.recarregar(aguardar=True)
+        v1 = registry.atual
+
+        assert registry.recarregar() is True
+        assert registry.recarregar() is False
+        assert registry.recarregando and registry.atual is v1
+
+        liberar.set()
+        registry.aguardar()
+        assert registry.atual is not v1 and registry.atual.versao == 2
+        assert publicadas == [v1, registry.atual]
+        assert registry.status()["reloads"] == 2
+
+    def test_falha_mantem_versao_atual(self, diretorio_artefatos):
+        """Artefato corrompido: erro registrado, versão anterior continua"""
+        registry = ArtifactRegistry(lambda anterior: carregar_versao(diretorio_artefatos, anterior=anterior),
+                                    caminhos=diretorio_artefatos)
+        assert registry.recarregar(aguardar=True)
+        v1 = registry.atual
+
+        _tocar(diretorio_artefatos['model'], "corrompido")
+        pendente = registry.verificar_arquivos()
+        assert registry.verificar_arquivos(pendente) is None
+
+        assert registry.atual is v1
+        status = registry.status()
+        assert status["failures"] == 1 and status["last_error"]
+        # Os mesmos arquivos não são tentados de novo a cada verificação
+        assert registry.verificar_arquivos(registry.verificar_arquivos()) is None
+        assert registry.status()["failures"] == 1
+
+        joblib.dump(v1.model, diretorio_artefatos['model'])
+        _tocar(diretorio_artefatos['model'])
+        registry.verificar_arquivos(registry.verificar_arquivos())
+        assert registry.atual.versao == 2 and registry.status()["last_error"] is None
@@ -0,0 +1,36 @@
+"""
+Testes para a gravação atômica de arquivos (src/atomic_io.py)
+"""
+import json
+
+import pytest
+
+from src.atomic_io import escrita_atomica, gravar_json_atomico
+
+
+class TestEscritaAtomica:
+    """Testes para escrita_atomica e gravar_json_atomico"""
+
+    def test_substitui_destino(self, tmp_path):
+        path = tmp_path / "dados.json"
+        path.write_text("anterior")
+
+        gravar_json_atomico(path, {"versao": 2}, indent=1)
+
+        assert json.loads(path.read_text()) == {"versao": 2}
+        assert [p.name for p in tmp_path.iterdir()] == ["dados.json"]
+
+    def test_falha_preserva_destino_e_remove_temporario(self, tmp_path):
+        """Erro no meio da escrita: destino intocado e nenhum .dados.json.* sobrando"""
+        path = tmp_path / "dados.json"
+        path.write_text("anterior")
+
+        with pytest.raises(TypeError):
+            gravar_json_atomico(path, {"valor": object()})
+        with pytest.raises(RuntimeError):
+            with escrita_atomica(path, 'wb') as f:
+                f.write(b"parcial")
+                raise RuntimeError("falhou")
+
+        assert path.read_text() == "anterior"
+        assert [p.name for p in tmp_path.iterdir()] == ["dados.json"]
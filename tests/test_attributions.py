@@ -0,0 +1,116 @@
+"""
+Testes para as atribuições por voo (contribuições por caminho)
+"""
+import json
+
+import numpy as np
+import pytest
+
+from src.attributions import AtribuidorFloresta
+from src.prescriptive_engine import (RECOMENDACOES, RECOMENDACOES_POR_FATOR, gerar_output_prescritivo,
+                                     iterar_saida_prescritiva, lotes_explicados)
+from src.prescriptive_io import gravar_saida_prescritiva
+from src.tree_engine import CompiledForest
+from tests.conftest import FEATURE_ORDER
+
+
+@pytest.fixture(scope="module")
+def voos():
+    rng = np.random.default_rng(7)
+    n = 500
+    return np.column_stack([
+        rng.integers(1, 13, n), rng.integers(1, 8, n), rng.integers(0, 24, n), rng.integers(0, 2, n),
+        rng.integers(1, 5, n), rng.uniform(100, 3000, n), rng.uniform(0.1, 0.3, n),
+        rng.uniform(0.1, 0.3, n), rng.integers(300, 1100, n), rng.integers(0, 5, n),
+        rng.integers(0, 8, n), rng.integers(0, 8, n), rng.integers(0, 4, n),
+    ]).astype(np.float32)
+
+
+class TestAtribuidorFloresta:
+    """Testes para AtribuidorFloresta"""
+
+    def test_soma_igual_a_probabilidade(self, artefatos_substitutos, voos):
+        """viés + soma das contribuições = predict_proba do sklearn"""
+        model, _ = artefatos_substitutos
+        atribuidor = AtribuidorFloresta(model)
+
+        contrib = atribuidor.contribuicoes(voos, batch_size=128)
+
+        assert contrib.shape == (len(voos), len(FEATURE_ORDER))
+        np.testing.assert_allclose(atribuidor.vies + contrib.sum(axis=1),
+                                   model.predict_proba(voos)[:, 1], atol=1e-12)
+        assert atribuidor.feature_names == FEATURE_ORDER
+
+    def test_floresta_compilada_mmap(self, artefatos_substitutos, voos, tmp_path):
+        """Mesmas contribuições a partir do CompiledForest salvo em disco"""
+        model, _ = artefatos_substitutos
+        compilada = CompiledForest.load(CompiledForest.from_sklearn(model).save(tmp_path / "rf"))
+
+        np.testing.assert_array_equal(AtribuidorFloresta(compilada).contribuicoes(voos),
+                                      AtribuidorFloresta(model).contribuicoes(voos))
+
+    def test_top_k(self, artefatos_substitutos, voos):
+        """Top-k por |contribuição|, decrescente, independente do batch_size"""
+        atribuidor = AtribuidorFloresta(artefatos_substitutos[0])
+        contrib = atribuidor.contribuicoes(voos)
+
+        top = atribuidor.top_k(voos, k=4, batch_size=64)
+
+        assert top.indices.shape == (len(voos), 4)
+        modulo = np.abs(top.valores)
+        assert (np.diff(modulo, axis=1) <= 0).all()
+        np.testing.assert_allclose(modulo[:, 0], np.abs(contrib).max(axis=1), rtol=1e-6)
+        np.testing.assert_array_equal(top.indices, atribuidor.top_k(voos, k=4, batch_size=500).indices)
+
+    def test_nomes_invalidos(self, artefatos_substitutos):
+        """Número de nomes diferente do número de features"""
+        with pytest.raises(ValueError, match="nomes"):
+            AtribuidorFloresta(artefatos_substitutos[0], feature_names=["a", "b"])
+
+
+class TestSaidaExplicada:
+    """Atribuições na saída prescritiva"""
+
+    def test_fatores_e_recomendacoes_por_voo(self, artefatos_substitutos, voos):
+        """Fatores do voo e ação específica para o fator principal do atraso"""
+        model, _ = artefatos_substitutos
+        atribuidor = AtribuidorFloresta(model)
+        y_proba = model.predict_proba(voos)[:, 1]
+        y_pred = (y_proba >= 0.2).astype(int)
+        top = atribuidor.top_k(voos, k=2)
+
+        saida = gerar_output_prescritivo(y_pred, y_proba, {}, atribuicoes=top)
+
+        principal = top.fator_principal()
+        for registro, pred, fator in zip(saida, y_pred, principal):
+            assert len(registro["principais_fatores"]) == 2
+            assert registro["principais_fatores"][0].endswith("p.p. no risco de atraso")
+            if pred == 0:
+                assert registro["recomendacoes"] == RECOMENDACOES["Pontual"]
+            elif fator >= 0:
+                acao = RECOMENDACOES_POR_FATOR[FEATURE_ORDER[fator]]
+                assert registro["recomendacoes"] == [acao] + RECOMENDACOES["Atrasado"]
+            else:
+                assert registro["recomendacoes"] == RECOMENDACOES["Atrasado"]
+        assert len({id(r["recomendacoes"]) for r in saida}) <= 2 + len(set(RECOMENDACOES_POR_FATOR.values()))
+
+    def test_sinks_com_atribuicoes(self, artefatos_substitutos, voos, tmp_path):
+        """NDJSON e Parquet com fatores por voo iguais à lista em memória"""
+        import pyarrow.parquet as pq
+
+        model, _ = artefatos_substitutos
+        atribuidor = AtribuidorFloresta(model)
+        y_proba = model.predict_proba(voos)[:, 1]
+        y_pred = (y_proba >= 0.2).astype(int)
+        esperado = gerar_output_prescritivo(y_pred, y_proba, {}, atribuicoes=atribuidor.top_k(voos))
+
+        def blocos():
+            return iterar_saida_prescritiva(
+                lotes_explicados(atribuidor, voos, y_pred, y_proba, tamanho_bloco=150), {})
+
+        gravar_saida_prescritiva(blocos(), tmp_path / "saida.ndjson")
+        gravar_saida_prescritiva(blocos(), tmp_path / "saida.parquet", linhas_por_grupo=200)
+
+        linhas = (tmp_path / "saida.ndjson").read_text(encoding='utf-8').splitlines()
+        assert linhas == [json.dumps(r, ensure_ascii=False) for r in esperado]
+        assert pq.read_table(tmp_path / "saida.parquet").to_pylist() == esperado
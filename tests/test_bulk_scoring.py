@@ -0,0 +1,136 @@
+"""
+Testes para a pontuação em lote offline (src/bulk_scoring.py)
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.bulk_scoring import ARQUIVO_CHECKPOINT, ler_blocos, pontuar_arquivo
+from tests.conftest import AIRLINES, AIRPORTS
+
+
+def _malha(n, seed=0):
+    """Malha sintética com os nomes de campo de FlightRequest."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'flight_id': np.arange(n),
+        'airline': rng.choice(AIRLINES + ['ZZ'], n),
+        'origin': rng.choice(AIRPORTS + ['XXX'], n),
+        'dest': rng.choice(AIRPORTS, n),
+        'distance': rng.uniform(100, 3000, n).round(1),
+        'day_of_week': rng.integers(1, 8, n),
+        'flight_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 366, n), unit='D'),
+        'crs_dep_time': rng.integers(0, 2400, n),
+    }).assign(flight_date=lambda df: df['flight_date'].dt.strftime('%Y-%m-%d'))
+
+
+def _ler_saida(destino):
+    return pd.read_parquet(destino).sort_values('indice_voo').reset_index(drop=True)
+
+
+class TestLeituraEmBlocos:
+    """Testes para a divisão da entrada em blocos"""
+
+    def test_blocos_de_tamanho_fixo(self, tmp_path):
+        """Blocos do tamanho pedido independentemente dos row groups; nomes BTS aceitos"""
+        bts = _malha(1000).rename(columns={'airline': 'Airline', 'origin': 'Origin', 'dest': 'Dest',
+                                           'distance': 'Distance', 'day_of_week': 'DayOfWeek',
+                                           'flight_date': 'FlightDate', 'crs_dep_time': 'CRSDepTime'})
+        bts.to_parquet(tmp_path / 'malha.parquet', row_group_size=300)
+
+        blocos = list(ler_blocos(tmp_path / 'malha.parquet', 400))
+
+        assert [(n, inicio, t.num_rows) for n, inicio, t in blocos] == [(0, 0, 400), (1, 400, 400), (2, 800, 200)]
+        assert blocos[1][2].column_names[:2] == ['airline', 'origin']
+
+    def test_coluna_ausente(self, tmp_path):
+        _malha(10).drop(columns='crs_dep_time').to_parquet(tmp_path / 'malha.parquet')
+        with pytest.raises(ValueError, match="crs_dep_time"):
+            next(ler_blocos(tmp_path / 'malha.parquet'))
+
+
+class TestPontuacao:
+    """Testes para consistência com /predict, retomada e linhas inválidas"""
+
+    def test_consistente_com_predict(self, api, diretorio_artefatos, tmp_path):
+        """Cada linha tem a mesma resposta que /predict daria ao voo (pool de 2 workers)"""
+        malha = _malha(600)
+        malha.to_parquet(tmp_path / 'malha.parquet')
+
+        resumo = pontuar_arquivo(tmp_path / 'malha.parquet', tmp_path / 'saida', diretorio_artefatos,
+                                 workers=2, linhas_por_bloco=250, manter_colunas=['flight_id'])
+        saida = _ler_saida(tmp_path / 'saida')
+
+        assert resumo['blocos'] == 3 and resumo['pontuadas'] == 600
+        assert (saida['flight_id'] == malha['flight_id']).all()
+        for i in range(0, 600, 7):
+            voo = malha.iloc[i].drop('flight_id').to_dict()
+            resposta = api.predict_flight_delay(api.FlightRequest(**voo))
+            linha = saida.iloc[i]
+            assert linha['probability_delay'] == resposta['probability_delay']
+            assert linha['recommendation'] == resposta['recommendation']
+            assert linha['previsao'] == resposta['prediction']
+            assert linha['historical_origin_risk'] == resposta['internal_metrics']['historical_origin_risk']
+            assert linha['historical_carrier_risk'] == resposta['internal_metrics']['historical_carrier_risk']
+            assert len(linha['principais_fatores']) == 3
+
+    def test_csv_igual_parquet(self, diretorio_artefatos, tmp_path):
+        """A mesma malha em CSV e em Parquet produz a mesma saída"""
+        malha = _malha(300)
+        malha.loc[0, 'airline'] = 'NA'  # código que o leitor de CSV não pode tratar como nulo
+        malha.to_parquet(tmp_path / 'malha.parquet')
+        malha.to_csv(tmp_path / 'malha.csv', index=False)
+
+        for nome in ('malha.parquet', 'malha.csv'):
+            pontuar_arquivo(tmp_path / nome, tmp_path / f'saida_{nome}', diretorio_artefatos,
+                            workers=1, linhas_por_bloco=128)
+
+        pd.testing.assert_frame_equal(_ler_saida(tmp_path / 'saida_malha.parquet'),
+                                      _ler_saida(tmp_path / 'saida_malha.csv'))
+
+    def test_linhas_invalidas_contadas(self, diretorio_artefatos, tmp_path):
+        """Linhas que /predict rejeitaria ficam fora da saída e são contadas por motivo"""
+        malha = _malha(50)
+        malha.loc[3, 'distance'] = 0
+        malha.loc[7, 'day_of_week'] = 9
+        malha.loc[11, 'flight_date'] = '2024-02-30'
+        malha.loc[13, 'origin'] = None
+        malha.to_parquet(tmp_path / 'malha.parquet')
+
+        resumo = pontuar_arquivo(tmp_path / 'malha.parquet', tmp_path / 'saida', diretorio_artefatos, workers=1)
+        saida = _ler_saida(tmp_path / 'saida')
+
+        assert resumo['invalidas'] == {'distance': 1, 'day_of_week': 1, 'flight_date': 1, 'campo_ausente': 1}
+        assert resumo['pontuadas'] == 46
+        assert not set(saida['indice_voo']) & {3, 7, 11, 13}
+
+    def test_retomada_pula_blocos_concluidos(self, diretorio_artefatos, tmp_path):
+        """Blocos registrados no checkpoint não são pontuados de novo; parâmetros diferentes são erro"""
+        _malha(500).to_parquet(tmp_path / 'malha.parquet')
+        destino = tmp_path / 'saida'
+        pontuar_arquivo(tmp_path / 'malha.parquet', destino, diretorio_artefatos, workers=1, linhas_por_bloco=100)
+        completa = _ler_saida(destino)
+
+        # Simula uma interrupção depois dos dois primeiros blocos
+        checkpoint = json.loads((destino / ARQUIVO_CHECKPOINT).read_text())
+        checkpoint['blocos'] = {b: s for b, s in checkpoint['blocos'].items() if int(b) < 2}
+        checkpoint['concluido'] = False
+        (destino / ARQUIVO_CHECKPOINT).write_text(json.dumps(checkpoint))
+        for parte in sorted(destino.glob('part-*.parquet'))[2:]:
+            parte.unlink()
+
+        resumo = pontuar_arquivo(tmp_path / 'malha.parquet', destino, diretorio_artefatos, workers=1)
+
+        assert resumo['linhas_nesta_execucao'] == 300
+        assert resumo['linhas_por_bloco'] == 100
+        pd.testing.assert_frame_equal(_ler_saida(destino), completa)
+        with pytest.raises(ValueError, match="top_k"):
+            pontuar_arquivo(tmp_path / 'malha.parquet', destino, diretorio_artefatos, workers=1, top_k=5)
+
+    def test_teto_de_memoria_insuficiente(self, diretorio_artefatos, tmp_path):
+        _malha(10).to_parquet(tmp_path / 'malha.parquet')
+        with pytest.raises(ValueError, match="Teto de memória"):
+            pontuar_arquivo(tmp_path / 'malha.parquet', tmp_path / 'saida', diretorio_artefatos,
+                            workers=1, limite_memoria_mb=1)
@@ -0,0 +1,233 @@
+"""
+Testes para o FeatureEncoder pré-compilado
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.feature_encoder import (
+    EntradaInvalida,
+    FeatureEncoder,
+    get_time_of_day,
+    parse_dep_hour,
+    parse_month,
+)
+from src.vocabulary import ARRAY_NAMES, ID_DESCONHECIDO, Vocabulario
+from tests.conftest import FEATURE_NAMES, FEATURE_ORDER, LOOKUP_TABLES
+
+
+def _voo(**kwargs):
+    base = dict(airline='AA', origin='JFK', dest='LAX', distance=2475.3,
+                day_of_week=2, flight_date='2023-12-12', crs_dep_time=1830)
+    base.update(kwargs)
+    return SimpleNamespace(**base)
+
+
+VOOS = [
+    _voo(),
+    _voo(airline='DL', origin='ATL', dest='ORD', distance=606,
+         day_of_week=6, flight_date='2024-03-02', crs_dep_time=545),
+    _voo(airline='ZZ', origin='XXX', dest='BOS', distance=187.7,
+         day_of_week=7, flight_date='2024-07-14', crs_dep_time=2359),
+    _voo(airline='WN', origin='MIA', dest='YYY', distance=1100,
+         day_of_week=1, flight_date='2024-10-07', crs_dep_time=0),
+    _voo(crs_dep_time=12345),
+]
+
+
+def _montar_legado(voo, encoders):
+    """Montagem original (DataFrame + LabelEncoder) usada como referência."""
+    month = datetime.strptime(voo.flight_date, "%Y-%m-%d").month
+    hour = int(str(voo.crs_dep_time).zfill(4)[:2])
+    defaults = LOOKUP_TABLES["defaults"]
+    X = pd.DataFrame([{
+        'Airline': voo.airline,
+        'Origin': voo.origin,
+        'Dest': voo.dest,
+        'Distance': voo.distance,
+        'Month': month,
+        'DayOfWeek': voo.day_of_week,
+        'dephour': hour,
+        'quarter': (month - 1) // 3 + 1,
+        'is_weekend': 1 if voo.day_of_week >= 6 else 0,
+        'time_of_day': get_time_of_day(hour),
+        'origin_delay_rate': LOOKUP_TABLES["origin_delay_rate"].get(
+            voo.origin, defaults["origin_delay_rate"]),
+        'carrier_delay_rate': LOOKUP_TABLES["carrier_delay_rate"].get(
+            voo.airline, defaults["carrier_delay_rate"]),
+        'origin_traffic': LOOKUP_TABLES["origin_traffic"].get(
+            voo.origin, defaults["origin_traffic"]),
+    }])
+    for col in ['Airline', 'Origin', 'Dest', 'time_of_day']:
+        val = X.at[0, col]
+        X[col] = encoders[col].transform([val])[0] if val in encoders[col].classes_ else -1
+    return X[FEATURE_ORDER]
+
+
+class TestFeatureEncoder:
+    """Testes para FeatureEncoder"""
+
+    @pytest.fixture
+    def encoder(self, artefatos_substitutos):
+        _, encoders = artefatos_substitutos
+        return FeatureEncoder(FEATURE_NAMES, encoders, LOOKUP_TABLES)
+
+    def test_linha_igual_a_montagem_legado(self, encoder, artefatos_substitutos):
+        """Linha float32 idêntica ao DataFrame legado convertido pelo sklearn"""
+        _, encoders = artefatos_substitutos
+        for voo in VOOS:
+            row, _, _ = encoder.encode(voo)
+            esperado = _montar_legado(voo, encoders).to_numpy(dtype=np.float32)
+            np.testing.assert_array_equal(row, esperado)
+
+    def test_probabilidade_igual_ao_legado(self, encoder, artefatos_substitutos):
+        """predict_proba sobre a linha é idêntico ao caminho com DataFrame"""
+        model, encoders = artefatos_substitutos
+        for voo in VOOS:
+            row, _, _ = encoder.encode(voo)
+            assert model.predict_proba(row)[0][1] == \
+                model.predict_proba(_montar_legado(voo, encoders))[0][1]
+
+    def test_lote_igual_a_linhas_individuais(self, encoder):
+        """encode_batch produz as mesmas linhas que encode"""
+        X, origin_rates, carrier_rates = encoder.encode_batch(VOOS)
+
+        assert X.dtype == np.float32
+        assert X.shape == (len(VOOS), len(FEATURE_ORDER))
+        for i, voo in enumerate(VOOS):
+            row, origin_rate, carrier_rate = encoder.encode(voo)
+            np.testing.assert_array_equal(X[i], row[0])
+            assert origin_rates[i] == origin_rate
+            assert carrier_rates[i] == carrier_rate
+
+    def test_calendario_da_linha(self, encoder):
+        """Mês, dia da semana e hora lidos da linha codificada iguais ao parse"""
+        for voo in VOOS + [_voo(crs_dep_time=2359), _voo(crs_dep_time=0)]:
+            row, _, _ = encoder.encode(voo)
+            assert encoder.calendario(row) == (
+                parse_month(voo.flight_date), voo.day_of_week, parse_dep_hour(voo.crs_dep_time))
+
+    def test_categoria_desconhecida(self, encoder):
+        """Categorias fora do vocabulário viram -1"""
+        row, _, _ = encoder.encode(_voo(airline='ZZ', origin='XXX', dest='YYY'))
+
+        for col in ['Airline', 'Origin', 'Dest']:
+            assert row[0, FEATURE_ORDER.index(col)] == -1
+
+    def test_lookup_defaults(self, encoder):
+        """Origem/companhia sem histórico usam os defaults"""
+        _, origin_rate, carrier_rate = encoder.encode(_voo(airline='ZZ', origin='XXX'))
+
+        assert origin_rate == LOOKUP_TABLES["defaults"]["origin_delay_rate"]
+        assert carrier_rate == LOOKUP_TABLES["defaults"]["carrier_delay_rate"]
+
+    def test_contagem_de_fallbacks_e_desconhecidas(self, encoder):
+        """Contagens por tabela/coluna iguais em linha única e em lote"""
+        voos = [_voo(), _voo(airline='ZZ', origin='XXX', dest='YYY'), _voo(airline='WN')]
+        X, _, _ = encoder.encode_batch(voos)
+
+        assert encoder.categorias_desconhecidas(X) == {'Airline': 1, 'Origin': 1, 'Dest': 1}
+        assert encoder.lookups_ausentes([v.origin for v in voos], [v.airline for v in voos]) == \
+            {'origin_delay_rate': 1, 'carrier_delay_rate': 2, 'origin_traffic': 1}
+        row, _, _ = encoder.encode(voos[1])
+        assert encoder.categorias_desconhecidas(row) == {'Airline': 1, 'Origin': 1, 'Dest': 1}
+        assert encoder.categorias_desconhecidas(encoder.encode(voos[0])[0]) == {}
+
+    def test_data_invalida(self, encoder):
+        """Data inválida gera EntradaInvalida (e lote informa os índices)"""
+        with pytest.raises(EntradaInvalida):
+            encoder.encode(_voo(flight_date='12/12/2023'))
+
+        with pytest.raises(EntradaInvalida, match=r"\[1\]"):
+            encoder.encode_batch([_voo(), _voo(flight_date='2023-02-30')])
+
+    def test_encoder_ausente(self, artefatos_substitutos):
+        """Coluna categórica sem encoder é erro de configuração"""
+        _, encoders = artefatos_substitutos
+        incompletos = {k: v for k, v in encoders.items() if k != 'Dest'}
+
+        with pytest.raises(ValueError, match="Dest"):
+            FeatureEncoder(FEATURE_NAMES, incompletos, LOOKUP_TABLES)
+
+    def test_verificar_modelo(self, encoder, artefatos_substitutos):
+        """Modelo com ordem de features diferente é rejeitado"""
+        model, _ = artefatos_substitutos
+        encoder.verificar_modelo(model)
+
+        invertido = FeatureEncoder(
+            {**FEATURE_NAMES, "todas": FEATURE_ORDER[::-1]},
+            artefatos_substitutos[1], LOOKUP_TABLES)
+        with pytest.raises(ValueError):
+            invertido.verificar_modelo(model)
+
+    def test_preparar_modelo_sem_aviso(self, encoder, artefatos_substitutos):
+        """Modelo preparado aceita a linha float32 sem warnings"""
+        import copy
+        import warnings
+
+        model = copy.deepcopy(artefatos_substitutos[0])
+        row, _, _ = encoder.encode(VOOS[0])
+        esperado = model.predict_proba(pd.DataFrame(row, columns=FEATURE_ORDER))
+
+        encoder.preparar_modelo(model)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            np.testing.assert_array_equal(model.predict_proba(row), esperado)
+
+
+class TestVocabulario:
+    """Testes para os ids e tabelas por id do Vocabulario"""
+
+    @pytest.fixture
+    def encoder(self, artefatos_substitutos):
+        _, encoders = artefatos_substitutos
+        return FeatureEncoder(FEATURE_NAMES, encoders, LOOKUP_TABLES)
+
+    def test_tabelas_iguais_as_lookup_tables(self, encoder):
+        """Cada id carrega os códigos dos encoders e as taxas de lookup_tables.json"""
+        voc, defaults = encoder.vocabulario, LOOKUP_TABLES["defaults"]
+        for codigo, i in voc.ids_aeroportos.items():
+            assert voc.aeroportos[i].tolist() == [
+                LOOKUP_TABLES["origin_delay_rate"].get(codigo, defaults["origin_delay_rate"]),
+                LOOKUP_TABLES["origin_traffic"].get(codigo, defaults["origin_traffic"]),
+                encoder.vocabularios['Origin'].get(codigo, -1),
+                encoder.vocabularios['Dest'].get(codigo, -1),
+            ]
+            assert voc.ausentes_aeroportos[i].tolist() == [
+                codigo not in LOOKUP_TABLES["origin_delay_rate"], codigo not in LOOKUP_TABLES["origin_traffic"]]
+        for codigo, i in voc.ids_companhias.items():
+            assert voc.companhias[i].tolist() == [
+                LOOKUP_TABLES["carrier_delay_rate"].get(codigo, defaults["carrier_delay_rate"]),
+                encoder.vocabularios['Airline'].get(codigo, -1),
+            ]
+        assert set(LOOKUP_TABLES["origin_delay_rate"]) <= set(voc.ids_aeroportos)
+        assert set(LOOKUP_TABLES["carrier_delay_rate"]) <= set(voc.ids_companhias)
+
+    def test_id_desconhecido(self, encoder):
+        """Código fora do vocabulário cai no id 0: defaults, código -1 e ausente"""
+        voc, defaults = encoder.vocabulario, LOOKUP_TABLES["defaults"]
+        assert voc.id_aeroporto('XXX') == ID_DESCONHECIDO == voc.id_companhia('ZZ')
+        assert voc.aeroportos[ID_DESCONHECIDO].tolist() == \
+            [defaults["origin_delay_rate"], defaults["origin_traffic"], -1, -1]
+        assert voc.companhias[ID_DESCONHECIDO].tolist() == [defaults["carrier_delay_rate"], -1]
+        assert voc.ausentes_aeroportos[ID_DESCONHECIDO].all() and voc.ausentes_companhias[ID_DESCONHECIDO]
+        assert min(voc.ids_aeroportos.values()) == min(voc.ids_companhias.values()) == 1
+        assert encoder.lookup('XXX', 'ZZ') == (
+            defaults["origin_delay_rate"], defaults["carrier_delay_rate"], defaults["origin_traffic"])
+
+    def test_arrays_somente_leitura(self, encoder):
+        """Arrays não graváveis (páginas compartilhadas entre workers após o fork)"""
+        voc = encoder.vocabulario
+        for nome in ARRAY_NAMES:
+            array = getattr(voc, nome)
+            assert not array.flags.writeable and array.flags.c_contiguous
+        with pytest.raises(ValueError):
+            voc.aeroportos[1, 0] = 0.0
+
+    def test_tabelas_inconsistentes(self):
+        with pytest.raises(ValueError, match="vocabulário"):
+            Vocabulario(['GRU'], [], np.zeros((1, 4)), np.zeros((1, 2)), np.zeros((2, 2), bool), np.zeros(1, bool))
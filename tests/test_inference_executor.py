@@ -0,0 +1,77 @@
+"""
+Testes para o executor de inferência com fila limitada (src/inference_executor.py)
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.inference_executor import FilaCheia, InferenceExecutor, PrazoExcedido
+
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor(max_workers=1, max_queue=2)
+    yield executor
+    executor.close()
+
+
+class TestInferenceExecutor:
+    """Testes para fila limitada, prazos e execução a partir do event loop"""
+
+    def test_fila_cheia_rejeita_na_hora(self, executor):
+        """Com 1 em execução e 2 na fila, a quarta submissão falha sem enfileirar"""
+        liberar = threading.Event()
+        futures = [executor.submit(liberar.wait) for _ in range(3)]
+
+        with pytest.raises(FilaCheia):
+            executor.submit(liberar.wait)
+        liberar.set()
+        assert [f.result(timeout=5) for f in futures] == [True] * 3
+
+        stats = executor.stats()
+        assert stats["accepted"] == 3 and stats["rejected"] == 1 and stats["completed"] == 3
+        assert stats["queue_depth"] == 0 and stats["running"] == 0
+        # Vagas liberadas: volta a aceitar
+        assert executor.submit(lambda: 1).result(timeout=5) == 1
+
+    def test_prazo_vencido_na_fila_nao_executa(self, executor):
+        """Tarefa que chega ao topo depois do prazo é descartada sem rodar"""
+        liberar = threading.Event()
+        executadas = []
+        bloqueio = executor.submit(liberar.wait)
+        expirada = executor.submit(executadas.append, 1, prazo=time.monotonic() + 0.01)
+        time.sleep(0.05)
+        liberar.set()
+
+        with pytest.raises(PrazoExcedido):
+            expirada.result(timeout=5)
+        assert bloqueio.result(timeout=5)
+        assert executadas == []
+        assert executor.stats()["expired"] == 1
+
+    def test_run_no_event_loop(self, executor):
+        """run devolve o resultado e converte prazo esgotado em PrazoExcedido"""
+        async def cenario():
+            assert await executor.run(sum, [1, 2, 3], timeout=1) == 6
+            inicio = time.perf_counter()
+            with pytest.raises(PrazoExcedido):
+                await executor.run(time.sleep, 0.5, timeout=0.05)
+            return time.perf_counter() - inicio
+
+        assert asyncio.run(cenario()) < 0.4
+
+    def test_excecao_da_tarefa_propagada(self, executor):
+        def falhar():
+            raise ValueError("entrada")
+
+        with pytest.raises(ValueError):
+            asyncio.run(executor.run(falhar))
+        assert executor.stats()["completed"] == 0
+
+    def test_parametros_invalidos(self):
+        with pytest.raises(ValueError):
+            InferenceExecutor(max_workers=0)
+        with pytest.raises(ValueError):
+            InferenceExecutor(max_queue=-1)
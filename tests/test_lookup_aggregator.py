@@ -0,0 +1,128 @@
+"""
+Testes para a atualização incremental das lookup tables
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.feature_encoder import FeatureEncoder
+from src.lookup_aggregator import LookupAggregator
+from tests.conftest import FEATURE_NAMES
+from update_lookup_tables import main as update_lookup_tables
+
+
+def _lote(seed, dias, n=3000):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'FlightDate': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(*dias, n), unit='D'),
+        'Origin': rng.choice(['ATL', 'JFK', 'LAX', 'ORD'], n),
+        'Airline': rng.choice(['AA', 'DL', 'UA'], n),
+        'ArrDelay15': rng.integers(0, 2, n),
+    })
+
+
+class TestLookupAggregator:
+    """Testes para LookupAggregator"""
+
+    def test_incremental_igual_ao_historico_completo(self):
+        """Lotes diários somados == agregação do histórico inteiro"""
+        lotes = [_lote(i, (i * 5, i * 5 + 5)) for i in range(4)]
+        incremental = LookupAggregator()
+        for lote in lotes:
+            incremental.ingerir(lote)
+
+        historico = pd.concat(lotes)
+        tabelas = incremental.tabelas()
+
+        origem = historico.groupby('Origin')['ArrDelay15'].mean()
+        companhia = historico.groupby('Airline')['ArrDelay15'].mean()
+        trafego = historico.groupby('Origin').size() / historico['FlightDate'].nunique()
+        assert tabelas["origin_delay_rate"] == pytest.approx(origem.to_dict(), abs=1e-6)
+        assert tabelas["carrier_delay_rate"] == pytest.approx(companhia.to_dict(), abs=1e-6)
+        assert tabelas["origin_traffic"] == trafego.round().astype(int).to_dict()
+        assert tabelas["defaults"]["origin_delay_rate"] == pytest.approx(historico['ArrDelay15'].mean())
+        assert tabelas["flights"] == len(historico) and tabelas["days"] == 20
+
+    def test_target_nulo_e_aeroportos_sem_voos(self):
+        """Target nulo fica fora das taxas; aeroportos válidos sem voos usam os defaults"""
+        lote = _lote(0, (0, 3))
+        lote['ArrDelay15'] = lote['ArrDelay15'].astype('float64')
+        lote.loc[::7, 'ArrDelay15'] = np.nan
+        agregador = LookupAggregator(['ATL', 'BOS', 'SEA'])
+        agregador.ingerir(lote)
+
+        tabelas = agregador.tabelas()
+        esperado = lote.dropna().groupby('Origin')['ArrDelay15'].mean()
+        assert set(tabelas["origin_delay_rate"]) == {'ATL', 'BOS', 'JFK', 'LAX', 'ORD', 'SEA'}
+        assert tabelas["origin_delay_rate"]['JFK'] == pytest.approx(esperado['JFK'], abs=1e-6)
+        assert tabelas["origin_delay_rate"]['BOS'] == tabelas["defaults"]["origin_delay_rate"]
+        assert tabelas["origin_traffic"]['SEA'] == tabelas["defaults"]["origin_traffic"]
+
+    def test_colunas_ausentes(self):
+        """Lote sem o target é rejeitado"""
+        with pytest.raises(ValueError, match="ArrDelay15"):
+            LookupAggregator().ingerir(_lote(0, (0, 1)).drop(columns='ArrDelay15'))
+
+
+class TestUpdateLookupTables:
+    """Testes do script update_lookup_tables.py"""
+
+    def test_publica_versoes_e_ignora_lote_repetido(self, tmp_path):
+        """Cada lote novo publica uma versão; lote repetido não é contado duas vezes"""
+        aeroportos = tmp_path / 'valid_airports.json'
+        aeroportos.write_text(json.dumps({"valid_airports": ['ATL', 'BOS', 'JFK', 'LAX', 'ORD']}))
+        _lote(0, (0, 5)).to_parquet(tmp_path / 'lote1.parquet')
+        _lote(1, (5, 6)).to_csv(tmp_path / 'lote2.csv', index=False)
+        args = ['--state', str(tmp_path / 'state.json'), '--output', str(tmp_path / 'lookup.json'),
+                '--airports', str(aeroportos)]
+
+        update_lookup_tables([str(tmp_path / 'lote1.parquet')] + args)
+        v1 = json.loads((tmp_path / 'lookup.json').read_text())
+        update_lookup_tables([str(tmp_path / 'lote2.csv'), str(tmp_path / 'lote1.parquet')] + args)
+        v2 = json.loads((tmp_path / 'lookup.json').read_text())
+        update_lookup_tables([str(tmp_path / 'lote2.csv')] + args)
+        v3 = json.loads((tmp_path / 'lookup.json').read_text())
+
+        assert (v1["version"], v2["version"], v3["version"]) == (1, 2, 2)
+        assert (v1["flights"], v2["flights"]) == (3000, 6000)
+        assert 'BOS' in v2["origin_delay_rate"]
+        assert not list(tmp_path.glob('.lookup.json.*'))
+
+        # A tabela publicada é aceita pelo FeatureEncoder da API
+        from sklearn.preprocessing import LabelEncoder
+        encoders = {col: LabelEncoder().fit(['x']) for col in FEATURE_NAMES['categoricas']}
+        encoder = FeatureEncoder(FEATURE_NAMES, encoders, v2)
+        assert encoder.lookup('BOS', 'ZZ') == (v2["defaults"]["origin_delay_rate"],
+                                               v2["defaults"]["carrier_delay_rate"],
+                                               v2["defaults"]["origin_traffic"])
+
+    def test_grade_de_risco_regerada(self, diretorio_artefatos, tmp_path):
+        """Tabela nova descarta a grade antiga (motivo exposto); --risk-grid-routes a regera"""
+        from build_risk_grid import build_risk_grid
+        from src.artifact_registry import carregar_versao
+
+        (tmp_path / 'rotas.csv').write_text("airline,origin,dest,distance\nAA,JFK,LAX,2475\nDL,ATL,ORD,606\n")
+        grade = str(diretorio_artefatos['risk_grid'])
+        build_risk_grid(str(tmp_path / 'rotas.csv'), grade, str(diretorio_artefatos['model']),
+                        str(diretorio_artefatos['lookup']), str(diretorio_artefatos['encoders']),
+                        str(diretorio_artefatos['feature_names']))
+        assert carregar_versao(diretorio_artefatos).info()["risk_grid_routes"] == 2
+
+        aeroportos = tmp_path / 'valid_airports.json'
+        aeroportos.write_text(json.dumps({"valid_airports": ['ATL', 'JFK', 'LAX', 'ORD']}))
+        _lote(0, (0, 5)).to_parquet(tmp_path / 'lote1.parquet')
+        _lote(1, (5, 6)).to_parquet(tmp_path / 'lote2.parquet')
+        args = ['--state', str(tmp_path / 'state.json'), '--output', str(diretorio_artefatos['lookup']),
+                '--airports', str(aeroportos), '--artifacts-dir', str(tmp_path)]
+
+        update_lookup_tables([str(tmp_path / 'lote1.parquet')] + args)
+        info = carregar_versao(diretorio_artefatos).info()
+        assert info["risk_grid_routes"] is None and "lookup" in info["risk_grid_error"]
+
+        update_lookup_tables([str(tmp_path / 'lote2.parquet'), '--risk-grid-routes', str(tmp_path / 'rotas.csv')]
+                             + args)
+        info = carregar_versao(diretorio_artefatos).info()
+        assert info["risk_grid_routes"] == 2 and info["risk_grid_error"] is None
+        assert info["lookup_version"] == 2
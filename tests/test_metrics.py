@@ -0,0 +1,123 @@
+"""
+Testes para as métricas no formato Prometheus (src/metrics.py)
+"""
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from src.metrics import MetricasAPI, RegistroMetricas
+
+
+class TestRegistroMetricas:
+    """Testes para contadores, histogramas e exposição em texto"""
+
+    def test_exposicao_contador_e_gauge(self):
+        """HELP/TYPE por família e uma linha por série, com rótulos escapados"""
+        registro = RegistroMetricas()
+        requisicoes = registro.contador("x_requests_total", "Requisições.", ("endpoint", "status"))
+        fila = registro.gauge("x_queue", "Fila.")
+        requisicoes.inc("/predict", "200")
+        requisicoes.inc("/predict", "200", valor=2)
+        requisicoes.inc('/a"b', "500")
+        fila.definir(3)
+
+        assert registro.expor().splitlines() == [
+            "# HELP x_requests_total Requisições.",
+            "# TYPE x_requests_total counter",
+            'x_requests_total{endpoint="/a\\"b",status="500"} 1',
+            'x_requests_total{endpoint="/predict",status="200"} 3',
+            "# HELP x_queue Fila.",
+            "# TYPE x_queue gauge",
+            "x_queue 3",
+        ]
+
+    def test_histograma_cumulativo(self):
+        """Buckets cumulativos com +Inf, _sum e _count"""
+        registro = RegistroMetricas()
+        latencia = registro.histograma("x_seconds", "Latência.", (0.1, 1), ("stage",))
+        for valor in (0.05, 0.1, 0.5, 3):
+            latencia.observar(valor, "predict")
+
+        linhas = registro.expor().splitlines()
+        assert linhas[2:] == [
+            'x_seconds_bucket{stage="predict",le="0.1"} 2',
+            'x_seconds_bucket{stage="predict",le="1"} 3',
+            'x_seconds_bucket{stage="predict",le="+Inf"} 4',
+            'x_seconds_sum{stage="predict"} 3.65',
+            'x_seconds_count{stage="predict"} 4',
+        ]
+
+    def test_rotulos_invalidos(self):
+        """Número de rótulos diferente do declarado é erro; nome repetido também"""
+        registro = RegistroMetricas()
+        contador = registro.contador("x_total", "X.", ("endpoint",))
+
+        with pytest.raises(ValueError):
+            contador.inc()
+        with pytest.raises(ValueError):
+            registro.contador("x_total", "X.")
+
+    def test_concorrencia_sem_perdas(self):
+        """Incrementos de várias threads não se perdem"""
+        contador = RegistroMetricas().contador("x_total", "X.")
+
+        def incrementar():
+            for _ in range(10000):
+                contador.inc()
+
+        threads = [threading.Thread(target=incrementar) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert contador.valor() == 80000
+
+
+class TestMetricasAPI:
+    """Testes para a medição de requisições"""
+
+    def test_status_e_versao(self):
+        """Status 200, HTTPException pelo status_code e demais erros como 500"""
+        metricas = MetricasAPI()
+        with metricas.requisicao("/predict") as medicao:
+            medicao.versao = "3"
+        for excecao in (HTTPException(status_code=400), RuntimeError("falha")):
+            with pytest.raises(type(excecao)):
+                with metricas.requisicao("/predict"):
+                    raise excecao
+
+        assert metricas.requisicoes.valor("/predict", "200", "3") == 1
+        assert metricas.requisicoes.valor("/predict", "400", "none") == 1
+        assert metricas.requisicoes.valor("/predict", "500", "none") == 1
+        assert metricas.latencia.valor("/predict", "3")["count"] == 1
+
+    def test_amostragem_de_etapas(self):
+        """Etapas só são medidas nas requisições amostradas"""
+        sempre, nunca = MetricasAPI(amostra_etapas=1.0), MetricasAPI(amostra_etapas=0.0)
+        for metricas in (sempre, nunca):
+            for _ in range(5):
+                with metricas.requisicao("/predict") as medicao:
+                    medicao.etapa("encode")
+                    medicao.etapa("predict")
+
+        assert sempre.etapas.valor("/predict", "encode")["count"] == 5
+        assert sempre.etapas.valor("/predict", "predict")["count"] == 5
+        assert nunca.etapas.valor("/predict", "encode") is None
+        assert nunca.requisicoes.valor("/predict", "200", "none") == 5
+
+    def test_desligado(self):
+        """Com habilitado=False nada é registrado"""
+        metricas = MetricasAPI(habilitado=False, amostra_etapas=1.0)
+        with metricas.requisicao("/predict") as medicao:
+            medicao.versao = "1"
+            medicao.etapa("encode")
+        metricas.voos("/predict", 1, "model")
+        metricas.qualidade_entrada({"origin_delay_rate": 1}, {})
+
+        assert "flightontime_requests_total{" not in metricas.expor()
+        assert metricas.fallbacks.valor("origin_delay_rate") is None
+
+    def test_amostra_invalida(self):
+        with pytest.raises(ValueError):
+            MetricasAPI(amostra_etapas=1.5)
@@ -0,0 +1,120 @@
+"""
+Testes para o MicroBatcher
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from src.micro_batcher import MicroBatcher
+
+
+class TestMicroBatcher:
+    """Testes para MicroBatcher"""
+
+    def test_resultados_por_chamador(self, artefatos_substitutos):
+        """Cada chamador recebe a probabilidade da própria linha"""
+        model, _ = artefatos_substitutos
+        X = np.random.default_rng(0).uniform(0, 2000, size=(60, 13)).astype(np.float32)
+        esperado = model.predict_proba(X)[:, 1]
+
+        batcher = MicroBatcher(lambda lote: model.predict_proba(lote)[:, 1],
+                               max_batch_size=16, max_wait_ms=20)
+        with ThreadPoolExecutor(max_workers=30) as pool:
+            resultados = list(pool.map(lambda i: batcher.predict(X[i:i + 1]), range(len(X))))
+        batcher.close()
+
+        np.testing.assert_array_equal(resultados, esperado)
+
+    def test_agrupa_requisicoes_concorrentes(self):
+        """Requisições simultâneas são pontuadas em poucos lotes"""
+        tamanhos = []
+
+        def score(lote):
+            tamanhos.append(len(lote))
+            return lote[:, 0]
+
+        batcher = MicroBatcher(score, max_batch_size=8, max_wait_ms=50)
+        barreira = threading.Barrier(20)
+
+        def chamar(i):
+            barreira.wait()
+            return batcher.predict(np.full(3, i, dtype=np.float32))
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            resultados = list(pool.map(chamar, range(20)))
+        batcher.close()
+
+        assert resultados == list(range(20))
+        assert max(tamanhos) <= 8
+        assert len(tamanhos) < 20
+
+        stats = batcher.stats()
+        assert stats["requests"] == 20
+        assert stats["batches"] == len(tamanhos)
+        assert stats["max_batch_size_seen"] == max(tamanhos)
+        assert sum(stats["batch_size_histogram"].values()) == len(tamanhos)
+        assert sum(stats["queue_wait_ms_histogram"].values()) == 20
+
+    def test_lote_separado_por_modelo(self):
+        """Linhas de modelos diferentes (troca de versão) nunca dividem uma chamada"""
+        chamadas = []
+
+        def score(lote, modelo):
+            chamadas.append((modelo, len(lote)))
+            return lote[:, 0] * modelo
+
+        batcher = MicroBatcher(score, max_batch_size=16, max_wait_ms=50)
+        barreira = threading.Barrier(12)
+
+        def chamar(i):
+            barreira.wait()
+            return batcher.predict(np.full(3, i, dtype=np.float32), 10 if i % 2 else 100)
+
+        with ThreadPoolExecutor(max_workers=12) as pool:
+            resultados = list(pool.map(chamar, range(12)))
+        batcher.close()
+
+        assert resultados == [i * (10 if i % 2 else 100) for i in range(12)]
+        assert sum(n for _, n in chamadas) == 12
+        assert batcher.stats()["batches"] == len(chamadas) < 12
+
+    def test_erro_propagado_para_o_lote(self):
+        """Exceção no modelo chega a todos os chamadores do lote"""
+        def score(lote):
+            raise RuntimeError("modelo falhou")
+
+        batcher = MicroBatcher(score, max_batch_size=4, max_wait_ms=1)
+
+        with pytest.raises(RuntimeError, match="modelo falhou"):
+            batcher.predict(np.zeros(3))
+        assert batcher.stats()["errors"] == 1
+
+        batcher.close()
+
+    def test_reinicia_apos_close(self):
+        """Após close, nova submissão reinicia a thread de lotes"""
+        batcher = MicroBatcher(lambda lote: lote[:, 0], max_batch_size=2, max_wait_ms=1)
+
+        assert batcher.predict(np.array([1.0, 0.0])) == 1.0
+        batcher.close()
+        assert batcher.predict(np.array([2.0, 0.0])) == 2.0
+        batcher.close()
+
+    def test_copiar_false_usa_a_linha_entregue(self):
+        """Por padrão a linha é copiada; com copiar=False o batcher usa a do chamador"""
+        batcher = MicroBatcher(lambda lote: lote[:, 0], max_batch_size=8, max_wait_ms=200)
+        copiada = np.array([[1.0, 0.0]], dtype=np.float32)
+        entregue = np.array([[2.0, 0.0]], dtype=np.float32)
+
+        futuros = [batcher.submit(copiada), batcher.submit(entregue, copiar=False)]
+        copiada[0, 0] = entregue[0, 0] = 9.0
+        batcher.close()
+
+        assert [f.result(timeout=1) for f in futuros] == [1.0, 9.0]
+
+    def test_tamanho_invalido(self):
+        """max_batch_size precisa ser positivo"""
+        with pytest.raises(ValueError):
+            MicroBatcher(lambda lote: lote, max_batch_size=0)
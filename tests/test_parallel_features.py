@@ -0,0 +1,55 @@
+"""
+Testes para as features históricas em paralelo
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.parallel_features import criar_features_historicas_paralelo
+from src.preprocessing import criar_features_historicas
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(11)
+    n = 6000
+    return pd.DataFrame({
+        'FlightDate': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 40, n), unit='D'),
+        'Origin': rng.choice(['JFK', 'LAX', 'ATL', 'ORD', 'MIA', 'SEA', 'BOS'], n),
+        'Airline': rng.choice(['AA', 'DL', 'UA', 'WN', 'B6'], n),
+        'ArrDelay15': rng.integers(0, 2, n),
+    })
+
+
+class TestFeaturesHistoricasParalelo:
+    """criar_features_historicas_paralelo == criar_features_historicas"""
+
+    @pytest.mark.parametrize("workers", [1, 2, 3])
+    def test_identico_ao_serial(self, dataset, workers):
+        """Mesmas linhas, mesma ordem e mesmos valores para qualquer número de processos"""
+        pd.testing.assert_frame_equal(
+            criar_features_historicas_paralelo(dataset, workers=workers),
+            criar_features_historicas(dataset), check_exact=True)
+
+    def test_identico_com_nulos_e_target_continuo(self, dataset):
+        """Target float com nulos, companhia nula e Origin categórica"""
+        rng = np.random.default_rng(2)
+        dataset['ArrDelay15'] = rng.uniform(0, 3, len(dataset))
+        dataset.loc[::17, 'ArrDelay15'] = np.nan
+        dataset.loc[::23, 'Airline'] = None
+        dataset['Origin'] = dataset['Origin'].astype('category')
+
+        pd.testing.assert_frame_equal(
+            criar_features_historicas_paralelo(dataset, workers=2),
+            criar_features_historicas(dataset), check_exact=True)
+
+    def test_deterministico(self, dataset):
+        """Execuções repetidas (e com mais tarefas) produzem o mesmo resultado"""
+        primeiro = criar_features_historicas_paralelo(dataset, workers=2)
+        segundo = criar_features_historicas_paralelo(dataset, workers=2, tarefas_por_worker=16)
+        pd.testing.assert_frame_equal(primeiro, segundo, check_exact=True)
+
+    def test_requires_flight_date(self):
+        """Exige coluna FlightDate"""
+        with pytest.raises(ValueError, match="FlightDate"):
+            criar_features_historicas_paralelo(pd.DataFrame({'Origin': ['JFK']}), workers=1)
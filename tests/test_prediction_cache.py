@@ -0,0 +1,68 @@
+"""
+Testes para o PredictionCache
+"""
+import numpy as np
+import pytest
+
+from src.prediction_cache import PredictionCache
+
+
+class TestPredictionCache:
+    """Testes para PredictionCache"""
+
+    def test_hit_e_miss(self):
+        """Segunda consulta da mesma linha é hit"""
+        cache = PredictionCache(max_size=4)
+        chave = PredictionCache.chave(np.array([[1.0, 2.0]], dtype=np.float32))
+
+        assert cache.get(chave) is None
+        cache.put(chave, 0.42)
+        assert cache.get(chave) == 0.42
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["hit_rate"] == 0.5
+
+    def test_evicta_menos_usado(self):
+        """Ao exceder max_size sai a entrada menos usada recentemente"""
+        cache = PredictionCache(max_size=2)
+        cache.put("a", 1.0)
+        cache.put("b", 2.0)
+        cache.get("a")
+        cache.put("c", 3.0)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1.0
+        assert cache.get("c") == 3.0
+        assert cache.stats()["evictions"] == 1
+
+    def test_expiracao(self, monkeypatch):
+        """Entradas expiram após ttl_seconds"""
+        agora = [100.0]
+        monkeypatch.setattr("src.prediction_cache.time.monotonic", lambda: agora[0])
+        cache = PredictionCache(max_size=4, ttl_seconds=10)
+        cache.put("a", 1.0)
+
+        agora[0] = 109.0
+        assert cache.get("a") == 1.0
+        agora[0] = 110.0
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+        assert len(cache) == 0
+
+    def test_clear_descarta_geracao_anterior(self):
+        """Valor calculado antes de clear() não volta ao cache"""
+        cache = PredictionCache(max_size=4)
+        cache.put("a", 1.0)
+        geracao = cache.geracao
+
+        cache.clear()
+        cache.put("b", 2.0, geracao)
+
+        assert len(cache) == 0
+        assert cache.stats()["generation"] == geracao + 1
+
+    def test_tamanho_invalido(self):
+        """max_size precisa ser positivo"""
+        with pytest.raises(ValueError):
+            PredictionCache(max_size=0)
@@ -5,9 +5,13 @@ import pytest
 import pandas as pd
 import numpy as np
 from src.preprocessing import (
+    classify_time_period,
     criar_features_temporais,
     criar_features_historicas,
-    downcast_dataframe
+    downcast_dataframe,
+    carregar_schema_dtypes,
+    ler_parquet_compacto,
+    planejar_dtypes
 )
 
 
@@ -73,6 +77,35 @@ class TestCriarFeaturesTemporais:
         assert df_result['dephour'].min() >= 0
         assert df_result['dephour'].max() <= 23
 
+    def test_identico_ao_apply_legado(self):
+        """Colunas, dtypes e categorias iguais ao apply por linha original"""
+        rng = np.random.default_rng(3)
+        df = pd.DataFrame({
+            'CRSDepTime': rng.integers(0, 2600, 2000),
+            'DayOfWeek': rng.integers(1, 8, 2000),
+            'Month': rng.integers(1, 13, 2000),
+        })
+
+        esperado = df.copy()
+        esperado['dephour'] = (esperado['CRSDepTime'] // 100).clip(0, 23).astype('int8')
+        esperado['is_weekend'] = esperado['DayOfWeek'].isin([6, 7]).astype('int8')
+        esperado['quarter'] = ((esperado['Month'] - 1) // 3 + 1).astype('int8')
+        esperado['time_of_day'] = esperado['dephour'].apply(
+            classify_time_period).astype('category')
+
+        pd.testing.assert_frame_equal(criar_features_temporais(df), esperado)
+        # Apenas os períodos presentes viram categorias
+        manha = criar_features_temporais(df[df['CRSDepTime'].between(600, 1159)])
+        assert list(manha['time_of_day'].cat.categories) == ['Morning (6am-12pm)']
+
+    def test_inplace(self, sample_dataframe):
+        """inplace=True adiciona as colunas no próprio DataFrame"""
+        copia = criar_features_temporais(sample_dataframe)
+        df_result = criar_features_temporais(sample_dataframe, inplace=True)
+
+        assert df_result is sample_dataframe
+        pd.testing.assert_frame_equal(df_result, copia)
+
 
 class TestCriarFeaturesHistoricas:
     """Testes para criar_features_historicas"""
@@ -134,14 +167,17 @@ class TestCriarFeaturesHistoricas:
 class TestDowncastDataframe:
     """Testes para downcast_dataframe"""
 
-    def test_int64_to_int32_conversion(self):
-        """Testa conversão de int64 para int32"""
+    def test_int64_to_smallest_int(self):
+        """Testa conversão de int64 para o menor inteiro (com e sem sinal)"""
         df = pd.DataFrame({
-            'col1': np.array([1, 2, 3], dtype='int64')
+            'col1': np.array([1, 2, 3], dtype='int64'),
+            'col2': np.array([-1, 0, 100], dtype='int64'),
+            'col3': np.array([0, 300, 60000], dtype='int64'),
+            'col4': np.array([-300, 0, 2000], dtype='int64'),
         })
 
         df_result = downcast_dataframe(df)
-        assert df_result['col1'].dtype == 'int32'
+        assert df_result.dtypes.astype(str).tolist() == ['uint8', 'int8', 'uint16', 'int16']
 
     def test_float64_to_float32_conversion(self):
         """Testa conversão de float64 para float32"""
@@ -164,3 +200,115 @@ class TestDowncastDataframe:
         memory_after = df_result.memory_usage(deep=True).sum()
 
         assert memory_after < memory_before
+
+    def test_low_cardinality_strings_to_category(self):
+        """Strings repetidas viram category; alta cardinalidade continua object"""
+        df = pd.DataFrame({
+            'Airline': ['AA', 'DL', 'AA', 'UA'] * 50,
+            'TailNum': [f'N{i}' for i in range(200)],
+        })
+
+        df_result = downcast_dataframe(df)
+        assert df_result['Airline'].dtype == 'category'
+        assert df_result['TailNum'].dtype == object
+        assert df_result['Airline'].tolist() == df['Airline'].tolist()
+
+    def test_plano_unico_sem_modificar_entrada(self):
+        """Plano só com as colunas que mudam; a entrada não é modificada"""
+        df = pd.DataFrame({
+            'col1': np.array([1, 2, 3], dtype='int64'),
+            'col2': np.array([1, 2, 3], dtype='uint8'),
+        })
+
+        assert planejar_dtypes(df) == {'col1': 'uint8'}
+        assert planejar_dtypes(df, unsigned=False) == {'col1': 'int8', 'col2': 'int8'}
+
+        df_result = downcast_dataframe(df)
+        assert df['col1'].dtype == 'int64'
+        assert df_result['col1'].dtype == 'uint8'
+
+    def test_schema_persistido(self, tmp_path):
+        """Schema salvo reproduz os dtypes na leitura do Parquet"""
+        df = pd.DataFrame({
+            'Month': np.array([1, 6, 12] * 10, dtype='int64'),
+            'Distance': np.linspace(100, 3000, 30),
+            'Origin': ['JFK', 'LAX', 'ATL'] * 10,
+        })
+        df_result = downcast_dataframe(df, schema_path=tmp_path / 'schema.json')
+        df.to_parquet(tmp_path / 'voos.parquet')
+
+        schema = carregar_schema_dtypes(tmp_path / 'schema.json')
+        assert schema == {'Month': 'uint8', 'Distance': 'float32', 'Origin': 'category'}
+
+        lido = ler_parquet_compacto(tmp_path / 'voos.parquet', tmp_path / 'schema.json')
+        pd.testing.assert_frame_equal(lido, df_result)
+
+    def test_schema_valores_fora_do_intervalo(self, tmp_path):
+        """Valores que não cabem no dtype do schema geram erro"""
+        pd.DataFrame({'Month': np.array([1, 300], dtype='int64')}).to_parquet(tmp_path / 'voos.parquet')
+
+        with pytest.raises(Exception):
+            ler_parquet_compacto(tmp_path / 'voos.parquet', {'Month': 'uint8'})
+
+
+def _historicas_legado(df, delay_col='ArrDelay15'):
+    """Implementação original (transform com lambda por grupo) usada como referência."""
+    df_feat = df.copy()
+    df_feat = df_feat.sort_values('FlightDate').reset_index(drop=True)
+    df_feat['origin_delay_rate'] = df_feat.groupby(
+        'Origin')[delay_col].transform(lambda x: x.shift(1).expanding().mean())
+    df_feat['carrier_delay_rate'] = df_feat.groupby(
+        'Airline')[delay_col].transform(lambda x: x.shift(1).expanding().mean())
+    df_feat['origin_traffic'] = df_feat.groupby(
+        ['Origin', 'FlightDate']).cumcount().astype('int16')
+    global_mean = df_feat[delay_col].mean()
+    df_feat['origin_delay_rate'] = df_feat['origin_delay_rate'].fillna(global_mean)
+    df_feat['carrier_delay_rate'] = df_feat['carrier_delay_rate'].fillna(global_mean)
+    return df_feat
+
+
+class TestFeaturesHistoricasEquivalencia:
+    """criar_features_historicas vetorizada == implementação original"""
+
+    @pytest.fixture
+    def dataset(self):
+        rng = np.random.default_rng(7)
+        n = 5000
+        return pd.DataFrame({
+            'FlightDate': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 60, n), unit='D'),
+            'Origin': rng.choice(['JFK', 'LAX', 'ATL', 'ORD', 'MIA', 'SEA'], n),
+            'Airline': rng.choice(['AA', 'DL', 'UA', 'WN'], n),
+            'ArrDelay15': rng.integers(0, 2, n),
+        })
+
+    def test_identico_ao_legado(self, dataset):
+        """Mesmas linhas, mesma ordem, mesmos valores (bit a bit)"""
+        pd.testing.assert_frame_equal(
+            criar_features_historicas(dataset), _historicas_legado(dataset), check_exact=True)
+
+    def test_identico_com_nulos_e_categorias(self, dataset):
+        """Target nulo, grupo nulo e colunas categóricas"""
+        dataset['ArrDelay15'] = dataset['ArrDelay15'].astype('float64')
+        dataset.loc[::17, 'ArrDelay15'] = np.nan
+        dataset.loc[::23, 'Airline'] = None
+        dataset['Origin'] = dataset['Origin'].astype('category')
+
+        pd.testing.assert_frame_equal(
+            criar_features_historicas(dataset), _historicas_legado(dataset), check_exact=True)
+
+    def test_nao_altera_entrada(self, dataset):
+        """O DataFrame de entrada não é modificado"""
+        original = dataset.copy()
+        criar_features_historicas(dataset)
+        pd.testing.assert_frame_equal(dataset, original)
+
+    def test_entrada_ordenada_sem_copia(self, dataset):
+        """Entrada já ordenada: colunas originais compartilhadas, sem cópia"""
+        dataset = dataset.sort_values('FlightDate', kind='stable').set_index(np.arange(len(dataset)) * 2)
+        original = dataset.copy()
+
+        resultado = criar_features_historicas(dataset)
+
+        assert np.shares_memory(resultado['ArrDelay15'].to_numpy(), dataset['ArrDelay15'].to_numpy())
+        assert (resultado.index == pd.RangeIndex(len(dataset))).all()
+        pd.testing.assert_frame_equal(dataset, original)
@@ -4,7 +4,7 @@ Testes Unitários para o Motor Prescritivo
 import numpy as np
 import pytest
 
-from src.prescriptive_engine import gerar_output_prescritivo
+from src.prescriptive_engine import CONFIANCAS, gerar_output_prescritivo, gerar_saida_prescritiva
 
 
 class TestGerarOutputPrescritivo:
@@ -164,3 +164,65 @@ class TestValidacaoEntrada:
         resultado = gerar_output_prescritivo(
             y_pred, y_proba, feature_importance)
         assert resultado[0]["principais_fatores"] == []
+
+
+class TestSaidaPrescritiva:
+    """Testes para a saída colunar (gerar_saida_prescritiva)"""
+
+    def test_limites_de_confianca(self):
+        """Limites exatos de cada faixa, nas duas classes"""
+        y_pred = np.array([1, 1, 1, 1, 0, 0, 0, 0])
+        y_proba = np.array([0.75, 0.60, 0.50, 0.4999, 0.25, 0.40, 0.50, 0.5001])
+
+        saida = gerar_saida_prescritiva(y_pred, y_proba, {"dephour": 0.273})
+
+        assert [CONFIANCAS[c] for c in saida.confianca] == [
+            "Muito Alta", "Alta", "Moderada", "Baixa"] * 2
+
+    def test_mesmo_resultado_da_lista(self):
+        """Visão em dicts igual a gerar_output_prescritivo, com listas compartilhadas"""
+        rng = np.random.default_rng(0)
+        y_proba = rng.random(1000)
+        y_pred = (y_proba >= 0.409).astype(int)
+        importancias = {"dephour": 0.273, "Distance": 0.087, "carrier_delay_rate": 0.141}
+
+        saida = gerar_saida_prescritiva(y_pred, y_proba, importancias, top_n=2)
+        lista = gerar_output_prescritivo(y_pred, y_proba, importancias, top_n=2)
+
+        assert len(saida) == 1000 and list(saida) == lista
+        assert saida[-1] == lista[-1] and saida[10:13] == lista[10:13]
+        assert lista[0]["principais_fatores"] is lista[1]["principais_fatores"]
+        atrasados = [r["recomendacoes"] for r in lista if r["previsao"] == "Atrasado"]
+        assert all(r is atrasados[0] for r in atrasados)
+
+    def test_alterar_saida_nao_afeta_as_proximas(self):
+        """Recomendações de uma saída são listas próprias, não a tabela global"""
+        from src.prescriptive_engine import RECOMENDACOES
+
+        y_pred, y_proba = np.array([1, 0]), np.array([0.8, 0.2])
+        saida = gerar_saida_prescritiva(y_pred, y_proba, {"dephour": 0.273})
+        primeira = saida.to_list()
+        primeira[0]["recomendacoes"].append("alterada")
+        primeira[1]["recomendacoes"].clear()
+
+        assert saida.to_list()[0]["recomendacoes"] == RECOMENDACOES["Atrasado"]
+        assert gerar_output_prescritivo(y_pred, y_proba, {"dephour": 0.273})[1]["recomendacoes"] == \
+            RECOMENDACOES["Pontual"]
+        assert len(RECOMENDACOES["Atrasado"]) == 5 and len(RECOMENDACOES["Pontual"]) == 3
+
+    def test_pandas_e_arrow(self):
+        """Saída colunar com previsao/confianca categóricas"""
+        y_pred = np.array([1, 0, 1])
+        y_proba = np.array([0.75, 0.30, 0.55])
+
+        saida = gerar_saida_prescritiva(y_pred, y_proba, {"dephour": 0.273})
+        df = saida.to_pandas()
+        assert df["previsao"].tolist() == ["Atrasado", "Pontual", "Atrasado"]
+        assert df["confianca"].tolist() == ["Muito Alta", "Alta", "Moderada"]
+        assert df.attrs["principais_fatores"] == ["dephour: 27.3% de importância"]
+
+        table = saida.to_arrow()
+        assert table.column("previsao").to_pylist() == ["Atrasado", "Pontual", "Atrasado"]
+        assert table.column("probabilidade_atraso").to_pylist() == [0.75, 0.3, 0.55]
+        assert table.column("principais_fatores").to_pylist() == [["dephour: 27.3% de importância"]] * 3
+        assert table.to_pylist() == saida.to_list()
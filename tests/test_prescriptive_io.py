@@ -0,0 +1,118 @@
+"""
+Testes para a gravação em fluxo da saída prescritiva (NDJSON e Parquet)
+"""
+import json
+import tracemalloc
+
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+from src.prescriptive_engine import (dividir_em_lotes, gerar_output_prescritivo, gerar_output_prescritivo_stream,
+                                     iterar_saida_prescritiva)
+from src.prescriptive_io import gravar_saida_prescritiva, ler_ndjson
+
+IMPORTANCIAS = {"dephour": 0.273, "Distance": 0.087, "carrier_delay_rate": 0.141}
+
+
+def _predicoes(n, seed=0):
+    y_proba = np.random.default_rng(seed).random(n)
+    return (y_proba >= 0.409).astype(int), y_proba
+
+
+def _blocos(n, tamanho_bloco):
+    return iterar_saida_prescritiva(dividir_em_lotes(*_predicoes(n), tamanho_bloco), IMPORTANCIAS)
+
+
+class TestGerador:
+    """Testes para gerar_output_prescritivo_stream"""
+
+    def test_mesmos_registros_da_lista(self):
+        """Blocos encadeados: indice_voo contínuo e registros idênticos"""
+        y_pred, y_proba = _predicoes(1001)
+        lista = gerar_output_prescritivo(y_pred, y_proba, IMPORTANCIAS)
+
+        assert list(gerar_output_prescritivo_stream(y_pred, y_proba, IMPORTANCIAS, tamanho_bloco=100)) == lista
+
+    def test_tamanhos_diferentes_erro(self):
+        """Mesmo erro da versão em lista"""
+        with pytest.raises(IndexError):
+            list(gerar_output_prescritivo_stream(np.array([1, 0]), np.array([0.75]), IMPORTANCIAS))
+
+
+class TestSinks:
+    """Testes para NDJSONSink e ParquetSink"""
+
+    def test_ndjson_igual_ao_json(self, tmp_path):
+        """Cada linha é o json.dumps do registro original"""
+        y_pred, y_proba = _predicoes(2500)
+        y_proba[7] = np.nan
+        lista = gerar_output_prescritivo(y_pred, y_proba, IMPORTANCIAS)
+        path = tmp_path / "saida.ndjson"
+
+        blocos = iterar_saida_prescritiva(dividir_em_lotes(y_pred, y_proba, 1000), IMPORTANCIAS)
+        assert gravar_saida_prescritiva(blocos, path) == 2500
+
+        linhas = path.read_text(encoding='utf-8').splitlines()
+        assert linhas == [json.dumps(r, ensure_ascii=False) for r in lista]
+        assert next(ler_ndjson(path)) == lista[0]
+
+    def test_parquet_row_groups(self, tmp_path):
+        """Row groups de tamanho fixo independentes do tamanho dos blocos"""
+        path = tmp_path / "saida.parquet"
+        assert gravar_saida_prescritiva(_blocos(2500, 700), path, linhas_por_grupo=1000) == 2500
+
+        arquivo = pq.ParquetFile(path)
+        assert [arquivo.metadata.row_group(i).num_rows for i in range(arquivo.num_row_groups)] == [1000, 1000, 500]
+        assert arquivo.read().to_pylist() == gerar_output_prescritivo(*_predicoes(2500), IMPORTANCIAS)
+
+    @pytest.mark.parametrize("nome", ["saida.ndjson", "saida.parquet"])
+    def test_falha_nao_publica_arquivo(self, tmp_path, nome):
+        """Erro no meio do fluxo: destino intocado e temporário removido"""
+        path = tmp_path / nome
+        path.write_text("anterior")
+
+        def blocos():
+            yield from _blocos(100, 50)
+            raise RuntimeError("inferência falhou")
+
+        with pytest.raises(RuntimeError):
+            gravar_saida_prescritiva(blocos(), path)
+        assert path.read_text() == "anterior"
+        assert [p.name for p in tmp_path.iterdir()] == [nome]
+
+    def test_opcao_invalida_nao_cria_temporario(self, tmp_path):
+        """linhas_por_grupo inválido é rejeitado antes de abrir o arquivo"""
+        with pytest.raises(ValueError, match="linhas_por_grupo"):
+            gravar_saida_prescritiva(_blocos(10, 5), tmp_path / "saida.parquet", linhas_por_grupo=0)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_sink_incompleto_falha_na_criacao(self, tmp_path):
+        """Sink sem _concluir/_abortar falha ao instanciar, sem criar temporário"""
+        from src.prescriptive_io import _SinkAtomico
+
+        class SinkIncompleto(_SinkAtomico):
+            def escrever(self, bloco):
+                pass
+
+        with pytest.raises(TypeError, match="_abortar"):
+            SinkIncompleto(tmp_path / "saida.txt")
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.parametrize("nome, opcoes", [("saida.ndjson", {}),
+                                              ("saida.parquet", {"linhas_por_grupo": 5000})])
+    def test_memoria_constante(self, tmp_path, nome, opcoes):
+        """Pico de memória não cresce com o número de voos"""
+        def lotes(n):
+            # Predições geradas por lote, como numa inferência em chunks
+            for i in range(n // 5000):
+                yield _predicoes(5000, seed=i)
+
+        picos = []
+        for n in (20_000, 200_000):
+            tracemalloc.start()
+            blocos = iterar_saida_prescritiva(lotes(n), IMPORTANCIAS)
+            gravar_saida_prescritiva(blocos, tmp_path / nome, **opcoes)
+            picos.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        assert picos[1] < 2 * picos[0]
@@ -0,0 +1,102 @@
+"""
+Testes para a grade de risco pré-calculada
+"""
+import copy
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.feature_encoder import FeatureEncoder
+from src.risk_grid import RiskGrid, carregar_rotas
+from tests.conftest import FEATURE_NAMES, LOOKUP_TABLES
+
+ROTAS = [
+    ('AA', 'JFK', 'LAX', 2475.0),
+    ('DL', 'ATL', 'ORD', 606.0),
+    ('ZZ', 'XXX', 'BOS', 187.7),
+]
+
+
+@pytest.fixture
+def encoder(artefatos_substitutos):
+    return FeatureEncoder(FEATURE_NAMES, artefatos_substitutos[1], LOOKUP_TABLES)
+
+
+@pytest.fixture
+def grade(encoder, artefatos_substitutos):
+    return RiskGrid.build(ROTAS, encoder, artefatos_substitutos[0], rotas_por_bloco=2)
+
+
+class TestRiskGrid:
+    """Testes para RiskGrid"""
+
+    def test_celulas_iguais_a_inferencia_ao_vivo(self, grade, encoder, artefatos_substitutos):
+        """Cada célula é idêntica a encode + predict_proba do voo"""
+        model = artefatos_substitutos[0]
+        for airline, origin, dest, distance in ROTAS:
+            for month, day_of_week, hour in [(1, 1, 0), (3, 6, 5), (7, 7, 23), (12, 2, 18)]:
+                voo = SimpleNamespace(airline=airline, origin=origin, dest=dest, distance=distance,
+                                      day_of_week=day_of_week, flight_date=f'2024-{month:02d}-10',
+                                      crs_dep_time=hour * 100 + 15)
+                row, _, _ = encoder.encode(voo)
+
+                assert grade.lookup(airline, origin, dest, distance, month, day_of_week, hour) == \
+                    model.predict_proba(row)[0][1]
+
+    def test_fora_da_grade(self, grade):
+        """Rota, distância ou hora fora da malha retornam None"""
+        assert grade.lookup('AA', 'JFK', 'BOS', 2475.0, 1, 1, 10) is None
+        assert grade.lookup('AA', 'JFK', 'LAX', 2475.3, 1, 1, 10) is None
+        assert grade.lookup('AA', 'JFK', 'LAX', 2475.0, 1, 1, 24) is None
+        assert grade.lookup('AA', 'JFK', 'LAX', 2475.0, 1, 1, 10) is not None
+
+    def test_salvar_e_carregar(self, grade, encoder, artefatos_substitutos, tmp_path):
+        """Grade salva abre mapeada em memória com os mesmos valores"""
+        grade.save(tmp_path / "grade")
+        carregada = RiskGrid.load(tmp_path / "grade")
+
+        assert RiskGrid.is_artifact(tmp_path / "grade")
+        assert isinstance(carregada.probas, np.memmap)
+        np.testing.assert_array_equal(carregada.probas, grade.probas)
+        assert carregada.rotas == grade.rotas
+        carregada.verificar(encoder, artefatos_substitutos[0])
+
+    def test_regerar_nao_altera_grade_mapeada(self, grade, encoder, artefatos_substitutos, tmp_path):
+        """Regerar no diretório em uso troca os arquivos sem truncar o probas.npy mapeado"""
+        grade.save(tmp_path / "grade")
+        em_uso = RiskGrid.load(tmp_path / "grade")
+
+        RiskGrid.build(ROTAS[:1], encoder, artefatos_substitutos[0]).save(tmp_path / "grade")
+
+        np.testing.assert_array_equal(em_uso.probas, grade.probas)
+        assert len(RiskGrid.load(tmp_path / "grade")) == 1
+        assert sorted(p.name for p in (tmp_path / "grade").iterdir()) == ["header.json", "probas.npy"]
+
+    def test_verificar_rejeita_outros_artefatos(self, grade, encoder, artefatos_substitutos):
+        """Outro modelo ou outras lookup tables invalidam a grade"""
+        model, encoders = artefatos_substitutos
+        outro_modelo = copy.deepcopy(model)
+        outro_modelo.estimators_ = outro_modelo.estimators_[:3]
+        with pytest.raises(ValueError, match="modelo"):
+            grade.verificar(encoder, outro_modelo, amostras=256)
+
+        outras_lookups = copy.deepcopy(LOOKUP_TABLES)
+        outras_lookups["origin_delay_rate"]["JFK"] = 0.9
+        with pytest.raises(ValueError, match="lookup"):
+            grade.verificar(FeatureEncoder(FEATURE_NAMES, encoders, outras_lookups), model)
+
+    def test_rota_duplicada(self):
+        """A mesma rota não pode aparecer duas vezes"""
+        with pytest.raises(ValueError, match="duplicada"):
+            RiskGrid(ROTAS[:1] * 2, np.zeros((2, 12, 7, 24)), "x")
+
+    def test_carregar_rotas(self, tmp_path):
+        """CSV de rotas exige as quatro colunas"""
+        arquivo = tmp_path / "rotas.csv"
+        arquivo.write_text("airline,origin,dest,distance\nAA,JFK,LAX,2475\n")
+        assert carregar_rotas(arquivo) == [('AA', 'JFK', 'LAX', 2475.0)]
+
+        arquivo.write_text("airline,origin,dest\nAA,JFK,LAX\n")
+        with pytest.raises(ValueError, match="distance"):
+            carregar_rotas(arquivo)
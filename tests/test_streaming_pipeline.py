@@ -0,0 +1,65 @@
+"""
+Testes para o pipeline de features em streaming
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.preprocessing import criar_features_historicas, criar_features_temporais
+from src.streaming_pipeline import processar_parquet
+
+
+def _dataset(n=3000, seed=11):
+    rng = np.random.default_rng(seed)
+    data = pd.Timestamp('2023-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 40, n)), unit='D')
+    return pd.DataFrame({
+        'FlightDate': data,
+        'Airline': rng.choice(['AA', 'DL', 'UA', 'WN', 'B6'], n),
+        'Origin': rng.choice(['JFK', 'LAX', 'ATL', 'ORD', 'MIA', 'SEA', 'BOS'], n),
+        'CRSDepTime': rng.integers(0, 2400, n),
+        'DayOfWeek': data.dayofweek + 1,
+        'Month': data.month,
+        'ArrDelay15': rng.integers(0, 2, n),
+    })
+
+
+def _em_memoria(path):
+    return criar_features_historicas(criar_features_temporais(pd.read_parquet(path)))
+
+
+class TestProcessarParquet:
+    """Testes para processar_parquet"""
+
+    @pytest.mark.parametrize("chunk_rows", [97, 1000, 10000])
+    def test_identico_ao_caminho_em_memoria(self, tmp_path, chunk_rows):
+        """Saída em streaming == pipeline em memória (datas cruzam blocos)"""
+        entrada, saida = tmp_path / "consolidado.parquet", tmp_path / "features.parquet"
+        _dataset().to_parquet(entrada, row_group_size=500)
+
+        stats = processar_parquet(entrada, saida, chunk_rows=chunk_rows)
+
+        assert stats["rows"] == 3000
+        pd.testing.assert_frame_equal(pd.read_parquet(saida), _em_memoria(entrada), check_exact=True)
+
+    def test_identico_com_nulos_e_categorias(self, tmp_path):
+        """Target nulo, companhia nula, colunas categóricas e poucos períodos do dia"""
+        df = _dataset()
+        df['ArrDelay15'] = df['ArrDelay15'].astype('float64')
+        df.loc[::13, 'ArrDelay15'] = np.nan
+        df.loc[::29, 'Airline'] = None
+        df['Origin'] = df['Origin'].astype('category')
+        df['CRSDepTime'] = np.where(df.index < 1500, 700, 1300)
+        entrada, saida = tmp_path / "consolidado.parquet", tmp_path / "features.parquet"
+        df.to_parquet(entrada, row_group_size=400)
+
+        processar_parquet(entrada, saida, chunk_rows=250)
+
+        pd.testing.assert_frame_equal(pd.read_parquet(saida), _em_memoria(entrada), check_exact=True)
+
+    def test_exige_ordenacao(self, tmp_path):
+        """Entrada fora de ordem de FlightDate é rejeitada"""
+        entrada = tmp_path / "consolidado.parquet"
+        _dataset().sample(frac=1, random_state=1).to_parquet(entrada)
+
+        with pytest.raises(ValueError, match="ordenado"):
+            processar_parquet(entrada, tmp_path / "features.parquet")
@@ -0,0 +1,149 @@
+"""
+Testes para o motor de inferência compilado (CompiledForest)
+"""
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+from src.tree_engine import CompiledForest
+
+
+def _dados(n=1500, n_classes=2, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 6)).astype(np.float32)
+    y = (X[:, 0] + rng.normal(scale=0.5, size=n) > 0).astype(int)
+    if n_classes > 2:
+        y += (X[:, 1] > 0.5).astype(int)
+    return X, y
+
+
+class TestCompiledForest:
+    """Testes para CompiledForest"""
+
+    @pytest.mark.parametrize("estimator", [RandomForestClassifier, ExtraTreesClassifier])
+    @pytest.mark.parametrize("n_classes", [2, 3])
+    def test_probabilidades_bit_a_bit(self, estimator, n_classes):
+        """predict_proba idêntico ao sklearn (sem tolerância)"""
+        X, y = _dados(n_classes=n_classes)
+        model = estimator(n_estimators=15, random_state=42).fit(X, y)
+        compiled = CompiledForest.from_sklearn(model)
+
+        X_teste = np.random.default_rng(1).normal(size=(700, 6))
+        np.testing.assert_array_equal(
+            compiled.predict_proba(X_teste), model.predict_proba(X_teste))
+
+    def test_modelo_substituto_v7(self, artefatos_substitutos):
+        """Equivalência no schema v7, uma linha e em blocos pequenos"""
+        model, _ = artefatos_substitutos
+        compiled = CompiledForest.from_sklearn(model)
+        X = np.random.default_rng(2).uniform(-1, 3000, size=(257, 13)).astype(np.float32)
+
+        np.testing.assert_array_equal(
+            compiled.predict_proba(X, batch_size=64), model.predict_proba(X))
+        np.testing.assert_array_equal(
+            compiled.predict_proba(X[:1]), model.predict_proba(X[:1]))
+        assert list(compiled.feature_names_in_) == list(model.feature_names_in_)
+
+    def test_valores_ausentes(self):
+        """NaN segue o mesmo ramo que no sklearn"""
+        X, y = _dados()
+        X[np.random.default_rng(3).random(X.shape) < 0.1] = np.nan
+        model = RandomForestClassifier(n_estimators=10, random_state=42).fit(X, y)
+        compiled = CompiledForest.from_sklearn(model)
+
+        np.testing.assert_array_equal(compiled.predict_proba(X), model.predict_proba(X))
+
+    def test_apply_e_predict(self):
+        """Folhas e classes consistentes com o sklearn"""
+        X, y = _dados()
+        model = RandomForestClassifier(n_estimators=5, random_state=42).fit(X, y)
+        compiled = CompiledForest.from_sklearn(model)
+
+        folhas = compiled.apply(X) - compiled.roots[:, np.newaxis]
+        np.testing.assert_array_equal(folhas.T, model.apply(X))
+        np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+
+    def test_formato_invalido(self):
+        """X com número errado de features é rejeitado"""
+        X, y = _dados()
+        compiled = CompiledForest.from_sklearn(
+            RandomForestClassifier(n_estimators=3, random_state=42).fit(X, y))
+
+        with pytest.raises(ValueError):
+            compiled.predict_proba(X[:, :5])
+
+    def test_modelo_compacto(self, artefatos_substitutos):
+        """Arrays da floresta são contíguos e menores que o pickle"""
+        import pickle
+
+        model, _ = artefatos_substitutos
+        compiled = CompiledForest.from_sklearn(model)
+
+        assert compiled.n_estimators == model.n_estimators
+        assert compiled.nbytes < len(pickle.dumps(model))
+
+
+class TestArtefatoMapeado:
+    """Testes para o formato .npy + header.json"""
+
+    @pytest.fixture
+    def compiled(self, artefatos_substitutos):
+        model, _ = artefatos_substitutos
+        return CompiledForest.from_sklearn(model)
+
+    def test_roundtrip_mmap(self, compiled, tmp_path):
+        """Floresta salva e reaberta via mmap produz as mesmas probabilidades"""
+        compiled.save(tmp_path / "forest")
+        carregado = CompiledForest.load(tmp_path / "forest")
+
+        assert isinstance(carregado.threshold, np.memmap)
+        assert not carregado.threshold.flags.writeable
+        X = np.random.default_rng(4).uniform(0, 2000, size=(50, 13))
+        np.testing.assert_array_equal(
+            carregado.predict_proba(X), compiled.predict_proba(X))
+        assert list(carregado.feature_names_in_) == list(compiled.feature_names_in_)
+
+    def test_roundtrip_sem_mmap(self, compiled, tmp_path):
+        """mmap=False carrega arrays comuns em memória"""
+        compiled.save(tmp_path / "forest")
+        carregado = CompiledForest.load(tmp_path / "forest", mmap=False)
+
+        assert not isinstance(carregado.value, np.memmap)
+        np.testing.assert_array_equal(carregado.value, compiled.value)
+
+    def test_regravar_nao_altera_floresta_mapeada(self, compiled, tmp_path):
+        """Regravar o diretório em uso troca os arquivos sem truncar os mapeados"""
+        from sklearn.ensemble import RandomForestClassifier
+
+        compiled.save(tmp_path / "forest")
+        em_uso = CompiledForest.load(tmp_path / "forest")
+        X = np.random.default_rng(5).uniform(0, 2000, size=(50, 13))
+        antes = em_uso.predict_proba(X)
+
+        rng = np.random.default_rng(6)
+        outro = RandomForestClassifier(n_estimators=3, random_state=0).fit(
+            rng.uniform(0, 2000, size=(200, 13)), rng.integers(0, 2, 200))
+        CompiledForest.from_sklearn(outro).save(tmp_path / "forest")
+
+        np.testing.assert_array_equal(em_uso.predict_proba(X), antes)
+        assert CompiledForest.load(tmp_path / "forest").n_estimators == 3
+        assert not [p for p in (tmp_path / "forest").iterdir() if p.name.startswith('.')]
+
+    def test_header_inconsistente(self, compiled, tmp_path):
+        """Array que não confere com o header é rejeitado"""
+        destino = compiled.save(tmp_path / "forest")
+        np.save(destino / "threshold.npy", compiled.threshold[:-1])
+
+        with pytest.raises(ValueError, match="threshold"):
+            CompiledForest.load(destino)
+
+    def test_load_model_detecta_artefato(self, compiled, tmp_path):
+        """load_model abre diretórios compilados sem joblib"""
+        from src.model_utils import load_model
+
+        destino = compiled.save(tmp_path / "forest")
+        modelo = load_model(str(destino))
+
+        assert isinstance(modelo, CompiledForest)
+        assert CompiledForest.is_artifact(destino)
+        assert not CompiledForest.is_artifact(tmp_path)
@@ -0,0 +1,83 @@
+"""
+Atualiza models/lookup_tables.json com novos lotes de voos (Parquet ou CSV).
+
+O estado acumulado (somas e contagens por aeroporto e companhia) fica em
+models/lookup_state.json; cada execução ingere apenas os lotes novos e
+publica uma nova versão da tabela com troca atômica. A API em execução
+recarrega o arquivo sozinha (FLIGHTONTIME_ARTIFACT_WATCH_S).
+
+A grade de risco (build_risk_grid.py) é pontuada com as lookup tables e deixa
+de valer a cada publicação: a API a descarta na recarga (risk_grid_error em
+/admin/artifacts, flightontime_risk_grid_rejected em /metrics) e responde
+esses voos com inferência ao vivo. Com --risk-grid-routes a grade é regerada
+logo depois da tabela.
+
+Uso:
+    # Primeira carga: histórico completo
+    python update_lookup_tables.py data/flight_data_consolidated.parquet
+    # Depois: um lote por dia
+    python update_lookup_tables.py data/voos_2025-12-19.parquet
+    # Lote diário + grade de risco regerada com as tabelas novas
+    python update_lookup_tables.py data/voos_2025-12-19.parquet --risk-grid-routes rotas.csv
+
+Colunas necessárias: FlightDate, Origin, Airline e ArrDelay15.
+"""
+import argparse
+import os
+from pathlib import Path
+
+from build_risk_grid import build_risk_grid
+from src.lookup_aggregator import LookupAggregator, carregar_aeroportos_validos
+from src.model_utils import BASE_DIR
+from src.risk_grid import RiskGrid
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Atualização incremental das lookup tables")
+    parser.add_argument("batches", nargs="+", help="Arquivos Parquet/CSV com voos novos")
+    parser.add_argument("--state", default=str(BASE_DIR / "models" / "lookup_state.json"))
+    parser.add_argument("--output", default=str(BASE_DIR / "models" / "lookup_tables.json"))
+    parser.add_argument("--airports", default=str(BASE_DIR / "docs" / "valid_airports.json"))
+    parser.add_argument("--delay-col", default="ArrDelay15")
+    parser.add_argument("--artifacts-dir", default=str(BASE_DIR / "models"),
+                        help="Diretório do modelo, encoders, feature names e grade de risco")
+    parser.add_argument("--model-path", help="Modelo da grade (default: randomforest_v7_final.pkl do diretório)")
+    parser.add_argument("--risk-grid-routes", help="CSV de rotas: regera a grade de risco com a tabela nova")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    aeroportos = carregar_aeroportos_validos(args.airports)
+
+    if os.path.exists(args.state):
+        agregador = LookupAggregator.carregar(args.state, aeroportos)
+        print(f"🔄 Estado carregado: v{agregador.versao}, {agregador.voos:,} voos")
+    else:
+        agregador = LookupAggregator(aeroportos, args.delay_col)
+        print("⚠️ Estado não encontrado: começando do zero (ingira o histórico completo primeiro)")
+
+    novos = [path for path in args.batches if agregador.ingerir_arquivo(path)]
+    if not novos:
+        print("✅ Nenhum lote novo: lookup tables inalteradas")
+        return
+
+    # A tabela é sempre recalculada do estado: se o processo parar entre as
+    # duas gravações, a próxima execução reingere o lote e republica
+    agregador.publicar(args.output)
+    agregador.salvar(args.state)
+
+    artefatos = Path(args.artifacts_dir)
+    grade = artefatos / 'risk_grid_v7'
+    if args.risk_grid_routes:
+        build_risk_grid(args.risk_grid_routes, str(grade),
+                        args.model_path or str(artefatos / 'randomforest_v7_final.pkl'),
+                        args.output, str(artefatos / 'label_encoders_v7.pkl'),
+                        str(artefatos / 'feature_names_v7.json'))
+    elif RiskGrid.is_artifact(grade):
+        print(f"⚠️ Grade de risco em {grade} gerada com as tabelas anteriores: a API vai ignorá-la "
+              "até ser regerada (--risk-grid-routes ou build_risk_grid.py)")
+
+
+if __name__ == "__main__":
+    main()